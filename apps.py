@@ -5,12 +5,43 @@ class AdminPanelConfig(AppConfig):
     name = 'adminPanel'
     
     def ready(self):
-        """Start background threads when Django app is ready"""
+        """Start background jobs when Django app is ready"""
         try:
-            # Start chat message cleanup thread
-            from adminPanel.chat_cleanup_thread import chat_cleanup_thread
-            chat_cleanup_thread.start()
+            # One scheduler thread per process runs chat cleanup, commission sync, reports
+            # and PAMM equity sync; per-job leases make sure only one process runs each job
+            from django.conf import settings
+            if getattr(settings, 'SCHEDULER_ENABLED', True):
+                from adminPanel.scheduler import scheduler, register_default_jobs
+                register_default_jobs(scheduler)
+                scheduler.start()
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
-            logger.warning(f"Failed to start chat cleanup thread: {e}")
\ No newline at end of file
+            logger.warning(f"Failed to start scheduler: {e}")
+
+        try:
+            # Refresh the MT5 group catalog when trading group rows change
+            from adminPanel.services.group_catalog import connect_signals
+            connect_signals()
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Failed to connect group catalog signals: {e}")
+
+        try:
+            # Keep the transaction daily summary in step with saved / deleted transactions
+            from adminPanel.services.transaction_summary import connect_signals as connect_summary_signals
+            connect_summary_signals()
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Failed to connect transaction summary signals: {e}")
+
+        try:
+            # Release deduplicated uploads when the rows that reference them are deleted
+            from adminPanel.services.blob_storage import connect_signals as connect_blob_signals
+            connect_blob_signals()
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Failed to connect blob storage signals: {e}")
@@ -0,0 +1,68 @@
+"""
+pytest-benchmark suite for the commission hot path (see services/commission_benchmark.py).
+
+Needs pytest-django and pytest-benchmark; not collected by manage.py test:
+
+    pytest adminPanel/benchmarks/bench_commission.py --ds=<settings module> \
+        --benchmark-json=commission-benchmark.json
+
+BENCH_COMMISSION_DEPTH / _FAN_OUT / _CLIENTS / _DEALS size the seeded data.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('pytest_django')
+pytest.importorskip('pytest_benchmark')
+
+from adminPanel.services import commission_benchmark  # noqa: E402
+
+ROUNDS = 5
+
+
+@pytest.fixture
+def data(db):
+    return commission_benchmark.seed(
+        depth=int(os.environ.get('BENCH_COMMISSION_DEPTH', 3)),
+        fan_out=int(os.environ.get('BENCH_COMMISSION_FAN_OUT', 3)),
+        clients_per_ib=int(os.environ.get('BENCH_COMMISSION_CLIENTS', 3)),
+        deals_per_client=int(os.environ.get('BENCH_COMMISSION_DEALS', 10)),
+    )
+
+
+def _run(benchmark, data, path):
+    last = {}
+
+    def run():
+        last['raw'] = commission_benchmark.run_path(path, data)
+
+    # Only the path is timed; resetting (and pre-seeding sync_rerun) happens in setup
+    benchmark.pedantic(run, setup=lambda: commission_benchmark.prepare(path, data), rounds=ROUNDS, iterations=1)
+    result = commission_benchmark.summarize(data, last['raw'])
+    benchmark.extra_info.update(data.config)
+    benchmark.extra_info.update({
+        key: result[key] for key in ('deals', 'queries_per_deal', 'p50_ms', 'p99_ms', 'commissions', 'commission_total')
+    })
+    return result
+
+
+def test_create_commission(benchmark, data):
+    result = _run(benchmark, data, 'create_commission')
+    assert result['commissions'] > 0
+
+
+def test_process_commission_for_trade(benchmark, data):
+    result = _run(benchmark, data, 'process_trade')
+    assert result['commissions'] > 0
+
+
+def test_sync_commissions_from_mt5(benchmark, data):
+    result = _run(benchmark, data, 'sync')
+    assert result['commissions'] > 0
+
+
+def test_sync_commissions_rerun(benchmark, data):
+    result = _run(benchmark, data, 'sync_rerun')
+    # Nothing new to create: the run only re-checks existing deals
+    assert result['p50_ms'] is None
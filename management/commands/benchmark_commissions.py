@@ -0,0 +1,104 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from adminPanel.services import commission_benchmark
+from adminPanel.services.commission_benchmark import PATHS
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark commission calculation and ingestion (create_commission, process_commission_for_trade, '
+        'sync_commissions_from_mt5) on a synthetic IB hierarchy with simulated MT5 deals. '
+        'Seeded rows are rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=3, help='IB hierarchy depth')
+        parser.add_argument('--fan-out', type=int, default=3, help='Sub-IBs per IB')
+        parser.add_argument('--roots', type=int, default=1, help='Top-level IBs')
+        parser.add_argument('--clients-per-ib', type=int, default=5)
+        parser.add_argument('--deals-per-client', type=int, default=20, help='Closed deals per client account (about)')
+        parser.add_argument('--levels', type=int, help='dynamic_levels in the profile (default: depth)')
+        parser.add_argument('--mode', choices=('usd', 'percentage'), default='usd')
+        parser.add_argument('--path', choices=PATHS, action='append', help='Run only these paths')
+        parser.add_argument('--rounds', type=int, default=3, help='Runs per path; the median run is reported')
+        parser.add_argument('--memory', action='store_true',
+                            help='Trace Python allocations (slower; reported as traced_peak_mb)')
+        parser.add_argument('--json', dest='json_path', help="Write the results as JSON to this file ('-' for stdout)")
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                capture_output=True, text=True, timeout=10,
+            ).stdout.strip() or None
+        except Exception:
+            return None
+
+    def handle(self, *args, **options):
+        paths = options['path'] or PATHS
+        rounds = max(1, options['rounds'])
+        results = []
+
+        with commission_benchmark.rolled_back():
+            started = time.perf_counter()
+            data = commission_benchmark.seed(
+                depth=options['depth'],
+                fan_out=options['fan_out'],
+                clients_per_ib=options['clients_per_ib'],
+                deals_per_client=options['deals_per_client'],
+                levels=options['levels'],
+                mode=options['mode'],
+                roots=options['roots'],
+            )
+            config = data.config
+            self.stdout.write(
+                f"Seeded {config['ibs']} IBs, {config['clients']} clients, {config['deals']} closed deals, "
+                f"{config['levels']} {config['mode']} levels in {time.perf_counter() - started:.1f}s; "
+                f"{rounds} rounds per path\n"
+            )
+            self.stdout.write(
+                f"{'path':<18} {'deals/s':>9} {'queries/deal':>13} {'p50 ms':>8} {'p99 ms':>8} "
+                f"{'commissions':>12} {'RSS MB':>8}"
+            )
+            for path in paths:
+                runs = []
+                for _ in range(rounds):
+                    # Each run starts from the same rows
+                    with commission_benchmark.rolled_back():
+                        runs.append(commission_benchmark.measure(path, data, trace_memory=options['memory']))
+                result = sorted(runs, key=lambda run: run['seconds'])[len(runs) // 2]
+                result['rounds_seconds'] = [run['seconds'] for run in runs]
+                result['stdev_seconds'] = statistics.pstdev(result['rounds_seconds'])
+                results.append(result)
+
+                p50 = f"{result['p50_ms']:8.2f}" if result['p50_ms'] is not None else f"{'-':>8}"
+                p99 = f"{result['p99_ms']:8.2f}" if result['p99_ms'] is not None else f"{'-':>8}"
+                rss = f"{result['peak_rss_mb']:8.1f}" if result['peak_rss_mb'] is not None else f"{'-':>8}"
+                self.stdout.write(
+                    f"{path:<18} {result['deals_per_second']:9.1f} {result['queries_per_deal']:13.2f} {p50} {p99} "
+                    f"{result['commissions']:>12} {rss}"
+                )
+
+        if options['json_path']:
+            report = {
+                'benchmark': 'commissions',
+                'commit': self._git_commit(),
+                'timestamp': timezone.now().isoformat(),
+                'config': {**config, 'depth': options['depth'], 'fan_out': options['fan_out'],
+                           'roots': options['roots'], 'clients_per_ib': options['clients_per_ib'],
+                           'deals_per_client': options['deals_per_client'], 'rounds': rounds},
+                'results': results,
+            }
+            if options['json_path'] == '-':
+                self.stdout.write(json.dumps(report, indent=2, default=str))
+            else:
+                with open(options['json_path'], 'w') as f:
+                    json.dump(report, f, indent=2, default=str)
+                self.stdout.write(f"\nResults written to {options['json_path']}")
@@ -0,0 +1,184 @@
+import json
+import resource
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from adminPanel.mt5 import simulator
+
+SCENARIOS = ('commission', 'dashboard', 'positions', 'reports', 'bulk')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the MT5 access paths of commission sync, dashboards, positions, reports and bulk '
+        'account changes against the offline MT5 simulator (10k accounts, millions of deals by default). '
+        'No MT5 server or database writes are needed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=10000)
+        parser.add_argument('--deals-per-account', type=int, default=300)
+        parser.add_argument('--sample', type=int, default=500,
+                            help='Logins used for the per-login reference paths (extrapolated to all accounts)')
+        parser.add_argument('--latency-ms', type=float, default=1.0, help='Simulated round trip per Manager API call')
+        parser.add_argument('--record-latency-us', type=float, default=2.0,
+                            help='Simulated transfer time per returned record')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of Manager API calls that fail')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--only', choices=SCENARIOS, action='append', help='Run only these scenarios')
+        parser.add_argument('--json', dest='json_path', help="Write the results as JSON to this file ('-' for stdout)")
+
+    # --- helpers --------------------------------------------------------------
+
+    def _measure(self, scenario, label, fn, extrapolate_from=None):
+        server = simulator.server()
+        server.reset_stats()
+        started = time.perf_counter()
+        items = fn()
+        seconds = time.perf_counter() - started
+        stats = server.stats()
+        result = {
+            'scenario': scenario,
+            'path': label,
+            'seconds': seconds,
+            'items': items,
+            'items_per_second': items / seconds if seconds else None,
+            'mt5_calls': stats['calls'],
+            'mt5_records': stats['records'],
+            'mt5_failures': stats['failures'],
+            'simulated_latency_seconds': stats['latency_seconds'],
+            'simulator_generate_seconds': stats['generate_seconds'],
+            # ru_maxrss is in KB on Linux
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+        if extrapolate_from:
+            result['estimated_seconds_all_accounts'] = seconds / extrapolate_from * self.accounts
+        self.results.append(result)
+
+        estimate = ''
+        if extrapolate_from:
+            estimate = f"  (~{result['estimated_seconds_all_accounts']:.1f} s for {self.accounts} accounts)"
+        self.stdout.write(
+            f"{scenario:<11} {label:<44} {seconds:9.2f} s {items:>10} items {stats['calls']:>7} calls "
+            f"{stats['records']:>9} records  sim {stats['generate_seconds']:6.2f} s{estimate}"
+        )
+        return result
+
+    def _chunks(self, logins):
+        for i in range(0, len(logins), self.chunk_size):
+            yield logins[i:i + self.chunk_size]
+
+    # --- scenarios ------------------------------------------------------------
+
+    def _commission(self, actions, logins, sample, from_date, to_date):
+        # sync_commissions_from_mt5: one DealRequest per trading account
+        self._measure('commission', 'get_closed_trades per login', lambda: sum(
+            len(actions.get_closed_trades(login, from_date, to_date)) for login in sample
+        ), extrapolate_from=len(sample))
+
+        def batched():
+            closed = 0
+            # One chunk in memory at a time, as a streaming sync would consume it
+            for chunk in self._chunks(logins):
+                trades = actions.get_closed_trades_by_logins(chunk, from_date, to_date, chunk_size=self.chunk_size)
+                closed += sum(len(deals) for deals in trades.values())
+            return closed
+
+        self._measure('commission', 'get_closed_trades_by_logins (all accounts)', batched)
+
+    def _dashboard(self, actions, logins, sample):
+        self._measure('dashboard', 'get_account_data per login', lambda: sum(
+            1 for login in sample if actions.get_account_data(login, use_cache=False)
+        ), extrapolate_from=len(sample))
+        self._measure('dashboard', 'get_accounts_data (all accounts)', lambda: len(
+            actions.get_accounts_data(logins, use_cache=False, chunk_size=self.chunk_size)
+        ))
+
+    def _positions(self, actions, logins, sample):
+        self._measure('positions', 'get_open_positions per login', lambda: sum(
+            len(actions.get_open_positions(login)) for login in sample
+        ), extrapolate_from=len(sample))
+        self._measure('positions', 'get_open_positions_by_logins (all accounts)', lambda: sum(
+            len(positions) for positions in
+            actions.get_open_positions_by_logins(logins, chunk_size=self.chunk_size).values()
+        ))
+
+    def _reports(self, actions, logins, to_date):
+        from adminPanel.services.balance_timeline import deal_balance_effect
+
+        def month_of_deals():
+            # Monthly statements / balance timeline: last 30 days of deals folded into per-login totals
+            deals = 0
+            for chunk in self._chunks(logins):
+                by_login = actions.get_deals_by_logins(chunk, to_date - timedelta(days=30), to_date,
+                                                       chunk_size=self.chunk_size)
+                for login_deals in by_login.values():
+                    for deal in login_deals:
+                        deal_balance_effect(deal)
+                    deals += len(login_deals)
+            return deals
+
+        self._measure('reports', 'get_deals_by_logins, 30 days (all accounts)', month_of_deals)
+
+    def _bulk(self, actions, sample):
+        changes = {login: {'Leverage': 200} for login in sample}
+        self._measure('bulk', 'update_users (UserUpdateBatch)', lambda: sum(
+            1 for result in actions.update_users(changes, chunk_size=200).values() if result['ok']
+        ), extrapolate_from=len(sample))
+        self._measure('bulk', 'UserGet + UserUpdate per login', lambda: sum(
+            1 for login, fields in changes.items() if actions._update_user_single(login, fields)['ok']
+        ), extrapolate_from=len(sample))
+
+    def handle(self, *args, **options):
+        self.accounts = options['accounts']
+        self.chunk_size = options['chunk_size']
+        self.results = []
+        scenarios = options['only'] or SCENARIOS
+
+        server = simulator.configure(
+            accounts=self.accounts,
+            deals_per_account=options['deals_per_account'],
+            latency_ms=options['latency_ms'],
+            record_latency_us=options['record_latency_us'],
+            failure_rate=options['failure_rate'],
+            seed=options['seed'],
+        )
+        actions = simulator.manager_actions()
+
+        logins = list(range(server.first_login, server.first_login + self.accounts))
+        step = max(1, self.accounts // max(1, options['sample']))
+        sample = logins[::step][:options['sample']]
+        to_date = datetime.fromtimestamp(server.now)
+        from_date = to_date - timedelta(days=365)
+
+        self.stdout.write(
+            f"Simulated MT5: {self.accounts} accounts, ~{self.accounts * options['deals_per_account']:,} deals, "
+            f"{options['latency_ms']} ms per call, {options['record_latency_us']} us per record, "
+            f"failure rate {options['failure_rate']}; per-login paths on {len(sample)} logins\n"
+        )
+        if 'commission' in scenarios:
+            self._commission(actions, logins, sample, from_date, to_date)
+        if 'dashboard' in scenarios:
+            self._dashboard(actions, logins, sample)
+        if 'positions' in scenarios:
+            self._positions(actions, logins, sample)
+        if 'reports' in scenarios:
+            self._reports(actions, logins, to_date)
+        if 'bulk' in scenarios:
+            self._bulk(actions, sample)
+
+        if options['json_path']:
+            report = {
+                'config': {key: value for key, value in server.config.items() if key != 'groups'},
+                'sample': len(sample),
+                'results': self.results,
+            }
+            if options['json_path'] == '-':
+                self.stdout.write(json.dumps(report, indent=2, default=str))
+            else:
+                with open(options['json_path'], 'w') as f:
+                    json.dump(report, f, indent=2, default=str)
+                self.stdout.write(f"\nResults written to {options['json_path']}")
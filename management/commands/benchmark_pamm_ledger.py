@@ -0,0 +1,81 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from adminPanel.services.pamm_ledger import PAMMLedger
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PAMMLedger array operations on a synthetic PAMM (no database writes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--investors', type=int, default=10000, help='Number of investor participants')
+        parser.add_argument('--batch', type=int, default=1000, help='Deposits/withdrawals per batch event')
+        parser.add_argument('--rounds', type=int, default=5, help='Times each event is repeated')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _build_ledger(self, investors, rng):
+        units = [Decimal(rng.randint(1000, 5_000_000)).scaleb(-2) for _ in range(investors)]
+        manager_units = Decimal('100000.00')
+        total_units = sum(units) + manager_units
+        return PAMMLedger(
+            total_equity=(total_units * Decimal('1.0725')).quantize(Decimal('0.01')),
+            total_units=total_units,
+            participant_ids=list(range(investors + 1)),
+            roles=['MANAGER'] + ['INVESTOR'] * investors,
+            units=[manager_units] + units,
+            deposited=[manager_units] + units,
+            withdrawn=[Decimal('0')] * (investors + 1),
+            high_water_mark=total_units,
+            profit_share=Decimal('20.00'),
+        )
+
+    def _time(self, label, rounds, fn):
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        best = min(timings) * 1000
+        mean = sum(timings) / len(timings) * 1000
+        self.stdout.write(f'{label:<40} best {best:9.2f} ms   mean {mean:9.2f} ms')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        investors = options['investors']
+        batch = min(options['batch'], investors)
+        rounds = options['rounds']
+
+        ledger = self._build_ledger(investors, rng)
+        self.stdout.write(f'PAMM with {investors} investors, batch {batch}, {rounds} rounds')
+
+        deposits = [(rng.randint(1, investors), Decimal(rng.randint(1000, 100000)).scaleb(-2)) for _ in range(batch)]
+        withdrawals = [(pid, (amount / 4).quantize(Decimal('0.01'))) for pid, amount in deposits]
+
+        self._time('load (arrays from participant rows)', rounds, lambda: self._build_ledger(investors, rng))
+        self._time(f'apply_deposits x{batch}', rounds, lambda: ledger.apply_deposits(deposits))
+        self._time(f'plan+apply_withdrawals x{batch}', rounds, lambda: ledger.apply_withdrawals(withdrawals))
+
+        self._time('balances()', rounds, ledger.balances)
+        self._time('profit_losses()', rounds, ledger.profit_losses)
+        self._time('snapshot_values()', rounds, ledger.snapshot_values)
+
+        # Reference: the per-participant Decimal loop the ledger replaces
+        participants = [
+            {'units': Decimal(u).scaleb(-8), 'deposited': Decimal(d).scaleb(-2)}
+            for u, d in zip(ledger.units, ledger.deposited)
+        ]
+        equity = Decimal(ledger.total_equity).scaleb(-2)
+        total_units = Decimal(ledger.total_units).scaleb(-8)
+
+        def naive_balances():
+            unit_price = equity / total_units
+            return [(p['units'] * unit_price).quantize(Decimal('0.01')) for p in participants]
+
+        self._time('reference: Decimal per-participant loop', rounds, naive_balances)
+
+        # Conservation check: balances add up to the pool within rounding
+        drift = abs(sum(ledger.balances()) - Decimal(ledger.total_equity).scaleb(-2))
+        self.stdout.write(f'balance drift vs pool equity: {drift} (max allowed {Decimal("0.01") * (investors + 1)})')
@@ -0,0 +1,94 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+HEAVY_MODULES = ('MT5Manager', 'weasyprint', 'reportlab', 'pikepdf')
+
+# Runs in a fresh interpreter: the cost one worker pays before serving its first request
+PROBE = r"""
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver
+resolver = get_resolver()
+resolver.reverse_dict  # builds the URL index like the first request does
+urls_done = time.perf_counter()
+touched = 0
+if os.environ.get('BENCHMARK_TOUCH_VIEWS') == '1':
+    from adminPanel.utils.lazy_views import LazyView
+    def walk(patterns):
+        global touched
+        for pattern in patterns:
+            if hasattr(pattern, 'url_patterns'):
+                walk(pattern.url_patterns)
+            elif isinstance(pattern.callback, LazyView):
+                pattern.callback.resolve()
+                touched += 1
+    walk(resolver.url_patterns)
+touched_done = time.perf_counter()
+with open('/proc/self/statm') as statm:
+    rss = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+print(json.dumps({
+    'setup_ms': (setup_done - started) * 1000,
+    'urls_ms': (urls_done - setup_done) * 1000,
+    'touch_ms': (touched_done - urls_done) * 1000,
+    'touched': touched,
+    'rss_mb': rss / 1048576,
+    'modules': len(sys.modules),
+    'heavy': sorted(name for name in HEAVY if name in sys.modules),
+}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure worker startup (django.setup + URL conf) with lazy and eager view loading: '
+        'import time, RSS, loaded modules and which heavy libraries (MT5Manager, WeasyPrint, reportlab, pikepdf) got imported.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5, help='Fresh interpreters per mode')
+        parser.add_argument('--touch', action='store_true',
+                            help='Also resolve every lazy view afterwards (cost of visiting every route once)')
+
+    def _probe(self, eager, touch):
+        env = dict(os.environ)
+        env['ADMINPANEL_EAGER_VIEWS'] = '1' if eager else '0'
+        env['BENCHMARK_TOUCH_VIEWS'] = '1' if touch else '0'
+        code = f"HEAVY = {HEAVY_MODULES!r}\n" + PROBE
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, timeout=300)
+        lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+        if result.returncode != 0 or not lines:
+            raise CommandError(f'Startup probe failed:\n{result.stderr[-2000:]}')
+        return json.loads(lines[-1])
+
+    def handle(self, *args, **options):
+        if not os.path.exists('/proc/self/statm'):
+            raise CommandError('RSS is read from /proc; run this on Linux')
+        rounds = max(1, options['rounds'])
+        self.stdout.write(f'{rounds} fresh interpreters per mode\n')
+        self.stdout.write(f"{'mode':<8} {'setup ms':>10} {'urls ms':>10} {'total ms':>10} {'RSS MB':>8} {'modules':>8}  heavy imports")
+        for eager in (True, False):
+            samples = [self._probe(eager, touch=False) for _ in range(rounds)]
+            setup = statistics.median(s['setup_ms'] for s in samples)
+            urls = statistics.median(s['urls_ms'] for s in samples)
+            rss = statistics.median(s['rss_mb'] for s in samples)
+            modules = statistics.median(s['modules'] for s in samples)
+            heavy = ', '.join(samples[-1]['heavy']) or '-'
+            label = 'eager' if eager else 'lazy'
+            self.stdout.write(f'{label:<8} {setup:10.1f} {urls:10.1f} {setup + urls:10.1f} {rss:8.1f} {modules:8.0f}  {heavy}')
+
+        if options['touch']:
+            sample = self._probe(False, touch=True)
+            self.stdout.write(
+                f"\nlazy, then every view resolved: {sample['touched']} views in {sample['touch_ms']:.1f} ms, "
+                f"RSS {sample['rss_mb']:.1f} MB, heavy imports: {', '.join(sample['heavy']) or '-'}"
+            )
@@ -0,0 +1,139 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from adminPanel.models import Transaction, TransactionDailySummary
+from adminPanel.services.transaction_summary import rebuild_all, transaction_totals
+
+SEED_SOURCE = 'benchmark-seed'
+TYPES = ['deposit_trading', 'withdraw_trading', 'credit_in', 'credit_out', 'commission_withdrawal']
+STATUSES = ['approved'] * 8 + ['pending', 'rejected']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the dashboard / listing Transaction queries: raw aggregates against the daily summary, '
+        'with query plans. --seed N inserts N synthetic rows first, inside a transaction that is rolled back '
+        'after the run, so nothing is left in the table; --cleanup removes rows left by older versions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Synthetic transactions to insert (e.g. 5000000)')
+        parser.add_argument('--users', type=int, default=2000, help='Existing users the seeded rows are spread over')
+        parser.add_argument('--days', type=int, default=730, help='Days of history the seeded rows cover')
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--explain', action='store_true', help='Print query plans of the raw queries')
+        parser.add_argument('--cleanup', action='store_true', help='Delete seeded rows and rebuild the summary')
+
+    def _time(self, label, rounds, fn):
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        best = min(timings) * 1000
+        mean = sum(timings) / len(timings) * 1000
+        self.stdout.write(f'{label:<52} best {best:9.2f} ms   mean {mean:9.2f} ms')
+
+    def _seed(self, count, users, days):
+        user_ids = list(get_user_model().objects.order_by('id').values_list('id', flat=True)[:users])
+        if not user_ids:
+            raise CommandError('Seeding needs at least one existing user')
+        rng = random.Random(42)
+        now = timezone.now()
+        batch = []
+        self.stdout.write(f'Seeding {count} transactions over {len(user_ids)} users and {days} days...')
+        for i in range(count):
+            batch.append(Transaction(
+                user_id=rng.choice(user_ids),
+                transaction_type=rng.choice(TYPES),
+                status=rng.choice(STATUSES),
+                amount=Decimal(rng.randint(1000, 500000)).scaleb(-2),
+                source=SEED_SOURCE,
+            ))
+            if len(batch) == 10000 or i == count - 1:
+                created = Transaction.objects.bulk_create(batch)
+                # created_at is auto_now_add: spread the rows over the history afterwards
+                for tx in created:
+                    tx.created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+                Transaction.objects.bulk_update(created, ['created_at'], batch_size=10000)
+                batch = []
+                self.stdout.write(f'  {i + 1} rows', ending='\r')
+        self.stdout.write('')
+        started = time.perf_counter()
+        rows = rebuild_all()
+        self.stdout.write(f'Summary rebuilt: {rows} rows in {(time.perf_counter() - started):.1f}s')
+
+    def _explain(self, label, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {sql}', params)
+            plan = '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+        self.stdout.write(f'--- {label}\n{plan}')
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            deleted, _ = Transaction.objects.filter(source=SEED_SOURCE).delete()
+            rebuild_all()
+            self.stdout.write(self.style.SUCCESS(f'Removed {deleted} seeded rows and rebuilt the summary'))
+            return
+        if not options['seed']:
+            self._run(options)
+            return
+        with transaction.atomic():
+            self._seed(options['seed'], options['users'], options['days'])
+            self._run(options)
+            # The seeded rows and the summary rebuilt over them never leave this transaction
+            transaction.set_rollback(True)
+        self.stdout.write('Seeded rows rolled back')
+
+    def _run(self, options):
+        rounds = options['rounds']
+        since = timezone.now() - timedelta(days=30)
+        withdraw_types = ['withdraw_trading', 'credit_out']
+        self.stdout.write(
+            f'{Transaction.objects.count()} transactions, {TransactionDailySummary.objects.count()} summary rows, '
+            f'{rounds} rounds'
+        )
+
+        raw_queries = {
+            'deposits 30d': Transaction.objects.filter(
+                transaction_type='deposit_trading', status='approved', created_at__gte=since),
+            'deposits all time': Transaction.objects.filter(transaction_type='deposit_trading', status='approved'),
+            'withdrawn all time': Transaction.objects.filter(transaction_type__in=withdraw_types, status='approved'),
+            'pending count': Transaction.objects.filter(status='pending'),
+        }
+        for label, queryset in raw_queries.items():
+            self._time(f'raw: {label}', rounds, lambda qs=queryset: qs.order_by().aggregate(n=Count('id'), s=Sum('amount')))
+
+        self._time('summary: deposits 30d', rounds, lambda: transaction_totals('deposit_trading', 'approved', since=since))
+        self._time('summary: deposits all time', rounds, lambda: transaction_totals('deposit_trading', 'approved'))
+        self._time('summary: withdrawn all time', rounds, lambda: transaction_totals(withdraw_types, 'approved'))
+        self._time('summary: pending count', rounds, lambda: transaction_totals(None, 'pending'))
+
+        listings = {
+            'pending deposits page': Transaction.objects.filter(
+                transaction_type__in=['deposit', 'deposit_trading', 'deposit_commission'], status='pending',
+            ).order_by('-created_at')[:20],
+            'recent deposits page': Transaction.objects.filter(
+                transaction_type='deposit_trading').order_by('-created_at')[:10],
+            'admin transactions page': Transaction.objects.order_by('-created_at')[:10],
+        }
+        for label, queryset in listings.items():
+            self._time(f'listing: {label}', rounds, lambda qs=queryset: list(qs.values_list('id', flat=True)))
+
+        # Consistency check: summary totals equal the raw aggregates
+        raw = raw_queries['deposits 30d'].order_by().aggregate(s=Sum('amount'))['s'] or Decimal('0')
+        summary = transaction_totals('deposit_trading', 'approved', since=since)[1]
+        self.stdout.write(f'deposits 30d raw {raw} / summary {summary} ({"match" if raw == summary else "MISMATCH"})')
+
+        if options['explain']:
+            for label, queryset in {**raw_queries, **listings}.items():
+                self._explain(label, queryset)
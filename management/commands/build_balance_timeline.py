@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from adminPanel.models import TradingAccount
+from adminPanel.services.balance_timeline import BalanceTimeline
+
+
+class Command(BaseCommand):
+    help = 'Build or extend the daily balance timeline of trading accounts from MT5 deals and approved transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', action='append', help='MT5 account ID (repeatable); default all accounts')
+        parser.add_argument('--through', type=str, help='Last day to build, YYYY-MM-DD (default yesterday)')
+        parser.add_argument('--rebuild', action='store_true', help='Drop existing timelines and replay full history')
+        parser.add_argument('--no-mt5', action='store_true', help='Build from approved transactions only')
+
+    def handle(self, *args, **options):
+        accounts = TradingAccount.objects.all()
+        if options['account']:
+            accounts = accounts.filter(account_id__in=options['account'])
+        accounts = list(accounts)
+        through = date.fromisoformat(options['through']) if options['through'] else None
+
+        mt5_manager = None
+        if not options['no_mt5']:
+            try:
+                from adminPanel.mt5.services import MT5ManagerActions
+                mt5_manager = MT5ManagerActions()
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f'MT5 unavailable, building from transactions: {e}'))
+
+        timeline = BalanceTimeline(mt5_manager)
+        if options['rebuild']:
+            states = timeline.rebuild(accounts, through)
+        else:
+            states = timeline.ensure_built(accounts, through)
+
+        built = sum(1 for account in accounts if account.id in states)
+        self.stdout.write(self.style.SUCCESS(f'Balance timeline ready for {built}/{len(accounts)} accounts'))
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from adminPanel.services.transaction_summary import rebuild, rebuild_all, refresh_recent
+
+
+class Command(BaseCommand):
+    help = 'Recompute the transaction daily summary (all history, a date range or the last days)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=str, help='First day, YYYY-MM-DD')
+        parser.add_argument('--to', dest='end', type=str, help='Last day, YYYY-MM-DD (default today)')
+        parser.add_argument('--days', type=int, help='Recompute the last N days')
+        parser.add_argument('--all', action='store_true', help='Recompute from the first transaction')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            written = rebuild_all()
+        elif options['start']:
+            end = date.fromisoformat(options['end']) if options['end'] else date.today()
+            written = rebuild(date.fromisoformat(options['start']), end)
+        else:
+            written = refresh_recent(options['days'] or 7)
+        self.stdout.write(self.style.SUCCESS(f'Transaction summary: {written} rows written'))
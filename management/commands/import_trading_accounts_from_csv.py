@@ -1,161 +1,148 @@
-import csv
 from django.core.management.base import BaseCommand
-from django.utils.dateparse import parse_datetime, parse_date
-from datetime import datetime
+from django.utils import timezone
 from adminPanel.models import TradingAccount, CustomUser, Package
-from django.db import transaction
+from adminPanel.utils.csv_import import (
+    BulkCSVImporter, RowDeferred, RowSkipped, DEFAULT_CHUNK_SIZE, parse_bool, parse_int, parse_decimal, parse_csv_datetime,
+)
+from datetime import timedelta
 from decimal import Decimal
-from django.utils import timezone
 
 CSV_FILE = 'TradingAccounts_2025-07-31_10-28-14.csv'
 
+ACCOUNT_NAME_SUFFIX = {
+    'mam': '-MAM',
+    'mam_investment': '-INV',
+    'prop': '-PROP',
+    'standard': '',
+}
+
+
+class TradingAccountImporter(BulkCSVImporter):
+    """
+    Trading accounts are matched on account_id. MAM investment rows whose master
+    is not known yet are held back and retried once every other row has been
+    written, so file order no longer matters.
+    """
+
+    model = TradingAccount
+    update_fields = [
+        'user', 'account_type', 'account_name', 'leverage', 'balance', 'is_enabled', 'is_trading_enabled',
+        'group_name', 'manager_allow_copy', 'investor_allow_copy', 'mam_master_account',
+        'profit_sharing_percentage', 'risk_level', 'is_algo_enabled', 'payout_frequency', 'package',
+        'status', 'approved_by', 'approved_at', 'start_date', 'end_date', 'created_at',
+    ]
+    created_timestamp_fields = ('created_at',)
+    label = 'trading accounts'
+
+    def preload(self):
+        self.user_pk_by_user_id = {}
+        self.user_pk_by_email = {}
+        for pk, user_id, email in CustomUser.objects.values_list('id', 'user_id', 'email'):
+            if user_id:
+                self.user_pk_by_user_id[user_id] = pk
+            if email:
+                self.user_pk_by_email[email] = pk
+        self.account_pk_by_id = dict(TradingAccount.objects.values_list('account_id', 'id'))
+        self.package_days = dict(Package.objects.values_list('id', 'target_time_in_days'))
+        self.resolving_deferred = False
+
+    def build_row(self, row):
+        user_id = parse_int(row.get('user_id'))
+        user_pk = self.user_pk_by_user_id.get(user_id) if user_id else None
+        # If user lookup by user_id failed, try common email fields as fallback
+        if not user_pk:
+            email_candidate = (row.get('email') or row.get('user_email') or row.get('user') or None)
+            # Sometimes account_name holds an email in legacy CSVs
+            if not email_candidate and row.get('account_name') and '@' in row.get('account_name'):
+                email_candidate = row.get('account_name')
+            if email_candidate:
+                user_pk = self.user_pk_by_email.get(email_candidate)
+            if not user_pk:
+                raise RowSkipped(f'trading account {row.get("account_id")}: no matching user for {user_id or email_candidate}')
+
+        account_id = row['account_id']
+        account_type = row['account_type'] or 'standard'
+        mam_master_account_id = row['mam_master_account_id'] or None
+        mam_master_pk = self.account_pk_by_id.get(mam_master_account_id) if mam_master_account_id else None
+        # If mam_investment, must have a valid mam_master_account
+        if account_type == 'mam_investment' and not mam_master_pk:
+            if mam_master_account_id and not self.resolving_deferred:
+                raise RowDeferred()
+            raise RowSkipped(f'mam_investment account {account_id}: missing or invalid mam_master_account')
+
+        profit_sharing_percentage = parse_decimal(row['profit_sharing_percentage'])
+        if account_type == 'mam' and not profit_sharing_percentage:
+            raise RowSkipped(f'mam account {account_id}: profit sharing percentage is required')
+
+        package_id = parse_int(row['package_id'])
+        approved_by_user_id = parse_int(row['approved_by_user_id'])
+        values = {
+            'user_id': user_pk,
+            'account_id': account_id,
+            'account_type': account_type,
+            'account_name': row['account_name'] or f"({account_id}){ACCOUNT_NAME_SUFFIX.get(account_type, '')}",
+            'leverage': parse_int(row['leverage']) or 100,
+            'balance': parse_decimal(row['balance'], Decimal('0.00')),
+            'is_enabled': parse_bool(row['is_enabled'], default=True),
+            'is_trading_enabled': parse_bool(row['is_trading_enabled'], default=True),
+            'created_at': parse_csv_datetime(row['created_at']) or timezone.now(),
+            'group_name': row['group_name'] or None,
+            'manager_allow_copy': parse_bool(row['manager_allow_copy'], default=True),
+            'investor_allow_copy': parse_bool(row['investor_allow_copy'], default=True),
+            'mam_master_account_id': mam_master_pk,
+            'profit_sharing_percentage': profit_sharing_percentage,
+            'risk_level': row['risk_level'] or None,
+            'is_algo_enabled': parse_bool(row['is_algo_enabled']),
+            'payout_frequency': row['payout_frequency'] or None,
+            'package_id': package_id if package_id in self.package_days else None,
+            'status': row['status'] or 'running',
+            'approved_by_id': self.user_pk_by_user_id.get(approved_by_user_id) if approved_by_user_id else None,
+            'approved_at': parse_csv_datetime(row['approved_at']),
+            'start_date': parse_csv_datetime(row['start_date']),
+            'end_date': parse_csv_datetime(row['end_date']),
+        }
+        # Mirror TradingAccount.save(): prop accounts start trading when approved
+        if account_type == 'prop' and values['approved_at'] and not values['start_date']:
+            values['start_date'] = values['approved_at']
+            if values['package_id']:
+                values['end_date'] = values['approved_at'] + timedelta(days=self.package_days[values['package_id']])
+        return account_id, values
+
+    def fetch_existing(self, keys):
+        return TradingAccount.objects.in_bulk(list(keys), field_name='account_id')
+
+    def after_chunk(self, pairs):
+        for account, _ in pairs:
+            if account.pk:
+                self.account_pk_by_id[account.account_id] = account.pk
+
+    def finalize(self):
+        if not self.deferred_rows:
+            return
+        self.write(f'Resolving {len(self.deferred_rows)} MAM investment accounts listed before their master...')
+        self.resolving_deferred = True
+        rows, self.deferred_rows = self.deferred_rows, []
+        for start in range(0, len(rows), self.chunk_size):
+            pairs = self.process_chunk(rows[start:start + self.chunk_size])
+            self.stats.linked += len(pairs)
+
+
 class Command(BaseCommand):
     help = 'Import trading accounts from CSV and map to TradingAccount model.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=CSV_FILE, help='Path to the trading accounts CSV export')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Rows validated and written per batch')
+        parser.add_argument('--verbose-skips', action='store_true', help='Print a line for every skipped row')
+
     def handle(self, *args, **options):
-        with open(CSV_FILE, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            count = 0
-            with transaction.atomic():
-                for row in reader:
-                    user_id = int(row['user_id']) if row.get('user_id') else None
-                    user = CustomUser.objects.filter(user_id=user_id).first() if user_id else None
-
-                    # If user lookup by user_id failed, try common email fields as fallback
-                    if not user:
-                        email_candidate = (row.get('email') or row.get('user_email') or row.get('user') or None)
-                        # Sometimes account_name holds an email in legacy CSVs
-                        if not email_candidate and row.get('account_name') and '@' in row.get('account_name'):
-                            email_candidate = row.get('account_name')
-                        if email_candidate:
-                            user = CustomUser.objects.filter(email=email_candidate).first()
-                        if not user:
-                            self.stdout.write(self.style.WARNING(f'Skipping trading account {row.get("account_id")} for user {user_id or email_candidate}: no matching user found.'))
-                            continue
-                    account_id = row['account_id']
-                    account_type = row['account_type'] or 'standard'
-                    account_name = row['account_name'] or ''
-                    leverage = int(row['leverage']) if row['leverage'] else 100
-                    balance = Decimal(row['balance']) if row['balance'] else Decimal('0.00')
-                    is_enabled = row['is_enabled'].lower() == 'true' if row['is_enabled'] else True
-                    is_trading_enabled = row['is_trading_enabled'].lower() == 'true' if row['is_trading_enabled'] else True
-                    # Preserve CSV created_at when provided; accept full ISO datetime or date-only
-                    created_at_raw = row['created_at'] or None
-                    created_at = None
-                    if created_at_raw and str(created_at_raw).lower() != 'none':
-                        created_at = parse_datetime(created_at_raw)
-                        if not created_at:
-                            parsed_date = parse_date(created_at_raw)
-                            if parsed_date:
-                                created_at = datetime.combine(parsed_date, datetime.min.time())
-                                try:
-                                    created_at = timezone.make_aware(created_at)
-                                except Exception:
-                                    pass
-                        # Diagnostic: show if parsing succeeded and what value we got
-                        if created_at:
-                            self.stdout.write(self.style.NOTICE(f"Parsed TradingAccount.created_at for account {row.get('account_id')}: {created_at} (raw: {created_at_raw})"))
-                        else:
-                            self.stdout.write(self.style.WARNING(f"Could not parse TradingAccount.created_at for account {row.get('account_id')}: raw value '{created_at_raw}' - will use current time"))
-                    if not created_at:
-                        created_at = timezone.now()
-                    group_name = row['group_name'] or None
-                    manager_allow_copy = row['manager_allow_copy'].lower() == 'true' if row['manager_allow_copy'] else True
-                    investor_allow_copy = row['investor_allow_copy'].lower() == 'true' if row['investor_allow_copy'] else True
-                    mam_master_account_id = row['mam_master_account_id'] or None
-                    mam_master_account = TradingAccount.objects.filter(account_id=mam_master_account_id).first() if mam_master_account_id else None
-                    profit_sharing_percentage = Decimal(row['profit_sharing_percentage']) if row['profit_sharing_percentage'] else None
-                    risk_level = row['risk_level'] or None
-                    is_algo_enabled = row['is_algo_enabled'].lower() == 'true' if row['is_algo_enabled'] else False
-                    payout_frequency = row['payout_frequency'] or None
-                    package_id = row['package_id'] or None
-                    package = Package.objects.filter(id=package_id).first() if package_id else None
-                    status = row['status'] or 'running'
-                    approved_by_user_id = int(row['approved_by_user_id']) if row['approved_by_user_id'] else None
-                    approved_by = CustomUser.objects.filter(user_id=approved_by_user_id).first() if approved_by_user_id else None
-                    # Parse optional datetime fields similarly
-                    approved_at_raw = row['approved_at'] or None
-                    approved_at = None
-                    if approved_at_raw and str(approved_at_raw).lower() != 'none':
-                        approved_at = parse_datetime(approved_at_raw)
-                        if not approved_at:
-                            parsed_date = parse_date(approved_at_raw)
-                            if parsed_date:
-                                approved_at = datetime.combine(parsed_date, datetime.min.time())
-                                try:
-                                    approved_at = timezone.make_aware(approved_at)
-                                except Exception:
-                                    pass
-
-                    start_date_raw = row['start_date'] or None
-                    start_date = None
-                    if start_date_raw and str(start_date_raw).lower() != 'none':
-                        start_date = parse_datetime(start_date_raw)
-                        if not start_date:
-                            parsed_date = parse_date(start_date_raw)
-                            if parsed_date:
-                                start_date = datetime.combine(parsed_date, datetime.min.time())
-                                try:
-                                    start_date = timezone.make_aware(start_date)
-                                except Exception:
-                                    pass
-
-                    end_date_raw = row['end_date'] or None
-                    end_date = None
-                    if end_date_raw and str(end_date_raw).lower() != 'none':
-                        end_date = parse_datetime(end_date_raw)
-                        if not end_date:
-                            parsed_date = parse_date(end_date_raw)
-                            if parsed_date:
-                                end_date = datetime.combine(parsed_date, datetime.min.time())
-                                try:
-                                    end_date = timezone.make_aware(end_date)
-                                except Exception:
-                                    pass
-
-                    # If mam_investment, must have a valid mam_master_account
-                    if account_type == 'mam_investment' and not mam_master_account:
-                        self.stdout.write(self.style.WARNING(f'Skipping mam_investment account {account_id} for user {user_id}: missing or invalid mam_master_account.'))
-                        continue
-
-                    ta_obj, ta_created = TradingAccount.objects.update_or_create(
-                        account_id=account_id,
-                        defaults={
-                            'user': user,
-                            'account_type': account_type,
-                            'account_name': account_name,
-                            'leverage': leverage,
-                            'balance': balance,
-                            'is_enabled': is_enabled,
-                            'is_trading_enabled': is_trading_enabled,
-                            'group_name': group_name,
-                            'manager_allow_copy': manager_allow_copy,
-                            'investor_allow_copy': investor_allow_copy,
-                            'mam_master_account': mam_master_account,
-                            'profit_sharing_percentage': profit_sharing_percentage,
-                            'risk_level': risk_level,
-                            'is_algo_enabled': is_algo_enabled,
-                            'payout_frequency': payout_frequency,
-                            'package': package,
-                            'status': status,
-                            'approved_by': approved_by,
-                            'approved_at': approved_at,
-                            'start_date': start_date,
-                            'end_date': end_date,
-                        }
-                    )
-
-                    # Explicitly set created_at from CSV on the instance to ensure preservation even if auto_now_add is set.
-                    try:
-                        if created_at:
-                            # Only update if it's different to avoid unnecessary writes
-                            old_val = getattr(ta_obj, 'created_at', None)
-                            if old_val != created_at:
-                                ta_obj.created_at = created_at
-                                ta_obj.save(update_fields=['created_at'])
-                                self.stdout.write(self.style.SUCCESS(f"Set TradingAccount(id={ta_obj.account_id}) created_at: {old_val} -> {created_at}"))
-                    except Exception as e:
-                        # Defensive: ignore failures to set created_at but continue import
-                        self.stdout.write(self.style.ERROR(f"Failed to set created_at for TradingAccount {account_id}: {e}"))
-                    count += 1
-            self.stdout.write(self.style.SUCCESS(f'Successfully imported/updated {count} trading accounts.'))
+        importer = TradingAccountImporter(
+            options['file'],
+            stdout=self.stdout,
+            style=self.style,
+            chunk_size=options['chunk_size'],
+            verbose=options['verbose_skips'],
+        )
+        stats = importer.run()
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported/updated {stats.created + stats.updated} trading accounts.'))
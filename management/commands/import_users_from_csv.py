@@ -1,184 +1,205 @@
-import csv
+import random
+import string
 from django.core.management.base import BaseCommand
-from django.utils.dateparse import parse_date, parse_datetime
-from datetime import datetime
-from adminPanel.models import CustomUser, CommissioningProfile
-from django.db import transaction, IntegrityError
-from decimal import Decimal
+from django.db.models import Max
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from adminPanel.models import CustomUser, CommissioningProfile
+from adminPanel.utils.csv_import import (
+    BulkCSVImporter, RowSkipped, DEFAULT_CHUNK_SIZE, parse_bool, parse_int, parse_csv_datetime,
+)
 
 CSV_FILE = 'UserData_2025-07-31_10-28-42.csv'
 
+USER_FIELDS = [
+    'email', 'username', 'first_name', 'last_name', 'dob', 'phone_number', 'address', 'city',
+    'zip_code', 'state', 'country', 'profile_pic', 'address_proof_verified', 'id_proof_verified',
+    'IB_status', 'MAM_manager_status', 'manager_admin_status', 'date_joined', 'is_active', 'is_staff',
+    'parent_ib', 'commissioning_profile', 'referral_code',
+]
+
+
+class UserImporter(BulkCSVImporter):
+    """
+    Users are matched by user_id first, then by email. CustomUser.save() is
+    bypassed by the bulk writes, so its side effects are applied here:
+    username, user_id and IB referral codes per row, and, for users who become
+    IBs, parent_ib of the clients who registered with their code (finalize).
+    save() also hands an IB's clients to the user when their role becomes
+    'manager'; role is not imported, so that never applies. parent_ib links
+    are resolved after all rows are written so a client may appear in the
+    file before its IB.
+    """
+
+    model = CustomUser
+    update_fields = USER_FIELDS + ['user_id']
+    label = 'users'
+
+    def preload(self):
+        self.profiles_by_name = dict(CommissioningProfile.objects.values_list('name', 'id'))
+        self.default_profile_id = CommissioningProfile.objects.order_by('pk').values_list('id', flat=True).first()
+        self.user_pk_by_user_id = dict(CustomUser.objects.exclude(user_id=None).values_list('user_id', 'id'))
+        self.referral_codes = set(CustomUser.objects.exclude(referral_code=None).values_list('referral_code', flat=True))
+        max_id = CustomUser.objects.aggregate(Max('user_id'))['user_id__max']
+        self.next_user_id = max(max_id + 1, 7000000) if max_id else 7000000
+        # (user_id, parent_ib_user_id) pairs resolved in finalize()
+        self.parent_links = []
+        # Existing users that were IBs before this import; referral code -> pk of new IBs
+        self.previous_ib_pks = set()
+        self.new_ib_codes = {}
+
+    def _new_referral_code(self):
+        while True:
+            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+            if code not in self.referral_codes:
+                self.referral_codes.add(code)
+                return code
+
+    def build_row(self, row):
+        user_id = parse_int(row['user_id'])
+        email = row['email'] or None
+        if not user_id and not email:
+            raise RowSkipped("row has neither user_id nor email")
+
+        IB_status = parse_bool(row['IB_status'])
+        manager_admin_status = row['manager_admin_status'] or 'None'
+        # Normalize manager_admin_status values
+        if manager_admin_status == 'Admin Level 1':
+            manager_admin_status = 'admin'
+        elif manager_admin_status in ['Manager Level 1', 'Manager Level 2', 'Manager Level 3']:
+            manager_admin_status = 'manager'
+
+        commissioning_profile_id = None
+        if row['commissioning_profile_name']:
+            commissioning_profile_id = self.profiles_by_name.get(row['commissioning_profile_name'])
+        # If IB user and commissioning_profile is missing, assign default
+        if IB_status and not commissioning_profile_id:
+            commissioning_profile_id = self.default_profile_id
+            if not commissioning_profile_id:
+                raise RowSkipped(f"no commissioning profile found for IB user {email or user_id}")
+
+        parent_ib_user_id = parse_int(row['parent_ib_user_id'])
+        if user_id and parent_ib_user_id:
+            self.parent_links.append((user_id, parent_ib_user_id))
+
+        first_name = row['first_name'] or ''
+        last_name = row['last_name'] or ''
+        values = {
+            'email': email,
+            'username': f"{first_name} {last_name}",
+            'first_name': first_name,
+            'last_name': last_name,
+            'dob': parse_date(row['dob']) if row['dob'] else None,
+            'phone_number': row['phone_number'] or '',
+            'address': row['address'] or '',
+            'city': row['city'] or '',
+            'zip_code': row['zip_code'] or '',
+            'state': row['state'] or '',
+            'country': row['country'] or '',
+            'profile_pic': row['profile_pic'] or '',
+            'address_proof_verified': parse_bool(row['address_proof_verified']),
+            'id_proof_verified': parse_bool(row['id_proof_verified']),
+            'IB_status': IB_status,
+            'MAM_manager_status': parse_bool(row['MAM_manager_status']),
+            'manager_admin_status': manager_admin_status,
+            'date_joined': parse_csv_datetime(row['date_joined']) or timezone.now(),
+            'is_active': parse_bool(row['is_active'], default=True),
+            'is_staff': parse_bool(row['is_staff']),
+            'parent_ib_id': self.user_pk_by_user_id.get(parent_ib_user_id) if parent_ib_user_id else None,
+            'commissioning_profile_id': commissioning_profile_id,
+        }
+        if user_id:
+            values['user_id'] = user_id
+        return (user_id, email), values
+
+    def fetch_existing(self, keys):
+        user_ids = [user_id for user_id, _ in keys if user_id]
+        emails = [email for _, email in keys if email]
+        by_user_id = {}
+        by_email = {}
+        for user in CustomUser.objects.filter(user_id__in=user_ids):
+            by_user_id[user.user_id] = user
+        for user in CustomUser.objects.filter(email__in=emails):
+            by_email[user.email] = user
+        for user in (*by_user_id.values(), *by_email.values()):
+            if user.IB_status:
+                self.previous_ib_pks.add(user.pk)
+        existing = {}
+        for user_id, email in keys:
+            user = by_user_id.get(user_id) if user_id else None
+            if not user and email:
+                user = by_email.get(email)
+            if user:
+                existing[(user_id, email)] = user
+        return existing
+
+    def validate(self, instance):
+        if not instance.user_id:
+            instance.user_id = self.next_user_id
+            self.next_user_id += 1
+        elif instance.user_id >= self.next_user_id:
+            self.next_user_id = instance.user_id + 1
+        if instance.IB_status and not instance.referral_code:
+            instance.referral_code = self._new_referral_code()
+
+    def after_chunk(self, pairs):
+        for user, _ in pairs:
+            if user.pk and user.user_id:
+                self.user_pk_by_user_id[user.user_id] = user.pk
+            if user.pk and user.IB_status and user.referral_code and user.pk not in self.previous_ib_pks:
+                self.new_ib_codes[user.referral_code] = user.pk
+
+    def finalize(self):
+        self.write('Fixing parent_ib mapping for all users...')
+        wanted = {}
+        for user_id, parent_ib_user_id in self.parent_links:
+            user_pk = self.user_pk_by_user_id.get(user_id)
+            parent_pk = self.user_pk_by_user_id.get(parent_ib_user_id)
+            if user_pk and parent_pk:
+                wanted[user_pk] = parent_pk
+
+        to_fix = []
+        for pks in [list(wanted)[i:i + self.chunk_size] for i in range(0, len(wanted), self.chunk_size)]:
+            for user_pk, current_parent in CustomUser.objects.filter(pk__in=pks).values_list('pk', 'parent_ib_id'):
+                if current_parent != wanted[user_pk]:
+                    to_fix.append(CustomUser(pk=user_pk, parent_ib_id=wanted[user_pk]))
+        if to_fix:
+            CustomUser.objects.bulk_update(to_fix, ['parent_ib'], batch_size=self.chunk_size)
+        self.stats.linked = len(to_fix)
+        self.write(f'Fixed parent_ib for {len(to_fix)} users.', 'SUCCESS')
+        self.link_referred_clients()
+
+    def link_referred_clients(self):
+        """As CustomUser.save() does when IB_status turns on: clients who used the code and have no IB get it."""
+        codes = list(self.new_ib_codes)
+        to_link = []
+        for chunk in [codes[i:i + self.chunk_size] for i in range(0, len(codes), self.chunk_size)]:
+            clients = CustomUser.objects.filter(referral_code_used__in=chunk, parent_ib__isnull=True)
+            for pk, code in clients.values_list('pk', 'referral_code_used'):
+                if self.new_ib_codes[code] != pk:
+                    to_link.append(CustomUser(pk=pk, parent_ib_id=self.new_ib_codes[code]))
+        if to_link:
+            CustomUser.objects.bulk_update(to_link, ['parent_ib'], batch_size=self.chunk_size)
+        self.stats.linked += len(to_link)
+        self.write(f'Linked {len(to_link)} referred clients to their new IBs.', 'SUCCESS')
+
+
 class Command(BaseCommand):
     help = 'Import users from CSV and map to CustomUser model.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=CSV_FILE, help='Path to the users CSV export')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Rows validated and written per batch')
+        parser.add_argument('--verbose-skips', action='store_true', help='Print a line for every skipped row')
+
     def handle(self, *args, **options):
-        with open(CSV_FILE, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            count = 0
-            # Get the only available commissioning profile (if any)
-            default_comm_profile = CommissioningProfile.objects.first()
-            with transaction.atomic():
-                for row in reader:
-                    user_id = int(row['user_id']) if row['user_id'] else None
-                    email = row['email'] or None
-                    username = row['username'] or None
-                    first_name = row['first_name'] or ''
-                    last_name = row['last_name'] or ''
-                    dob = parse_date(row['dob']) if row['dob'] else None
-                    phone_number = row['phone_number'] or ''
-                    address = row['address'] or ''
-                    city = row['city'] or ''
-                    zip_code = row['zip_code'] or ''
-                    state = row['state'] or ''
-                    country = row['country'] or ''
-                    profile_pic = row['profile_pic'] or ''
-                    id_proof = row['id_proof'] or ''
-                    address_proof = row['address_proof'] or ''
-                    address_proof_verified = row['address_proof_verified'].lower() == 'true' if row['address_proof_verified'] else False
-                    id_proof_verified = row['id_proof_verified'].lower() == 'true' if row['id_proof_verified'] else False
-                    IB_status = row['IB_status'].lower() == 'true' if row['IB_status'] else False
-                    MAM_manager_status = row['MAM_manager_status'].lower() == 'true' if row['MAM_manager_status'] else False
-                    created_by_user_id = int(row['created_by_user_id']) if row['created_by_user_id'] else None
-                    created_by_username = row['created_by_username'] or None
-                    manager_admin_status = row['manager_admin_status'] or 'None'
-                    # Normalize manager_admin_status values
-                    if manager_admin_status == 'Admin Level 1':
-                        manager_admin_status = 'admin'
-                    elif manager_admin_status in ['Manager Level 1', 'Manager Level 2', 'Manager Level 3']:
-                        manager_admin_status = 'manager'
-                    # Preserve original created/joined timestamp from CSV when available.
-                    # Accept ISO datetime with timezone, or date-only strings.
-                    date_joined_raw = row['date_joined'] or None
-                    date_joined = None
-                    if date_joined_raw and str(date_joined_raw).lower() != 'none':
-                        # Try to parse full datetime first (handles offsets)
-                        date_joined = parse_datetime(date_joined_raw)
-                        if not date_joined:
-                            # If parse_datetime failed, try parsing as a date and convert to midnight
-                            parsed_date = parse_date(date_joined_raw)
-                            if parsed_date:
-                                date_joined = datetime.combine(parsed_date, datetime.min.time())
-                                # Make timezone-aware using project timezone
-                                try:
-                                    date_joined = timezone.make_aware(date_joined)
-                                except Exception:
-                                    # If already aware or timezone not configured, leave as-is
-                                    pass
-                    is_active = row['is_active'].lower() == 'true' if row['is_active'] else True
-                    is_staff = row['is_staff'].lower() == 'true' if row['is_staff'] else False
-                    parent_ib_user_id = int(row['parent_ib_user_id']) if row['parent_ib_user_id'] else None
-                    parent_ib_username = row['parent_ib_username'] or None
-                    commissioning_profile_name = row['commissioning_profile_name'] or None
-                    direct_client_count = int(row['direct_client_count']) if row['direct_client_count'] else 0
-                    # Find parent_ib and commissioning_profile if possible
-                    parent_ib = None
-                    if parent_ib_user_id:
-                        parent_ib = CustomUser.objects.filter(user_id=parent_ib_user_id).first()
-                    commissioning_profile = None
-                    if commissioning_profile_name:
-                        commissioning_profile = CommissioningProfile.objects.filter(name=commissioning_profile_name).first()
-                    # If IB user and commissioning_profile is missing, assign default
-                    if IB_status and not commissioning_profile:
-                        commissioning_profile = default_comm_profile
-                        if commissioning_profile:
-                            self.stdout.write(self.style.WARNING(f'Assigned default commissioning profile to IB user {email or username or user_id}'))
-                        else:
-                            self.stdout.write(self.style.ERROR(f'No commissioning profile found for IB user {email or username or user_id}, skipping user.'))
-                            continue
-                    # Prepare defaults for update/create
-                    defaults = {
-                        'email': email,
-                        'username': username,
-                        'first_name': first_name,
-                        'last_name': last_name,
-                        'dob': dob,
-                        'phone_number': phone_number,
-                        'address': address,
-                        'city': city,
-                        'zip_code': zip_code,
-                        'state': state,
-                        'country': country,
-                        'profile_pic': profile_pic,
-                        'address_proof_verified': address_proof_verified,
-                        'id_proof_verified': id_proof_verified,
-                        'IB_status': IB_status,
-                        'MAM_manager_status': MAM_manager_status,
-                        'manager_admin_status': manager_admin_status,
-                        'date_joined': date_joined or timezone.now(),
-                        'is_active': is_active,
-                        'is_staff': is_staff,
-                        'parent_ib': parent_ib,
-                        'commissioning_profile': commissioning_profile,
-                    }
-
-                    # Try to find an existing user by user_id first, then by email to avoid unique constraint errors.
-                    user = None
-                    if user_id:
-                        user = CustomUser.objects.filter(user_id=user_id).first()
-                    if not user and email:
-                        user = CustomUser.objects.filter(email=email).first()
-
-                    created = False
-                    if user:
-                        # Update existing user instance
-                        for k, v in defaults.items():
-                            setattr(user, k, v)
-                        # Ensure user_id is set when available
-                        if getattr(user, 'user_id', None) is None and user_id:
-                            user.user_id = user_id
-                        try:
-                            user.save()
-                        except IntegrityError:
-                            # If save fails due to race/unique constraint, try to recover by re-loading by email
-                            existing = CustomUser.objects.filter(email=email).first() if email else None
-                            if existing and existing.id != user.id:
-                                for k, v in defaults.items():
-                                    setattr(existing, k, v)
-                                if getattr(existing, 'user_id', None) is None and user_id:
-                                    existing.user_id = user_id
-                                existing.save()
-                                user = existing
-                            else:
-                                raise
-                    else:
-                        # No existing user found — create a new one
-                        try:
-                            create_data = dict(defaults)
-                            if user_id:
-                                create_data['user_id'] = user_id
-                            user = CustomUser.objects.create(**create_data)
-                            created = True
-                        except IntegrityError:
-                            # Likely a unique collision (email) — try to find the existing user by email and update it
-                            existing = CustomUser.objects.filter(email=email).first() if email else None
-                            if existing:
-                                for k, v in defaults.items():
-                                    setattr(existing, k, v)
-                                if getattr(existing, 'user_id', None) is None and user_id:
-                                    existing.user_id = user_id
-                                existing.save()
-                                user = existing
-                                created = False
-                            else:
-                                # Re-raise if we cannot resolve
-                                raise
-                    count += 1
-            self.stdout.write(self.style.SUCCESS(f'Successfully imported/updated {count} users.'))
-
-            # --- Post-import: Fix parent_ib mapping for all users ---
-            self.stdout.write('Fixing parent_ib mapping for all users...')
-            with open(CSV_FILE, newline='', encoding='utf-8') as csvfile2:
-                reader2 = csv.DictReader(csvfile2)
-                fix_count = 0
-                for row in reader2:
-                    user_id = int(row['user_id']) if row['user_id'] else None
-                    parent_ib_user_id = int(row['parent_ib_user_id']) if row['parent_ib_user_id'] else None
-                    if user_id and parent_ib_user_id:
-                        user = CustomUser.objects.filter(user_id=user_id).first()
-                        parent_ib = CustomUser.objects.filter(user_id=parent_ib_user_id).first()
-                        if user and parent_ib and user.parent_ib_id != parent_ib.id:
-                            user.parent_ib = parent_ib
-                            user.save(update_fields=['parent_ib'])
-                            fix_count += 1
-                self.stdout.write(self.style.SUCCESS(f'Fixed parent_ib for {fix_count} users.'))
+        importer = UserImporter(
+            options['file'],
+            stdout=self.stdout,
+            style=self.style,
+            chunk_size=options['chunk_size'],
+            verbose=options['verbose_skips'],
+        )
+        stats = importer.run()
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported/updated {stats.created + stats.updated} users.'))
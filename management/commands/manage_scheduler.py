@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from adminPanel.scheduler import scheduler, register_default_jobs
+
+
+class Command(BaseCommand):
+    help = 'Show scheduler job status or run a scheduled job now'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['status', 'run'], help='Action to perform')
+        parser.add_argument('job', nargs='?', help='Job name (for run)')
+
+    def handle(self, *args, **options):
+        if not scheduler.jobs:
+            register_default_jobs(scheduler)
+
+        if options['action'] == 'status':
+            self.show_status()
+        else:
+            self.run_job(options['job'])
+
+    def show_status(self):
+        from adminPanel.models import ScheduledJob
+
+        scheduler.sync_jobs()
+        now = timezone.now()
+        for row in ScheduledJob.objects.all():
+            job = scheduler.jobs.get(row.name)
+            enabled = 'enabled' if job and job.enabled else 'disabled'
+            locked = f" locked by {row.locked_by}" if row.locked_until and row.locked_until > now else ''
+            self.stdout.write(f"{row.name:<20} {row.schedule:<16} {enabled:<9} {row.last_status:<8}{locked}")
+            self.stdout.write(
+                f"    next: {row.next_run_at}  last: {row.last_started_at} "
+                f"({row.last_duration_ms} ms)  runs: {row.run_count}  failures: {row.failure_count}"
+            )
+            if row.last_error:
+                self.stdout.write(self.style.WARNING(f"    error: {row.last_error}"))
+
+    def run_job(self, name):
+        if name not in scheduler.jobs:
+            raise CommandError(f"Unknown job {name!r}; choose from {', '.join(sorted(scheduler.jobs))}")
+
+        self.stdout.write(f"Running {name}...")
+        if not scheduler.run_now(name):
+            raise CommandError(f"{name} is currently running in another process")
+
+        from adminPanel.models import ScheduledJob
+        row = ScheduledJob.objects.get(name=name)
+        style = self.style.SUCCESS if row.last_status == 'success' else self.style.ERROR
+        self.stdout.write(style(f"{name}: {row.last_status} in {row.last_duration_ms} ms"))
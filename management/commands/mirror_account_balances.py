@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+import time
+
+from adminPanel.services.account_mirror import mirror_account_balances
+
+
+class Command(BaseCommand):
+    help = 'Mirror balance, equity, credit and margin of all live trading accounts from MT5 (batched per chunk)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between cycles (default: 60)')
+        parser.add_argument('--once', action='store_true', help='Run a single cycle and exit')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        if options['once']:
+            result = mirror_account_balances()
+            self.stdout.write(self.style.SUCCESS(f"Account mirror: {result}"))
+            return
+
+        self.stdout.write(f"Mirroring account balances every {interval} seconds (Ctrl+C to stop)")
+        try:
+            while True:
+                try:
+                    result = mirror_account_balances()
+                    self.stdout.write(
+                        f"Mirrored {result['accounts']} accounts, {result['changed']} changed, "
+                        f"{result['missing']} missing in MT5 ({result.get('duration_ms', 0)}ms)"
+                    )
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"Account mirror failed: {e}"))
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Account mirror stopped")
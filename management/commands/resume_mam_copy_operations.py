@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from adminPanel.models import MAMCopyOperation
+from adminPanel.services.mam_copy import is_resumable, operation_summary, run_operation
+
+
+class Command(BaseCommand):
+    help = 'Resume interrupted, partial or failed bulk MAM copy operations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('operation_ids', nargs='*', type=int, help='Operations to resume (default: every resumable one)')
+
+    def handle(self, *args, **options):
+        operations = MAMCopyOperation.objects.select_related('master_account', 'target_master')
+        if options['operation_ids']:
+            operations = operations.filter(id__in=options['operation_ids'])
+        else:
+            operations = operations.filter(status__in=['pending', 'running', 'partial', 'failed'])
+
+        resumed = 0
+        for operation in operations.order_by('id'):
+            if not is_resumable(operation):
+                self.stdout.write(f'Operation {operation.id} is {operation.status}, skipped')
+                continue
+            run_operation(operation)
+            summary = operation_summary(operation)
+            self.stdout.write(
+                f"Operation {operation.id} ({operation.action} {summary['master_account']}): "
+                f"{summary['status']}, {summary['succeeded']}/{summary['total']} succeeded"
+            )
+            resumed += 1
+        self.stdout.write(self.style.SUCCESS(f'Resumed {resumed} operation(s)'))
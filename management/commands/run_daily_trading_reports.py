@@ -7,11 +7,13 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--date', type=str, help='Report date in YYYY-MM-DD (defaults to yesterday)')
         parser.add_argument('--dry-run', action='store_true', help='Do not enqueue tasks, only create DB rows')
+        parser.add_argument('--concurrency', type=int, help='PDF render workers (defaults to DAILY_REPORTS_CONCURRENCY)')
 
     def handle(self, *args, **options):
         date = options.get('date')
         dry = options.get('dry_run', False)
         if dry:
             self.stdout.write('Running in dry-run mode (no tasks enqueued)')
-        daily_trading_report_runner(date, dry)
+        summary = daily_trading_report_runner(date, dry, concurrency=options.get('concurrency'))
+        self.stdout.write(str(summary))
         self.stdout.write(self.style.SUCCESS('Daily trading report runner completed'))
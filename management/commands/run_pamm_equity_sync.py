@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+import time
+
+from adminPanel.pamm_equity_sync_thread import pamm_equity_sync_thread
+
+
+class Command(BaseCommand):
+    help = 'Sync PAMM equity from MT5 (one batched read per cycle) and maintain equity rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between cycles (default: 60)')
+        parser.add_argument('--once', action='store_true', help='Run a single cycle and exit')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        if options['once']:
+            result = pamm_equity_sync_thread.run_once()
+            self.stdout.write(self.style.SUCCESS(f"PAMM equity sync: {result}"))
+            return
+
+        self.stdout.write(f"Starting PAMM equity sync every {interval} seconds (Ctrl+C to stop)")
+        try:
+            while True:
+                try:
+                    result = pamm_equity_sync_thread.run_once()
+                    self.stdout.write(
+                        f"Synced {result['read']}/{result['pamms']} PAMMs, "
+                        f"{result['changed']} changed in {result['duration_ms']}ms"
+                    )
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"PAMM equity sync failed: {e}"))
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("PAMM equity sync stopped")
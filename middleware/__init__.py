@@ -1,7 +1,6 @@
 # Middleware package
 import logging
 from django.core.cache import cache
-from adminPanel.mt5.services import MT5ManagerActions
 from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
@@ -42,6 +41,7 @@ class MT5ConnectionMiddleware:
     def run_once(self):
         try:
             if not cache.get('mt5_connected'):
+                from adminPanel.mt5.services import MT5ManagerActions
                 initgo = MT5ManagerActions()
                 if initgo.manager and initgo.manager.is_connected():
                     cache.set('mt5_connected', True, 3600)  # Cache for 1 hour
@@ -0,0 +1,57 @@
+import logging
+import random
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from adminPanel.utils.query_profiler import enable_mt5_instrumentation, profile, profiler_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryProfilerMiddleware:
+    """
+    Opt-in per-endpoint profiling: SQL query count and time, repeated query
+    shapes and MT5 calls of each request, aggregated per URL name into
+    profiler_stats (read by the admin query-profile endpoint).
+
+    Settings:
+        QUERY_PROFILER_ENABLED      install the middleware (default False)
+        QUERY_PROFILER_SAMPLE_RATE  fraction of requests profiled (default 1.0)
+        QUERY_PROFILER_HEADERS      add X-Query-Count / X-Query-Time-Ms / X-MT5-Calls headers
+        QUERY_PROFILER_N_PLUS_ONE   warn when one query shape repeats this often in a request (default 10)
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_PROFILER_SAMPLE_RATE', 1.0)
+        self.headers = getattr(settings, 'QUERY_PROFILER_HEADERS', False)
+        self.n_plus_one = getattr(settings, 'QUERY_PROFILER_N_PLUS_ONE', 10)
+        enable_mt5_instrumentation()
+
+    def __call__(self, request):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        with profile() as prof:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.view_name if match else None) or 'unresolved'
+        profiler_stats.record(endpoint, prof)
+
+        repeated = prof.duplicates()
+        if repeated and repeated[0][1] >= self.n_plus_one:
+            shape, count = repeated[0]
+            logger.warning(
+                f"Possible N+1 on {endpoint} ({request.method} {request.path}): "
+                f"{count}x {shape[:200]} ({prof.queries} queries, {prof.sql_ms} ms SQL)"
+            )
+
+        if self.headers:
+            response['X-Query-Count'] = str(prof.queries)
+            response['X-Query-Time-Ms'] = str(prof.sql_ms)
+            response['X-MT5-Calls'] = str(prof.mt5_calls)
+        return response
@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-19 09:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminPanel', '0050_activitylog_status_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audience', models.CharField(choices=[('all', 'All Users'), ('client', 'Clients'), ('manager', 'Managers'), ('admin', 'Admins')], db_index=True, default='all', max_length=20)),
+                ('notification_type', models.CharField(choices=[('IB', 'IB Request'), ('BANK', 'Bank Transaction'), ('CRYPTO', 'Crypto Transaction'), ('PROFILE', 'Profile Change'), ('DOCUMENT', 'Document Upload'), ('ACCOUNT', 'Account Creation')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('created', 'Created'), ('completed', 'Completed')], default='created', max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('action_url', models.CharField(blank=True, max_length=500, null=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Hidden from users after this time', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcast_notifications_sent', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['audience', '-created_at'], name='broadcast_audience_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastNotificationRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_dismissed', models.BooleanField(default=False)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reads', to='adminPanel.broadcastnotification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_notification_reads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'broadcast'], name='broadcast_read_user_idx')],
+                'unique_together': {('broadcast', 'user')},
+            },
+        ),
+    ]
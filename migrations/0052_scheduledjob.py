@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminPanel', '0051_broadcastnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('schedule', models.CharField(help_text='Cron expression or "every Ns"', max_length=100)),
+                ('next_run_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('locked_by', models.CharField(blank=True, max_length=150, null=True)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_status', models.CharField(choices=[('idle', 'Idle'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed'), ('timeout', 'Timed out'), ('skipped', 'Skipped')], default='idle', max_length=10)),
+                ('last_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_duration_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('run_count', models.PositiveIntegerField(default=0)),
+                ('failure_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-19 12:30
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminPanel', '0052_scheduledjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalanceTimeline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('built_through', models.DateField()),
+                ('closing_balance', models.DecimalField(decimal_places=2, help_text='Balance at the end of built_through', max_digits=20)),
+                ('source', models.CharField(choices=[('mt5', 'MT5 deals'), ('transactions', 'Approved transactions')], default='mt5', max_length=15)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('trading_account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance_timeline', to='adminPanel.tradingaccount')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AccountDailyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('closing_balance', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('deposits', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20)),
+                ('withdrawals', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20)),
+                ('trading_pnl', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20)),
+                ('trading_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to='adminPanel.tradingaccount')),
+            ],
+            options={
+                'ordering': ['trading_account', '-date'],
+                'unique_together': {('trading_account', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 14:10
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminPanel', '0053_accountbalancetimeline_accountdailybalance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tradingaccount',
+            name='credit',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Current credit of the trading account.', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='tradingaccount',
+            name='mirrored_at',
+            field=models.DateTimeField(blank=True, help_text='When balance, equity, credit and margin were last mirrored from MT5.', null=True),
+        ),
+    ]
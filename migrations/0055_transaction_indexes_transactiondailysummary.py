@@ -0,0 +1,100 @@
+# Generated by Django 5.2 on 2026-10-19 15:05
+
+import django.db.models.deletion
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_summary(apps, schema_editor):
+    """One grouped pass over Transaction per month of history."""
+    from django.db.models import Count, F, Max, Min, Sum
+    from django.db.models.functions import TruncDate
+    from django.utils import timezone
+
+    Transaction = apps.get_model('adminPanel', 'Transaction')
+    TransactionDailySummary = apps.get_model('adminPanel', 'TransactionDailySummary')
+
+    bounds = Transaction.objects.order_by().aggregate(first=Min('created_at'), last=Max('created_at'))
+    if bounds['first'] is None:
+        return
+    tz = timezone.get_current_timezone()
+    day = timezone.localtime(bounds['first']).date()
+    last = timezone.localtime(bounds['last']).date()
+    while day <= last:
+        end = day + timedelta(days=31)
+        rows = (
+            Transaction.objects.filter(
+                created_at__gte=timezone.make_aware(datetime.combine(day, time.min), tz),
+                created_at__lt=timezone.make_aware(datetime.combine(end, time.min), tz),
+            )
+            .order_by()
+            .annotate(day=TruncDate('created_at'), manager_id=F('user__created_by'))
+            .values('day', 'transaction_type', 'status', 'manager_id')
+            .annotate(count=Count('id'), total=Sum('amount'))
+        )
+        TransactionDailySummary.objects.bulk_create([
+            TransactionDailySummary(
+                date=row['day'],
+                transaction_type=row['transaction_type'],
+                status=row['status'],
+                manager_id=row['manager_id'],
+                count=row['count'],
+                total_amount=row['total'] or Decimal('0'),
+            )
+            for row in rows
+        ], batch_size=1000)
+        day = end
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminPanel', '0054_tradingaccount_credit_mirrored_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['-created_at'], name='txn_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['status', 'transaction_type', '-created_at'], name='txn_status_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_type', '-created_at'], name='txn_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_type', 'status', 'created_at'], name='txn_user_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['trading_account', '-created_at'], name='txn_account_created_idx'),
+        ),
+        migrations.CreateModel(
+            name='TransactionDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text="Local date of the transactions' created_at.")),
+                ('transaction_type', models.CharField(max_length=30)),
+                ('status', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('manager', models.ForeignKey(blank=True, help_text='Manager who created the clients (null for clients without one).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transaction_daily_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('date', 'transaction_type', 'status', 'manager')},
+                'indexes': [
+                    models.Index(fields=['transaction_type', 'status', 'date'], name='txn_summary_type_status_idx'),
+                    models.Index(fields=['manager', 'date'], name='txn_summary_manager_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminPanel', '0055_transaction_indexes_transactiondailysummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MAMCopyOperation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('pause', 'Pause copy'), ('start', 'Start copy'), ('reassign', 'Reassign to another master')], max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('partial', 'Completed with failures'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('succeeded', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('results', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mam_copy_operations', to=settings.AUTH_USER_MODEL)),
+                ('master_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mam_copy_operations', to='adminPanel.tradingaccount')),
+                ('target_master', models.ForeignKey(blank=True, help_text='New master for reassign operations', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='adminPanel.tradingaccount')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
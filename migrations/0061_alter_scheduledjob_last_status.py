@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminPanel', '0060_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scheduledjob',
+            name='last_status',
+            field=models.CharField(choices=[('idle', 'Idle'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed'), ('timeout', 'Timed out'), ('overrun', 'Running past timeout'), ('skipped', 'Skipped')], default='idle', max_length=10),
+        ),
+    ]
@@ -1130,6 +1130,19 @@ class TradingAccount(models.Model):
         default=Decimal('0.00'),
         help_text="Current margin level of the trading account."
     )
+
+    credit = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Current credit of the trading account."
+    )
+
+    mirrored_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When balance, equity, credit and margin were last mirrored from MT5."
+    )
     
     status = models.CharField(
         max_length=20,
@@ -1520,6 +1533,49 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Listings ordered newest first (admin transactions, recent activity)
+            models.Index(fields=['-created_at'], name='txn_created_idx'),
+            # Pending queues and dashboard totals: status + type, newest first / date window
+            models.Index(fields=['status', 'transaction_type', '-created_at'], name='txn_status_type_created_idx'),
+            # Recent deposits / withdrawals / transfers by type
+            models.Index(fields=['transaction_type', '-created_at'], name='txn_type_created_idx'),
+            # Per-client totals (manager dashboards, commission withdrawals)
+            models.Index(fields=['user', 'transaction_type', 'status', 'created_at'], name='txn_user_type_status_idx'),
+            # Account history windows
+            models.Index(fields=['trading_account', '-created_at'], name='txn_account_created_idx'),
+        ]
+
+
+class TransactionDailySummary(models.Model):
+    """
+    Count and sum of transactions per day, type, status and manager (the
+    client's created_by). Maintained by services/transaction_summary.py.
+    """
+    date = models.DateField(help_text="Local date of the transactions' created_at.")
+    transaction_type = models.CharField(max_length=30)
+    status = models.CharField(max_length=50)
+    manager = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='transaction_daily_summaries',
+        help_text="Manager who created the clients (null for clients without one)."
+    )
+    count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('date', 'transaction_type', 'status', 'manager')
+        indexes = [
+            models.Index(fields=['transaction_type', 'status', 'date'], name='txn_summary_type_status_idx'),
+            models.Index(fields=['manager', 'date'], name='txn_summary_manager_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.transaction_type}/{self.status}: {self.count} ({self.total_amount})"
 
 class DemoAccount(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='demo_accounts')
@@ -2278,7 +2334,7 @@ class TradeGroup(models.Model):
         verbose_name_plural = "Trading Groups"
 
 # Import Notification model
-from adminPanel.models_notification import Notification
+from adminPanel.models_notification import Notification, BroadcastNotification, BroadcastNotificationRead
 
 class ChatMessage(models.Model):
     """
@@ -2366,5 +2422,286 @@ class DailyTradingReport(models.Model):
         return f"DailyReport {self.trading_account.account_id} - {self.report_date} ({self.status})"
 
 
+
+class ScheduledJob(models.Model):
+    """
+    Status and lease row for one in-process scheduler job (see adminPanel/scheduler.py).
+    The process holding an unexpired lease is the only one running the job.
+    """
+
+    STATUS_CHOICES = [
+        ('idle', 'Idle'),
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+        ('timeout', 'Timed out'),
+        ('overrun', 'Running past timeout'),
+        ('skipped', 'Skipped'),
+    ]
+
+    name = models.CharField(max_length=100, unique=True)
+    schedule = models.CharField(max_length=100, help_text='Cron expression or "every Ns"')
+    next_run_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    locked_by = models.CharField(max_length=150, null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    last_status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='idle')
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    run_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"ScheduledJob {self.name} ({self.last_status}, next {self.next_run_at})"
+
+
+class AccountBalanceTimeline(models.Model):
+    """
+    Build state of a trading account's daily balance timeline
+    (see services/balance_timeline.py): days up to built_through are stored.
+    """
+
+    SOURCE_CHOICES = [
+        ('mt5', 'MT5 deals'),
+        ('transactions', 'Approved transactions'),
+    ]
+
+    trading_account = models.OneToOneField(
+        'TradingAccount',
+        on_delete=models.CASCADE,
+        related_name='balance_timeline'
+    )
+    built_through = models.DateField()
+    closing_balance = models.DecimalField(max_digits=20, decimal_places=2, help_text='Balance at the end of built_through')
+    source = models.CharField(max_length=15, choices=SOURCE_CHOICES, default='mt5')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"BalanceTimeline {self.trading_account_id} through {self.built_through}"
+
+
+class AccountDailyBalance(models.Model):
+    """Closing balance of a trading account on a day with balance activity (days without activity are not stored)."""
+
+    trading_account = models.ForeignKey(
+        'TradingAccount',
+        on_delete=models.CASCADE,
+        related_name='daily_balances'
+    )
+    date = models.DateField()
+    closing_balance = models.DecimalField(max_digits=20, decimal_places=2)
+    deposits = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
+    withdrawals = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
+    trading_pnl = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        unique_together = ('trading_account', 'date')
+        ordering = ['trading_account', '-date']
+
+    def __str__(self):
+        return f"{self.trading_account_id} {self.date}: {self.closing_balance}"
+
+
+class MAMCopyOperation(models.Model):
+    """
+    Bulk MAM copy change over a master's investment accounts (services/mam_copy.py).
+    results holds {login: {'ok', 'error'}} and is saved after every chunk, so an
+    interrupted operation resumes with the logins that did not succeed.
+    """
+
+    ACTION_CHOICES = [
+        ('pause', 'Pause copy'),
+        ('start', 'Start copy'),
+        ('reassign', 'Reassign to another master'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('partial', 'Completed with failures'),
+        ('failed', 'Failed'),
+    ]
+
+    master_account = models.ForeignKey(
+        'TradingAccount',
+        on_delete=models.CASCADE,
+        related_name='mam_copy_operations'
+    )
+    target_master = models.ForeignKey(
+        'TradingAccount',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text='New master for reassign operations'
+    )
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    results = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='mam_copy_operations'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"MAMCopyOperation {self.id} {self.action} {self.master_account_id} ({self.status} {self.succeeded}/{self.total})"
+
+class AccountBulkOperation(models.Model):
+    """
+    Bulk change over the trading accounts matched by `filters` (services/account_bulk.py).
+    results holds {login: {'ok', 'error'}} (or {'from', 'to'} for a dry run) and is
+    saved after every chunk, so an interrupted operation resumes where it stopped.
+    """
+
+    OPERATION_CHOICES = [
+        ('change_group', 'Change group'),
+        ('change_leverage', 'Change leverage'),
+        ('enable_algo', 'Enable algo trading'),
+        ('disable_algo', 'Disable algo trading'),
+        ('enable_account', 'Enable account'),
+        ('disable_account', 'Disable account'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('partial', 'Completed with failures'),
+        ('failed', 'Failed'),
+    ]
+
+    operation = models.CharField(max_length=20, choices=OPERATION_CHOICES)
+    params = models.JSONField(default=dict, blank=True, help_text="e.g. {'group': ...} or {'leverage': ...}")
+    filters = models.JSONField(default=dict, blank=True, help_text="group_name, account_type and manager_id the accounts were selected by")
+    dry_run = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    results = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='account_bulk_operations'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"AccountBulkOperation {self.id} {self.operation} ({self.status} {self.succeeded}/{self.total})"
+
+class RateLimitCounter(models.Model):
+    """
+    Database fallback of the sliding-window rate limiter (utils/rate_limit.py):
+    units charged to `key` during fixed window number `window`.
+    """
+
+    key = models.CharField(max_length=200)
+    window = models.BigIntegerField(help_text="Window number: epoch seconds // window length")
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('key', 'window')
+
+    def __str__(self):
+        return f"{self.key}@{self.window}: {self.count}"
+
+class StoredBlob(models.Model):
+    """
+    One uploaded file content, stored once under its SHA-256 (services/blob_storage.py).
+    File fields that hold `name` share it; `ref_count` counts them.
+    """
+    THUMBNAIL_STATUS_CHOICES = [
+        ('none', 'None'),
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, help_text="Storage name, e.g. blobs/ab/cd/<sha256>.pdf")
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    thumbnail = models.CharField(max_length=255, blank=True)
+    thumbnail_status = models.CharField(max_length=10, choices=THUMBNAIL_STATUS_CHOICES, default='none')
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_referenced_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'last_referenced_at'], name='blob_unreferenced_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+class ExportJob(models.Model):
+    """
+    Background export (services/export_service.py). The file is written outside
+    MEDIA_ROOT, served only through the job download view and deleted after expires_at.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),
+    ]
+
+    job_id = models.CharField(max_length=32, unique=True)
+    export = models.CharField(max_length=30)
+    file_format = models.CharField(max_length=10, default='csv')
+    columns = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    rows = models.PositiveIntegerField(default=0)
+    path = models.CharField(max_length=500, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    size_bytes = models.BigIntegerField(null=True, blank=True)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs'
+    )
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"ExportJob {self.job_id} {self.export} ({self.status})"
+
 # Import PAMM models
-from adminPanel.models_pamm import PAMMAccount, PAMMParticipant, PAMMTransaction, PAMMEquitySnapshot
\ No newline at end of file
+from adminPanel.models_pamm import PAMMAccount, PAMMParticipant, PAMMTransaction, PAMMEquitySnapshot, PAMMEquityRollup
\ No newline at end of file
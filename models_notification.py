@@ -4,9 +4,35 @@ Handles user notifications for various events like IB requests, account creation
 """
 
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 
+# Cached unread counters are recomputed from the DB after this many seconds
+UNREAD_CACHE_TTL = 3600
+# Bumped on every new broadcast so per-user broadcast counters are recomputed lazily
+BROADCAST_GENERATION_KEY = 'notif_broadcast_generation'
+
+
+def _personal_unread_key(user_id):
+    return f"notif_unread_{user_id}"
+
+
+def _broadcast_unread_key(user_id):
+    generation = cache.get(BROADCAST_GENERATION_KEY) or 0
+    return f"notif_broadcast_unread_{user_id}_{generation}"
+
+
+def _adjust_counter(key, delta):
+    """Apply delta to a cached counter; drop the key if it is missing or would go negative."""
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        return
+    if value < 0:
+        cache.delete(key)
+
 
 class Notification(models.Model):
     """
@@ -89,6 +115,15 @@ class Notification(models.Model):
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
+            _adjust_counter(_personal_unread_key(self.user_id), -1)
+    
+    def delete(self, *args, **kwargs):
+        was_unread = not self.is_read
+        user_id = self.user_id
+        result = super().delete(*args, **kwargs)
+        if was_unread:
+            _adjust_counter(_personal_unread_key(user_id), -1)
+        return result
     
     @classmethod
     def create_notification(cls, user, notification_type, status, title, message, 
@@ -111,7 +146,7 @@ class Notification(models.Model):
         Returns:
             Notification instance
         """
-        return cls.objects.create(
+        notification = cls.objects.create(
             user=user,
             notification_type=notification_type,
             status=status,
@@ -122,19 +157,33 @@ class Notification(models.Model):
             related_object_type=related_object_type,
             metadata=metadata or {}
         )
+        _adjust_counter(_personal_unread_key(notification.user_id), 1)
+        return notification
+    
+    @classmethod
+    def get_personal_unread_count(cls, user):
+        """Unread per-user notifications, served from cache and recomputed on a miss"""
+        key = _personal_unread_key(user.id)
+        count = cache.get(key)
+        if count is None:
+            count = cls.objects.filter(user=user, is_read=False).count()
+            cache.set(key, count, UNREAD_CACHE_TTL)
+        return count
     
     @classmethod
     def get_unread_count(cls, user):
-        """Get count of unread notifications for a user"""
-        return cls.objects.filter(user=user, is_read=False).count()
+        """Get count of unread notifications (personal and broadcast) for a user"""
+        return cls.get_personal_unread_count(user) + BroadcastNotification.get_unread_count(user)
     
     @classmethod
     def mark_all_read(cls, user):
-        """Mark all notifications as read for a user"""
+        """Mark all notifications, including broadcasts, as read for a user"""
         cls.objects.filter(user=user, is_read=False).update(
             is_read=True,
             read_at=timezone.now()
         )
+        cache.set(_personal_unread_key(user.id), 0, UNREAD_CACHE_TTL)
+        BroadcastNotification.mark_all_read(user)
     
     @classmethod
     def delete_old_read_notifications(cls, days=7):
@@ -147,3 +196,141 @@ class Notification(models.Model):
             read_at__lt=cutoff_date
         ).delete()
         return deleted_count[0] if deleted_count else 0
+
+
+class BroadcastNotification(models.Model):
+    """
+    Notification addressed to a whole audience. Stored once instead of one
+    Notification row per user; per-user read/dismiss state lives in
+    BroadcastNotificationRead rows created only when a user acts on it.
+    """
+    
+    AUDIENCE_CHOICES = [
+        ('all', 'All Users'),
+        ('client', 'Clients'),
+        ('manager', 'Managers'),
+        ('admin', 'Admins'),
+    ]
+    
+    audience = models.CharField(max_length=20, choices=AUDIENCE_CHOICES, default='all', db_index=True)
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    status = models.CharField(max_length=20, choices=Notification.STATUS_CHOICES, default='created')
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    action_url = models.CharField(max_length=500, blank=True, null=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='broadcast_notifications_sent'
+    )
+    expires_at = models.DateTimeField(blank=True, null=True, help_text="Hidden from users after this time")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['audience', '-created_at'], name='broadcast_audience_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Broadcast {self.notification_type} - {self.title} ({self.audience})"
+    
+    @classmethod
+    def create_broadcast(cls, notification_type, status, title, message, audience='all',
+                         action_url=None, metadata=None, created_by=None, expires_at=None):
+        """Store one broadcast row and invalidate every user's cached broadcast counter"""
+        broadcast = cls.objects.create(
+            audience=audience,
+            notification_type=notification_type,
+            status=status,
+            title=title,
+            message=message,
+            action_url=action_url,
+            metadata=metadata or {},
+            created_by=created_by,
+            expires_at=expires_at
+        )
+        try:
+            cache.incr(BROADCAST_GENERATION_KEY)
+        except ValueError:
+            cache.set(BROADCAST_GENERATION_KEY, 1, None)
+        return broadcast
+    
+    @classmethod
+    def visible_to(cls, user):
+        """Active broadcasts for the user's audience, excluding ones the user dismissed"""
+        now = timezone.now()
+        return cls.objects.filter(
+            Q(audience='all') | Q(audience=getattr(user, 'role', None) or 'client')
+        ).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+        ).exclude(
+            Exists(BroadcastNotificationRead.objects.filter(broadcast=OuterRef('pk'), user=user, is_dismissed=True))
+        )
+    
+    @classmethod
+    def with_read_state(cls, user, queryset=None):
+        queryset = cls.visible_to(user) if queryset is None else queryset
+        return queryset.annotate(
+            is_read=Exists(BroadcastNotificationRead.objects.filter(broadcast=OuterRef('pk'), user=user))
+        )
+    
+    @classmethod
+    def get_unread_count(cls, user):
+        key = _broadcast_unread_key(user.id)
+        count = cache.get(key)
+        if count is None:
+            count = cls.visible_to(user).exclude(reads__user=user).count()
+            cache.set(key, count, UNREAD_CACHE_TTL)
+        return count
+    
+    @classmethod
+    def mark_read(cls, user, broadcast_ids, dismiss=False):
+        """Record read (and optionally dismissed) markers for the given broadcasts"""
+        now = timezone.now()
+        broadcast_ids = list(broadcast_ids)
+        existing = set(
+            BroadcastNotificationRead.objects.filter(user=user, broadcast_id__in=broadcast_ids)
+            .values_list('broadcast_id', flat=True)
+        )
+        BroadcastNotificationRead.objects.bulk_create(
+            [
+                BroadcastNotificationRead(broadcast_id=bid, user=user, read_at=now, is_dismissed=dismiss)
+                for bid in broadcast_ids if bid not in existing
+            ],
+            ignore_conflicts=True
+        )
+        if dismiss and existing:
+            BroadcastNotificationRead.objects.filter(user=user, broadcast_id__in=existing).update(is_dismissed=True)
+        cache.delete(_broadcast_unread_key(user.id))
+    
+    @classmethod
+    def mark_all_read(cls, user):
+        unread_ids = cls.visible_to(user).exclude(reads__user=user).values_list('id', flat=True)
+        cls.mark_read(user, unread_ids)
+        cache.set(_broadcast_unread_key(user.id), 0, UNREAD_CACHE_TTL)
+
+
+class BroadcastNotificationRead(models.Model):
+    """Per-user read marker for a BroadcastNotification"""
+    
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE, related_name='reads')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='broadcast_notification_reads'
+    )
+    read_at = models.DateTimeField(default=timezone.now)
+    is_dismissed = models.BooleanField(default=False)
+    
+    class Meta:
+        unique_together = (('broadcast', 'user'),)
+        indexes = [
+            models.Index(fields=['user', 'broadcast'], name='broadcast_read_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} read broadcast {self.broadcast_id}"
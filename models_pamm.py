@@ -295,6 +295,11 @@ class PAMMTransaction(models.Model):
     )
     approved_at = models.DateTimeField(null=True, blank=True)
     rejection_reason = models.TextField(blank=True)
+    mt5_applied_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the MT5 balance operation for this transaction succeeded (never repeated once set)"
+    )
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -349,3 +354,46 @@ class PAMMEquitySnapshot(models.Model):
 
     def __str__(self):
         return f"{self.pamm.name} - ${self.equity} @ {self.timestamp}"
+
+
+class PAMMEquityRollup(models.Model):
+    """
+    Downsampled PAMM equity for charting: one row per PAMM per minute/hour/day bucket
+    Maintained by the equity sync; old minute and hour rows are pruned
+    """
+    RESOLUTION_CHOICES = (
+        ('MINUTE', 'Minute'),
+        ('HOUR', 'Hour'),
+        ('DAY', 'Day'),
+    )
+
+    pamm = models.ForeignKey(
+        PAMMAccount,
+        on_delete=models.CASCADE,
+        related_name='equity_rollups'
+    )
+    resolution = models.CharField(max_length=6, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    
+    # Equity over the bucket
+    open_equity = models.DecimalField(max_digits=20, decimal_places=2)
+    high_equity = models.DecimalField(max_digits=20, decimal_places=2)
+    low_equity = models.DecimalField(max_digits=20, decimal_places=2)
+    close_equity = models.DecimalField(max_digits=20, decimal_places=2)
+    
+    # Pool state at the last update of the bucket
+    total_units = models.DecimalField(max_digits=20, decimal_places=8)
+    unit_price = models.DecimalField(max_digits=20, decimal_places=8)
+    
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'pamm_equity_rollup'
+        ordering = ['-bucket_start']
+        unique_together = ('pamm', 'resolution', 'bucket_start')
+        indexes = [
+            models.Index(fields=['resolution', 'bucket_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.pamm.name} - {self.resolution} ${self.close_equity} @ {self.bucket_start}"
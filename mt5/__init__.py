@@ -1 +1,8 @@
+import os
+
 default_app_config = 'adminPanel.mt5.apps.MT5Config'
+
+if os.environ.get('MT5_SIMULATOR') == '1':
+    # Offline development, CI and benchmarks: "import MT5Manager" gets the simulator
+    from .simulator import install
+    install()
@@ -30,6 +30,12 @@ def reset_manager_instance():
         _current_server_setting_id = None
         print("MT5 Manager connection has been reset and will reconnect with new credentials")  
 
+    try:
+        from adminPanel.services.group_catalog import group_catalog
+        group_catalog.reset('real')
+    except Exception as e:
+        print(f"Error while resetting group catalog: {e}")
+
 class MT5ManagerAPI:
     def __init__(self):
         
@@ -118,6 +124,12 @@ def reset_demo_manager_instance():
         _demo_server_setting_id = None
         print("Demo MT5 Manager connection has been reset")
 
+    try:
+        from adminPanel.services.group_catalog import group_catalog
+        group_catalog.reset('demo')
+    except Exception as e:
+        print(f"Error while resetting demo group catalog: {e}")
+
 
 def get_demo_manager_instance():
     """
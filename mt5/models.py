@@ -5,6 +5,8 @@ import base64
 import hashlib
 import logging
 import os
+import threading
+from collections import OrderedDict
 
 try:
     from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -20,6 +22,28 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+# PBKDF2 (390,000 iterations) is far too slow to run on every decrypt, so derived
+# Fernet keys are kept in memory only, keyed by (key material digest, salt).
+# A rotated MT5_ENCRYPTION_KEY / SECRET_KEY changes the digest and misses the cache.
+DERIVED_KEY_CACHE_SIZE = 64
+_derived_keys = OrderedDict()
+# Decrypted credentials per ServerSetting row, reused until the stored row changes
+_decrypted_snapshots = {}
+_credential_cache_lock = threading.Lock()
+
+
+def _key_material():
+    key_material = getattr(settings, 'MT5_ENCRYPTION_KEY', None) or settings.SECRET_KEY
+    return key_material.encode()
+
+
+def clear_credential_caches():
+    """Drop derived keys and decrypted snapshots (call after rotating the encryption key)."""
+    with _credential_cache_lock:
+        _derived_keys.clear()
+        _decrypted_snapshots.clear()
+
+
 class ServerSetting(models.Model):
     # Increase max_length to accommodate encrypted values
     server_ip = models.CharField(max_length=512, verbose_name='Server IP Address with Port')
@@ -60,8 +84,23 @@ class ServerSetting(models.Model):
         Derive a per-value Fernet key using PBKDF2HMAC with the provided salt.
         If PBKDF2HMAC is unavailable, fall back to the deterministic SHA256 derivation.
         """
-        key_material = getattr(settings, 'MT5_ENCRYPTION_KEY', None) or settings.SECRET_KEY
-        raw = key_material.encode()
+        raw = _key_material()
+        cache_key = (hashlib.sha256(raw).digest(), bytes(salt))
+        with _credential_cache_lock:
+            fernet = _derived_keys.get(cache_key)
+            if fernet is not None:
+                _derived_keys.move_to_end(cache_key)
+                return fernet
+        fernet = ServerSetting._derive_fernet(raw, salt)
+        if fernet is not None:
+            with _credential_cache_lock:
+                _derived_keys[cache_key] = fernet
+                while len(_derived_keys) > DERIVED_KEY_CACHE_SIZE:
+                    _derived_keys.popitem(last=False)
+        return fernet
+
+    @staticmethod
+    def _derive_fernet(raw: bytes, salt: bytes):
         if PBKDF2HMAC is None or hashes is None:
             # fallback
             digest = hashlib.sha256(raw).digest()
@@ -191,19 +230,40 @@ class ServerSetting(models.Model):
             return False
 
     # Explicit decrypt helpers (call these where plaintext is required)
+    def get_decrypted_settings(self):
+        """
+        Decrypted credentials for this row. The result is kept in process memory
+        and reused until the stored values, updated_at or the encryption key change.
+        """
+        raw_ip = object.__getattribute__(self, 'server_ip')
+        raw_password = object.__getattribute__(self, 'real_account_password')
+        fingerprint = (raw_ip, raw_password, self.updated_at, hashlib.sha256(_key_material()).digest())
+        if self.pk is not None:
+            with _credential_cache_lock:
+                cached = _decrypted_snapshots.get(self.pk)
+            if cached is not None and cached[0] == fingerprint:
+                return cached[1]
+        snapshot = {
+            'server_ip': type(self)._decrypt_value(raw_ip),
+            'real_account_password': type(self)._decrypt_value(raw_password),
+        }
+        if self.pk is not None:
+            with _credential_cache_lock:
+                _decrypted_snapshots[self.pk] = (fingerprint, snapshot)
+        return snapshot
+
     def get_decrypted_server_ip(self):
-        try:
-            raw = object.__getattribute__(self, 'server_ip')
-        except Exception:
-            raw = getattr(self, 'server_ip', None)
-        return type(self)._decrypt_value(raw)
+        return self.get_decrypted_settings()['server_ip']
 
     def get_decrypted_real_account_password(self):
-        try:
-            raw = object.__getattribute__(self, 'real_account_password')
-        except Exception:
-            raw = getattr(self, 'real_account_password', None)
-        return type(self)._decrypt_value(raw)
+        return self.get_decrypted_settings()['real_account_password']
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        with _credential_cache_lock:
+            _decrypted_snapshots.pop(pk, None)
+        return result
 
 class MT5GroupConfig(models.Model):
     """Model to store MT5 trading groups configuration"""
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 import os
 import json
 from django.db import transaction
+from adminPanel.utils.query_profiler import instrument_manager
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +122,14 @@ def reset_manager_instance():
             # Clear related cache keys
             cache.delete('mt5_groups_sync')
             cache.delete('mt5_connection_status')
+
+            # The in-memory group catalog belongs to the old connection
+            from adminPanel.services.group_catalog import group_catalog, invalidate_db_settings
+            group_catalog.reset('real')
+            invalidate_db_settings()
+
+            from adminPanel.services.positions_book import positions_book
+            positions_book.reset()
            
         except Exception as e:
             logger.warning(f"Error clearing MT5 groups cache: {e}")
@@ -253,6 +262,29 @@ def cache_account_success(login_id, balance, equity, cache_duration=30):
     data = {'balance': balance, 'equity': equity, 'timestamp': time.time()}
     cache.set(cache_key, data, cache_duration)
    
+def _is_closed_deal(deal):
+    """Closing deal (Entry OUT) of a buy/sell on a real symbol with closed volume."""
+    symbol = getattr(deal, 'Symbol', None)
+    volume_closed = getattr(deal, 'VolumeClosed', 0)
+    return (
+        getattr(deal, 'Entry', None) == 1
+        and symbol and str(symbol).strip() != ''
+        and volume_closed and float(volume_closed) > 0
+        and getattr(deal, 'Action', None) in (0, 1)
+    )
+
+def format_position(position):
+    """Position dict returned by get_open_positions for one MT5 position object."""
+    return {
+        "date": position.TimeCreate,
+        "id": position.Position,
+        "symbol": position.Symbol,
+        "volume": round(position.Volume/10000, 2),
+        "price": position.PriceOpen,
+        "profit": position.Profit,
+        "type": "Buy" if position.Action == 0 else "Sell",
+    }
+
 class MT5ManagerAPI:
     def __init__(self):
         unique_id = str(os.getpid())
@@ -393,17 +425,45 @@ class MT5ManagerActions:
             return []
         if not deals:
             return []
-        closed_deals = []
-        for idx, d in enumerate(deals):
-            action = getattr(d, 'Action', None)
-            entry = getattr(d, 'Entry', None)
-            symbol = getattr(d, 'Symbol', None)
-            volume_closed = getattr(d, 'VolumeClosed', 0)
-            deal_id = getattr(d, 'Deal', None)
-            # Keep original filter for actual closed_deals list
-            if entry == 1 and symbol and str(symbol).strip() != '' and volume_closed and float(volume_closed) > 0 and action in (0, 1):
-                closed_deals.append(d)
-        return closed_deals
+        return [d for d in deals if _is_closed_deal(d)]
+
+    def get_deals_by_logins(self, login_ids, from_date, to_date, chunk_size=500):
+        """
+        All deals (trades and balance operations) for many logins with one
+        DealRequestByLogins call per chunk. Returns {login: [deal objects]}.
+        """
+        if not self.manager:
+            raise Exception("MT5 Manager not connected")
+        logins = sorted({int(login_id) for login_id in login_ids})
+        by_login = {}
+        for i in range(0, len(logins), chunk_size):
+            chunk = logins[i:i + chunk_size]
+            try:
+                deals = self.manager.DealRequestByLogins(chunk, from_date, to_date)
+            except AttributeError:
+                # Manager API builds without the batch request: one request per login
+                for login in chunk:
+                    deals = self.manager.DealRequest(login, from_date, to_date)
+                    if isinstance(deals, (list, tuple)) and deals:
+                        by_login[login] = list(deals)
+                continue
+            if not isinstance(deals, (list, tuple)):
+                continue
+            for d in deals:
+                by_login.setdefault(int(d.Login), []).append(d)
+        return by_login
+
+    def get_closed_trades_by_logins(self, login_ids, from_date, to_date, chunk_size=500):
+        """
+        Closed trades for many logins, batched like get_deals_by_logins.
+        Returns {login: [deal objects]} (same filter as get_closed_trades); logins without deals are omitted.
+        """
+        by_login = {}
+        for login, deals in self.get_deals_by_logins(login_ids, from_date, to_date, chunk_size).items():
+            closed = [d for d in deals if _is_closed_deal(d)]
+            if closed:
+                by_login[login] = closed
+        return by_login
 
     @property
     def HistoryDealsGet(self):
@@ -423,7 +483,8 @@ class MT5ManagerActions:
         try:
             manager_instance = get_manager_instance()
             if manager_instance:
-                self.manager = manager_instance.manager
+                # Timed per call when the query profiler is on (no-op otherwise)
+                self.manager = instrument_manager(manager_instance.manager)
             else:
                 self.connection_error = "Manager instance is None"
                 logger.error("MT5 Manager instance is None")
@@ -747,6 +808,12 @@ class MT5ManagerActions:
                 logger.error("Cannot get groups - MT5 manager not initialized")
                 return groups
 
+            # Served from the group catalog snapshot; enumerate only if it is empty
+            from adminPanel.services.group_catalog import group_catalog
+            groups = list(group_catalog.group_names('real'))
+            if groups:
+                return groups
+
             # Check connection status
             try:
                
@@ -844,18 +911,30 @@ class MT5ManagerActions:
         if not positions:
             return []  
 
-        formatted_positions = []
-        for position in positions:            formatted_positions.append({
-                "date": position.TimeCreate,
-                "id": position.Position,
-                "symbol": position.Symbol,
-                "volume": round(position.Volume/10000, 2),
-                "price": position.PriceOpen,
-                "profit": position.Profit,
-                "type": "Buy" if position.Action == 0 else "Sell",
-            })
+        return [format_position(position) for position in positions]
 
-        return formatted_positions
+    @ensure_connected
+    def get_open_positions_by_logins(self, login_ids, chunk_size=500):
+        """
+        Open positions for many logins with one PositionGetByLogins call per chunk.
+        Returns {login: [position dicts]} in the get_open_positions format; logins without positions are omitted.
+        """
+        logins = sorted({int(login_id) for login_id in login_ids})
+        by_login = {}
+        for i in range(0, len(logins), chunk_size):
+            chunk = logins[i:i + chunk_size]
+            try:
+                positions = self.manager.PositionGetByLogins(chunk)
+            except AttributeError:
+                # Manager API builds without the batch request: one request per login
+                for login in chunk:
+                    formatted = self.get_open_positions(login)
+                    if formatted:
+                        by_login[login] = formatted
+                continue
+            for position in positions or []:
+                by_login.setdefault(int(position.Login), []).append(format_position(position))
+        return by_login
 
     @ensure_connected
     def change_master_password(self, login_id, master_pass):
@@ -925,7 +1004,51 @@ class MT5ManagerActions:
                 logger.error(f"Error in get_account_data for {login_id}: {str(e)}")
             return {'balance': 0.0, 'equity': 0.0}
 
-    @ensure_connected  
+    @ensure_connected
+    def get_accounts_data(self, login_ids, use_cache=True, chunk_size=500):
+        """
+        Get balance, equity, credit and margin for many accounts with one Manager API
+        request per chunk of logins.
+        Returns {login: {'balance', 'equity', 'credit', 'margin', 'margin_free', 'margin_level'}}
+        (floats); logins unknown to MT5, or in a chunk whose request failed, are omitted.
+        """
+        logins = sorted({int(login_id) for login_id in login_ids})
+        if not logins:
+            return {}
+
+        results = {}
+        for i in range(0, len(logins), chunk_size):
+            chunk = logins[i:i + chunk_size]
+            try:
+                accounts = self.manager.UserAccountGetByLogins(chunk)
+            except AttributeError:
+                # Manager API builds without the batch request: fall back to one request per login
+                accounts = [self.manager.UserAccountGet(login) for login in chunk]
+            except Exception as e:
+                logger.error(f"Error in get_accounts_data for {len(chunk)} logins: {str(e)}")
+                continue
+
+            for account in accounts or []:
+                if not account:
+                    continue
+                results[int(account.Login)] = {
+                    'balance': float(account.Balance),
+                    'equity': float(account.Equity),
+                    'credit': float(getattr(account, 'Credit', 0.0) or 0.0),
+                    'margin': float(getattr(account, 'Margin', 0.0) or 0.0),
+                    'margin_free': float(getattr(account, 'MarginFree', 0.0) or 0.0),
+                    'margin_level': float(getattr(account, 'MarginLevel', 0.0) or 0.0),
+                }
+
+        if use_cache and results:
+            now = time.time()
+            cache.set_many({
+                f"mt5_success_{login}": {'balance': data['balance'], 'equity': data['equity'], 'timestamp': now}
+                for login, data in results.items()
+            }, 30)
+        return results
+
+    @ensure_connected
     def get_balance(self, login_id):
         try:
             # Use the optimized method that caches results
@@ -1118,6 +1241,10 @@ class MT5ManagerActions:
     def get_group_configuration(self, group_name):
         """Get detailed configuration for a specific group"""
         try:
+            from adminPanel.services.group_catalog import group_catalog
+            config = group_catalog.get_config(group_name, 'real')
+            if config is not None:
+                return config
             for i in range(self.manager.GroupTotal()):
                 group = self.manager.GroupNext(i)
                 if group.Group == group_name:
@@ -1138,7 +1265,11 @@ class MT5ManagerActions:
     def get_all_group_configurations(self):
         """Get detailed configurations for all available groups"""
         try:
-            groups_config = []
+            from adminPanel.services.group_catalog import group_catalog
+            groups_config = list(group_catalog.all_configs('real'))
+            if groups_config:
+                return groups_config
+
             for i in range(self.manager.GroupTotal()):
                 group = self.manager.GroupNext(i)
                 group_info = {
@@ -1595,6 +1726,78 @@ class MT5ManagerActions:
                 return True
         return False
 
+    @ensure_connected
+    def update_users(self, changes_by_login, max_workers=8, chunk_size=200):
+        """
+        Apply field changes to many MT5 users: {login: {'Group': ..., 'Rights': ..., ...}}.
+        Uses UserGetByLogins / UserUpdateBatch per chunk where the Manager API has them,
+        otherwise UserGet + UserUpdate per login on a bounded thread pool.
+        Returns {login: {'ok': bool, 'error': str or None}}.
+        """
+        changes = {int(login): fields for login, fields in changes_by_login.items()}
+        logins = sorted(changes)
+        results = {}
+        for i in range(0, len(logins), chunk_size):
+            chunk = logins[i:i + chunk_size]
+            try:
+                results.update(self._update_users_batch(chunk, changes))
+            except AttributeError:
+                # Manager API builds without the batch calls: bounded concurrent single updates
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    futures = {pool.submit(self._update_user_single, login, changes[login]): login for login in chunk}
+                    for future in concurrent.futures.as_completed(futures):
+                        results[futures[future]] = future.result()
+        return results
+
+    def _update_users_batch(self, chunk, changes):
+        users = self.manager.UserGetByLogins(chunk)
+        results = {login: {'ok': False, 'error': 'Account not found in MT5'} for login in chunk}
+        found = []
+        for user in users or []:
+            if not user:
+                continue
+            for field, value in changes[int(user.Login)].items():
+                setattr(user, field, value)
+            found.append(user)
+        if not found:
+            return results
+
+        outcome = self.manager.UserUpdateBatch(found)
+        if isinstance(outcome, (list, tuple)) and len(outcome) == len(found):
+            # Per-user results: bools, or return codes where 0 (MT_RET_OK) is success
+            for user, code in zip(found, outcome):
+                ok = code if isinstance(code, bool) else code == 0
+                results[int(user.Login)] = {'ok': bool(ok), 'error': None if ok else f"UserUpdateBatch returned {code}"}
+        else:
+            error = None if outcome else str(MT5Manager.LastError())
+            for user in found:
+                results[int(user.Login)] = {'ok': bool(outcome), 'error': error}
+        return results
+
+    def _update_user_single(self, login, fields):
+        try:
+            user = self.manager.UserGet(int(login))
+            if not user:
+                return {'ok': False, 'error': 'Account not found in MT5'}
+            for field, value in fields.items():
+                setattr(user, field, value)
+            if self.manager.UserUpdate(user):
+                return {'ok': True, 'error': None}
+            return {'ok': False, 'error': str(MT5Manager.LastError())}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    def set_agents(self, agent_by_login, max_workers=8, chunk_size=200):
+        """
+        Set the Agent field of many logins (0 pauses MAM copy, a master login starts it).
+        Returns {login: {'ok': bool, 'error': str or None}}.
+        """
+        return self.update_users(
+            {login: {'Agent': int(agent)} for login, agent in agent_by_login.items()},
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+        )
+
     @ensure_connected
     def enable_double_trade(self, login_id):
         """
@@ -0,0 +1,878 @@
+"""
+MT5 Manager simulator
+Pure-Python stand-in for the MT5Manager binding, covering the part of the
+Manager API this project calls, so MT5 code paths can run offline (development
+machines, CI, load tests) against a synthetic server:
+
+    MT5_SIMULATOR=1 python manage.py runserver      # every "import MT5Manager" gets this module
+
+    from adminPanel.mt5 import simulator
+    simulator.configure(accounts=10000, deals_per_account=300, latency_ms=2, failure_rate=0.01)
+    simulator.install()                              # same, from code (tests, benchmark commands)
+    actions = simulator.manager_actions()            # MT5ManagerActions bound to the simulator
+
+Implemented: Connect/Disconnect, UserGet/UserRequest/UserGetByLogins/UserGetByGroup,
+UserAdd/UserUpdate/UserUpdateBatch/UserDelete/UserPasswordChange, UserAccountGet/
+UserAccountGetByLogins, UserTotal, DealRequest/DealRequestByLogins, DealerBalance,
+PositionGet/PositionGetByLogins, GroupTotal/GroupNext/GroupGet and the position,
+deal and group sinks (PositionSubscribe, DealSubscribe, GroupSubscribe).
+
+The server holds `accounts` logins starting at `first_login`. Users, accounts
+and open positions are derived from a per-login seed when first read; deal
+histories (about `deals_per_account` deals per login over `history_days`) are
+regenerated on every request instead of being kept in memory, so 10k accounts
+with millions of deals fit in a small process. Balances are not reconciled
+with the generated history.
+
+Every call sleeps `latency_ms` (+- `latency_jitter`) plus `record_latency_us`
+per returned record, and fails with probability `failure_rate` (only for
+`fail_methods` when given): the call returns False and LastError() reports
+MT_RET_ERR_TIMEOUT, like the real binding. stats() counts calls, records,
+injected latency and time spent generating data, so benchmarks can separate
+simulator overhead from the code under test.
+
+open_position(), close_position() and update_position() change the book and
+fire the subscribed sinks from the calling thread, standing in for the pump.
+"""
+
+from datetime import datetime
+import os
+import random
+import sys
+import threading
+import time
+
+SYMBOLS = (
+    'EURUSD', 'GBPUSD', 'USDJPY', 'XAUUSD', 'AUDUSD', 'USDCAD', 'EURJPY', 'BTCUSD', 'US30', 'NAS100',
+)
+PRICES = {
+    'EURUSD': 1.08, 'GBPUSD': 1.27, 'USDJPY': 151.0, 'XAUUSD': 2350.0, 'AUDUSD': 0.66,
+    'USDCAD': 1.36, 'EURJPY': 163.0, 'BTCUSD': 65000.0, 'US30': 39000.0, 'NAS100': 18000.0,
+}
+DEFAULT_GROUPS = ('real\\Standard', 'real\\ECN', 'real\\Pro', 'real\\Cent', 'demo\\Standard')
+
+# Volumes are in MT5 units: 10000 = 1 lot
+LOT = 10000
+
+
+def _env_number(name, default, cast=float):
+    try:
+        return cast(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+DEFAULT_CONFIG = {
+    'accounts': _env_number('MT5_SIM_ACCOUNTS', 10000, int),
+    'first_login': 7000001,
+    'deals_per_account': _env_number('MT5_SIM_DEALS_PER_ACCOUNT', 200, int),
+    'positions_per_account': 2,
+    'history_days': 365,
+    'groups': DEFAULT_GROUPS,
+    'seed': _env_number('MT5_SIM_SEED', 42, int),
+    'latency_ms': _env_number('MT5_SIM_LATENCY_MS', 0.0),
+    'latency_jitter': 0.2,
+    'record_latency_us': _env_number('MT5_SIM_RECORD_LATENCY_US', 0.0),
+    'failure_rate': _env_number('MT5_SIM_FAILURE_RATE', 0.0),
+    'fail_methods': (),
+    # Fixed "now" (epoch seconds) for reproducible histories; None = time of configure()
+    'now': None,
+}
+
+
+# --- enums --------------------------------------------------------------------
+
+class EnMTAPIRetcode:
+    MT_RET_OK = 0
+    MT_RET_OK_NONE = 1
+    MT_RET_ERROR = 2
+    MT_RET_ERR_PARAMS = 3
+    MT_RET_ERR_NETWORK = 7
+    MT_RET_ERR_PERMISSIONS = 8
+    MT_RET_ERR_TIMEOUT = 9
+    MT_RET_ERR_CONNECTION = 10
+    MT_RET_ERR_NOTFOUND = 13
+    MT_RET_USR_LOGIN_EXHAUSTED = 3002
+    MT_RET_USR_LOGIN_PROHIBITED = 3003
+    MT_RET_USR_LOGIN_EXIST = 3004
+    MT_RET_REQUEST_NO_MONEY = 10019
+    MT_RET_TRADE_MAX_MONEY = 10034
+
+
+class _UsersRights:
+    USER_RIGHT_NONE = 0x0
+    USER_RIGHT_ENABLED = 0x1
+    USER_RIGHT_PASSWORD = 0x2
+    USER_RIGHT_TRADE_DISABLED = 0x4
+    USER_RIGHT_INVESTOR = 0x8
+    USER_RIGHT_CONFIRMED = 0x10
+    USER_RIGHT_TRAILING = 0x20
+    USER_RIGHT_EXPERT = 0x40
+
+
+class _DealAction:
+    DEAL_BUY = 0
+    DEAL_SELL = 1
+    DEAL_BALANCE = 2
+    DEAL_CREDIT = 3
+    DEAL_CHARGE = 4
+    DEAL_CORRECTION = 5
+    DEAL_BONUS = 6
+    DEAL_COMMISSION = 7
+
+
+class _DealEntry:
+    ENTRY_IN = 0
+    ENTRY_OUT = 1
+
+
+class _PumpModes:
+    PUMP_MODE_NONE = 0
+    PUMP_MODE_USERS = 0x1
+    PUMP_MODE_FULL = 0xFFFFFFFF
+
+
+ENABLED_RIGHTS = (
+    _UsersRights.USER_RIGHT_ENABLED | _UsersRights.USER_RIGHT_PASSWORD | _UsersRights.USER_RIGHT_CONFIRMED
+    | _UsersRights.USER_RIGHT_TRAILING | _UsersRights.USER_RIGHT_EXPERT
+)
+
+
+# --- records ------------------------------------------------------------------
+
+class MTUser:
+    EnUsersRights = _UsersRights
+
+    def __init__(self, manager=None, **fields):
+        self.Login = 0
+        self.Group = ''
+        self.Leverage = 100
+        self.Rights = ENABLED_RIGHTS
+        self.Agent = 0
+        self.FirstName = ''
+        self.LastName = ''
+        self.Name = ''
+        self.EMail = ''
+        self.Country = ''
+        self.Phone = ''
+        self.Comment = ''
+        self.Balance = 0.0
+        self.Credit = 0.0
+        self.Registration = 0
+        self.LastAccess = 0
+        self.__dict__.update(fields)
+
+    def copy(self):
+        return MTUser(**self.__dict__)
+
+    def __repr__(self):
+        return f"<MTUser {self.Login} {self.Group}>"
+
+
+class MTAccount:
+    __slots__ = (
+        'Login', 'Balance', 'Credit', 'Equity', 'Profit', 'Margin', 'MarginFree', 'MarginLevel', 'Leverage',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name, '' if name in ('Symbol', 'Comment') else 0))
+
+
+class MTDeal:
+    EnDealAction = _DealAction
+    EnDealEntry = _DealEntry
+
+    __slots__ = (
+        'Deal', 'Login', 'Order', 'Action', 'Entry', 'Symbol', 'Volume', 'VolumeClosed', 'Price',
+        'Profit', 'Commission', 'Storage', 'Fee', 'Time', 'TimeMsc', 'Position', 'PositionID', 'Comment',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name, '' if name in ('Symbol', 'Comment') else 0))
+
+    @property
+    def Type(self):
+        return self.Action
+
+    @property
+    def TimeClose(self):
+        return self.Time
+
+    def __repr__(self):
+        return f"<MTDeal {self.Deal} {self.Login} {self.Symbol} action={self.Action} entry={self.Entry}>"
+
+
+class MTPosition:
+    __slots__ = (
+        'Position', 'Login', 'Symbol', 'Action', 'Volume', 'PriceOpen', 'PriceCurrent', 'Profit', 'Storage',
+        'TimeCreate', 'TimeUpdate', 'Comment',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name, '' if name in ('Symbol', 'Comment') else 0))
+
+    def copy(self):
+        return MTPosition(**{name: getattr(self, name) for name in self.__slots__})
+
+
+class MTConGroup:
+    def __init__(self, name):
+        self.Group = name
+        self.Currency = 'USD'
+        self.LeverageMax = 100 if name.lower().startswith('demo') else 1000
+        self.LeverageMin = 1
+        self.MarginMode = 0
+        self.DepositMin = 0
+
+
+# --- server -------------------------------------------------------------------
+
+class SimulatedFailure(Exception):
+    pass
+
+
+class SimServer:
+    """Synthetic trade server shared by every ManagerAPI object of the process."""
+
+    def __init__(self, **options):
+        self.config = dict(DEFAULT_CONFIG)
+        unknown = set(options) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise TypeError(f"Unknown simulator options: {', '.join(sorted(unknown))}")
+        self.config.update(options)
+        self.now = int(self.config['now'] or time.time())
+        self.history_start = self.now - int(self.config['history_days']) * 86400
+        self.groups = [MTConGroup(name) for name in self.config['groups']]
+        self.first_login = int(self.config['first_login'])
+        self.next_login = self.first_login + int(self.config['accounts'])
+
+        self._lock = threading.RLock()
+        self._users = {}
+        self._balances = {}
+        self._positions = {}
+        self._extra_deals = {}
+        self._deleted = set()
+        self._next_deal = 10 ** 12
+        self._next_position = 10 ** 11
+        self._rng = random.Random(self.config['seed'])
+        self._stats = {}
+        self._generate_seconds = 0.0
+        self._latency_seconds = 0.0
+        self.sinks = {'position': [], 'deal': [], 'group': [], 'user': []}
+
+    # --- call accounting --------------------------------------------------
+
+    def call(self, method):
+        """Account for one API call: injected latency and failure. Raises SimulatedFailure."""
+        config = self.config
+        with self._lock:
+            stats = self._stats.setdefault(method, {'calls': 0, 'records': 0, 'failures': 0})
+            stats['calls'] += 1
+            fail = config['failure_rate'] > 0 and (not config['fail_methods'] or method in config['fail_methods']) \
+                and self._rng.random() < config['failure_rate']
+            if fail:
+                stats['failures'] += 1
+            jitter = self._rng.uniform(-config['latency_jitter'], config['latency_jitter'])
+        self._sleep(config['latency_ms'] / 1000 * (1 + jitter))
+        if fail:
+            raise SimulatedFailure(method)
+
+    def returned(self, method, records):
+        """Account for the records a call returns (and their per-record latency)."""
+        with self._lock:
+            self._stats[method]['records'] += records
+        self._sleep(records * self.config['record_latency_us'] / 1e6)
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+            with self._lock:
+                self._latency_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                'methods': {name: dict(values) for name, values in sorted(self._stats.items())},
+                'calls': sum(values['calls'] for values in self._stats.values()),
+                'records': sum(values['records'] for values in self._stats.values()),
+                'failures': sum(values['failures'] for values in self._stats.values()),
+                'latency_seconds': self._latency_seconds,
+                'generate_seconds': self._generate_seconds,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+            self._generate_seconds = 0.0
+            self._latency_seconds = 0.0
+
+    # --- synthetic data ---------------------------------------------------
+
+    def exists(self, login):
+        login = int(login)
+        if login in self._deleted:
+            return False
+        return self.first_login <= login < self.first_login + int(self.config['accounts']) or login in self._users
+
+    def _login_rng(self, login, salt):
+        return random.Random((self.config['seed'] * 1000003 + login) * 31 + salt)
+
+    def user(self, login):
+        """The stored user (created on first read), or None."""
+        login = int(login)
+        user = self._users.get(login)
+        if user is not None or not self.exists(login):
+            return user
+        started = time.perf_counter()
+        rng = self._login_rng(login, 1)
+        real_groups = [group.Group for group in self.groups if not group.Group.lower().startswith('demo')] \
+            or [group.Group for group in self.groups]
+        index = login - self.first_login
+        user = MTUser(
+            Login=login,
+            Group=rng.choice(real_groups),
+            Leverage=rng.choice((50, 100, 200, 500)),
+            FirstName=f"Client{index}",
+            LastName='Sim',
+            Name=f"Client{index} Sim",
+            EMail=f"client{index}@sim.invalid",
+            Country='Cyprus',
+            Phone=f"+357{login}",
+            # A few MAM investors copying the first logins
+            Agent=self.first_login + rng.randrange(10) if rng.random() < 0.05 else 0,
+            Registration=self.history_start + rng.randrange(86400 * 30),
+            LastAccess=self.now - rng.randrange(86400 * 7),
+        )
+        with self._lock:
+            user = self._users.setdefault(login, user)
+            self._balances.setdefault(login, [round(rng.uniform(100, 50000), 2), 0.0])
+            self._generate_seconds += time.perf_counter() - started
+        return user
+
+    def positions(self, login):
+        """Open positions of the login (created on first read)."""
+        login = int(login)
+        positions = self._positions.get(login)
+        if positions is not None or not self.exists(login):
+            return positions or []
+        started = time.perf_counter()
+        rng = self._login_rng(login, 2)
+        positions = []
+        for i in range(rng.randrange(int(self.config['positions_per_account']) * 2 + 1)):
+            symbol = rng.choice(SYMBOLS)
+            price = PRICES[symbol] * rng.uniform(0.97, 1.03)
+            created = self.now - rng.randrange(86400 * 3)
+            positions.append(MTPosition(
+                Position=login * 1000 + i,
+                Login=login,
+                Symbol=symbol,
+                Action=rng.randrange(2),
+                Volume=rng.choice((1, 2, 5, 10, 50, 100)) * LOT // 100,
+                PriceOpen=round(price, 5),
+                PriceCurrent=round(price * rng.uniform(0.995, 1.005), 5),
+                Profit=round(rng.uniform(-200, 200), 2),
+                TimeCreate=created,
+                TimeUpdate=created,
+            ))
+        with self._lock:
+            positions = self._positions.setdefault(login, positions)
+            self._generate_seconds += time.perf_counter() - started
+        return positions
+
+    def balance(self, login):
+        self.user(login)
+        return self._balances.get(int(login), [0.0, 0.0])
+
+    def deals(self, login, from_ts, to_ts):
+        """Deals of the login with from_ts <= Time <= to_ts: the generated history plus DealerBalance deals."""
+        login = int(login)
+        if not self.exists(login):
+            return []
+        started = time.perf_counter()
+        deals = [deal for deal in self._history(login) if from_ts <= deal.Time <= to_ts]
+        deals.extend(deal for deal in self._extra_deals.get(login, ()) if from_ts <= deal.Time <= to_ts)
+        with self._lock:
+            self._generate_seconds += time.perf_counter() - started
+        return deals
+
+    def _history(self, login):
+        """The login's generated deal history (identical on every call)."""
+        if not self.first_login <= login < self.first_login + int(self.config['accounts']):
+            return []
+        rng = self._login_rng(login, 3)
+        start, span = self.history_start, self.now - self.history_start
+        base = (login - self.first_login + 1) * 1000000
+        deals = [MTDeal(
+            Deal=base, Login=login, Order=0, Action=_DealAction.DEAL_BALANCE, Entry=_DealEntry.ENTRY_IN,
+            Symbol='', Profit=round(rng.uniform(500, 20000), 2), Time=start, TimeMsc=start * 1000,
+            Comment='Deposit',
+        )]
+        trades = max(0, int(self.config['deals_per_account'] * rng.uniform(0.5, 1.5)) // 2)
+        random_ = rng.random
+        for i in range(trades):
+            symbol = SYMBOLS[int(random_() * len(SYMBOLS))]
+            opened = start + int(random_() * span)
+            closed = min(self.now, opened + int(random_() * 259200))
+            volume = (1 + int(random_() * 100)) * LOT // 100
+            action = 0 if random_() < 0.5 else 1
+            price = PRICES[symbol] * (0.9 + random_() * 0.2)
+            position = base + 500000 + i
+            commission = -round(volume / LOT * 7, 2)
+            deals.append(MTDeal(
+                Deal=base + 2 * i + 1, Login=login, Order=base + 2 * i + 1, Action=action,
+                Entry=_DealEntry.ENTRY_IN, Symbol=symbol, Volume=volume, VolumeClosed=0, Price=price,
+                Commission=commission / 2, Time=opened, TimeMsc=opened * 1000,
+                Position=position, PositionID=position,
+            ))
+            deals.append(MTDeal(
+                Deal=base + 2 * i + 2, Login=login, Order=base + 2 * i + 2, Action=1 - action,
+                Entry=_DealEntry.ENTRY_OUT, Symbol=symbol, Volume=volume, VolumeClosed=volume,
+                Price=price * (0.995 + random_() * 0.01), Profit=round((random_() - 0.48) * volume / 20, 2),
+                Commission=commission / 2, Storage=-round(random_() * (closed - opened) / 86400, 2),
+                Time=closed, TimeMsc=closed * 1000, Position=position, PositionID=position,
+            ))
+        deals.sort(key=lambda deal: deal.Time)
+        return deals
+
+    # --- changes ------------------------------------------------------------
+
+    def add_user(self, user):
+        with self._lock:
+            if user.Login and self.exists(user.Login):
+                return EnMTAPIRetcode.MT_RET_USR_LOGIN_EXIST
+            if not user.Login:
+                user.Login = self.next_login
+                self.next_login += 1
+            stored = user.copy()
+            stored.Registration = stored.LastAccess = int(time.time())
+            self._users[user.Login] = stored
+            self._balances[user.Login] = [0.0, 0.0]
+            self._positions[user.Login] = []
+            self._deleted.discard(user.Login)
+        self._notify('user', 'OnUserAdd', stored)
+        return EnMTAPIRetcode.MT_RET_OK
+
+    def update_user(self, user):
+        stored = self.user(user.Login)
+        if stored is None:
+            return EnMTAPIRetcode.MT_RET_ERR_NOTFOUND
+        with self._lock:
+            for name, value in user.__dict__.items():
+                if name not in ('Balance', 'Credit', 'Registration'):
+                    setattr(stored, name, value)
+        self._notify('user', 'OnUserUpdate', stored)
+        return EnMTAPIRetcode.MT_RET_OK
+
+    def delete_user(self, login):
+        login = int(login)
+        if not self.exists(login):
+            return EnMTAPIRetcode.MT_RET_ERR_NOTFOUND
+        with self._lock:
+            self._deleted.add(login)
+            self._users.pop(login, None)
+            self._positions.pop(login, None)
+        return EnMTAPIRetcode.MT_RET_OK
+
+    def dealer_balance(self, login, amount, action, comment):
+        """Post a balance/credit/bonus deal. Returns (retcode, deal id)."""
+        login = int(login)
+        if self.user(login) is None:
+            return EnMTAPIRetcode.MT_RET_ERR_NOTFOUND, 0
+        with self._lock:
+            balances = self._balances[login]
+            index = 1 if action == _DealAction.DEAL_CREDIT else 0
+            if amount < 0 and balances[index] + amount < 0:
+                return EnMTAPIRetcode.MT_RET_REQUEST_NO_MONEY, 0
+            balances[index] = round(balances[index] + amount, 2)
+            self._next_deal += 1
+            now = int(time.time())
+            deal = MTDeal(
+                Deal=self._next_deal, Login=login, Action=action, Entry=_DealEntry.ENTRY_IN, Symbol='',
+                Profit=amount, Time=now, TimeMsc=now * 1000, Comment=comment,
+            )
+            self._extra_deals.setdefault(login, []).append(deal)
+        self._notify('deal', 'OnDealAdd', deal)
+        return EnMTAPIRetcode.MT_RET_OK, deal.Deal
+
+    def account(self, login):
+        if self.user(login) is None:
+            return None
+        balance, credit = self.balance(login)
+        profit = round(sum(position.Profit for position in self.positions(login)), 2)
+        margin = round(sum(position.Volume / LOT * 100 for position in self.positions(login)), 2)
+        equity = round(balance + credit + profit, 2)
+        return MTAccount(
+            Login=int(login), Balance=balance, Credit=credit, Equity=equity, Profit=profit, Margin=margin,
+            MarginFree=round(equity - margin, 2), MarginLevel=round(equity / margin * 100, 2) if margin else 0.0,
+            Leverage=self._users[int(login)].Leverage,
+        )
+
+    # --- pump ---------------------------------------------------------------
+
+    def subscribe(self, kind, sink):
+        with self._lock:
+            if sink not in self.sinks[kind]:
+                self.sinks[kind].append(sink)
+
+    def unsubscribe(self, kind, sink):
+        with self._lock:
+            if sink in self.sinks[kind]:
+                self.sinks[kind].remove(sink)
+
+    def _notify(self, kind, event, *args):
+        for sink in list(self.sinks[kind]):
+            handler = getattr(sink, event, None)
+            if handler is not None:
+                handler(*args)
+
+    def open_position(self, login, symbol='EURUSD', action=0, volume=LOT, price=None):
+        """Open a position and fire OnPositionAdd. Returns the position."""
+        login = int(login)
+        with self._lock:
+            positions = list(self.positions(login))
+            self._next_position += 1
+            now = int(time.time())
+            price = price or PRICES.get(symbol, 1.0)
+            position = MTPosition(
+                Position=self._next_position, Login=login, Symbol=symbol, Action=action, Volume=volume,
+                PriceOpen=price, PriceCurrent=price, TimeCreate=now, TimeUpdate=now,
+            )
+            positions.append(position)
+            self._positions[login] = positions
+        self._notify('position', 'OnPositionAdd', position)
+        return position
+
+    def update_position(self, login, position_id, profit):
+        """Set a position's floating profit and fire OnPositionUpdate."""
+        login = int(login)
+        with self._lock:
+            positions = [position.copy() for position in self.positions(login)]
+            changed = None
+            for position in positions:
+                if position.Position == position_id:
+                    position.Profit = profit
+                    position.TimeUpdate = int(time.time())
+                    changed = position
+            self._positions[login] = positions
+        if changed is not None:
+            self._notify('position', 'OnPositionUpdate', changed)
+        return changed
+
+    def close_position(self, login, position_id):
+        """Close a position: post the closing deal, fire OnPositionDelete and OnDealAdd."""
+        login = int(login)
+        with self._lock:
+            positions = self.positions(login)
+            closing = next((position for position in positions if position.Position == position_id), None)
+            if closing is None:
+                return None
+            self._positions[login] = [position for position in positions if position is not closing]
+            self._next_deal += 1
+            now = int(time.time())
+            deal = MTDeal(
+                Deal=self._next_deal, Login=login, Order=self._next_deal, Action=1 - closing.Action,
+                Entry=_DealEntry.ENTRY_OUT, Symbol=closing.Symbol, Volume=closing.Volume,
+                VolumeClosed=closing.Volume, Price=closing.PriceCurrent, Profit=closing.Profit,
+                Commission=-round(closing.Volume / LOT * 7, 2), Time=now, TimeMsc=now * 1000,
+                Position=closing.Position, PositionID=closing.Position,
+            )
+            self._extra_deals.setdefault(login, []).append(deal)
+            balances = self.balance(login)
+            balances[0] = round(balances[0] + closing.Profit + deal.Commission, 2)
+        self._notify('position', 'OnPositionDelete', closing)
+        self._notify('deal', 'OnDealAdd', deal)
+        return deal
+
+
+# --- module state ---------------------------------------------------------------
+
+_server = None
+_server_lock = threading.Lock()
+_last_error = threading.local()
+
+
+def configure(**options):
+    """Replace the simulated server with a fresh one built from `options` (see DEFAULT_CONFIG)."""
+    global _server
+    with _server_lock:
+        _server = SimServer(**options)
+    return _server
+
+
+def server():
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = SimServer()
+    return _server
+
+
+def install():
+    """Make "import MT5Manager" return this module (no-op when already installed)."""
+    module = sys.modules[__name__]
+    if sys.modules.get('MT5Manager') is not module:
+        sys.modules['MT5Manager'] = module
+    return module
+
+
+def manager_actions():
+    """MT5ManagerActions on a new connected simulator manager (needs Django; no ServerSetting rows)."""
+    from types import SimpleNamespace
+    from unittest import mock
+    from adminPanel.mt5 import services
+
+    module = install()
+    # A services module imported before install() still points at the real binding
+    services.MT5Manager = module
+    manager = ManagerAPI()
+    manager.Connect('simulator', 1, '', _PumpModes.PUMP_MODE_FULL, 120000)
+    with mock.patch.object(services, 'get_manager_instance', return_value=SimpleNamespace(manager=manager)):
+        return services.MT5ManagerActions()
+
+
+def LastError():
+    """(MT5 error flag, retcode, description) of the calling thread's last failed call."""
+    retcode = getattr(_last_error, 'retcode', EnMTAPIRetcode.MT_RET_OK)
+    description = getattr(_last_error, 'description', 'Done')
+    return (retcode != EnMTAPIRetcode.MT_RET_OK, retcode, description)
+
+
+def _set_error(retcode, description):
+    _last_error.retcode = retcode
+    _last_error.description = description
+
+
+def InitializeManagerAPIPath(module_path=None, work_path=None):
+    return True
+
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _api(method):
+    """Run a ManagerAPI method through latency/failure injection; failed calls return False."""
+    def decorator(fn):
+        def wrapper(self, *args, **kwargs):
+            sim = server()
+            try:
+                if not self._connected and method != 'Connect':
+                    _set_error(EnMTAPIRetcode.MT_RET_ERR_CONNECTION, 'Not connected')
+                    return False
+                sim.call(method)
+            except SimulatedFailure:
+                _set_error(EnMTAPIRetcode.MT_RET_ERR_TIMEOUT, f"Simulated failure in {method}")
+                return False
+            _set_error(EnMTAPIRetcode.MT_RET_OK, 'Done')
+            result = fn(self, sim, *args, **kwargs)
+            if isinstance(result, list):
+                sim.returned(method, len(result))
+            elif result is not None and not isinstance(result, bool):
+                sim.returned(method, 1)
+            return result
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        return wrapper
+    return decorator
+
+
+class ManagerAPI:
+    EnPumpModes = _PumpModes
+
+    def __init__(self):
+        self._connected = False
+
+    @_api('Connect')
+    def Connect(self, sim, address, login, password, mode=_PumpModes.PUMP_MODE_FULL, timeout=120000):
+        self._connected = True
+        return True
+
+    def Disconnect(self):
+        self._connected = False
+        return True
+
+    # --- users ----------------------------------------------------------------
+
+    @_api('UserTotal')
+    def UserTotal(self, sim):
+        return int(sim.config['accounts']) - len(sim._deleted) + len(
+            [login for login in sim._users if not sim.first_login <= login < sim.first_login + int(sim.config['accounts'])]
+        )
+
+    @_api('UserGet')
+    def UserGet(self, sim, login):
+        user = sim.user(login)
+        if user is None:
+            _set_error(EnMTAPIRetcode.MT_RET_ERR_NOTFOUND, f"User {login} not found")
+            return None
+        # Callers change the returned object and send it back with UserUpdate
+        return self._with_balance(sim, user.copy())
+
+    UserRequest = UserGet
+
+    @_api('UserGetByLogins')
+    def UserGetByLogins(self, sim, logins):
+        users = []
+        for login in logins:
+            user = sim.user(login)
+            if user is not None:
+                users.append(self._with_balance(sim, user.copy()))
+        return users
+
+    @_api('UserGetByGroup')
+    def UserGetByGroup(self, sim, group):
+        last = sim.first_login + int(sim.config['accounts'])
+        logins = list(range(sim.first_login, last)) + [login for login in sim._users if login >= last]
+        return [
+            self._with_balance(sim, user.copy()) for user in (sim.user(login) for login in logins)
+            if user is not None and user.Group == group
+        ]
+
+    @staticmethod
+    def _with_balance(sim, user):
+        user.Balance, user.Credit = sim.balance(user.Login)
+        return user
+
+    @_api('UserAdd')
+    def UserAdd(self, sim, user, master_password=None, investor_password=None):
+        retcode = sim.add_user(user)
+        if retcode != EnMTAPIRetcode.MT_RET_OK:
+            _set_error(retcode, 'User was not added')
+            return False
+        return True
+
+    @_api('UserUpdate')
+    def UserUpdate(self, sim, user):
+        retcode = sim.update_user(user)
+        if retcode != EnMTAPIRetcode.MT_RET_OK:
+            _set_error(retcode, f"User {user.Login} not found")
+            return False
+        return True
+
+    @_api('UserUpdateBatch')
+    def UserUpdateBatch(self, sim, users):
+        """Per-user retcodes, in the order of `users`."""
+        return [sim.update_user(user) for user in users]
+
+    @_api('UserDelete')
+    def UserDelete(self, sim, login):
+        retcode = sim.delete_user(login)
+        if retcode != EnMTAPIRetcode.MT_RET_OK:
+            _set_error(retcode, f"User {login} not found")
+            return False
+        return True
+
+    @_api('UserPasswordChange')
+    def UserPasswordChange(self, sim, password_type, login, password):
+        if sim.user(login) is None:
+            _set_error(EnMTAPIRetcode.MT_RET_ERR_NOTFOUND, f"User {login} not found")
+            return False
+        return True
+
+    @_api('UserAccountGet')
+    def UserAccountGet(self, sim, login):
+        account = sim.account(login)
+        if account is None:
+            _set_error(EnMTAPIRetcode.MT_RET_ERR_NOTFOUND, f"Account {login} not found")
+        return account
+
+    @_api('UserAccountGetByLogins')
+    def UserAccountGetByLogins(self, sim, logins):
+        return [account for account in (sim.account(login) for login in logins) if account is not None]
+
+    # --- deals ------------------------------------------------------------------
+
+    @_api('DealRequest')
+    def DealRequest(self, sim, login, from_date, to_date):
+        return sim.deals(login, _timestamp(from_date), _timestamp(to_date))
+
+    @_api('DealRequestByLogins')
+    def DealRequestByLogins(self, sim, logins, from_date, to_date):
+        from_ts, to_ts = _timestamp(from_date), _timestamp(to_date)
+        deals = []
+        for login in logins:
+            deals.extend(sim.deals(login, from_ts, to_ts))
+        return deals
+
+    @_api('DealerBalance')
+    def DealerBalance(self, sim, login, amount, action, comment=''):
+        """Deal id of the balance operation, or False (LastError has the retcode)."""
+        retcode, deal_id = sim.dealer_balance(login, float(amount), action, comment)
+        if retcode != EnMTAPIRetcode.MT_RET_OK:
+            _set_error(retcode, 'Balance operation rejected')
+            return False
+        return deal_id
+
+    # --- positions --------------------------------------------------------------
+
+    @_api('PositionGet')
+    def PositionGet(self, sim, login):
+        return list(sim.positions(login))
+
+    @_api('PositionGetByLogins')
+    def PositionGetByLogins(self, sim, logins):
+        positions = []
+        for login in logins:
+            positions.extend(sim.positions(login))
+        return positions
+
+    # --- groups -----------------------------------------------------------------
+
+    @_api('GroupTotal')
+    def GroupTotal(self, sim):
+        return len(sim.groups)
+
+    @_api('GroupNext')
+    def GroupNext(self, sim, index):
+        if 0 <= index < len(sim.groups):
+            return sim.groups[index]
+        _set_error(EnMTAPIRetcode.MT_RET_ERR_NOTFOUND, f"No group at index {index}")
+        return None
+
+    @_api('GroupGet')
+    def GroupGet(self, sim, name):
+        for group in sim.groups:
+            if group.Group == name:
+                return group
+        _set_error(EnMTAPIRetcode.MT_RET_ERR_NOTFOUND, f"Group {name} not found")
+        return None
+
+    # --- sinks --------------------------------------------------------------------
+
+    def PositionSubscribe(self, sink):
+        server().subscribe('position', sink)
+        return True
+
+    def PositionUnsubscribe(self, sink):
+        server().unsubscribe('position', sink)
+        return True
+
+    def DealSubscribe(self, sink):
+        server().subscribe('deal', sink)
+        return True
+
+    def DealUnsubscribe(self, sink):
+        server().unsubscribe('deal', sink)
+        return True
+
+    def GroupSubscribe(self, sink):
+        server().subscribe('group', sink)
+        return True
+
+    def GroupUnsubscribe(self, sink):
+        server().unsubscribe('group', sink)
+        return True
+
+    def UserSubscribe(self, sink):
+        server().subscribe('user', sink)
+        return True
+
+    def UserUnsubscribe(self, sink):
+        server().unsubscribe('user', sink)
+        return True
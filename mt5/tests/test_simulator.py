@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase
+
+from adminPanel.mt5 import simulator
+
+
+class MT5SimulatorTest(SimpleTestCase):
+    def setUp(self):
+        self.server = simulator.configure(accounts=50, deals_per_account=40, now=1760000000)
+        self.manager = simulator.ManagerAPI()
+        self.manager.Connect('simulator', 1, '', simulator.ManagerAPI.EnPumpModes.PUMP_MODE_FULL, 1000)
+        self.login = self.server.first_login
+
+    def test_deal_history_is_deterministic(self):
+        first = self.manager.DealRequest(self.login, 0, self.server.now)
+        second = self.manager.DealRequestByLogins([self.login], 0, self.server.now)
+        self.assertTrue(first)
+        self.assertEqual([deal.Deal for deal in first], [deal.Deal for deal in second])
+        closed = [deal for deal in first if deal.Entry == 1 and deal.VolumeClosed > 0]
+        self.assertTrue(closed)
+
+    def test_user_update_round_trip(self):
+        user = self.manager.UserGet(self.login)
+        user.Leverage = 333
+        self.assertEqual(self.manager.UserUpdateBatch([user]), [simulator.EnMTAPIRetcode.MT_RET_OK])
+        self.assertEqual(self.manager.UserGet(self.login).Leverage, 333)
+        self.assertIsNone(self.manager.UserGet(self.login + 10000))
+
+    def test_withdrawal_beyond_balance_sets_last_error(self):
+        self.assertFalse(self.manager.DealerBalance(self.login, -1e12, simulator.MTDeal.EnDealAction.DEAL_BALANCE, 'x'))
+        self.assertEqual(simulator.LastError()[1], simulator.EnMTAPIRetcode.MT_RET_REQUEST_NO_MONEY)
+
+    def test_failure_injection(self):
+        simulator.configure(accounts=10, failure_rate=1.0, fail_methods=('UserGet',))
+        self.assertFalse(self.manager.UserGet(self.login))
+        self.assertEqual(simulator.LastError()[1], simulator.EnMTAPIRetcode.MT_RET_ERR_TIMEOUT)
+        self.assertEqual(self.manager.GroupTotal(), len(simulator.DEFAULT_GROUPS))
+
+    def test_position_sink_receives_events(self):
+        events = []
+
+        class Sink:
+            def OnPositionAdd(self, position):
+                events.append(('add', position.Position))
+
+            def OnPositionDelete(self, position):
+                events.append(('delete', position.Position))
+
+        self.manager.PositionSubscribe(Sink())
+        position = self.server.open_position(self.login, 'EURUSD')
+        deal = self.server.close_position(self.login, position.Position)
+        self.assertEqual(events, [('add', position.Position), ('delete', position.Position)])
+        self.assertEqual(deal.Entry, 1)
+        self.assertNotIn(position.Position, [p.Position for p in self.manager.PositionGet(self.login)])
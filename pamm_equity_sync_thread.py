@@ -0,0 +1,82 @@
+"""
+Background thread for PAMM equity sync
+Every cycle reads equity for all active PAMMs from MT5 in one batched request
+and applies the moves in one transaction (see services/pamm_equity_sync.py).
+Runs as the pamm_equity_sync scheduler job (settings.PAMM_EQUITY_SYNC_ENABLED,
+PAMM_EQUITY_SYNC_INTERVAL) or from the run_pamm_equity_sync command.
+"""
+
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Prune expired minute/hour rollups at most this often (seconds)
+PRUNE_INTERVAL = 3600
+
+
+class PAMMEquitySyncThread:
+    """Background thread that keeps PAMM equity and its rollups in line with MT5"""
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.is_running = False
+        self.last_result = None
+        self.last_run_at = None
+        self._last_prune = 0
+
+    def start(self):
+        """Start the background sync thread"""
+        if self.is_running:
+            logger.debug("PAMM equity sync thread is already running")
+            return
+
+        self.stop_event.clear()
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run_loop, name="pamm-equity-sync", daemon=True)
+        self.thread.start()
+        logger.info(f"PAMM equity sync thread started - every {self.interval} seconds")
+
+    def stop(self):
+        """Stop the background sync thread"""
+        self.stop_event.set()
+        self.is_running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+        logger.info("PAMM equity sync thread stopped")
+
+    def _run_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error in PAMM equity sync thread loop: {e}")
+
+            if self.stop_event.wait(timeout=self.interval):
+                break
+
+    def run_once(self):
+        """One sync cycle (also used by the run_pamm_equity_sync command)"""
+        from django.db import close_old_connections
+        from adminPanel.services.pamm_equity_sync import prune_rollups, sync_pamm_equities
+
+        close_old_connections()
+        started = time.monotonic()
+        result = sync_pamm_equities()
+
+        if time.monotonic() - self._last_prune > PRUNE_INTERVAL:
+            result['pruned'] = prune_rollups()
+            self._last_prune = time.monotonic()
+
+        result['duration_ms'] = round((time.monotonic() - started) * 1000, 1)
+        self.last_result = result
+        self.last_run_at = time.time()
+        logger.debug(f"PAMM equity sync: {result}")
+        return result
+
+
+# Global instance
+pamm_equity_sync_thread = PAMMEquitySyncThread()
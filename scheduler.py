@@ -0,0 +1,494 @@
+"""
+In-process job scheduler
+Replaces one daemon thread per background task (chat cleanup, commission sync,
+monthly / daily reports, PAMM equity sync) with a single scheduler thread per
+process and a ScheduledJob row per job.
+
+Every web worker may run the scheduler; a job only runs in the process that
+wins its lease. The lease is a conditional UPDATE on the job's row (due, and
+not locked or the lock expired), so exactly one process takes each run
+whatever the number of workers or hosts.
+
+Jobs:
+    - schedule: cron expression ("m h dom mon dow", local time) or every=seconds
+    - timeout: past it the run is recorded as 'overrun'; its lease is renewed
+      for as long as the worker is alive, so no other process starts a second
+      copy, and the run ends as 'timeout' when it finally returns
+    - jitter: random seconds added to each next run
+    - catch_up: a run missed while no process was up (overdue by more than
+      MISFIRE_GRACE) still runs once; otherwise it is skipped to the next slot
+
+Jobs are enabled per settings.SCHEDULER_JOBS ({name: bool}); only chat_cleanup
+is on by default, every other job must be enabled there explicitly. The
+scheduler is started from AdminPanelConfig.ready() unless
+settings.SCHEDULER_ENABLED is False.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+import logging
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the local due-time estimates
+TICK = 5
+# Re-read job rows at least this often (another process may have run a job)
+REFRESH_INTERVAL = 60
+# Extra seconds a lease outlives the job timeout; an overrunning job renews it every LEASE_GRACE / 3
+LEASE_GRACE = 30
+# A job overdue by more than this counts as a missed run
+MISFIRE_GRACE = 60
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week (0/7 = Sunday)."""
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        parsed = [self._parse(field, low, high) for field, (low, high) in zip(fields, self.RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # cron: Sunday is 0 or 7; Python weekday(): Monday is 0
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        # Standard cron: when both day fields are restricted, either may match
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/', 1)
+                step = int(step)
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(v) for v in part.split('-', 1))
+            else:
+                start = end = int(part)
+                if step != 1:
+                    end = high
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        in_month = moment.day in self.days
+        in_week = moment.weekday() in self.weekdays
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return in_week
+        if self.any_weekday:
+            return in_month
+        return in_month or in_week
+
+    def next_after(self, moment):
+        """First matching minute strictly after moment (aware datetime, evaluated in local time)."""
+        moment = timezone.localtime(moment).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 4)
+        while moment < limit:
+            if moment.month not in self.months or not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+                continue
+            if moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+                continue
+            return timezone.localtime(moment)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __str__(self):
+        return self.expression
+
+
+class IntervalSchedule:
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment):
+        return moment + timedelta(seconds=self.seconds)
+
+    def __str__(self):
+        return f"every {self.seconds}s"
+
+
+class Job:
+    def __init__(self, name, func, cron=None, every=None, timeout=600, jitter=0, catch_up=False, enabled=True):
+        if (cron is None) == (every is None):
+            raise ValueError(f"Job {name}: give exactly one of cron= or every=")
+        self.name = name
+        self.func = func
+        self.schedule = CronSchedule(cron) if cron else IntervalSchedule(every)
+        self.timeout = timeout
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.enabled = enabled
+
+    def next_run(self, after):
+        next_at = self.schedule.next_after(after)
+        if self.jitter:
+            next_at += timedelta(seconds=random.uniform(0, self.jitter))
+        return next_at
+
+    def lease_seconds(self):
+        return self.timeout + LEASE_GRACE
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.is_running = False
+        self._running_jobs = set()
+        self._running_lock = threading.Lock()
+        self._due = {}
+        self._last_refresh = 0
+
+    def register(self, name, func, **options):
+        """Register (or replace) a job. See Job for options."""
+        self.jobs[name] = Job(name, func, **options)
+        return self.jobs[name]
+
+    # --- lifecycle ----------------------------------------------------------
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self.is_running:
+            logger.debug("Scheduler is already running")
+            return
+
+        self.stop_event.clear()
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run_loop, name="scheduler", daemon=True)
+        self.thread.start()
+        enabled = sorted(name for name, job in self.jobs.items() if job.enabled)
+        logger.info(f"Scheduler started as {self.owner} with jobs: {', '.join(enabled) or 'none'}")
+
+    def stop(self):
+        """Stop the scheduler thread; running jobs finish in their own threads"""
+        self.stop_event.set()
+        self.is_running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+        logger.info("Scheduler stopped")
+
+    def _run_loop(self):
+        synced = False
+        while not self.stop_event.is_set():
+            try:
+                close_old_connections()
+                if not synced:
+                    self.sync_jobs()
+                    synced = True
+                self.tick()
+            except Exception as e:
+                # Typically the ScheduledJob table is missing before migrate; retry later
+                logger.error(f"Error in scheduler loop: {e}")
+                synced = False
+                self.stop_event.wait(timeout=REFRESH_INTERVAL)
+                continue
+            self.stop_event.wait(timeout=TICK)
+
+    # --- job rows -----------------------------------------------------------
+
+    def sync_jobs(self):
+        """Create missing ScheduledJob rows and reschedule jobs whose schedule changed."""
+        from adminPanel.models import ScheduledJob
+
+        now = timezone.now()
+        rows = {row.name: row for row in ScheduledJob.objects.filter(name__in=list(self.jobs))}
+        missing = [
+            ScheduledJob(name=name, schedule=str(job.schedule), next_run_at=job.next_run(now))
+            for name, job in self.jobs.items()
+            if name not in rows
+        ]
+        if missing:
+            ScheduledJob.objects.bulk_create(missing, ignore_conflicts=True)
+        for name, row in rows.items():
+            job = self.jobs[name]
+            if row.schedule != str(job.schedule):
+                ScheduledJob.objects.filter(name=name).update(schedule=str(job.schedule), next_run_at=job.next_run(now))
+        self.refresh()
+
+    def refresh(self):
+        """Read every enabled job's next run time in one query."""
+        from adminPanel.models import ScheduledJob
+
+        # Disabled jobs have rows too; a due one must not make every tick refresh
+        enabled = [name for name, job in self.jobs.items() if job.enabled]
+        self._due = dict(ScheduledJob.objects.filter(name__in=enabled).values_list('name', 'next_run_at'))
+        self._last_refresh = time.monotonic()
+
+    def tick(self):
+        now = timezone.now()
+        if time.monotonic() - self._last_refresh > REFRESH_INTERVAL or any(
+            due is not None and due <= now for due in self._due.values()
+        ):
+            self.refresh()
+
+        for name, due in self._due.items():
+            job = self.jobs.get(name)
+            if job is None or not job.enabled or due is None or due > now:
+                continue
+            with self._running_lock:
+                if name in self._running_jobs:
+                    continue
+            self._dispatch(job, due, now)
+
+    def _acquire(self, job, due, now):
+        """Take the job's lease if it is still due and unlocked. True if this process won."""
+        from adminPanel.models import ScheduledJob
+
+        return ScheduledJob.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+            name=job.name,
+            next_run_at=due,
+        ).update(
+            locked_by=self.owner,
+            locked_until=now + timedelta(seconds=job.lease_seconds()),
+        ) == 1
+
+    def _dispatch(self, job, due, now):
+        from adminPanel.models import ScheduledJob
+
+        if not self._acquire(job, due, now):
+            return
+
+        if not job.catch_up and (now - due).total_seconds() > MISFIRE_GRACE:
+            next_at = job.next_run(now)
+            ScheduledJob.objects.filter(name=job.name, locked_by=self.owner).update(
+                next_run_at=next_at, last_status='skipped', locked_by=None, locked_until=None,
+            )
+            self._due[job.name] = next_at
+            logger.info(f"Scheduler: skipped missed run of {job.name} due at {due}")
+            return
+
+        with self._running_lock:
+            self._running_jobs.add(job.name)
+        self._due[job.name] = None
+        threading.Thread(target=self._execute, args=(job, now), name=f"job-{job.name}", daemon=True).start()
+
+    # --- execution ----------------------------------------------------------
+
+    def _execute(self, job, started_at, manual=False):
+        """Run the job in a worker thread, wait up to its timeout and record the outcome."""
+        from adminPanel.models import ScheduledJob
+
+        outcome = {}
+
+        def target():
+            close_old_connections()
+            try:
+                job.func()
+                outcome['status'] = 'success'
+            except Exception as e:
+                outcome['status'] = 'failed'
+                outcome['error'] = f"{type(e).__name__}: {e}"
+                logger.exception(f"Scheduler job {job.name} failed")
+            finally:
+                close_old_connections()
+
+        try:
+            ScheduledJob.objects.filter(name=job.name, locked_by=self.owner).update(
+                last_status='running', last_started_at=started_at,
+            )
+            worker = threading.Thread(target=target, name=f"job-{job.name}-run", daemon=True)
+            started = time.monotonic()
+            worker.start()
+            worker.join(timeout=job.timeout)
+            duration_ms = int((time.monotonic() - started) * 1000)
+            timed_out = worker.is_alive()
+
+            finished_at = timezone.now()
+            status = 'timeout' if timed_out else outcome.get('status', 'failed')
+            update = {
+                'last_status': status,
+                'last_finished_at': finished_at,
+                'last_duration_ms': duration_ms,
+                'last_error': outcome.get('error') if status == 'failed' else (
+                    f"Exceeded timeout of {job.timeout}s" if timed_out else None
+                ),
+                'run_count': F('run_count') + 1,
+            }
+            if status != 'success':
+                update['failure_count'] = F('failure_count') + 1
+            if not manual:
+                update['next_run_at'] = job.next_run(finished_at)
+            if timed_out:
+                # Still running: keep the lease while it runs so nobody starts a second copy
+                update['last_status'] = 'overrun'
+            else:
+                update['locked_by'] = None
+                update['locked_until'] = None
+            ScheduledJob.objects.filter(name=job.name, locked_by=self.owner).update(**update)
+            if timed_out:
+                logger.error(f"Scheduler job {job.name} exceeded its {job.timeout}s timeout, still running")
+                self._wait_overrun(job, worker, started)
+        except Exception as e:
+            logger.error(f"Scheduler: error recording run of {job.name}: {e}")
+        finally:
+            with self._running_lock:
+                self._running_jobs.discard(job.name)
+            self._last_refresh = 0
+            close_old_connections()
+
+    def _wait_overrun(self, job, worker, started):
+        """Renew the lease of a job past its timeout until its worker returns, then record it as timed out."""
+        from adminPanel.models import ScheduledJob
+
+        while worker.is_alive():
+            ScheduledJob.objects.filter(name=job.name, locked_by=self.owner).update(
+                locked_until=timezone.now() + timedelta(seconds=LEASE_GRACE),
+            )
+            worker.join(timeout=LEASE_GRACE / 3)
+        duration = time.monotonic() - started
+        ScheduledJob.objects.filter(name=job.name, locked_by=self.owner).update(
+            last_status='timeout',
+            last_finished_at=timezone.now(),
+            last_duration_ms=int(duration * 1000),
+            last_error=f"Exceeded timeout of {job.timeout}s, finished after {duration:.0f}s",
+            locked_by=None,
+            locked_until=None,
+        )
+        logger.warning(f"Scheduler job {job.name} finished after {duration:.0f}s (timeout {job.timeout}s)")
+
+    def run_now(self, name):
+        """Run a job immediately in this process (still under its lease). Returns False if another process holds it."""
+        from adminPanel.models import ScheduledJob
+
+        job = self.jobs[name]
+        now = timezone.now()
+        self.sync_jobs()
+        acquired = ScheduledJob.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+            name=name,
+        ).update(locked_by=self.owner, locked_until=now + timedelta(seconds=job.lease_seconds())) == 1
+        if not acquired:
+            return False
+        with self._running_lock:
+            self._running_jobs.add(name)
+        self._execute(job, now, manual=True)
+        return True
+
+
+def _setting(name, default):
+    from django.conf import settings
+    return getattr(settings, name, default)
+
+
+def _job_enabled(name, default):
+    return _setting('SCHEDULER_JOBS', {}).get(name, default)
+
+
+# --- jobs migrated from the former background threads ---------------------
+
+def _chat_cleanup():
+    from adminPanel.chat_cleanup_thread import chat_cleanup_thread
+    chat_cleanup_thread._cleanup_old_messages()
+
+
+def _commission_sync():
+    from django.core.management import call_command
+    call_command('sync_commissions_from_mt5')
+
+
+def _monthly_reports():
+    from adminPanel.monthly_reports_thread import monthly_reports_thread
+    monthly_reports_thread._check_and_generate_reports()
+
+
+def _daily_reports():
+    from adminPanel.tasks.daily_reports import daily_trading_report_runner
+    daily_trading_report_runner()
+
+
+def _pamm_equity_sync():
+    from adminPanel.pamm_equity_sync_thread import pamm_equity_sync_thread
+    pamm_equity_sync_thread.run_once()
+
+
+def _balance_timeline():
+    from adminPanel.models import TradingAccount
+    from adminPanel.mt5.services import MT5ManagerActions
+    from adminPanel.services.balance_timeline import BalanceTimeline
+    BalanceTimeline(MT5ManagerActions()).ensure_built(TradingAccount.objects.all())
+
+
+def _transaction_summary():
+    from adminPanel.services.transaction_summary import refresh_recent
+    refresh_recent()
+
+
+def _balance_mirror():
+    from adminPanel.services.account_mirror import mirror_account_balances
+    mirror_account_balances()
+
+
+def _rate_limit_cleanup():
+    from adminPanel.utils.rate_limit import cleanup_expired
+    cleanup_expired()
+
+
+def _blob_maintenance():
+    from adminPanel.services.blob_storage import run_maintenance
+    run_maintenance()
+
+
+def _export_cleanup():
+    from adminPanel.services.export_service import cleanup_expired_exports
+    cleanup_expired_exports()
+
+
+def register_default_jobs(target):
+    target.register('chat_cleanup', _chat_cleanup, every=300, timeout=120, jitter=10,
+                    enabled=_job_enabled('chat_cleanup', True))
+    target.register('commission_sync', _commission_sync,
+                    every=_setting('COMMISSION_SYNC_INTERVAL', 30), timeout=600,
+                    enabled=_job_enabled('commission_sync', False))
+    target.register('monthly_reports', _monthly_reports, cron='5 * * * *', timeout=6 * 3600,
+                    jitter=60, catch_up=True, enabled=_job_enabled('monthly_reports', False))
+    target.register('daily_reports', _daily_reports, cron='0 2 * * *', timeout=4 * 3600,
+                    jitter=60, catch_up=True, enabled=_job_enabled('daily_reports', False))
+    target.register('balance_timeline', _balance_timeline, cron='30 0 * * *', timeout=2 * 3600,
+                    jitter=300, catch_up=True, enabled=_job_enabled('balance_timeline', False))
+    target.register('pamm_equity_sync', _pamm_equity_sync,
+                    every=_setting('PAMM_EQUITY_SYNC_INTERVAL', 60), timeout=120,
+                    enabled=_job_enabled('pamm_equity_sync', _setting('PAMM_EQUITY_SYNC_ENABLED', False)))
+    target.register('transaction_summary', _transaction_summary, cron='15 0 * * *', timeout=3600,
+                    jitter=120, catch_up=True, enabled=_job_enabled('transaction_summary', False))
+    target.register('balance_mirror', _balance_mirror,
+                    every=_setting('BALANCE_MIRROR_INTERVAL', 60), timeout=300,
+                    enabled=_job_enabled('balance_mirror', False))
+    target.register('rate_limit_cleanup', _rate_limit_cleanup, every=3600, timeout=300, jitter=60,
+                    enabled=_job_enabled('rate_limit_cleanup', False))
+    target.register('blob_maintenance', _blob_maintenance, every=3600, timeout=1800, jitter=120,
+                    enabled=_job_enabled('blob_maintenance', False))
+    target.register('export_cleanup', _export_cleanup, every=3600, timeout=300, jitter=60,
+                    enabled=_job_enabled('export_cleanup', False))
+
+
+# Global instance
+scheduler = Scheduler()
@@ -1,5 +1,4 @@
 from rest_framework import serializers
-from adminPanel.mt5.services import MT5ManagerActions
 from .models import *
 from adminPanel.mt5.models import ServerSetting
 from decimal import Decimal
@@ -5,7 +5,7 @@ Handles serialization for PAMM accounts, participants, and transactions
 
 from rest_framework import serializers
 from decimal import Decimal
-from adminPanel.models_pamm import PAMMAccount, PAMMParticipant, PAMMTransaction, PAMMEquitySnapshot
+from adminPanel.models_pamm import PAMMAccount, PAMMParticipant, PAMMTransaction, PAMMEquitySnapshot, PAMMEquityRollup
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -230,6 +230,20 @@ class PAMMEquitySnapshotSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp']
 
 
+class PAMMEquityRollupSerializer(serializers.ModelSerializer):
+    """Serializer for downsampled equity history (charting); equity/timestamp mirror the snapshot fields"""
+    equity = serializers.DecimalField(source='close_equity', max_digits=20, decimal_places=2, read_only=True)
+    timestamp = serializers.DateTimeField(source='bucket_start', read_only=True)
+    
+    class Meta:
+        model = PAMMEquityRollup
+        fields = [
+            'pamm', 'resolution', 'timestamp', 'equity', 'open_equity', 'high_equity',
+            'low_equity', 'close_equity', 'total_units', 'unit_price'
+        ]
+        read_only_fields = fields
+
+
 class PAMMDetailSerializer(PAMMAccountSerializer):
     """Extended serializer with full PAMM details including participants"""
     participants = PAMMParticipantSerializer(many=True, read_only=True)
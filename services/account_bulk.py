@@ -0,0 +1,185 @@
+"""
+Bulk Account Operations
+Apply one change (group, leverage, algo trading, account enabled) to every
+trading account matched by a filter, instead of one UserGet + UserUpdate per
+login from the single-account views.
+
+    operation = create_operation('change_group', {'group': 'real\\B'},
+                                 {'group_name': 'real\\A'}, user=request.user)
+    run_in_background(operation)        # or run_operation(operation)
+
+- accounts are selected by group_name, account_type and manager (the clients'
+  created_by) and their logins frozen into operation.results;
+- a dry run only records the current and target value per login, nothing is
+  sent to MT5;
+- otherwise MT5 is updated in chunks through MT5ManagerActions.update_users
+  (UserUpdateBatch where available, at most MAX_WORKERS concurrent single
+  updates otherwise) and the logins MT5 accepted are mirrored into
+  TradingAccount with one bulk_update per chunk;
+- progress is saved after every chunk, so resume_operation() continues with
+  the logins that are unprocessed or failed (services/resumable_operation.py).
+"""
+
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from adminPanel.models import AccountBulkOperation, TradeGroup, TradingAccount
+from adminPanel.services.resumable_operation import ResumableOperationRunner
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 200
+# Concurrent single updates when the Manager API has no UserUpdateBatch
+MAX_WORKERS = getattr(settings, 'ACCOUNT_BULK_MAX_WORKERS', 8)
+
+OPERATIONS = (
+    'change_group', 'change_leverage', 'enable_algo', 'disable_algo', 'enable_account', 'disable_account',
+)
+
+
+def validate_params(operation, params):
+    """Normalised params for the operation; raises ValueError when they are unusable."""
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+    if operation == 'change_group':
+        group = (params or {}).get('group')
+        if not group or not TradeGroup.objects.filter(name=group, is_active=True).exists():
+            raise ValueError("group must be the name of an active trade group")
+        return {'group': group}
+    if operation == 'change_leverage':
+        try:
+            leverage = int((params or {}).get('leverage'))
+        except (TypeError, ValueError):
+            raise ValueError("leverage must be a positive integer")
+        if leverage <= 0:
+            raise ValueError("leverage must be a positive integer")
+        return {'leverage': leverage}
+    return {}
+
+
+def _changes(operation, params):
+    """(MT5 user fields, TradingAccount fields) the operation sets."""
+    from adminPanel.mt5.services import (
+        account_create_rights, algo_disable_rights, algo_enable_rights, disable_account_rights,
+    )
+    if operation == 'change_group':
+        return {'Group': params['group']}, {'group_name': params['group']}
+    if operation == 'change_leverage':
+        return {'Leverage': params['leverage']}, {'leverage': params['leverage']}
+    if operation == 'enable_algo':
+        return {'Rights': algo_enable_rights}, {'algo_enabled': True}
+    if operation == 'disable_algo':
+        return {'Rights': algo_disable_rights}, {'algo_enabled': False}
+    if operation == 'enable_account':
+        return {'Rights': account_create_rights}, {'is_enabled': True}
+    return {'Rights': disable_account_rights}, {'is_enabled': False}
+
+
+def select_accounts(filters):
+    """Live trading accounts matching group_name, account_type and manager_id."""
+    accounts = TradingAccount.objects.exclude(account_type='demo')
+    if filters.get('group_name'):
+        accounts = accounts.filter(group_name=filters['group_name'])
+    if filters.get('account_type'):
+        accounts = accounts.filter(account_type=filters['account_type'])
+    if filters.get('manager_id'):
+        accounts = accounts.filter(user__created_by_id=filters['manager_id'])
+    return accounts
+
+
+def _dry_run_results(accounts, db_fields):
+    results = {}
+    for row in accounts.values('account_id', *db_fields):
+        current = {field: row[field] for field in db_fields}
+        results[str(row['account_id'])] = {'from': current, 'to': db_fields, 'change': current != db_fields}
+    return results
+
+
+def create_operation(operation, params, filters, dry_run=False, user=None):
+    params = validate_params(operation, params)
+    filters = {key: filters[key] for key in ('group_name', 'account_type', 'manager_id') if filters.get(key)}
+    accounts = select_accounts(filters)
+
+    if dry_run:
+        _, db_fields = _changes(operation, params)
+        results = _dry_run_results(accounts, db_fields)
+        return AccountBulkOperation.objects.create(
+            operation=operation,
+            params=params,
+            filters=filters,
+            dry_run=True,
+            status='completed',
+            total=len(results),
+            succeeded=sum(1 for result in results.values() if result['change']),
+            results=results,
+            created_by=user,
+            finished_at=timezone.now(),
+        )
+
+    logins = []
+    for account_id in accounts.values_list('account_id', flat=True):
+        try:
+            logins.append(str(int(account_id)))
+        except (TypeError, ValueError):
+            continue
+    return AccountBulkOperation.objects.create(
+        operation=operation,
+        params=params,
+        filters=filters,
+        total=len(logins),
+        results={login: None for login in logins},
+        created_by=user,
+    )
+
+
+def _mirror(logins, db_fields):
+    accounts = list(TradingAccount.objects.filter(account_id__in=logins).only('id', 'account_id', *db_fields))
+    for account in accounts:
+        for field, value in db_fields.items():
+            setattr(account, field, value)
+    TradingAccount.objects.bulk_update(accounts, list(db_fields), batch_size=CHUNK_SIZE)
+
+
+class _Runner(ResumableOperationRunner):
+    label = 'account-bulk'
+    chunk_size = CHUNK_SIZE
+
+    def skip(self, operation):
+        # A dry run is complete when created
+        return operation.dry_run
+
+    def apply_chunk(self, operation, logins, mt5_manager):
+        mt5_fields, _ = _changes(operation.operation, operation.params)
+        return mt5_manager.update_users(
+            {login: mt5_fields for login in logins}, max_workers=MAX_WORKERS, chunk_size=CHUNK_SIZE,
+        )
+
+    def after_chunk(self, operation, succeeded):
+        _, db_fields = _changes(operation.operation, operation.params)
+        _mirror(succeeded, db_fields)
+
+    def describe(self, operation):
+        return f"Account bulk {operation.operation} {operation.params}"
+
+
+runner = _Runner()
+run_operation = runner.run
+is_resumable = runner.is_resumable
+resume_operation = runner.resume
+run_in_background = runner.run_in_background
+
+
+def operation_summary(operation, include_results=False):
+    data = runner.summary(operation, {
+        'operation': operation.operation,
+        'params': operation.params,
+        'filters': operation.filters,
+        'dry_run': operation.dry_run,
+    }, include_results=include_results)
+    if operation.dry_run:
+        # succeeded counts the accounts whose value would change
+        data['would_change'] = operation.succeeded
+        data['pending'] = 0
+    return data
@@ -0,0 +1,293 @@
+"""
+Trading Account History
+Balance history of one trading account (MT5 balance deals merged with
+Transaction rows), served from a per-login deal cache.
+
+Deal cache (django cache, one entry per login):
+    - holds the MT5 balance deals of the last HISTORY_MAX_DAYS days, as small
+      dicts sorted newest first, plus the span of time they cover;
+    - a view tops it up with only the deals since the last sync (minus a short
+      overlap, deduplicated by deal id) and skips MT5 entirely if the entry was
+      synced less than HISTORY_TOPUP_INTERVAL seconds ago;
+    - MT5 requests run on a worker thread with a deadline, so a slow server
+      leaves the cached deals in place instead of blocking the request (the
+      SIGALRM timeout this replaces only worked on the main thread).
+
+Paging: deals and transactions are two streams sorted newest first; a page is
+their k-way merge cut at `limit`, and the cursor is the sort key of the last
+row returned, so the next page starts strictly after it.
+
+Usage:
+    page = AccountHistoryService().page(account, days_back=30, limit=100, cursor=request.GET.get('cursor'))
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from adminPanel.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MAX_DAYS = 90
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Skip the MT5 top-up when the cache entry is younger than this (seconds)
+HISTORY_TOPUP_INTERVAL = getattr(settings, 'ACCOUNT_HISTORY_TOPUP_INTERVAL', 30)
+# Deadline for one MT5 deal request (seconds)
+HISTORY_MT5_TIMEOUT = getattr(settings, 'ACCOUNT_HISTORY_MT5_TIMEOUT', 15)
+# Re-read this much before the last sync so late-booked deals are not missed
+TOPUP_OVERLAP = timedelta(minutes=5)
+CACHE_TTL = 7 * 24 * 3600
+BALANCE_ACTION = 2
+
+# Sort rank breaks timestamp ties between the two streams
+RANK_DB, RANK_MT5 = 0, 1
+
+_mt5_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="account-history-mt5")
+_login_locks = {}
+_login_locks_guard = threading.Lock()
+
+
+def _cache_key(login):
+    return f"account_history_deals_{login}"
+
+
+def _login_lock(login):
+    with _login_locks_guard:
+        return _login_locks.setdefault(login, threading.Lock())
+
+
+def _micros(moment):
+    return int(moment.timestamp()) * 1_000_000 + moment.microsecond
+
+
+def encode_cursor(key):
+    return "{}:{}:{}".format(*key)
+
+
+def decode_cursor(cursor):
+    """Sort key from a cursor string; None for a missing or malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        micros, rank, row_id = (int(part) for part in str(cursor).split(':'))
+    except ValueError:
+        return None
+    return micros, rank, row_id
+
+
+def _deal_to_dict(deal):
+    return {
+        'deal': int(getattr(deal, 'Deal', 0) or 0),
+        'time': int(getattr(deal, 'Time', 0) or 0),
+        'amount': float(getattr(deal, 'Profit', 0.0) or 0.0),
+        'comment': getattr(deal, 'Comment', '') or '',
+    }
+
+
+class AccountHistoryService:
+    def __init__(self, mt5_manager=None):
+        self._mt5_manager = mt5_manager
+
+    @property
+    def mt5_manager(self):
+        if self._mt5_manager is None:
+            from adminPanel.mt5.services import MT5ManagerActions
+            self._mt5_manager = MT5ManagerActions()
+        return self._mt5_manager
+
+    # --- deal cache ---------------------------------------------------------
+
+    def _request_deals(self, login, from_date, to_date):
+        """Balance deals in [from_date, to_date) within the MT5 deadline; raises TimeoutError."""
+        manager = self.mt5_manager
+        future = _mt5_executor.submit(manager.get_deals_by_logins, [login], from_date, to_date)
+        try:
+            deals = future.result(timeout=HISTORY_MT5_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"MT5 deal request for {login} exceeded {HISTORY_MT5_TIMEOUT}s")
+        return [
+            _deal_to_dict(deal) for deal in deals.get(login, ())
+            if getattr(deal, 'Action', None) == BALANCE_ACTION
+        ]
+
+    def cached_deals(self, login, since):
+        """
+        (balance deals newest first, stale flag) for `login` covering at least
+        `since`, topping the cache up from MT5 only for the missing spans.
+        """
+        entry = cache.get(_cache_key(login))
+        now = datetime.now()
+        if entry and entry['from'] <= since and time.time() - entry['synced_at'] < HISTORY_TOPUP_INTERVAL:
+            return entry['deals'], False
+
+        with _login_lock(login):
+            # Another request may have refreshed the entry while we waited
+            entry = cache.get(_cache_key(login))
+            if entry and entry['from'] <= since and time.time() - entry['synced_at'] < HISTORY_TOPUP_INTERVAL:
+                return entry['deals'], False
+
+            spans = []
+            if entry is None:
+                spans.append((since, now))
+            else:
+                if since < entry['from']:
+                    spans.append((since, entry['from']))
+                spans.append((entry['to'] - TOPUP_OVERLAP, now))
+
+            started = time.monotonic()
+            try:
+                fetched = []
+                for from_date, to_date in spans:
+                    fetched.extend(self._request_deals(login, from_date, to_date))
+            except Exception as e:
+                logger.warning(f"Account history: MT5 deals unavailable for {login}, serving cache: {e}")
+                return (entry['deals'] if entry else []), True
+
+            by_id = {deal['deal']: deal for deal in (entry['deals'] if entry else ())}
+            by_id.update((deal['deal'], deal) for deal in fetched)
+            horizon = int((now - timedelta(days=HISTORY_MAX_DAYS)).timestamp())
+            deals = sorted(
+                (deal for deal in by_id.values() if deal['time'] >= horizon),
+                key=lambda deal: (deal['time'], deal['deal']),
+                reverse=True,
+            )
+            covered_from = max(min(since, entry['from']) if entry else since, now - timedelta(days=HISTORY_MAX_DAYS))
+            cache.set(_cache_key(login), {
+                'deals': deals,
+                'from': covered_from,
+                'to': now,
+                'synced_at': time.time(),
+            }, CACHE_TTL)
+            logger.debug(
+                f"Account history: topped up {login} with {len(fetched)} deal(s) "
+                f"in {(time.monotonic() - started) * 1000:.0f} ms"
+            )
+            return deals, False
+
+    def invalidate(self, login):
+        cache.delete(_cache_key(login))
+
+    # --- streams ------------------------------------------------------------
+
+    def _deal_rows(self, account, deals, since, before):
+        """Deal rows newest first, restricted to the window and the cursor."""
+        since_ts = int(since.timestamp())
+        email = account.user.email if account.user_id else 'Unknown'
+        for deal in deals:
+            if deal['time'] < since_ts:
+                break
+            if not deal['amount']:
+                continue
+            moment = datetime.fromtimestamp(deal['time'], tz=dt_timezone.utc)
+            key = (_micros(moment), RANK_MT5, deal['deal'])
+            if before is not None and key >= before:
+                continue
+            if deal['amount'] > 0:
+                trans_type, type_display = 'deposit_trading', 'Deposit'
+            else:
+                trans_type, type_display = 'withdraw_trading', 'Withdrawal'
+            created = moment.isoformat()
+            yield key, {
+                'id': f"mt5_{deal['deal']}",
+                'transaction_type': trans_type,
+                'amount': f"{abs(deal['amount']):.2f}",
+                'description': f"MT5 {type_display}: {deal['comment']}" if deal['comment'] else f"MT5 {type_display}",
+                'status': 'approved',
+                'created_at': created,
+                'approved_at': created,
+                'source': 'MT5 Server',
+                'user': email,
+                'approved_by': 'MT5 System',
+                'is_mt5_deal': True,
+            }
+
+    def _transaction_queryset(self, account, since):
+        return Transaction.objects.filter(trading_account=account, created_at__gte=since)
+
+    def _transaction_rows(self, account, since, before, limit):
+        """Transaction rows newest first, restricted to the window and the cursor (at most `limit`)."""
+        queryset = self._transaction_queryset(account, since)
+        if before is not None:
+            micros, rank, row_id = before
+            boundary = datetime.fromtimestamp(micros // 1_000_000, tz=dt_timezone.utc).replace(
+                microsecond=micros % 1_000_000
+            )
+            at_boundary = Q(created_at=boundary)
+            if rank == RANK_DB:
+                at_boundary &= Q(id__lt=row_id)
+            queryset = queryset.filter(Q(created_at__lt=boundary) | at_boundary)
+        queryset = queryset.select_related('user', 'approved_by').order_by('-created_at', '-id')
+
+        for tx in queryset[:limit]:
+            yield (_micros(tx.created_at), RANK_DB, tx.id), {
+                'id': tx.id,
+                'transaction_type': tx.transaction_type,
+                'amount': f"{float(tx.amount):.2f}",
+                'description': tx.description or '',
+                'status': tx.status,
+                'created_at': tx.created_at.isoformat() if tx.created_at else '',
+                'approved_at': tx.approved_at.isoformat() if tx.approved_at else '',
+                'source': tx.source or 'Database',
+                'user': tx.user.email if tx.user else 'Unknown',
+                'approved_by': tx.approved_by.email if tx.approved_by else '',
+                'is_mt5_deal': False,
+            }
+
+    # --- pages --------------------------------------------------------------
+
+    def page(self, account, days_back=30, limit=DEFAULT_PAGE_SIZE, cursor=None, include_mt5=True):
+        """
+        One page of history, newest first:
+        {'results', 'next_cursor', 'mt5_deals_count', 'db_transactions_count', 'mt5_stale', 'window_start'}.
+        Counts cover the whole window, not just the page.
+        """
+        days_back = max(1, min(int(days_back), HISTORY_MAX_DAYS))
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        before = decode_cursor(cursor)
+        since = timezone.now() - timedelta(days=days_back)
+
+        deals, stale = [], False
+        if include_mt5:
+            try:
+                login = int(account.account_id)
+            except (TypeError, ValueError):
+                login = None
+            if login is not None:
+                naive_since = datetime.now() - timedelta(days=days_back)
+                try:
+                    deals, stale = self.cached_deals(login, naive_since)
+                except Exception as e:
+                    logger.warning(f"Account history: MT5 error for account {login}: {e}")
+                    deals, stale = [], True
+
+        merged = heapq.merge(
+            self._deal_rows(account, deals, since, before),
+            self._transaction_rows(account, since, before, limit + 1),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+        page = list(islice(merged, limit + 1))
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        since_ts = int(since.timestamp())
+        return {
+            'results': [row for _, row in page],
+            'next_cursor': encode_cursor(page[-1][0]) if has_more else None,
+            'mt5_deals_count': sum(1 for deal in deals if deal['time'] >= since_ts and deal['amount']),
+            'db_transactions_count': self._transaction_queryset(account, since).count(),
+            'mt5_stale': stale,
+            'window_start': since.isoformat(),
+        }
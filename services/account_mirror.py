@@ -0,0 +1,113 @@
+"""
+Trading Account Mirror
+Copies balance, equity, credit and margin of every live trading account from
+MT5 into the TradingAccount columns, so dashboards and listings can aggregate
+the database instead of asking MT5 per account.
+
+Each cycle walks the accounts in chunks of CHUNK_SIZE:
+    - one batched MT5 request per chunk (get_accounts_data);
+    - one bulk_update of the rows whose values changed, which also sets
+      mirrored_at;
+    - one UPDATE of mirrored_at for the rows that were confirmed unchanged.
+Logins MT5 does not return keep their previous values and mirrored_at.
+
+Runs as the balance_mirror scheduler job (settings.BALANCE_MIRROR_INTERVAL)
+or from the mirror_account_balances command.
+"""
+
+from decimal import Decimal
+import logging
+import time
+
+from django.utils import timezone
+
+from adminPanel.models import TradingAccount
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+CENT = Decimal('0.01')
+# Largest value a max_digits=12, decimal_places=2 column holds
+MAX_VALUE = Decimal('9999999999.99')
+
+MIRRORED_FIELDS = ('balance', 'equity', 'credit', 'margin', 'margin_free', 'margin_level')
+
+
+def _to_decimal(value):
+    amount = Decimal(str(value or 0)).quantize(CENT)
+    return max(-MAX_VALUE, min(amount, MAX_VALUE))
+
+
+def mirrored_accounts():
+    """Accounts that live on the real MT5 server."""
+    return TradingAccount.objects.filter(is_enabled=True).exclude(account_type='demo')
+
+
+def mirror_chunk(accounts, mt5_manager, moment):
+    """Mirror one chunk of accounts. Returns (changed, unchanged, missing) counts."""
+    by_login = {}
+    for account in accounts:
+        try:
+            by_login[int(account.account_id)] = account
+        except (TypeError, ValueError):
+            continue
+    if not by_login:
+        return 0, 0, 0
+
+    data = mt5_manager.get_accounts_data(list(by_login), chunk_size=CHUNK_SIZE)
+
+    changed, unchanged = [], []
+    for login, account in by_login.items():
+        values = data.get(login)
+        if values is None:
+            continue
+        dirty = False
+        for field in MIRRORED_FIELDS:
+            value = _to_decimal(values.get(field))
+            if getattr(account, field) != value:
+                setattr(account, field, value)
+                dirty = True
+        if dirty:
+            account.mirrored_at = moment
+            changed.append(account)
+        else:
+            unchanged.append(account.id)
+
+    if changed:
+        TradingAccount.objects.bulk_update(changed, list(MIRRORED_FIELDS) + ['mirrored_at'], batch_size=CHUNK_SIZE)
+    if unchanged:
+        TradingAccount.objects.filter(id__in=unchanged).update(mirrored_at=moment)
+    return len(changed), len(unchanged), len(by_login) - len(changed) - len(unchanged)
+
+
+def mirror_account_balances(mt5_manager=None, queryset=None):
+    """One mirror cycle over all live accounts (or `queryset`). Returns a summary dict."""
+    if mt5_manager is None:
+        from adminPanel.mt5.services import MT5ManagerActions
+        mt5_manager = MT5ManagerActions()
+    if not mt5_manager.manager:
+        logger.warning("Account mirror: MT5 manager not connected, skipping cycle")
+        return {'accounts': 0, 'changed': 0, 'unchanged': 0, 'missing': 0, 'skipped': True}
+
+    started = time.monotonic()
+    queryset = (queryset if queryset is not None else mirrored_accounts()).only(
+        'id', 'account_id', 'mirrored_at', *MIRRORED_FIELDS
+    ).order_by('id')
+
+    summary = {'accounts': 0, 'changed': 0, 'unchanged': 0, 'missing': 0}
+    last_id = 0
+    while True:
+        # Keyset pagination keeps every chunk an indexed range scan
+        chunk = list(queryset.filter(id__gt=last_id)[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+        changed, unchanged, missing = mirror_chunk(chunk, mt5_manager, timezone.now())
+        summary['accounts'] += len(chunk)
+        summary['changed'] += changed
+        summary['unchanged'] += unchanged
+        summary['missing'] += missing
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 1)
+    logger.info(f"Account mirror: {summary}")
+    return summary
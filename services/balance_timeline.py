@@ -0,0 +1,263 @@
+"""
+Balance Timeline
+Daily closing balances per trading account, so "balance at date D" is an
+indexed lookup instead of reconstructing history per report.
+
+Build:
+    - the first build of an account replays its whole MT5 deal history
+      (trade P/L, commission, swap and balance operations; credit operations
+      are not balance), one DealRequestByLogins call per chunk of accounts;
+    - approved deposit/withdrawal Transaction rows (credit excluded, as for
+      deals) are folded in per day with one grouped query;
+    - later builds only extend from the day after built_through.
+Days are local days (TIME_ZONE) for deals and transactions alike. Only
+complete days are stored (through yesterday) and only days with activity get
+a row; the balance at D is the latest row on or before D.
+
+A timeline built from transactions alone (MT5 unavailable) misses trading P/L,
+so balances_at() answers None for it and callers use their own fallback; the
+next build with MT5 replays it.
+
+Usage:
+    timeline = BalanceTimeline(mt5_manager)
+    timeline.balances_at(accounts, date(2026, 9, 30))   # {trading account id: Decimal or None}
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+import logging
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from adminPanel.models import AccountBalanceTimeline, AccountDailyBalance, Transaction
+
+logger = logging.getLogger(__name__)
+
+# Balance operations only; credit_in/credit_out move credit, like CREDIT_ACTIONS
+DEPOSIT_TYPES = ['deposit_trading']
+WITHDRAWAL_TYPES = ['withdraw_trading']
+# Deal actions that move credit, not balance (DEAL_CREDIT, DEAL_SO_COMPENSATION_CREDIT)
+CREDIT_ACTIONS = {3, 20}
+TRADE_ACTIONS = {0, 1}
+# Start of deal history requested for a first build
+HISTORY_START = datetime(2000, 1, 1)
+# Smaller MT5 batches for full-history requests
+FULL_BUILD_CHUNK = 50
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    return Decimal(str(value or 0))
+
+
+def deal_balance_effect(deal):
+    """(balance change, trading P/L) of one MT5 deal."""
+    action = getattr(deal, 'Action', None)
+    if action in CREDIT_ACTIONS:
+        return ZERO, ZERO
+    amount = (
+        _money(getattr(deal, 'Profit', 0))
+        + _money(getattr(deal, 'Commission', 0))
+        + _money(getattr(deal, 'Storage', 0))
+        + _money(getattr(deal, 'Fee', 0))
+    )
+    return amount, (amount if action in TRADE_ACTIONS else ZERO)
+
+
+def _aware_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def last_complete_day():
+    return timezone.localdate() - timedelta(days=1)
+
+
+class BalanceTimeline:
+    def __init__(self, mt5_manager=None):
+        self.mt5_manager = mt5_manager
+
+    # --- building -----------------------------------------------------------
+
+    def ensure_built(self, accounts, through=None):
+        """Build or extend the timeline of each account through `through` (at most yesterday)."""
+        through = min(through or last_complete_day(), last_complete_day())
+        accounts = list(accounts)
+        states = {
+            state.trading_account_id: state
+            for state in AccountBalanceTimeline.objects.filter(trading_account_id__in=[a.id for a in accounts])
+        }
+
+        groups = defaultdict(list)
+        for account in accounts:
+            state = states.get(account.id)
+            if state is None or (state.source == 'transactions' and self.mt5_manager is not None):
+                groups[None].append(account)
+            elif state.built_through < through:
+                groups[state.built_through + timedelta(days=1)].append(account)
+
+        for start, group in groups.items():
+            try:
+                self._build(group, start, through, states)
+            except Exception as e:
+                logger.error(f"Balance timeline build failed for {len(group)} account(s) from {start or 'start'}: {e}")
+        return states
+
+    def _transaction_days(self, account_ids, start, through):
+        """{(trading account id, day): (deposits, withdrawals)} from approved transactions."""
+        queryset = Transaction.objects.filter(
+            trading_account_id__in=account_ids,
+            status='approved',
+            transaction_type__in=DEPOSIT_TYPES + WITHDRAWAL_TYPES,
+            created_at__lt=_aware_midnight(through + timedelta(days=1)),
+        )
+        if start is not None:
+            queryset = queryset.filter(created_at__gte=_aware_midnight(start))
+        rows = queryset.order_by().annotate(day=TruncDate('created_at')).values('trading_account_id', 'day').annotate(
+            deposits=Sum('amount', filter=Q(transaction_type__in=DEPOSIT_TYPES)),
+            withdrawals=Sum('amount', filter=Q(transaction_type__in=WITHDRAWAL_TYPES)),
+        )
+        return {
+            (row['trading_account_id'], row['day']): (row['deposits'] or ZERO, row['withdrawals'] or ZERO)
+            for row in rows
+        }
+
+    def _deal_days(self, accounts, start, through):
+        """{(trading account id, day): (balance change, trading P/L)} from MT5 deals, or None if MT5 is unavailable."""
+        if self.mt5_manager is None:
+            return None
+        logins = {}
+        for account in accounts:
+            try:
+                logins[int(account.account_id)] = account.id
+            except (TypeError, ValueError):
+                continue
+
+        # One spare day each side: deal times are bucketed into local days below
+        from_date = datetime.combine(start - timedelta(days=1), time.min) if start else HISTORY_START
+        to_date = datetime.combine(through + timedelta(days=2), time.min)
+        try:
+            deals = self.mt5_manager.get_deals_by_logins(
+                list(logins), from_date, to_date, chunk_size=FULL_BUILD_CHUNK if start is None else 500
+            )
+        except Exception as e:
+            logger.warning(f"Balance timeline: MT5 deal history unavailable, using transactions: {e}")
+            return None
+
+        days = defaultdict(lambda: [ZERO, ZERO])
+        for login, login_deals in deals.items():
+            account_id = logins.get(login)
+            if account_id is None:
+                continue
+            for deal in login_deals:
+                day = timezone.localtime(datetime.fromtimestamp(getattr(deal, 'Time', 0), tz=dt_timezone.utc)).date()
+                if day > through or (start and day < start):
+                    continue
+                change, pnl = deal_balance_effect(deal)
+                days[(account_id, day)][0] += change
+                days[(account_id, day)][1] += pnl
+        return {key: tuple(value) for key, value in days.items()}
+
+    def _build(self, accounts, start, through, states):
+        account_ids = [account.id for account in accounts]
+        transaction_days = self._transaction_days(account_ids, start, through)
+        deal_days = self._deal_days(accounts, start, through)
+        source = 'transactions' if deal_days is None else 'mt5'
+
+        days_by_account = defaultdict(set)
+        for account_id, day in transaction_days:
+            days_by_account[account_id].add(day)
+        for account_id, day in (deal_days or {}):
+            days_by_account[account_id].add(day)
+
+        rows, new_states, changed_states = [], [], []
+        for account in accounts:
+            state = states.get(account.id)
+            balance = ZERO if start is None or state is None else state.closing_balance
+            for day in sorted(days_by_account.get(account.id, ())):
+                deposits, withdrawals = transaction_days.get((account.id, day), (ZERO, ZERO))
+                if deal_days is None:
+                    change, pnl = deposits - withdrawals, ZERO
+                else:
+                    change, pnl = deal_days.get((account.id, day), (ZERO, ZERO))
+                balance += change
+                rows.append(AccountDailyBalance(
+                    trading_account_id=account.id,
+                    date=day,
+                    closing_balance=balance.quantize(CENT),
+                    deposits=deposits,
+                    withdrawals=withdrawals,
+                    trading_pnl=pnl.quantize(CENT),
+                ))
+
+            if state is None:
+                state = AccountBalanceTimeline(trading_account_id=account.id)
+                new_states.append(state)
+                states[account.id] = state
+            else:
+                changed_states.append(state)
+            state.built_through = through
+            state.closing_balance = balance.quantize(CENT)
+            state.source = source
+
+        with transaction.atomic():
+            stale = AccountDailyBalance.objects.filter(trading_account_id__in=account_ids)
+            if start is not None:
+                stale = stale.filter(date__gte=start)
+            stale.delete()
+            AccountDailyBalance.objects.bulk_create(rows, batch_size=1000)
+            if new_states:
+                AccountBalanceTimeline.objects.bulk_create(new_states, batch_size=1000)
+            if changed_states:
+                now = timezone.now()
+                for state in changed_states:
+                    state.updated_at = now
+                AccountBalanceTimeline.objects.bulk_update(
+                    changed_states, ['built_through', 'closing_balance', 'source', 'updated_at'], batch_size=1000
+                )
+        logger.info(
+            f"Balance timeline: built {len(accounts)} account(s) from {start or 'start'} through {through} "
+            f"({len(rows)} day rows, source {source})"
+        )
+
+    def rebuild(self, accounts, through=None):
+        """Drop and replay the timelines of the given accounts."""
+        accounts = list(accounts)
+        AccountBalanceTimeline.objects.filter(trading_account_id__in=[a.id for a in accounts]).delete()
+        return self.ensure_built(accounts, through)
+
+    # --- lookups --------------------------------------------------------------
+
+    def balances_at(self, accounts, day, build=True):
+        """
+        {trading account id: closing balance at the end of `day`}. Accounts whose
+        timeline could not be built, or was built from transactions only, map to
+        None (callers fall back).
+        """
+        accounts = list(accounts)
+        states = self.ensure_built(accounts, through=day) if build else {
+            state.trading_account_id: state
+            for state in AccountBalanceTimeline.objects.filter(trading_account_id__in=[a.id for a in accounts])
+        }
+        states = {account_id: state for account_id, state in states.items() if state.source == 'mt5'}
+        latest_date = AccountDailyBalance.objects.filter(
+            trading_account_id=OuterRef('trading_account_id'),
+            date__lte=day,
+        ).order_by('-date').values('date')[:1]
+        found = dict(
+            AccountDailyBalance.objects.filter(
+                trading_account_id__in=list(states),
+                date=Subquery(latest_date),
+            ).values_list('trading_account_id', 'closing_balance')
+        )
+        return {
+            account.id: (found.get(account.id, ZERO) if account.id in states else None)
+            for account in accounts
+        }
+
+    def balance_at(self, account, day):
+        return self.balances_at([account], day)[account.id]
@@ -0,0 +1,441 @@
+"""
+Blob storage
+Uploaded files stored once per content: the upload is streamed to disk in
+chunks and hashed on the way in, then kept under its SHA-256 in the configured
+storage (local MEDIA_ROOT or any Django storage backend, e.g. object storage):
+
+    @api_view(['POST'])
+    @hashing_uploads
+    def upload(request):
+        blob = store_upload(request.FILES['file'])
+        document.file.name = blob.name     # no second copy of the bytes
+        ...
+        release(old_name)                  # when a field stops pointing at a blob
+
+Upload path:
+    - HashingUploadHandler replaces Django's upload handlers on the decorated
+      views: each chunk read from the request is written to a temporary file
+      (BLOB_UPLOAD_TEMP_DIR, by default beside the local media root, outside
+      the served tree; blob_maintenance removes files a dead worker left
+      behind) and fed to SHA-256,
+      so the digest is ready when the body has been parsed and the file is never
+      read again to hash it;
+    - store_upload() looks the digest up in StoredBlob: known content only gets
+      its ref_count incremented (the temporary file is dropped); new content is
+      renamed into blobs/ab/cd/<sha256><ext> (or streamed to a remote backend)
+      and gets a row with ref_count 1.
+      Callers that save the referencing fields in the same transaction.atomic()
+      call discard_uncommitted(blob) when it rolls back.
+
+Reference counting: every file field that holds a blob name is one reference.
+release() decrements it; the blob_maintenance job (enabled in SCHEDULER_JOBS)
+deletes files whose blobs have had no references for UNREFERENCED_GRACE, under
+a row lock so a concurrent upload of the same content either keeps the blob or
+re-creates it.
+
+Thumbnails of image blobs are generated after the upload commits, in a small
+thread pool (BLOB_THUMBNAIL_WORKERS), so the request does not wait for Pillow.
+Blobs left 'pending' (process restart) are picked up by blob_maintenance.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import wraps
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from adminPanel.models import StoredBlob
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = 'blobs/'
+THUMBNAIL_PREFIX = 'blobs/thumbnails/'
+CHUNK_SIZE = 256 * 2 ** 10
+UNREFERENCED_GRACE = timedelta(hours=1)
+# Temporary upload files older than this belong to no live request
+STALE_UPLOAD_AGE = timedelta(hours=6)
+THUMBNAIL_CONTENT_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp')
+
+_executor = None
+
+
+def get_storage():
+    backend = getattr(settings, 'BLOB_STORAGE', None)
+    if backend:
+        from django.utils.module_loading import import_string
+        return import_string(backend)()
+    return default_storage
+
+
+def _local_path(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        # Remote backends have no filesystem path
+        return None
+
+
+def is_blob_name(name):
+    return bool(name) and str(name).startswith(BLOB_PREFIX) and not str(name).startswith(THUMBNAIL_PREFIX)
+
+
+def blob_name(digest, filename):
+    ext = os.path.splitext(filename or '')[1].lower()[:10]
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+# --- streaming upload -------------------------------------------------------------
+
+class HashedUploadedFile(TemporaryUploadedFile):
+    """A TemporaryUploadedFile in a chosen directory, with the SHA-256 of its content."""
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None, directory=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + ext, dir=directory)
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = None
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Streams every uploaded file to a temporary file while hashing it."""
+
+    chunk_size = CHUNK_SIZE
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.file = HashedUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra, directory=_temp_dir(),
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            try:
+                self.file.close()
+            except FileNotFoundError:
+                pass
+
+
+def _temp_dir():
+    """
+    Where uploads are streamed to: settings.BLOB_UPLOAD_TEMP_DIR, or next to the
+    local media root (same filesystem, so storing is a rename) but outside the
+    served tree.
+    """
+    path = getattr(settings, 'BLOB_UPLOAD_TEMP_DIR', None)
+    if not path:
+        root = _local_path(get_storage(), '')
+        if root is None:
+            return getattr(settings, 'FILE_UPLOAD_TEMP_DIR', None)
+        path = os.path.normpath(root) + '-upload-tmp'
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def delete_stale_uploads(older_than=STALE_UPLOAD_AGE):
+    """Temporary upload files left by a worker that died mid-request (normally removed when the request ends)."""
+    directories = [_temp_dir()]
+    # Earlier versions streamed uploads into the media tree
+    legacy = _local_path(get_storage(), f"{BLOB_PREFIX}tmp")
+    if legacy:
+        directories.append(legacy)
+    cutoff = time.time() - older_than.total_seconds()
+    removed = 0
+    for directory in directories:
+        if not directory or not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                if '.upload' in name and os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+def hashing_uploads(view):
+    """
+    Parse multipart uploads of the decorated view with HashingUploadHandler.
+    Works on function views and APIView methods; has no effect once the request
+    body has been read (the files are then hashed when stored).
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        for arg in args[:2]:
+            if hasattr(arg, 'META'):
+                request = getattr(arg, '_request', arg)
+                try:
+                    request.upload_handlers = [HashingUploadHandler(request)]
+                except AttributeError:
+                    logger.debug("Request body already parsed; uploads are hashed when stored")
+                break
+        return view(*args, **kwargs)
+    return wrapped
+
+
+def _hash(uploaded):
+    digest = hashlib.sha256()
+    uploaded.seek(0)
+    for chunk in uploaded.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    uploaded.seek(0)
+    return digest.hexdigest()
+
+
+# --- references -------------------------------------------------------------------
+
+def _add_reference(digest, references=1):
+    return StoredBlob.objects.filter(sha256=digest).update(
+        ref_count=F('ref_count') + references, last_referenced_at=timezone.now(),
+    )
+
+
+def _discard(uploaded):
+    # The temporary file of a duplicate; closing a NamedTemporaryFile deletes it
+    if hasattr(uploaded, 'temporary_file_path'):
+        try:
+            uploaded.close()
+        except FileNotFoundError:
+            pass
+
+
+def _write(uploaded, storage, name):
+    path = _local_path(storage, name)
+    if path is not None and hasattr(uploaded, 'temporary_file_path'):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A rename when the temporary file is on the same filesystem
+        file_move_safe(uploaded.temporary_file_path(), path, allow_overwrite=True)
+        # Temporary files are created 0600; the web server must be able to read blobs
+        os.chmod(path, getattr(storage, 'file_permissions_mode', None) or 0o644)
+        _discard(uploaded)
+        return
+    if storage.exists(name):
+        # Left by a blob whose row is gone; identical content by construction
+        storage.delete(name)
+    uploaded.seek(0)
+    storage.save(name, uploaded)
+    _discard(uploaded)
+
+
+def store_upload(uploaded, references=1):
+    """
+    The StoredBlob holding `uploaded`'s content, with `references` more references
+    (one per file field the caller points at it). Identical content is stored once;
+    only new content is written.
+    """
+    digest = getattr(uploaded, 'sha256', None) or _hash(uploaded)
+    if _add_reference(digest, references):
+        _discard(uploaded)
+        return StoredBlob.objects.get(sha256=digest)
+
+    storage = get_storage()
+    name = blob_name(digest, uploaded.name)
+    content_type = (
+        getattr(uploaded, 'content_type', None) or mimetypes.guess_type(uploaded.name)[0] or 'application/octet-stream'
+    )
+    size = uploaded.size
+    _write(uploaded, storage, name)
+    wants_thumbnail = content_type in THUMBNAIL_CONTENT_TYPES
+    try:
+        with transaction.atomic():
+            blob = StoredBlob.objects.create(
+                sha256=digest, name=name, size=size, content_type=content_type[:100], ref_count=references,
+                thumbnail_status='pending' if wants_thumbnail else 'none',
+            )
+    except IntegrityError:
+        # A concurrent upload of the same content created the row first
+        _add_reference(digest, references)
+        blob = StoredBlob.objects.get(sha256=digest)
+        if blob.name != name:
+            storage.delete(name)
+        return blob
+
+    if wants_thumbnail:
+        transaction.on_commit(lambda: schedule_thumbnail(blob.id))
+    return blob
+
+
+def discard_uncommitted(blob):
+    """
+    After the transaction that called store_upload() rolled back: delete the file
+    of a blob whose row was rolled back with it. References added to an existing
+    blob are rolled back by the database.
+    """
+    if blob is None or StoredBlob.objects.filter(sha256=blob.sha256).exists():
+        return False
+    get_storage().delete(blob.name)
+    return True
+
+
+def release(name):
+    """Drop one reference to the blob stored as `name`. Names outside the blob store are ignored."""
+    if not is_blob_name(name):
+        return False
+    digest = os.path.splitext(os.path.basename(str(name)))[0]
+    return bool(StoredBlob.objects.filter(sha256=digest, ref_count__gt=0).update(
+        ref_count=F('ref_count') - 1, last_referenced_at=timezone.now(),
+    ))
+
+
+def release_field(instance, **kwargs):
+    """post_delete receiver: release the blobs the deleted row's file fields pointed at."""
+    for field in instance._meta.concrete_fields:
+        if field.get_internal_type() in ('FileField', 'ImageField'):
+            value = getattr(instance, field.attname, None)
+            name = getattr(value, 'name', value)
+            if is_blob_name(name):
+                transaction.on_commit(lambda name=name: release(name))
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete
+
+    from clientPanel.models import UserDocument
+    from adminPanel.models import CustomUser, Message
+
+    for model in (Message, UserDocument, CustomUser):
+        post_delete.connect(release_field, sender=model, dispatch_uid=f"blob_release_{model.__name__}")
+
+
+# --- thumbnails -------------------------------------------------------------------
+
+def _thumbnail_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'BLOB_THUMBNAIL_WORKERS', 2), thread_name_prefix='blob-thumbnail',
+        )
+    return _executor
+
+
+def schedule_thumbnail(blob_id):
+    _thumbnail_executor().submit(_thumbnail_task, blob_id)
+
+
+def _thumbnail_task(blob_id):
+    close_old_connections()
+    try:
+        blob = StoredBlob.objects.filter(id=blob_id, thumbnail_status='pending').first()
+        if blob is not None:
+            generate_thumbnail(blob)
+    except Exception:
+        logger.exception(f"Thumbnail generation failed for blob {blob_id}")
+    finally:
+        close_old_connections()
+
+
+def generate_thumbnail(blob):
+    """Write a JPEG thumbnail of an image blob (BLOB_THUMBNAIL_SIZE, 320x320 by default)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning("Pillow is not installed; thumbnails are disabled")
+        StoredBlob.objects.filter(id=blob.id).update(thumbnail_status='failed')
+        return None
+
+    storage = get_storage()
+    name = f"{THUMBNAIL_PREFIX}{blob.sha256[:2]}/{blob.sha256}.jpg"
+    try:
+        with storage.open(blob.name, 'rb') as source:
+            image = Image.open(source)
+            image.thumbnail(getattr(settings, 'BLOB_THUMBNAIL_SIZE', (320, 320)))
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=80, optimize=True)
+    except Exception as e:
+        logger.warning(f"Cannot thumbnail blob {blob.sha256}: {e}")
+        StoredBlob.objects.filter(id=blob.id).update(thumbnail_status='failed')
+        return None
+
+    from django.core.files.base import ContentFile
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+    StoredBlob.objects.filter(id=blob.id).update(thumbnail=name, thumbnail_status='ready')
+    return name
+
+
+# --- maintenance ------------------------------------------------------------------
+
+def _delete_files(digest, names):
+    # After the row delete committed; skipped when an upload of the same content re-created the blob meanwhile
+    if StoredBlob.objects.filter(sha256=digest).exists():
+        return
+    storage = get_storage()
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Cannot delete {name}: {e}")
+
+
+def delete_unreferenced(grace=UNREFERENCED_GRACE, limit=500):
+    """
+    Delete blobs (file, thumbnail and row) without references for longer than `grace`.
+    The row goes first; the files only once that has committed, so a failed delete
+    never leaves a row pointing at a missing file.
+    """
+    cutoff = timezone.now() - grace
+    deleted = 0
+    candidates = StoredBlob.objects.filter(ref_count=0, last_referenced_at__lt=cutoff).values_list('id', flat=True)
+    for blob_id in list(candidates[:limit]):
+        with transaction.atomic():
+            # The row lock makes a concurrent store_upload wait, then re-create the blob
+            blob = StoredBlob.objects.select_for_update().filter(id=blob_id, ref_count=0).first()
+            if blob is None:
+                continue
+            names = [name for name in (blob.name, blob.thumbnail) if name]
+            digest = blob.sha256
+            blob.delete()
+            transaction.on_commit(lambda digest=digest, names=names: _delete_files(digest, names))
+        deleted += 1
+    return deleted
+
+
+def retry_pending_thumbnails(older_than=timedelta(minutes=10), limit=200):
+    """Thumbnails lost with a restarted process are still 'pending'; generate them here."""
+    cutoff = timezone.now() - older_than
+    done = 0
+    for blob in StoredBlob.objects.filter(thumbnail_status='pending', created_at__lt=cutoff)[:limit]:
+        if generate_thumbnail(blob):
+            done += 1
+    return done
+
+
+def run_maintenance():
+    deleted = delete_unreferenced()
+    thumbnails = retry_pending_thumbnails()
+    stale = delete_stale_uploads()
+    if deleted or thumbnails or stale:
+        logger.info(
+            f"Blob maintenance: {deleted} unreferenced blobs deleted, {thumbnails} thumbnails generated, "
+            f"{stale} stale uploads removed"
+        )
+    return deleted, thumbnails
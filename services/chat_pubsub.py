@@ -0,0 +1,156 @@
+"""
+Chat Pub/Sub
+Push delivery for the manager-admin chat.
+
+Every channel keeps the id of its newest message in the cache. Waiting
+requests compare that id with the client's last_id, so an idle chat is served
+from the cache without touching the database. Publishing also notifies a
+threading.Condition so waiters in the same worker wake up immediately; waiters
+in other workers pick the change up on their next cache check.
+
+Channels:
+    admins            manager messages broadcast to every admin
+    manager_<id>      admin replies addressed to one manager
+    admin_<id>        messages sent by one admin (keeps that admin's tabs in sync)
+
+Unread counters are held in the cache per user and recomputed lazily from the
+database when the key is missing.
+"""
+
+import threading
+import time
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a long-poll request may wait before returning an empty response
+LONG_POLL_TIMEOUT = 25
+# How often waiters re-check the shared cache (covers publishes from other workers)
+CACHE_CHECK_INTERVAL = 1.0
+CHANNEL_TTL = 86400
+UNREAD_TTL = 3600
+
+ADMINS_CHANNEL = 'admins'
+
+_condition = threading.Condition()
+
+
+def manager_channel(manager_id):
+    return f"manager_{manager_id}"
+
+
+def admin_channel(admin_id):
+    return f"admin_{admin_id}"
+
+
+def _channel_key(channel):
+    return f"chat_channel_last_{channel}"
+
+
+def _unread_key(user_id):
+    return f"chat_unread_{user_id}"
+
+
+ADMINS_UNREAD_KEY = 'chat_unread_admins'
+
+
+def channel_last_id(channel):
+    """Newest message id published on the channel, or None if unknown to the cache."""
+    return cache.get(_channel_key(channel))
+
+
+def publish(channels, message_id):
+    """Record a new message on the given channels and wake local waiters."""
+    for channel in channels:
+        key = _channel_key(channel)
+        current = cache.get(key)
+        if current is None or message_id > current:
+            cache.set(key, message_id, CHANNEL_TTL)
+    with _condition:
+        _condition.notify_all()
+
+
+def has_updates(channels, last_id):
+    """
+    True if any channel has a message newer than last_id. A channel missing
+    from the cache counts as updated so the caller falls back to one DB query
+    (which then seeds the cache through seed_channel()).
+    """
+    for channel in channels:
+        newest = channel_last_id(channel)
+        if newest is None or newest > last_id:
+            return True
+    return False
+
+
+def seed_channel(channel, newest_id):
+    """Store the newest id after a DB read so later polls can stay in the cache."""
+    if cache.get(_channel_key(channel)) is None:
+        cache.set(_channel_key(channel), newest_id or 0, CHANNEL_TTL)
+
+
+def wait_for_updates(channels, last_id, timeout=LONG_POLL_TIMEOUT):
+    """
+    Block until one of the channels has a message newer than last_id or the
+    timeout expires. Returns True when there is something to fetch.
+    """
+    deadline = time.monotonic() + max(0, timeout)
+    while True:
+        if has_updates(channels, last_id):
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        with _condition:
+            _condition.wait(timeout=min(CACHE_CHECK_INTERVAL, remaining))
+
+
+# --- Unread counters -------------------------------------------------------
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing key: leave it unset so the next read recomputes from the DB
+        pass
+
+
+def increment_unread(user_id):
+    _incr(_unread_key(user_id))
+
+
+def increment_admins_unread():
+    _incr(ADMINS_UNREAD_KEY)
+
+
+def reset_unread(user_id):
+    cache.set(_unread_key(user_id), 0, UNREAD_TTL)
+
+
+def invalidate_admins_unread():
+    cache.delete(ADMINS_UNREAD_KEY)
+
+
+def get_manager_unread(user):
+    """Unread admin replies addressed to this manager."""
+    key = _unread_key(user.id)
+    value = cache.get(key)
+    if value is None:
+        from adminPanel.models import ChatMessage
+        value = ChatMessage.objects.filter(recipient=user, sender_type='admin', is_read=False).count()
+        cache.set(key, value, UNREAD_TTL)
+    return value
+
+
+def get_admins_unread():
+    """Unread manager messages broadcast to admins (read state is shared by all admins)."""
+    value = cache.get(ADMINS_UNREAD_KEY)
+    if value is None:
+        from adminPanel.models import ChatMessage
+        value = ChatMessage.objects.filter(
+            sender_type='manager', recipient__isnull=True, is_read=False
+        ).count()
+        cache.set(ADMINS_UNREAD_KEY, value, UNREAD_TTL)
+    return value
@@ -0,0 +1,342 @@
+"""
+Commission benchmark
+Reproducible throughput measurements of the commission hot path on synthetic
+data, shared by the benchmark_commissions command and the pytest-benchmark
+suite (benchmarks/bench_commission.py):
+
+    with rolled_back():
+        data = seed(depth=4, fan_out=3, clients_per_ib=5, deals_per_client=20)
+        result = measure('create_commission', data)
+
+Seeded data:
+    - one CommissioningProfile with `levels` dynamic_levels (usd_per_lot and
+      percentage per level; `mode` picks which one is applied);
+    - an IB tree `depth` levels deep with `fan_out` sub-IBs per IB, every IB
+      with `clients_per_ib` clients and one live trading account per client;
+    - about `deals_per_client` closed deals per account, served by the MT5
+      simulator (adminPanel.mt5.simulator) so the sync path runs unchanged.
+
+Paths:
+    create_commission   CommissionTransaction.create_commission per deal, with the
+                        client and account already loaded;
+    process_trade       process_commission_for_trade per deal (its own lookups);
+    sync                the sync_commissions_from_mt5 command over the seeded accounts;
+    sync_rerun          the same sync once every commission exists (steady state).
+
+measure() reports deals/sec, DB queries per deal, p50/p99 latency per deal and
+memory. Everything runs against the configured database: wrap seeding and
+measuring in rolled_back() so no rows survive the run.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import io
+import math
+import time
+import tracemalloc
+from unittest import mock
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from adminPanel.models import CommissioningProfile, CommissionTransaction, CustomUser, TradingAccount
+from adminPanel.utils.query_profiler import profile
+
+PATHS = ('create_commission', 'process_trade', 'sync', 'sync_rerun')
+GROUP = 'real\\Standard'
+EMAIL_DOMAIN = 'commission-benchmark.invalid'
+FIRST_LOGIN = 900000001
+
+
+class BenchmarkData:
+    def __init__(self, profile, ibs, clients, accounts, trades, server):
+        self.profile = profile
+        self.ibs = ibs
+        self.clients = clients
+        self.accounts = accounts
+        # (client, trading account, trade dict) per closed deal
+        self.trades = trades
+        self.server = server
+
+    @property
+    def config(self):
+        return {
+            'ibs': len(self.ibs),
+            'clients': len(self.clients),
+            'accounts': len(self.accounts),
+            'deals': len(self.trades),
+            'levels': len(self.profile.dynamic_levels),
+            'mode': 'percentage' if self.profile.use_percentage_based else 'usd',
+        }
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction (or savepoint) that is always rolled back."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def _dynamic_levels(levels):
+    # Level 1 earns most; deeper levels get smaller shares
+    return [
+        {'level': level, 'percentage': round(50 / level, 2), 'usd_per_lot': round(10 / level, 2)}
+        for level in range(1, levels + 1)
+    ]
+
+
+def _new_user(index, user_id, parent, profile, is_ib):
+    kind = 'ib' if is_ib else 'client'
+    user = CustomUser(
+        email=f"{kind}-{user_id}@{EMAIL_DOMAIN}",
+        first_name=kind.upper(),
+        last_name=str(index),
+        username=f"{kind.upper()} {index}",
+        user_id=user_id,
+        role='client',
+        IB_status=is_ib,
+        referral_code=f"BENCH{user_id}" if is_ib else None,
+        commissioning_profile=profile if is_ib else None,
+        parent_ib=parent,
+    )
+    user.set_unusable_password()
+    return user
+
+
+def _first_free_login(count):
+    login = FIRST_LOGIN
+    while TradingAccount.objects.filter(account_id__in=[str(login), str(login + count - 1)]).exists():
+        login += 10 ** 6
+    return login
+
+
+def trade_data(account, client, deal):
+    """The trade dict sync_commissions_from_mt5 builds for one closed MT5 deal."""
+    volume = float(getattr(deal, 'VolumeClosed', 0) or getattr(deal, 'Volume', 0) or 0)
+    return {
+        'client_email': client.email,
+        'trade_id': str(deal.Deal),
+        'trading_account_id': account.id,
+        'symbol': deal.Symbol,
+        'position_type': 'buy' if deal.Action == 0 else 'sell',
+        'position_direction': 'in',
+        'total_commission': float(deal.Commission),
+        'lot_size': volume / 10000.0 if volume > 0 else 0.0,
+        'profit': float(deal.Profit or 0),
+        'deal_ticket': str(deal.Deal),
+        'mt5_close_time': timezone.make_aware(datetime.fromtimestamp(int(deal.Time))),
+    }
+
+
+def seed(depth=3, fan_out=3, clients_per_ib=5, deals_per_client=20, levels=None, mode='usd', roots=1, random_seed=42):
+    """Create the IB tree, clients, accounts and simulated deal histories. Returns BenchmarkData."""
+    from adminPanel.mt5 import simulator
+
+    profile = CommissioningProfile.objects.create(
+        name=f"Benchmark {depth}x{fan_out}",
+        dynamic_levels=_dynamic_levels(levels or depth),
+        approved_groups=[GROUP],
+        use_percentage_based=(mode == 'percentage'),
+    )
+    next_user_id = (CustomUser.objects.aggregate(top=Max('user_id'))['top'] or 7000000) + 1
+
+    ibs = []
+    parents = [None]
+    for _ in range(depth):
+        users = []
+        for parent in parents:
+            for _ in range(roots if parent is None else fan_out):
+                users.append(_new_user(len(ibs) + len(users), next_user_id, parent, profile, is_ib=True))
+                next_user_id += 1
+        # One INSERT per layer; children need their parents' primary keys
+        parents = CustomUser.objects.bulk_create(users)
+        ibs.extend(parents)
+
+    clients = []
+    for ib in ibs:
+        for _ in range(clients_per_ib):
+            clients.append(_new_user(len(clients), next_user_id, ib, None, is_ib=False))
+            next_user_id += 1
+    clients = CustomUser.objects.bulk_create(clients, batch_size=1000)
+
+    first_login = _first_free_login(len(clients))
+    accounts = TradingAccount.objects.bulk_create([
+        TradingAccount(
+            user=client,
+            account_id=str(first_login + i),
+            account_type='standard',
+            account_name=f"({first_login + i})",
+            group_name=GROUP,
+        )
+        for i, client in enumerate(clients)
+    ], batch_size=1000)
+
+    # Two deals (in + out) per round trip: about deals_per_client closed deals per account
+    server = simulator.configure(
+        accounts=len(clients),
+        first_login=first_login,
+        deals_per_account=deals_per_client * 2,
+        groups=(GROUP,),
+        seed=random_seed,
+    )
+    trades = []
+    for account, client in zip(accounts, clients):
+        for deal in server.deals(int(account.account_id), 0, server.now):
+            if deal.Entry == 1 and deal.Symbol and deal.VolumeClosed > 0 and deal.Action in (0, 1):
+                trades.append((client, account, trade_data(account, client, deal)))
+    return BenchmarkData(profile, ibs, clients, accounts, trades, server)
+
+
+def reset(data):
+    """Delete the commissions created for the seeded accounts."""
+    CommissionTransaction.objects.filter(client_trading_account__in=data.accounts).delete()
+
+
+# --- paths --------------------------------------------------------------------
+
+def run_create_commission(data, latencies=None):
+    for client, account, trade in data.trades:
+        started = time.perf_counter()
+        CommissionTransaction.create_commission(
+            client=client,
+            total_commission=trade['total_commission'],
+            position_id=trade['trade_id'],
+            trading_account=account,
+            trading_symbol=trade['symbol'],
+            position_type=trade['position_type'],
+            position_direction=trade['position_direction'],
+            lot_size=trade['lot_size'],
+            profit=trade['profit'],
+            deal_ticket=trade['deal_ticket'],
+            mt5_close_time=trade['mt5_close_time'],
+        )
+        if latencies is not None:
+            latencies.append(time.perf_counter() - started)
+    return len(data.trades)
+
+
+def run_process_trade(data, latencies=None):
+    from adminPanel.mt5.process_commission import process_commission_for_trade
+
+    for _, _, trade in data.trades:
+        started = time.perf_counter()
+        process_commission_for_trade(trade)
+        if latencies is not None:
+            latencies.append(time.perf_counter() - started)
+    return len(data.trades)
+
+
+def run_sync(data, latencies=None):
+    """The sync_commissions_from_mt5 loop over the seeded accounts, MT5 served by the simulator."""
+    from adminPanel.mt5 import simulator
+
+    # Installs the simulator before the command module imports MT5Manager
+    actions = simulator.manager_actions()
+    from adminPanel.management.commands import sync_commissions_from_mt5 as sync_command
+
+    accounts = TradingAccount.objects.filter(
+        id__in=[account.id for account in data.accounts]
+    ).select_related('user', 'user__parent_ib')
+    process = sync_command.process_commission_for_trade
+
+    def timed_process(trade):
+        started = time.perf_counter()
+        try:
+            return process(trade)
+        finally:
+            if latencies is not None:
+                latencies.append(time.perf_counter() - started)
+
+    command = sync_command.Command(stdout=io.StringIO())
+    # The command keeps its cooldown map on the class; a fresh one checks every account
+    command.account_last_check = {}
+    with mock.patch.object(sync_command, 'MT5ManagerActions', return_value=actions), \
+            mock.patch.object(sync_command.Command, 'get_active_accounts', lambda self: accounts), \
+            mock.patch.object(sync_command, 'process_commission_for_trade', timed_process):
+        command.handle()
+    return len(data.trades)
+
+
+_RUNNERS = {
+    'create_commission': run_create_commission,
+    'process_trade': run_process_trade,
+    'sync': run_sync,
+    'sync_rerun': run_sync,
+}
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def prepare(path, data):
+    """Bring the seeded data to the starting state of `path` (not part of the timing)."""
+    reset(data)
+    if path == 'sync_rerun':
+        # Steady state: every deal already has its commissions
+        run_create_commission(data)
+
+
+def run_path(path, data, trace_memory=False):
+    """The timed part: run `path` over every seeded deal. Returns the raw timings for summarize()."""
+    runner = _RUNNERS[path]
+    latencies = []
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with profile() as prof:
+        deals = runner(data, latencies)
+    seconds = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {'path': path, 'deals': deals, 'seconds': seconds, 'latencies': latencies, 'profile': prof, 'peak': peak}
+
+
+def summarize(data, raw):
+    """Metrics of one run_path() result."""
+    deals, seconds, prof = raw['deals'], raw['seconds'], raw['profile']
+    latencies = sorted(raw['latencies'])
+    peak = raw['peak']
+    commissions = CommissionTransaction.objects.filter(client_trading_account__in=data.accounts).aggregate(
+        count=Count('id'), total=Sum('commission_to_ib'),
+    )
+    return {
+        'path': raw['path'],
+        'deals': deals,
+        'seconds': seconds,
+        'deals_per_second': deals / seconds if seconds else None,
+        'queries': prof.queries,
+        'queries_per_deal': prof.queries / deals if deals else None,
+        'sql_seconds': prof.sql_seconds,
+        # Per deal that reached the commission step; sync_rerun skips every deal before it
+        'p50_ms': _percentile(latencies, 0.5) * 1000 if latencies else None,
+        'p99_ms': _percentile(latencies, 0.99) * 1000 if latencies else None,
+        'max_ms': latencies[-1] * 1000 if latencies else None,
+        # Same for every path over the same data: a cheap correctness check
+        'commissions': commissions['count'],
+        'commission_total': str(commissions['total'] or 0),
+        'traced_peak_mb': peak / 1048576 if peak is not None else None,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def measure(path, data, trace_memory=False):
+    """Run one path over every seeded deal from a clean state and return its metrics."""
+    prepare(path, data)
+    return summarize(data, run_path(path, data, trace_memory))
@@ -0,0 +1,528 @@
+"""
+Export Service
+Streaming CSV/XLSX exports for users, trading accounts and transactions.
+
+Rows are read through joined/annotated querysets with .iterator() so memory
+stays flat regardless of table size. Very large exports can run as a
+background job (ExportJob row) on a small shared thread pool; it writes a gzip
+CSV or an XLSX file under EXPORT_ROOT, outside MEDIA_ROOT, served only by the
+job download view and deleted after EXPORT_RETENTION_HOURS.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import gzip
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from adminPanel.models import CommissionTransaction, CustomUser, ExportJob, TradingAccount, Transaction
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per database round trip while streaming
+EXPORT_CHUNK_SIZE = 2000
+# Hours a finished export file is kept before cleanup deletes it
+EXPORT_RETENTION_HOURS = 24
+# Background exports running at once per process; further jobs queue up to EXPORT_MAX_QUEUED
+EXPORT_MAX_WORKERS = 2
+EXPORT_MAX_QUEUED = 10
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+def _iso(dt):
+    try:
+        return dt.isoformat() if dt else ''
+    except Exception:
+        return ''
+
+
+def _bool(value):
+    return 'true' if value else 'false'
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+def _file_url(field):
+    try:
+        return field.url if field else ''
+    except Exception:
+        return ''
+
+
+def _money(value):
+    return str(Decimal(value or 0).quantize(Decimal('0.01')))
+
+
+class ExportSpec:
+    """
+    Describes one export: base queryset, date filter field, output columns and
+    the per-column annotations that are only added when the column is selected.
+    """
+
+    def __init__(self, name, filename, queryset, date_field, columns, annotations=None):
+        self.name = name
+        self.filename = filename
+        self._queryset = queryset
+        self.date_field = date_field
+        self.columns = columns
+        self.headers = [header for header, _ in columns]
+        self._getters = dict(columns)
+        self.annotations = annotations or {}
+
+    def resolve_columns(self, requested=None):
+        """Return the ordered list of selected headers; raises ValueError on unknown names."""
+        if not requested:
+            return list(self.headers)
+        if isinstance(requested, str):
+            requested = [c.strip() for c in requested.split(',') if c.strip()]
+        unknown = [c for c in requested if c not in self._getters]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {self.name} export: {', '.join(unknown)}")
+        return list(requested)
+
+    def build_queryset(self, columns, date_from=None, date_to=None):
+        qs = self._queryset()
+        extra = {}
+        for header in columns:
+            if header in self.annotations:
+                alias, expression = self.annotations[header]
+                extra[alias] = expression()
+        if extra:
+            qs = qs.annotate(**extra)
+        # Range filters (not __date) so an index on the date column can be used
+        if date_from:
+            qs = qs.filter(**{f'{self.date_field}__gte': date_from})
+        if date_to:
+            qs = qs.filter(**{f'{self.date_field}__lt': date_to})
+        return qs
+
+    def row(self, obj, columns):
+        return [self._getters[header](obj) for header in columns]
+
+
+def parse_date_range(date_from=None, date_to=None):
+    """
+    Parse YYYY-MM-DD bounds into aware datetimes. The upper bound is exclusive
+    (start of the day after date_to) so the whole end day is included.
+    """
+    start = end = None
+    tz = timezone.get_current_timezone()
+    if date_from:
+        d = parse_date(str(date_from))
+        if not d:
+            raise ValueError("date_from must be in YYYY-MM-DD format")
+        start = timezone.make_aware(datetime.combine(d, datetime.min.time()), tz)
+    if date_to:
+        d = parse_date(str(date_to))
+        if not d:
+            raise ValueError("date_to must be in YYYY-MM-DD format")
+        end = timezone.make_aware(datetime.combine(d + timedelta(days=1), datetime.min.time()), tz)
+    if start and end and start >= end:
+        raise ValueError("date_from must not be after date_to")
+    return start, end
+
+
+# --- Users -----------------------------------------------------------------
+
+def _users_queryset():
+    return CustomUser.objects.select_related(
+        'created_by', 'parent_ib', 'commissioning_profile'
+    ).order_by('user_id')
+
+
+def _user_total_earnings():
+    earnings = CommissionTransaction.objects.filter(
+        ib_user=OuterRef('pk')
+    ).exclude(
+        client_trading_account__account_type='demo'
+    ).order_by().values('ib_user').annotate(total=Sum('commission_to_ib')).values('total')
+    return Coalesce(
+        Subquery(earnings, output_field=DecimalField(max_digits=20, decimal_places=2)),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=20, decimal_places=2),
+    )
+
+
+def _user_total_commission_withdrawals():
+    withdrawals = Transaction.objects.filter(
+        user=OuterRef('pk'), transaction_type='commission_withdrawal', status='approved'
+    ).order_by().values('user').annotate(total=Sum('amount')).values('total')
+    return Coalesce(
+        Subquery(withdrawals, output_field=DecimalField(max_digits=20, decimal_places=2)),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=20, decimal_places=2),
+    )
+
+
+def _user_direct_client_count():
+    clients = CustomUser.objects.filter(
+        parent_ib=OuterRef('pk')
+    ).order_by().values('parent_ib').annotate(c=Count('pk')).values('c')
+    return Coalesce(Subquery(clients, output_field=IntegerField()), Value(0))
+
+
+USERS_EXPORT = ExportSpec(
+    name='users',
+    filename='users_export',
+    queryset=_users_queryset,
+    date_field='date_joined',
+    columns=[
+        ('user_id', lambda u: _text(u.user_id)),
+        ('first_name', lambda u: u.first_name or ''),
+        ('last_name', lambda u: u.last_name or ''),
+        ('dob', lambda u: _iso(u.dob)),
+        ('phone_number', lambda u: u.phone_number or ''),
+        ('email', lambda u: u.email or ''),
+        ('username', lambda u: u.username or ''),
+        ('address', lambda u: u.address or ''),
+        ('city', lambda u: u.city or ''),
+        ('zip_code', lambda u: u.zip_code or ''),
+        ('state', lambda u: u.state or ''),
+        ('country', lambda u: u.country or ''),
+        ('profile_pic', lambda u: _file_url(u.profile_pic)),
+        ('id_proof', lambda u: _file_url(u.id_proof)),
+        ('address_proof', lambda u: _file_url(u.address_proof)),
+        ('address_proof_verified', lambda u: _bool(u.address_proof_verified)),
+        ('id_proof_verified', lambda u: _bool(u.id_proof_verified)),
+        ('user_verified', lambda u: _bool(u.user_verified)),
+        ('IB_status', lambda u: _bool(u.IB_status)),
+        ('MAM_manager_status', lambda u: _bool(u.MAM_manager_status)),
+        ('created_by_user_id', lambda u: _text(u.created_by.user_id) if u.created_by else ''),
+        ('created_by_username', lambda u: u.created_by.username if u.created_by else ''),
+        ('manager_admin_status', lambda u: u.manager_admin_status or ''),
+        ('total_earnings', lambda u: _money(u.export_total_earnings)),
+        ('total_commission_withdrawals', lambda u: _money(u.export_total_commission_withdrawals)),
+        ('date_joined', lambda u: _iso(u.date_joined)),
+        ('is_active', lambda u: _bool(u.is_active)),
+        ('is_staff', lambda u: _bool(u.is_staff)),
+        ('parent_ib_user_id', lambda u: _text(u.parent_ib.user_id) if u.parent_ib else ''),
+        ('parent_ib_username', lambda u: u.parent_ib.username if u.parent_ib else ''),
+        ('commissioning_profile_name', lambda u: u.commissioning_profile.name if u.commissioning_profile else ''),
+        ('direct_client_count', lambda u: str(u.export_direct_client_count or 0)),
+    ],
+    annotations={
+        'total_earnings': ('export_total_earnings', _user_total_earnings),
+        'total_commission_withdrawals': ('export_total_commission_withdrawals', _user_total_commission_withdrawals),
+        'direct_client_count': ('export_direct_client_count', _user_direct_client_count),
+    },
+)
+
+
+# --- Trading accounts ------------------------------------------------------
+
+def _trading_accounts_queryset():
+    return TradingAccount.objects.select_related(
+        'user', 'mam_master_account', 'package', 'approved_by'
+    ).order_by('id')
+
+
+TRADING_ACCOUNTS_EXPORT = ExportSpec(
+    name='trading_accounts',
+    filename='trading_accounts_export',
+    queryset=_trading_accounts_queryset,
+    date_field='created_at',
+    columns=[
+        ('id', lambda a: a.id),
+        ('user_id', lambda a: _text(a.user.user_id) if a.user else ''),
+        ('user_username', lambda a: a.user.username if a.user else ''),
+        ('user_email', lambda a: a.user.email if a.user else ''),
+        ('account_id', lambda a: a.account_id or ''),
+        ('copy_coefficient', lambda a: str(a.copy_factor or '')),
+        ('account_type', lambda a: a.account_type or ''),
+        ('account_name', lambda a: a.account_name or ''),
+        ('leverage', lambda a: _text(a.leverage)),
+        ('balance', lambda a: _text(a.balance)),
+        ('is_enabled', lambda a: _bool(a.is_enabled)),
+        ('is_trading_enabled', lambda a: _bool(a.is_trading_enabled)),
+        ('created_at', lambda a: _iso(a.created_at)),
+        ('group_name', lambda a: a.group_name or ''),
+        ('manager_allow_copy', lambda a: _bool(a.manager_allow_copy)),
+        ('investor_allow_copy', lambda a: _bool(a.investor_allow_copy)),
+        ('mam_master_account_id', lambda a: a.mam_master_account.account_id if a.mam_master_account else ''),
+        ('mam_master_account_name', lambda a: a.mam_master_account.account_name if a.mam_master_account else ''),
+        ('profit_sharing_percentage', lambda a: str(a.profit_sharing_percentage or '')),
+        ('risk_level', lambda a: a.risk_level or ''),
+        ('is_algo_enabled', lambda a: _bool(a.is_algo_enabled)),
+        ('payout_frequency', lambda a: a.payout_frequency or ''),
+        ('package_name', lambda a: a.package.name if a.package else ''),
+        ('package_id', lambda a: a.package.id if a.package else ''),
+        ('status', lambda a: a.status or ''),
+        ('approved_by_user_id', lambda a: _text(a.approved_by.user_id) if a.approved_by else ''),
+        ('approved_by_username', lambda a: a.approved_by.username if a.approved_by else ''),
+        ('approved_at', lambda a: _iso(a.approved_at)),
+        ('start_date', lambda a: _iso(a.start_date)),
+        ('end_date', lambda a: _iso(a.end_date)),
+    ],
+)
+
+
+# --- Transactions ----------------------------------------------------------
+
+def _transactions_queryset():
+    return Transaction.objects.select_related(
+        'user', 'trading_account', 'approved_by', 'from_account', 'to_account'
+    ).order_by('id')
+
+
+TRANSACTIONS_EXPORT = ExportSpec(
+    name='transactions',
+    filename='transactions_export',
+    queryset=_transactions_queryset,
+    date_field='created_at',
+    columns=[
+        ('id', lambda t: t.id),
+        ('user_id', lambda t: _text(t.user.user_id) if t.user else ''),
+        ('user_username', lambda t: t.user.username if t.user else ''),
+        ('user_email', lambda t: t.user.email if t.user else ''),
+        ('source', lambda t: t.source or ''),
+        ('trading_account_id', lambda t: t.trading_account.account_id if t.trading_account else ''),
+        ('trading_account_name', lambda t: t.trading_account.account_name if t.trading_account else ''),
+        ('transaction_type', lambda t: t.transaction_type or ''),
+        ('amount', lambda t: _text(t.amount)),
+        ('description', lambda t: t.description or ''),
+        ('created_at', lambda t: _iso(t.created_at)),
+        ('status', lambda t: t.status or ''),
+        ('approved_by_user_id', lambda t: _text(t.approved_by.user_id) if t.approved_by else ''),
+        ('approved_by_username', lambda t: t.approved_by.username if t.approved_by else ''),
+        ('approved_at', lambda t: _iso(t.approved_at)),
+        ('payout_to', lambda t: t.payout_to or ''),
+        ('external_account', lambda t: t.external_account or ''),
+        ('from_account_id', lambda t: t.from_account.account_id if t.from_account else ''),
+        ('from_account_name', lambda t: t.from_account.account_name if t.from_account else ''),
+        ('to_account_id', lambda t: t.to_account.account_id if t.to_account else ''),
+        ('to_account_name', lambda t: t.to_account.account_name if t.to_account else ''),
+        ('document', lambda t: _file_url(t.document)),
+    ],
+)
+
+
+EXPORT_SPECS = {
+    spec.name: spec for spec in (USERS_EXPORT, TRADING_ACCOUNTS_EXPORT, TRANSACTIONS_EXPORT)
+}
+
+
+def get_export_spec(name):
+    spec = EXPORT_SPECS.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown export: {name}")
+    return spec
+
+
+def iter_export_rows(spec, columns, date_from=None, date_to=None):
+    """Yield the header row followed by one list per record, chunked from the DB."""
+    yield list(columns)
+    qs = spec.build_queryset(columns, date_from, date_to)
+    for obj in qs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield spec.row(obj, columns)
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(spec, columns, date_from=None, date_to=None):
+    """Generator of CSV-encoded lines suitable for StreamingHttpResponse."""
+    writer = csv.writer(_Echo())
+    for row in iter_export_rows(spec, columns, date_from, date_to):
+        yield writer.writerow(row)
+
+
+def _xlsx_workbook():
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("XLSX export requires openpyxl to be installed")
+    return Workbook(write_only=True)
+
+
+def _save_xlsx(wb, spec, rows, target):
+    ws = wb.create_sheet(title=spec.name[:31])
+    count = 0
+    for row in rows:
+        ws.append(row)
+        count += 1
+    wb.save(target)
+    return count
+
+
+def write_xlsx(spec, columns, date_from=None, date_to=None):
+    """
+    Write the export to a temporary XLSX file using openpyxl's write-only mode
+    (rows are flushed to disk as they are appended) and return the open file.
+    """
+    wb = _xlsx_workbook()
+    tmp = tempfile.TemporaryFile(suffix='.xlsx')
+    _save_xlsx(wb, spec, iter_export_rows(spec, columns, date_from, date_to), tmp)
+    tmp.seek(0)
+    return tmp
+
+
+# --- Background jobs -------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ExportQueueFull(Exception):
+    """Too many background exports are already pending or running."""
+
+
+def _export_dir():
+    base = getattr(settings, 'EXPORT_ROOT', None) or os.path.join(tempfile.gettempdir(), 'adminpanel_exports')
+    os.makedirs(base, mode=0o700, exist_ok=True)
+    return base
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EXPORT_MAX_WORKERS', EXPORT_MAX_WORKERS),
+                thread_name_prefix='export',
+            )
+        return _executor
+
+
+def get_export_job(job_id):
+    return ExportJob.objects.filter(job_id=job_id).first()
+
+
+def _update_job(job_id, **fields):
+    ExportJob.objects.filter(job_id=job_id).update(**fields)
+
+
+class _ProgressRows:
+    """Pass rows through, recording the count on the job every few chunks."""
+
+    def __init__(self, job_id, rows):
+        self.job_id = job_id
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            yield row
+            self.count += 1
+            if self.count % (EXPORT_CHUNK_SIZE * 5) == 0:
+                _update_job(self.job_id, rows=self.count - 1)
+
+
+def _run_export_job(job_id, spec, columns, date_from, date_to, file_format, path):
+    started = time.time()
+    try:
+        _update_job(job_id, status='running')
+        rows = _ProgressRows(job_id, iter_export_rows(spec, columns, date_from, date_to))
+        if file_format == 'xlsx':
+            wb = _xlsx_workbook()
+            with open(path, 'wb') as fh:
+                _save_xlsx(wb, spec, rows, fh)
+        else:
+            writer = csv.writer(_Echo())
+            with gzip.open(path, 'wt', encoding='utf-8', newline='') as fh:
+                for row in rows:
+                    fh.write(writer.writerow(row))
+        _update_job(
+            job_id,
+            status='completed',
+            rows=max(rows.count - 1, 0),
+            size_bytes=os.path.getsize(path),
+            duration_seconds=round(time.time() - started, 2),
+            finished_at=timezone.now(),
+        )
+        logger.info(f"Export job {job_id} ({spec.name}) finished: {rows.count - 1} rows in {time.time() - started:.1f}s")
+    except Exception as e:
+        logger.error(f"Export job {job_id} ({spec.name}) failed: {e}")
+        _update_job(job_id, status='failed', error=str(e), finished_at=timezone.now())
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    finally:
+        close_old_connections()
+
+
+def start_export_job(spec, columns, date_from=None, date_to=None, requested_by=None, file_format='csv'):
+    """
+    Queue a background export that writes a gzip CSV or XLSX file. Returns the
+    ExportJob; progress is polled with get_export_job(job_id). Raises
+    ExportQueueFull when EXPORT_MAX_QUEUED jobs are already pending or running.
+    """
+    cleanup_expired_exports()
+    max_queued = getattr(settings, 'EXPORT_MAX_QUEUED', EXPORT_MAX_QUEUED)
+    if ExportJob.objects.filter(status__in=['pending', 'running']).count() >= max_queued:
+        raise ExportQueueFull(f"{max_queued} exports are already in progress, try again later")
+
+    job_id = uuid.uuid4().hex
+    extension = 'xlsx' if file_format == 'xlsx' else 'csv.gz'
+    path = os.path.join(_export_dir(), f"{spec.filename}_{job_id}.{extension}")
+    retention = getattr(settings, 'EXPORT_RETENTION_HOURS', EXPORT_RETENTION_HOURS)
+    job = ExportJob.objects.create(
+        job_id=job_id,
+        export=spec.name,
+        file_format=file_format,
+        columns=list(columns),
+        path=path,
+        filename=f"{spec.filename}.{extension}",
+        requested_by=requested_by if getattr(requested_by, 'pk', None) else None,
+        expires_at=timezone.now() + timedelta(hours=retention),
+    )
+    _get_executor().submit(_run_export_job, job_id, spec, columns, date_from, date_to, file_format, path)
+    return job
+
+
+def cleanup_expired_exports(now=None):
+    """
+    Delete the files of exports past expires_at, and any file left in the
+    export directory longer than the retention (crashed or untracked jobs).
+    Returns the number of files removed.
+    """
+    now = now or timezone.now()
+    removed = 0
+    for job in ExportJob.objects.filter(expires_at__lte=now).exclude(path=''):
+        if os.path.exists(job.path):
+            try:
+                os.remove(job.path)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove expired export {job.path}: {e}")
+                continue
+        if job.status == 'completed':
+            ExportJob.objects.filter(pk=job.pk).update(status='expired', path='')
+        elif job.status == 'failed':
+            ExportJob.objects.filter(pk=job.pk).update(path='')
+        else:
+            # Still pending or running at expiry: the process that ran it is gone
+            ExportJob.objects.filter(pk=job.pk).update(status='failed', path='', error='Did not finish before expiry')
+
+    cutoff = now.timestamp() - getattr(settings, 'EXPORT_RETENTION_HOURS', EXPORT_RETENTION_HOURS) * 3600
+    directory = _export_dir()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"Removed {removed} expired export file(s)")
+    return removed
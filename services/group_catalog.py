@@ -0,0 +1,338 @@
+"""
+MT5 Group Catalog
+In-memory snapshot of the MT5 group names and configurations for the real and
+demo servers, merged once with the TradeGroup / MT5GroupConfig rows.
+
+Views used to enumerate GroupTotal() / GroupNext(i) on every request. They now
+read the catalog, which answers from the current snapshot in O(1):
+
+    group_catalog.group_names('real')        tuple of names in MT5 order
+    group_catalog.get_config(name, 'real')   config dict for one group
+    group_catalog.all_configs('real')        list of config dicts
+    group_catalog.merged_groups('real')      MT5 groups merged with database settings
+    group_catalog.db_settings()              {name: TradeGroup settings}
+    group_catalog.leverage_summary('real')   leverage ratios offered by the groups
+
+Refresh:
+    - a GroupSink subscribed on the manager connection marks the snapshot stale
+      when MT5 reports a group being added, updated or deleted;
+    - snapshots older than SNAPSHOT_TTL are refreshed in a background thread
+      while readers keep getting the previous snapshot;
+    - database settings are re-read when a TradeGroup / MT5GroupConfig row is
+      saved or deleted (a cache generation key makes this visible to every
+      worker) or after DB_SETTINGS_TTL seconds.
+"""
+
+import threading
+import time
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SERVERS = ('real', 'demo')
+# Seconds before a group snapshot is refreshed in the background
+SNAPSHOT_TTL = 300
+# Seconds before merged database settings are re-read even without a save signal
+DB_SETTINGS_TTL = 60
+DB_GENERATION_KEY = 'group_catalog_db_generation'
+
+# Leverage ratios offered to clients when a group allows them
+COMMON_LEVERAGE_RATIOS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+_NAME_ATTRS = ('Group', 'Name', 'GroupName', 'group', 'name')
+
+
+def _group_name(group):
+    for attr in _NAME_ATTRS:
+        value = getattr(group, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+def build_group_config(name, group, server):
+    """Config dict for one MT5 group object (same keys as get_all_group_configurations)."""
+    is_demo = server == 'demo' or 'demo' in name.lower()
+    return {
+        'name': name,
+        'leverage_max': getattr(group, 'LeverageMax', 1000),
+        'leverage_min': getattr(group, 'LeverageMin', 1),
+        'is_demo': is_demo,
+        'is_live': not is_demo,
+        'currency': getattr(group, 'Currency', 'USD'),
+        'margin_mode': getattr(group, 'MarginMode', 0),
+        'deposit_min': getattr(group, 'DepositMin', 0),
+        'description': f"{'Demo' if is_demo else 'Live'} trading group",
+    }
+
+
+def _leverage_summary(configs):
+    leverage_set = set()
+    max_leverage = 1000
+    min_leverage = 1
+    for config in configs:
+        group_max = config.get('leverage_max', 1000)
+        group_min = config.get('leverage_min', 1)
+        max_leverage = max(max_leverage, group_max)
+        min_leverage = min(min_leverage, group_min)
+        for ratio in COMMON_LEVERAGE_RATIOS:
+            if group_min <= ratio <= group_max:
+                leverage_set.add(ratio)
+    return {
+        'ratios': sorted(leverage_set),
+        'max_leverage': max_leverage,
+        'min_leverage': min_leverage,
+        'groups_analyzed': len(configs),
+    }
+
+
+class GroupSnapshot:
+    """Immutable view of one server's groups. Replaced as a whole on refresh."""
+
+    def __init__(self, server, configs):
+        self.server = server
+        self.names = tuple(config['name'] for config in configs)
+        self.configs = {config['name']: config for config in configs}
+        self.config_list = list(configs)
+        self.leverage = _leverage_summary(configs)
+        self.loaded_at = time.monotonic()
+        self.stale = False
+
+    @property
+    def age(self):
+        return time.monotonic() - self.loaded_at
+
+
+class GroupCatalogSink:
+    """
+    MT5 group sink: the Manager API calls these when the group configuration
+    changes on the server. Any change just marks the snapshot stale; the next
+    read schedules a refresh.
+    """
+
+    def __init__(self, catalog, server):
+        self.catalog = catalog
+        self.server = server
+
+    def _changed(self, *args):
+        self.catalog.mark_stale(self.server)
+
+    OnGroupAdd = _changed
+    OnGroupUpdate = _changed
+    OnGroupDelete = _changed
+    OnGroupSync = _changed
+
+
+class GroupCatalog:
+    def __init__(self):
+        self._snapshots = {}
+        self._refresh_lock = threading.Lock()
+        self._refreshing = set()
+        self._sinks = {}
+        self._db = None
+        self._db_generation = None
+        self._db_loaded_at = 0
+        self._merged = {}
+
+    # --- MT5 snapshots ----------------------------------------------------
+
+    def _get_manager(self, server):
+        """Raw Manager API object for the server, or None if it cannot connect."""
+        try:
+            if server == 'demo':
+                from adminPanel.mt5.manager import get_demo_manager_instance
+                instance = get_demo_manager_instance()
+            else:
+                from adminPanel.mt5.services import get_manager_instance
+                instance = get_manager_instance()
+            return instance.manager if instance else None
+        except Exception as e:
+            logger.warning(f"Group catalog: {server} MT5 manager unavailable: {e}")
+            return None
+
+    def _subscribe(self, server, manager):
+        """Register a change sink once per manager connection."""
+        if self._sinks.get(server, (None,))[0] is manager:
+            return
+        sink = GroupCatalogSink(self, server)
+        try:
+            manager.GroupSubscribe(sink)
+        except Exception as e:
+            # Not every Manager API build exposes group sinks; TTL refresh still applies
+            logger.debug(f"Group catalog: GroupSubscribe unavailable on {server} server: {e}")
+        # Keep a reference so the sink is not garbage collected
+        self._sinks[server] = (manager, sink)
+
+    def _enumerate(self, server, manager):
+        configs = []
+        total = manager.GroupTotal()
+        for i in range(total or 0):
+            try:
+                group = manager.GroupNext(i)
+            except Exception as e:
+                logger.error(f"Group catalog: error reading {server} group at index {i}: {e}")
+                continue
+            if group is None:
+                continue
+            name = _group_name(group)
+            if name:
+                configs.append(build_group_config(name, group, server))
+        return configs
+
+    def refresh(self, server='real'):
+        """Enumerate the server's groups now and swap in a new snapshot."""
+        manager = self._get_manager(server)
+        if manager is None:
+            return self._snapshots.get(server)
+        try:
+            configs = self._enumerate(server, manager)
+        except Exception as e:
+            logger.error(f"Group catalog: failed to enumerate {server} groups: {e}")
+            return self._snapshots.get(server)
+        self._subscribe(server, manager)
+        snapshot = GroupSnapshot(server, configs)
+        self._snapshots[server] = snapshot
+        self._merged.pop(server, None)
+        logger.info(f"Group catalog: loaded {len(snapshot.names)} {server} groups")
+        return snapshot
+
+    def _refresh_in_background(self, server):
+        with self._refresh_lock:
+            if server in self._refreshing:
+                return
+            self._refreshing.add(server)
+
+        def run():
+            try:
+                self.refresh(server)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(server)
+
+        threading.Thread(target=run, name=f"group-catalog-{server}", daemon=True).start()
+
+    def snapshot(self, server='real'):
+        """
+        Current snapshot for the server. The first read loads synchronously;
+        stale snapshots are served while a background refresh runs.
+        """
+        snapshot = self._snapshots.get(server)
+        if snapshot is None:
+            with self._refresh_lock:
+                loading = server in self._refreshing
+            snapshot = None if loading else self.refresh(server)
+            return snapshot or GroupSnapshot(server, [])
+        if snapshot.stale or snapshot.age > SNAPSHOT_TTL:
+            self._refresh_in_background(server)
+        return snapshot
+
+    def mark_stale(self, server=None):
+        for name in ([server] if server else SERVERS):
+            snapshot = self._snapshots.get(name)
+            if snapshot is not None:
+                snapshot.stale = True
+
+    def reset(self, server=None):
+        """Drop snapshots (e.g. after a server credential change) so the next read reloads."""
+        for name in ([server] if server else SERVERS):
+            self._snapshots.pop(name, None)
+            self._merged.pop(name, None)
+            self._sinks.pop(name, None)
+
+    def group_names(self, server='real'):
+        return self.snapshot(server).names
+
+    def get_config(self, name, server=None):
+        for candidate in ([server] if server else SERVERS):
+            config = self.snapshot(candidate).configs.get(name)
+            if config is not None:
+                return config
+        return None
+
+    def all_configs(self, server='real'):
+        return self.snapshot(server).config_list
+
+    def leverage_summary(self, server='real'):
+        return self.snapshot(server).leverage
+
+    # --- database settings ------------------------------------------------
+
+    def db_settings(self):
+        """
+        {group name: settings} from TradeGroup, with MT5GroupConfig leverage /
+        min deposit folded in. Re-read after a save/delete signal or DB_SETTINGS_TTL.
+        """
+        generation = cache.get(DB_GENERATION_KEY) or 0
+        if (
+            self._db is None
+            or generation != self._db_generation
+            or time.monotonic() - self._db_loaded_at > DB_SETTINGS_TTL
+        ):
+            self._db = self._load_db_settings()
+            self._db_generation = generation
+            self._db_loaded_at = time.monotonic()
+            self._merged = {}
+        return self._db
+
+    def _load_db_settings(self):
+        from adminPanel.models import TradeGroup
+        from adminPanel.mt5.models import MT5GroupConfig
+
+        settings_by_name = {}
+        for group in TradeGroup.objects.all():
+            settings_by_name[group.name] = {
+                'id': group.id,
+                'group_id': group.group_id,
+                'description': group.description,
+                'alias': group.alias or '',
+                'type': group.type,
+                'is_active': group.is_active,
+                'is_default': group.is_default,
+                'is_demo_default': group.is_demo_default,
+            }
+        try:
+            for config in MT5GroupConfig.objects.all():
+                entry = settings_by_name.setdefault(config.group_name, {})
+                entry['leverage'] = config.leverage
+                entry['min_deposit'] = config.min_deposit
+                entry['mt5_enabled'] = config.is_enabled
+        except Exception as e:
+            logger.debug(f"Group catalog: MT5GroupConfig unavailable: {e}")
+        return settings_by_name
+
+    def merged_groups(self, server='real'):
+        """MT5 groups of the server paired with their database settings, computed once per snapshot."""
+        db = self.db_settings()
+        snapshot = self.snapshot(server)
+        cached = self._merged.get(server)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        merged = [
+            {'name': name, 'config': snapshot.configs[name], 'db': db.get(name, {})}
+            for name in snapshot.names
+        ]
+        self._merged[server] = (snapshot, merged)
+        return merged
+
+
+group_catalog = GroupCatalog()
+
+
+def invalidate_db_settings(*args, **kwargs):
+    """Signal receiver: make every worker re-read TradeGroup / MT5GroupConfig rows."""
+    try:
+        cache.incr(DB_GENERATION_KEY)
+    except ValueError:
+        cache.set(DB_GENERATION_KEY, 1, None)
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+    from adminPanel.models import TradeGroup
+    from adminPanel.mt5.models import MT5GroupConfig
+
+    for model in (TradeGroup, MT5GroupConfig):
+        post_save.connect(invalidate_db_settings, sender=model, dispatch_uid=f'group_catalog_{model.__name__}_save')
+        post_delete.connect(invalidate_db_settings, sender=model, dispatch_uid=f'group_catalog_{model.__name__}_delete')
@@ -0,0 +1,90 @@
+"""
+Bulk MAM copy control
+Pause, start or reassign copying for all investment accounts of a MAM master
+in one operation instead of one UserGet + UserUpdate round trip per view call.
+
+    operation = create_operation(master, 'pause', user=request.user)
+    run_in_background(operation)        # or run_operation(operation)
+
+- investors are read from TradingAccount.mam_master_account in one query and
+  frozen into operation.results ({login: None} until processed);
+- Agent changes go to MT5 in chunks via MT5ManagerActions.set_agents (batched
+  where the Manager API allows, a bounded pool otherwise);
+- reassigned investors move to the new master in the database one UPDATE per
+  chunk, only for the logins MT5 accepted;
+- progress is saved after every chunk, so resume_operation() continues with
+  the logins that are unprocessed or failed (services/resumable_operation.py).
+"""
+
+import logging
+
+from adminPanel.models import MAMCopyOperation, TradingAccount
+from adminPanel.services.resumable_operation import ResumableOperationRunner
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 200
+
+
+def investor_logins(master):
+    """MT5 logins of the master's investment accounts (one query)."""
+    logins = []
+    for account_id in TradingAccount.objects.filter(mam_master_account=master).values_list('account_id', flat=True):
+        try:
+            logins.append(int(account_id))
+        except (TypeError, ValueError):
+            continue
+    return logins
+
+
+def create_operation(master, action, target_master=None, user=None):
+    if action == 'reassign' and target_master is None:
+        raise ValueError("Reassign needs a target master account")
+    logins = investor_logins(master)
+    return MAMCopyOperation.objects.create(
+        master_account=master,
+        target_master=target_master,
+        action=action,
+        total=len(logins),
+        results={str(login): None for login in logins},
+        created_by=user,
+    )
+
+
+def _agent_for(operation):
+    if operation.action == 'pause':
+        return 0
+    if operation.action == 'start':
+        return int(operation.master_account.account_id)
+    return int(operation.target_master.account_id)
+
+
+class _Runner(ResumableOperationRunner):
+    label = 'mam-copy'
+    chunk_size = CHUNK_SIZE
+
+    def apply_chunk(self, operation, logins, mt5_manager):
+        agent = _agent_for(operation)
+        return mt5_manager.set_agents({login: agent for login in logins}, chunk_size=CHUNK_SIZE)
+
+    def after_chunk(self, operation, succeeded):
+        if operation.action == 'reassign':
+            TradingAccount.objects.filter(account_id__in=succeeded).update(mam_master_account=operation.target_master)
+
+    def describe(self, operation):
+        return f"MAM copy {operation.action} for master {operation.master_account.account_id}"
+
+
+runner = _Runner()
+run_operation = runner.run
+is_resumable = runner.is_resumable
+resume_operation = runner.resume
+run_in_background = runner.run_in_background
+
+
+def operation_summary(operation, include_results=False):
+    return runner.summary(operation, {
+        'master_account': operation.master_account.account_id,
+        'target_master': operation.target_master.account_id if operation.target_master_id else None,
+        'action': operation.action,
+    }, include_results=include_results)
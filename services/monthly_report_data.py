@@ -0,0 +1,192 @@
+"""
+Monthly Report Data Loader
+Loads everything the monthly trade reports need from the database for a whole
+report run in a handful of range-filtered bulk queries, grouped in memory by
+user and trading account. Per-user report generation then only formats data
+that is already loaded.
+
+Date filters use created_at >= start / < end ranges instead of created_at__date
+lookups so the created_at indexes can be used.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import logging
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from adminPanel.models import CommissionTransaction, TradingAccount, Transaction
+
+logger = logging.getLogger(__name__)
+
+DEPOSIT_TYPES = ['deposit_trading', 'credit_in']
+WITHDRAWAL_TYPES = ['withdraw_trading', 'credit_out']
+# Report withdrawals also include commission withdrawals (account-level history does not)
+REPORT_WITHDRAWAL_TYPES = ['withdraw_trading', 'credit_out', 'commission_withdrawal']
+
+
+def _aware_midnight(day):
+    if isinstance(day, datetime):
+        day = day.date()
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()), timezone.get_current_timezone())
+
+
+def month_bounds(report_month):
+    """Return (first_day, last_day) dates of the month containing report_month."""
+    if isinstance(report_month, datetime):
+        report_month = report_month.date()
+    first = report_month.replace(day=1)
+    next_month = first.replace(month=first.month + 1) if first.month < 12 else first.replace(year=first.year + 1, month=1)
+    return first, next_month - timedelta(days=1)
+
+
+class MonthlyReportDataLoader:
+    """
+    Bulk loader for one report month.
+
+    Usage:
+        loader = MonthlyReportDataLoader(year, month, users)
+        loader.load()
+        loader.transactions_for(user)      # approved transactions in the month
+        loader.commissions_for(user)       # IB commissions in the month
+        loader.accounts_for(user)          # user's trading accounts
+        loader.opening_balance(account)    # balance at the start of the month (balance timeline)
+        loader.balance_history(account_id) # sums used to rebuild the opening balance without a timeline
+    """
+
+    def __init__(self, year, month, users=None):
+        self.start_date, self.end_date = month_bounds(date(year, month, 1))
+        self.range_start = _aware_midnight(self.start_date)
+        self.range_end = _aware_midnight(self.end_date + timedelta(days=1))
+        self.users = users
+        self.loaded = False
+        self._transactions = defaultdict(list)
+        self._commissions = defaultdict(list)
+        self._accounts = defaultdict(list)
+        self._balance_history = {}
+        self._opening_balances = {}
+        self._mt5_manager = None
+        self._mt5_failed = False
+
+    def _user_filter(self, field):
+        if self.users is None:
+            return Q()
+        return Q(**{f'{field}__in': self.users})
+
+    def load(self):
+        """Run the bulk queries for the month. Safe to call more than once."""
+        if self.loaded:
+            return self
+
+        accounts = TradingAccount.objects.filter(self._user_filter('user')).order_by('id')
+        for account in accounts:
+            self._accounts[account.user_id].append(account)
+
+        transactions = Transaction.objects.filter(
+            self._user_filter('user'),
+            status='approved',
+            created_at__gte=self.range_start,
+            created_at__lt=self.range_end,
+        ).order_by('created_at')
+        for tx in transactions:
+            self._transactions[tx.user_id].append(tx)
+
+        commissions = CommissionTransaction.objects.filter(
+            self._user_filter('ib_user'),
+            created_at__gte=self.range_start,
+            created_at__lt=self.range_end,
+        ).order_by('created_at')
+        for commission in commissions:
+            self._commissions[commission.ib_user_id].append(commission)
+
+        self._load_balance_history()
+        self._load_opening_balances([account for group in self._accounts.values() for account in group])
+        self.loaded = True
+        logger.info(
+            f"Monthly report data loaded for {self.start_date:%Y-%m}: "
+            f"{sum(len(v) for v in self._accounts.values())} accounts, "
+            f"{sum(len(v) for v in self._transactions.values())} transactions, "
+            f"{sum(len(v) for v in self._commissions.values())} commissions"
+        )
+        return self
+
+    def _load_balance_history(self):
+        """
+        One grouped aggregate over approved account transactions giving, per
+        account, deposits/withdrawals after the first day of the month (to walk
+        back from the current balance) and up to the end of that day (fallback).
+        """
+        cutoff = _aware_midnight(self.start_date + timedelta(days=1))
+        rows = Transaction.objects.filter(
+            self._user_filter('trading_account__user'),
+            status='approved',
+            trading_account__isnull=False,
+        ).order_by().values('trading_account__account_id').annotate(
+            deposits_since=Sum('amount', filter=Q(transaction_type__in=DEPOSIT_TYPES, created_at__gte=cutoff)),
+            withdrawals_since=Sum('amount', filter=Q(transaction_type__in=WITHDRAWAL_TYPES, created_at__gte=cutoff)),
+            deposits_before=Sum('amount', filter=Q(transaction_type__in=DEPOSIT_TYPES, created_at__lt=cutoff)),
+            withdrawals_before=Sum('amount', filter=Q(transaction_type__in=WITHDRAWAL_TYPES, created_at__lt=cutoff)),
+        )
+        for row in rows:
+            self._balance_history[str(row.pop('trading_account__account_id'))] = {
+                key: value or Decimal('0') for key, value in row.items()
+            }
+
+    def _load_opening_balances(self, accounts):
+        """Closing balances of the day before the month for every account, from the balance timeline."""
+        from adminPanel.services.balance_timeline import BalanceTimeline
+
+        try:
+            timeline = BalanceTimeline(self.mt5_manager())
+            self._opening_balances = timeline.balances_at(accounts, self.start_date - timedelta(days=1))
+        except Exception as e:
+            logger.error(f"Balance timeline unavailable for {self.start_date:%Y-%m} reports: {e}")
+            self._opening_balances = {}
+
+    # --- accessors ---------------------------------------------------------
+
+    def accounts_for(self, user):
+        return self._accounts.get(user.id, [])
+
+    def transactions_for(self, user):
+        return self._transactions.get(user.id, [])
+
+    def commissions_for(self, user):
+        return self._commissions.get(user.id, [])
+
+    def opening_balance(self, account):
+        """Balance at the start of the month, or None when the account has no timeline."""
+        return self._opening_balances.get(account.id)
+
+    def balance_history(self, account_id):
+        return self._balance_history.get(str(account_id), {
+            'deposits_since': Decimal('0'),
+            'withdrawals_since': Decimal('0'),
+            'deposits_before': Decimal('0'),
+            'withdrawals_before': Decimal('0'),
+        })
+
+    def mt5_manager(self):
+        """One MT5ManagerActions shared by every report in the run (None if unavailable)."""
+        if self._mt5_manager is None and not self._mt5_failed:
+            try:
+                from adminPanel.mt5.services import MT5ManagerActions
+                self._mt5_manager = MT5ManagerActions()
+            except Exception as e:
+                logger.error(f"Failed to initialize MT5 manager: {str(e)}")
+                self._mt5_failed = True
+        return self._mt5_manager
+
+    def summarize(self, user):
+        """Deposit/withdrawal/commission totals for the user, computed in memory."""
+        transactions = self.transactions_for(user)
+        commissions = self.commissions_for(user)
+        return {
+            'total_deposits': sum((t.amount for t in transactions if t.transaction_type in DEPOSIT_TYPES), Decimal('0')),
+            'total_withdrawals': sum((t.amount for t in transactions if t.transaction_type in REPORT_WITHDRAWAL_TYPES), Decimal('0')),
+            'total_commission_earned': sum((c.commission_to_ib for c in commissions), Decimal('0')),
+            'transaction_count': len(transactions),
+            'commission_count': len(commissions),
+        }
@@ -1,5 +1,4 @@
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from weasyprint import HTML
 import os
 import tempfile
 from datetime import datetime, timedelta
@@ -10,14 +9,17 @@ from django.db.models import Sum, Count, Avg, Q
 from django.utils import timezone
 from adminPanel.models import CustomUser, Transaction, CommissionTransaction, TradingAccount
 from adminPanel.mt5.services import MT5ManagerActions
+from adminPanel.services.balance_timeline import BalanceTimeline
 
-# Try to import pikepdf for PDF encryption, but make it optional
-try:
-    import pikepdf
-    PIKEPDF_AVAILABLE = True
-except ImportError:
-    PIKEPDF_AVAILABLE = False
-    pikepdf = None
+
+
+def _load_pikepdf():
+    """pikepdf (optional, for PDF encryption) imported on first use; None when not installed."""
+    try:
+        import pikepdf
+        return pikepdf
+    except ImportError:
+        return None
 
 logger = logging.getLogger(__name__)
 
@@ -88,7 +90,7 @@ class MonthlyTradeReportGenerator:
                     user_name = getattr(self.user, 'email', 'Unknown User')
                 
                 # Get account ID safely - use primary trading account ID if available
-                primary_account = data['trading_accounts'].first() if data['trading_accounts'] else None
+                primary_account = data['trading_accounts'][0] if data['trading_accounts'] else None
                 if primary_account:
                     account_id = primary_account.account_id
                 else:
@@ -115,6 +117,8 @@ class MonthlyTradeReportGenerator:
 
             # Generate PDF from HTML
             logger.info("Generating PDF from HTML...")
+            # WeasyPrint pulls in its rendering stack; load it only when a report is built
+            from weasyprint import HTML
             HTML(string=html_content, base_url=template_dir).write_pdf(output_path)
             logger.info(f"PDF generated successfully: {output_path}")
             return output_path
@@ -132,15 +136,18 @@ class MonthlyTradeReportGenerator:
         return f"{name_part}{dob_part}"
     """Service class to generate monthly trade reports as password-protected PDFs"""
     
-    def __init__(self, user, report_month):
+    def __init__(self, user, report_month, data_loader=None):
         """
         Initialize the report generator
         
         Args:
             user: CustomUser instance
             report_month: datetime.date object representing the month (YYYY-MM-01)
+            data_loader: Optional loaded MonthlyReportDataLoader for the same month.
+                When given, database data is read from it instead of per-user queries.
         """
         self.user = user
+        self.data_loader = data_loader
         self.report_month = report_month
         self.start_date = report_month
         self.end_date = self._get_month_end_date(report_month)
@@ -161,39 +168,60 @@ class MonthlyTradeReportGenerator:
         """
         try:
             # --- Django ORM for internal data (deposits, withdrawals, commissions) ---
-            trading_accounts = TradingAccount.objects.filter(user=self.user)
-            if not trading_accounts.exists():
+            if self.data_loader is not None:
+                # Report run: everything was bulk-loaded once for all users
+                loader = self.data_loader.load()
+                trading_accounts = loader.accounts_for(self.user)
+                transactions = loader.transactions_for(self.user)
+                commission_transactions = loader.commissions_for(self.user)
+                totals = loader.summarize(self.user)
+                deposit_amount = totals['total_deposits']
+                withdrawal_amount = totals['total_withdrawals']
+                total_commission_earned = totals['total_commission_earned']
+                transaction_count = totals['transaction_count']
+                commission_count = totals['commission_count']
+            else:
+                range_start, range_end = self._get_period_bounds()
+                trading_accounts = list(TradingAccount.objects.filter(user=self.user))
+
+                transactions = list(Transaction.objects.filter(
+                    user=self.user,
+                    created_at__gte=range_start,
+                    created_at__lt=range_end,
+                    status='approved'
+                ).order_by('created_at'))
+
+                commission_transactions = list(CommissionTransaction.objects.filter(
+                    ib_user=self.user,
+                    created_at__gte=range_start,
+                    created_at__lt=range_end
+                ).order_by('created_at'))
+
+                deposit_amount = sum(
+                    (t.amount for t in transactions if t.transaction_type in ['deposit_trading', 'credit_in']),
+                    Decimal('0')
+                )
+                withdrawal_amount = sum(
+                    (t.amount for t in transactions
+                     if t.transaction_type in ['withdraw_trading', 'credit_out', 'commission_withdrawal']),
+                    Decimal('0')
+                )
+                total_commission_earned = sum((c.commission_to_ib for c in commission_transactions), Decimal('0'))
+                transaction_count = len(transactions)
+                commission_count = len(commission_transactions)
+
+            if not trading_accounts:
                 logger.warning(f"No trading accounts found for user {self.user.email}")
-            
-            transactions = Transaction.objects.filter(
-                user=self.user,
-                created_at__date__range=[self.start_date, self.end_date],
-                status='approved'
-            ).order_by('created_at')
-            
-            commission_transactions = CommissionTransaction.objects.filter(
-                ib_user=self.user,
-                created_at__date__range=[self.start_date, self.end_date]
-            ).order_by('created_at')
-
-            deposit_amount = transactions.filter(
-                transaction_type__in=['deposit_trading', 'credit_in']
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-            
-            withdrawal_amount = transactions.filter(
-                transaction_type__in=['withdraw_trading', 'credit_out', 'commission_withdrawal']
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-            
-            total_commission_earned = commission_transactions.aggregate(
-                total=Sum('commission_to_ib')
-            )['total'] or Decimal('0')
 
             # --- MT5 Integration for balances and trades ---
             mt5_manager = None
-            try:
-                mt5_manager = MT5ManagerActions()
-            except Exception as e:
-                logger.error(f"Failed to initialize MT5 manager: {str(e)}")
+            if self.data_loader is not None:
+                mt5_manager = self.data_loader.mt5_manager()
+            else:
+                try:
+                    mt5_manager = MT5ManagerActions()
+                except Exception as e:
+                    logger.error(f"Failed to initialize MT5 manager: {str(e)}")
             
             trading_positions = []
             starting_balance = Decimal('0')
@@ -222,7 +250,7 @@ class MonthlyTradeReportGenerator:
                         current_equity = Decimal(str(account_equity)) if account_equity else current_balance
                         
                         # Get historical starting balance (balance at start of month)
-                        account_starting_balance = self._get_historical_balance(account.account_id, self.start_date, current_balance)
+                        account_starting_balance = self._get_opening_balance(account, mt5_manager, current_balance)
                         
                         starting_balance += account_starting_balance
                         ending_balance += current_equity
@@ -298,8 +326,8 @@ class MonthlyTradeReportGenerator:
                     'total_withdrawals': withdrawal_amount,
                     'total_commission_earned': total_commission_earned,
                     'net_balance_change': net_balance_change,
-                    'transaction_count': transactions.count(),
-                    'commission_count': commission_transactions.count()
+                    'transaction_count': transaction_count,
+                    'commission_count': commission_count
                 }
             }
         
@@ -600,24 +628,35 @@ class MonthlyTradeReportGenerator:
             logger.error(f"Error fetching MT5 trades for account {account_id}: {str(e)}")
             return []
 
+    def _get_opening_balance(self, account, mt5_manager, current_balance):
+        """
+        Balance at the start of the report month from the balance timeline.
+        Falls back to walking back from the current balance when the account has no timeline.
+        """
+        opening = None
+        if self.data_loader is not None:
+            opening = self.data_loader.load().opening_balance(account)
+        else:
+            try:
+                day_before = (self.start_date.date() if isinstance(self.start_date, datetime) else self.start_date) - timedelta(days=1)
+                opening = BalanceTimeline(mt5_manager).balance_at(account, day_before)
+            except Exception as e:
+                logger.warning(f"Balance timeline lookup failed for account {account.account_id}: {e}")
+        if opening is not None:
+            return opening
+        return self._get_historical_balance(account.account_id, self.start_date, current_balance)
+
     def _get_historical_balance(self, account_id, date, current_balance=None):
         """
         Get historical balance for an account at a specific date.
         This calculates what the balance should have been at the start of the reporting period.
         """
         try:
-            # Get transactions since the specified date to work backwards from current balance
-            transactions_since_date = Transaction.objects.filter(
-                trading_account__account_id=account_id,
-                created_at__date__gt=date,
-                status='approved'
-            ).aggregate(
-                deposits_since=Sum('amount', filter=Q(transaction_type__in=['deposit_trading', 'credit_in'])),
-                withdrawals_since=Sum('amount', filter=Q(transaction_type__in=['withdraw_trading', 'credit_out']))
-            )
-            
-            deposits_since = transactions_since_date['deposits_since'] or Decimal('0')
-            withdrawals_since = transactions_since_date['withdrawals_since'] or Decimal('0')
+            # Deposits/withdrawals after `date` and up to the end of `date`, either
+            # precomputed for the whole report run or aggregated in one query here
+            history = self._get_balance_history(account_id, date)
+            deposits_since = history['deposits_since']
+            withdrawals_since = history['withdrawals_since']
             
             # If we have a current balance, work backwards
             if current_balance is not None and current_balance > 0:
@@ -647,17 +686,8 @@ class MonthlyTradeReportGenerator:
                 return calculated_starting
             
             # Fallback: Get all transactions up to the specified date
-            historical_transactions = Transaction.objects.filter(
-                trading_account__account_id=account_id,
-                created_at__date__lte=date,
-                status='approved'
-            ).aggregate(
-                deposits=Sum('amount', filter=Q(transaction_type__in=['deposit_trading', 'credit_in'])),
-                withdrawals=Sum('amount', filter=Q(transaction_type__in=['withdraw_trading', 'credit_out']))
-            )
-            
-            deposits = historical_transactions['deposits'] or Decimal('0')
-            withdrawals = historical_transactions['withdrawals'] or Decimal('0')
+            deposits = history['deposits_before']
+            withdrawals = history['withdrawals_before']
             
             calculated_balance = deposits - withdrawals
             
@@ -676,6 +706,41 @@ class MonthlyTradeReportGenerator:
                 return Decimal(str(current_balance)) * Decimal('0.9')  # Conservative estimate
             return Decimal('0')
 
+    def _get_period_bounds(self):
+        """Aware [start, end) datetimes of the report month, for index-friendly range filters."""
+        tz = timezone.get_current_timezone()
+        start = self.start_date.date() if isinstance(self.start_date, datetime) else self.start_date
+        end = self.end_date.date() if isinstance(self.end_date, datetime) else self.end_date
+        return (
+            timezone.make_aware(datetime.combine(start, datetime.min.time()), tz),
+            timezone.make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time()), tz),
+        )
+
+    def _get_balance_history(self, account_id, date):
+        """
+        Approved deposit/withdrawal sums for an account split at the end of `date`.
+        Uses the report-run loader when it covers the same date.
+        """
+        day = date.date() if isinstance(date, datetime) else date
+        if self.data_loader is not None and self.data_loader.start_date == day:
+            return self.data_loader.load().balance_history(account_id)
+
+        cutoff = timezone.make_aware(
+            datetime.combine(day + timedelta(days=1), datetime.min.time()), timezone.get_current_timezone()
+        )
+        deposit_q = Q(transaction_type__in=['deposit_trading', 'credit_in'])
+        withdrawal_q = Q(transaction_type__in=['withdraw_trading', 'credit_out'])
+        totals = Transaction.objects.filter(
+            trading_account__account_id=account_id,
+            status='approved'
+        ).aggregate(
+            deposits_since=Sum('amount', filter=deposit_q & Q(created_at__gte=cutoff)),
+            withdrawals_since=Sum('amount', filter=withdrawal_q & Q(created_at__gte=cutoff)),
+            deposits_before=Sum('amount', filter=deposit_q & Q(created_at__lt=cutoff)),
+            withdrawals_before=Sum('amount', filter=withdrawal_q & Q(created_at__lt=cutoff)),
+        )
+        return {key: value or Decimal('0') for key, value in totals.items()}
+
     def _format_mt5_time(self, timestamp):
         """Format MT5 timestamp to readable string."""
         try:
@@ -871,7 +936,8 @@ class MonthlyTradeReportGenerator:
             str: Path to the encrypted PDF file
         """
         try:
-            if not PIKEPDF_AVAILABLE:
+            pikepdf = _load_pikepdf()
+            if pikepdf is None:
                 logger.warning("pikepdf not available, returning unencrypted PDF")
                 return input_path
                 
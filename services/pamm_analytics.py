@@ -0,0 +1,348 @@
+"""
+PAMM Analytics Queries
+Annotated querysets behind the admin PAMM tables and statistics.
+
+Every per-PAMM / per-investor figure (participant totals, investor counts,
+transaction counts, profit) is computed by the database as a correlated
+Subquery annotation, so a page of the table costs a fixed number of queries
+no matter how many PAMMs or investors exist. Sorting happens on the
+annotations and pagination is applied in SQL.
+"""
+
+from decimal import Decimal
+
+from django.db.models import (
+    Case, Count, DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Prefetch, Q,
+    Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+
+from adminPanel.models_pamm import PAMMAccount, PAMMParticipant, PAMMTransaction
+
+MONEY = DecimalField(max_digits=20, decimal_places=2)
+UNITS = DecimalField(max_digits=20, decimal_places=8)
+PRICE = DecimalField(max_digits=28, decimal_places=8)
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 200
+
+DEPOSIT_TYPES = ['MANAGER_DEPOSIT', 'INVESTOR_DEPOSIT']
+WITHDRAW_TYPES = ['MANAGER_WITHDRAW', 'INVESTOR_WITHDRAW']
+
+
+def _sum_subquery(queryset, group_field, field, output_field=MONEY):
+    values = queryset.order_by().values(group_field).annotate(total=Sum(field)).values('total')
+    return Coalesce(Subquery(values, output_field=output_field), Value(Decimal('0')), output_field=output_field)
+
+
+def _count_subquery(queryset, group_field):
+    values = queryset.order_by().values(group_field).annotate(c=Count('pk')).values('c')
+    return Coalesce(Subquery(values, output_field=IntegerField()), Value(0))
+
+
+def parse_pagination(query_params):
+    """(page, page_size) from query params, clamped to sane bounds."""
+    try:
+        page = max(int(query_params.get('page', 1)), 1)
+    except (TypeError, ValueError):
+        page = 1
+    try:
+        page_size = int(query_params.get('page_size', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        page_size = DEFAULT_PAGE_SIZE
+    return page, min(max(page_size, 1), MAX_PAGE_SIZE)
+
+
+def apply_sort(queryset, query_params, sort_fields, default):
+    """
+    Order by ?sort_by=<key>&sort_order=asc|desc where key is one of sort_fields
+    (public name -> ORM expression). Unknown keys fall back to the default.
+    A trailing pk keeps page boundaries stable for equal sort values.
+    """
+    sort_by = query_params.get('sort_by') or ''
+    field = sort_fields.get(sort_by, default)
+    descending = (query_params.get('sort_order') or 'desc').lower() != 'asc'
+    prefix = '-' if descending else ''
+    return queryset.order_by(f'{prefix}{field}', f'{prefix}pk')
+
+
+def paginate(queryset, page, page_size):
+    start = (page - 1) * page_size
+    return queryset[start:start + page_size]
+
+
+# --- PAMM accounts table ---------------------------------------------------
+
+PAMM_SORT_FIELDS = {
+    'name': 'name',
+    'created_at': 'created_at',
+    'status': 'status',
+    'pool_balance': 'total_equity',
+    'total_units': 'total_units',
+    'profit_share': 'profit_share',
+    'unit_price': 'unit_price_value',
+    'investor_count': 'investor_count_value',
+    'total_deposited': 'total_deposited_value',
+    'total_withdrawn': 'total_withdrawn_value',
+    'net_invested': 'net_invested_value',
+    'total_profit': 'total_profit_value',
+    'total_transactions': 'transaction_count_value',
+    'last_equity_update': 'last_equity_update',
+}
+
+
+def pamm_table_queryset(search=''):
+    """PAMMAccount rows annotated with every figure the accounts table shows."""
+    pamm_participants = PAMMParticipant.objects.filter(pamm=OuterRef('pk'))
+    pamm_transactions = PAMMTransaction.objects.filter(pamm=OuterRef('pk'))
+
+    queryset = PAMMAccount.objects.select_related('manager').annotate(
+        total_deposited_value=_sum_subquery(pamm_participants, 'pamm', 'total_deposited'),
+        total_withdrawn_value=_sum_subquery(pamm_participants, 'pamm', 'total_withdrawn'),
+        manager_units_value=_sum_subquery(pamm_participants.filter(role='MANAGER'), 'pamm', 'units', UNITS),
+        investor_count_value=_count_subquery(pamm_participants.filter(role='INVESTOR', units__gt=0), 'pamm'),
+        transaction_count_value=_count_subquery(pamm_transactions, 'pamm'),
+        deposit_count_value=_count_subquery(pamm_transactions.filter(transaction_type__in=DEPOSIT_TYPES), 'pamm'),
+        withdrawal_count_value=_count_subquery(pamm_transactions.filter(transaction_type__in=WITHDRAW_TYPES), 'pamm'),
+    ).annotate(
+        net_invested_value=ExpressionWrapper(
+            F('total_deposited_value') - F('total_withdrawn_value'), output_field=MONEY
+        ),
+        unit_price_value=Case(
+            When(total_units=0, then=Value(Decimal('1'))),
+            default=ExpressionWrapper(F('total_equity') / F('total_units'), output_field=PRICE),
+            output_field=PRICE,
+        ),
+    ).annotate(
+        total_profit_value=ExpressionWrapper(F('total_equity') - F('net_invested_value'), output_field=MONEY),
+    )
+
+    if search:
+        queryset = queryset.filter(
+            Q(name__icontains=search) |
+            Q(manager__email__icontains=search) |
+            Q(mt5_account_id__icontains=search) |
+            Q(manager__first_name__icontains=search) |
+            Q(manager__last_name__icontains=search)
+        )
+    return queryset
+
+
+def with_participants(queryset):
+    """Prefetch participants (and their users) for a page of PAMMs in one extra query."""
+    return queryset.prefetch_related(
+        Prefetch('participants', queryset=PAMMParticipant.objects.select_related('user'))
+    )
+
+
+def _display_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.email
+
+
+def serialize_pamm_row(pamm, include_participants=True):
+    """Table row for an annotated (and optionally participant-prefetched) PAMMAccount."""
+    unit_price = pamm.unit_price_value
+    net_invested = pamm.net_invested_value
+    total_profit = float(pamm.total_profit_value)
+    profit_percentage = (total_profit / float(net_invested) * 100) if net_invested > 0 else 0
+    unit_price_float = float(unit_price)
+    unit_price_change = ((unit_price_float - 1.0) / 1.0 * 100) if unit_price_float > 0 else 0
+
+    row = {
+        'id': pamm.id,
+        'name': pamm.name,
+        'manager_name': _display_name(pamm.manager),
+        'manager_email': pamm.manager.email,
+        'manager_id': pamm.manager.id,
+        'mt5_login': pamm.mt5_account_id,
+        'pool_balance': float(pamm.total_equity),
+        'manager_capital': float(pamm.manager_units_value * unit_price),
+        'total_profit': total_profit,
+        'profit_percentage': round(profit_percentage, 2),
+        'profit_share': float(pamm.profit_share),
+        'leverage': pamm.leverage,
+        'risk_level': 'Medium',  # Placeholder
+        'payout_frequency': 'Monthly',  # Placeholder
+        'account_id': pamm.mt5_account_id,
+        'is_enabled': pamm.is_accepting_investors,
+        'status': pamm.status,
+        'investor_count': pamm.investor_count_value,
+        'created_at': pamm.created_at.isoformat() if pamm.created_at else None,
+        'last_equity_update': pamm.last_equity_update.isoformat() if pamm.last_equity_update else None,
+
+        # Unit-based metrics
+        'total_units': float(pamm.total_units),
+        'unit_price': unit_price_float,
+        'unit_price_change_pct': round(unit_price_change, 2),
+        'high_water_mark': float(pamm.high_water_mark),
+
+        # Financial summary
+        'total_deposited': float(pamm.total_deposited_value),
+        'total_withdrawn': float(pamm.total_withdrawn_value),
+        'net_invested': float(net_invested),
+
+        # Transaction stats
+        'total_transactions': pamm.transaction_count_value,
+        'total_deposits': pamm.deposit_count_value,
+        'total_withdrawals': pamm.withdrawal_count_value,
+    }
+
+    if include_participants:
+        participant_details = []
+        for p in pamm.participants.all():
+            current_balance = p.units * unit_price
+            net = p.total_deposited - p.total_withdrawn
+            participant_details.append({
+                'user_id': p.user.id,
+                'email': p.user.email,
+                'name': _display_name(p.user),
+                'role': p.role,
+                'units': float(p.units),
+                'current_balance': float(current_balance),
+                'total_deposited': float(p.total_deposited),
+                'total_withdrawn': float(p.total_withdrawn),
+                'net_invested': float(net),
+                'profit_loss': float(current_balance - net),
+                'share_percentage': float(p.units / pamm.total_units * 100) if pamm.total_units else 0.0,
+                'joined_at': p.joined_at.isoformat() if p.joined_at else None,
+            })
+        row['participants'] = participant_details
+        row['participant_count'] = len(participant_details)
+    return row
+
+
+# --- PAMM investors table --------------------------------------------------
+
+INVESTOR_SORT_FIELDS = {
+    'joined_at': 'joined_at',
+    'last_transaction_at': 'last_transaction_at',
+    'investor_email': 'user__email',
+    'pamm_name': 'pamm__name',
+    'units': 'units',
+    'amount_invested': 'total_deposited',
+    'total_withdrawn': 'total_withdrawn',
+    'net_invested': 'net_invested_value',
+    'current_value': 'current_value_value',
+    'net_profit_loss': 'profit_loss_value',
+    'total_transactions': 'transaction_count_value',
+}
+
+
+def investor_table_queryset(search=''):
+    """Investor participants annotated with value, P/L and transaction counts."""
+    participant_transactions = PAMMTransaction.objects.filter(participant=OuterRef('pk'))
+
+    queryset = PAMMParticipant.objects.filter(role='INVESTOR').select_related(
+        'user', 'pamm', 'pamm__manager'
+    ).annotate(
+        transaction_count_value=_count_subquery(participant_transactions, 'participant'),
+        deposit_count_value=_count_subquery(
+            participant_transactions.filter(transaction_type='INVESTOR_DEPOSIT'), 'participant'
+        ),
+        withdrawal_count_value=_count_subquery(
+            participant_transactions.filter(transaction_type='INVESTOR_WITHDRAW'), 'participant'
+        ),
+        net_invested_value=ExpressionWrapper(F('total_deposited') - F('total_withdrawn'), output_field=MONEY),
+        current_value_value=Case(
+            When(pamm__total_units=0, then=F('units')),
+            default=ExpressionWrapper(
+                F('units') * F('pamm__total_equity') / F('pamm__total_units'), output_field=PRICE
+            ),
+            output_field=PRICE,
+        ),
+    ).annotate(
+        profit_loss_value=ExpressionWrapper(F('current_value_value') - F('net_invested_value'), output_field=PRICE),
+    )
+
+    if search:
+        queryset = queryset.filter(
+            Q(user__email__icontains=search) |
+            Q(user__first_name__icontains=search) |
+            Q(user__last_name__icontains=search) |
+            Q(pamm__name__icontains=search) |
+            Q(pamm__manager__email__icontains=search)
+        )
+    return queryset
+
+
+def serialize_investor_row(participant):
+    pamm = participant.pamm
+    user = participant.user
+    unit_price = pamm.unit_price()
+    current_value = participant.units * unit_price
+    net_invested = participant.total_deposited - participant.total_withdrawn
+    profit_loss = current_value - net_invested
+    # ROI based on original investment (total_deposited) rather than net_invested
+    # This gives consistent ROI even when withdrawals exceed deposits
+    roi_percentage = (float(profit_loss) / float(participant.total_deposited) * 100) if participant.total_deposited > 0 else 0
+    share_percentage = (participant.units / pamm.total_units * 100) if pamm.total_units else Decimal('0.00')
+
+    return {
+        'id': participant.id,
+        'user_id': user.id,
+        'investor_name': _display_name(user),
+        'investor_email': user.email,
+        'investorEmail': user.email,  # Legacy field
+
+        # PAMM details
+        'pamm_id': pamm.id,
+        'pamm_name': pamm.name,
+        'manager_name': _display_name(pamm.manager),
+        'manager_email': pamm.manager.email,
+        'pamm_mt5_login': pamm.mt5_account_id,
+        'tradingAccountId': pamm.mt5_account_id,
+
+        # Financial details
+        'amount': float(participant.total_deposited),
+        'amountInvested': float(participant.total_deposited),  # Legacy
+        'amount_invested': float(participant.total_deposited),
+        'total_withdrawn': float(participant.total_withdrawn),
+        'net_invested': float(net_invested),
+        'current_value': float(current_value),
+        'net_profit_loss': float(profit_loss),
+        'profit': float(profit_loss),  # Legacy
+        'roi_percentage': round(roi_percentage, 2),
+
+        # Unit-based data
+        'units': float(participant.units),
+        'share_percentage': float(share_percentage),
+        'unit_price': float(unit_price),
+
+        # Transaction stats
+        'total_transactions': participant.transaction_count_value,
+        'total_deposits': participant.deposit_count_value,
+        'total_withdrawals': participant.withdrawal_count_value,
+
+        # Metadata
+        'joined_at': participant.joined_at.isoformat() if participant.joined_at else None,
+        'last_transaction_at': participant.last_transaction_at.isoformat() if participant.last_transaction_at else None,
+        'is_enabled': True,  # Investors don't have individual enable/disable
+        'pam_account': pamm.id,
+        'investor': user.id,
+    }
+
+
+# --- Statistics ------------------------------------------------------------
+
+def pamm_statistics():
+    """Overall PAMM statistics in three aggregate queries."""
+    accounts = PAMMAccount.objects.aggregate(
+        total_pamms=Count('pk'),
+        active_pamms=Count('pk', filter=Q(status='ACTIVE')),
+        total_equity=Sum('total_equity'),
+    )
+    total_investors = PAMMParticipant.objects.filter(role='INVESTOR', units__gt=0).count()
+    pending = PAMMTransaction.objects.filter(status='PENDING').aggregate(
+        pending_transactions=Count('pk'),
+        pending_deposits=Sum('amount', filter=Q(transaction_type__in=DEPOSIT_TYPES)),
+        pending_withdrawals=Sum('amount', filter=Q(transaction_type__in=WITHDRAW_TYPES)),
+    )
+    return {
+        'total_pamms': accounts['total_pamms'],
+        'active_pamms': accounts['active_pamms'],
+        'total_equity': accounts['total_equity'] or Decimal('0.00'),
+        'total_investors': total_investors,
+        'pending_transactions': pending['pending_transactions'],
+        'pending_deposits': pending['pending_deposits'] or Decimal('0.00'),
+        'pending_withdrawals': pending['pending_withdrawals'] or Decimal('0.00'),
+    }
@@ -0,0 +1,239 @@
+"""
+PAMM Equity Sync
+Pulls equity for every active PAMM from MT5 and keeps downsampled history.
+
+One cycle:
+    1. one batched MT5 request (UserAccountGetByLogins) for all PAMM logins;
+    2. one transaction that locks the PAMM rows whose equity moved, writes them
+       with a single bulk_update and upserts their minute / hour / day rollups
+       (one select, one bulk_create, one bulk_update).
+
+Equity-only moves no longer write a PAMMEquitySnapshot per update; raw
+snapshots are kept for unit events (deposits, withdrawals, fees) and charts
+read PAMMEquityRollup at a resolution matching the requested span.
+
+Retention: minute rollups for MINUTE_RETENTION, hour rollups for
+HOUR_RETENTION, day rollups are kept.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from adminPanel.models_pamm import PAMMAccount, PAMMEquityRollup, PAMMEquitySnapshot
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ('MINUTE', 'HOUR', 'DAY')
+MINUTE_RETENTION = timedelta(days=2)
+HOUR_RETENTION = timedelta(days=90)
+RETENTION = {'MINUTE': MINUTE_RETENTION, 'HOUR': HOUR_RETENTION, 'DAY': None}
+
+# Finest resolution used for a chart spanning up to this long
+RESOLUTION_SPANS = (
+    (timedelta(hours=6), 'MINUTE'),
+    (timedelta(days=14), 'HOUR'),
+)
+
+ROLLUP_FIELDS = ['high_equity', 'low_equity', 'close_equity', 'total_units', 'unit_price', 'updated_at']
+CENT = Decimal('0.01')
+
+
+def bucket_start(moment, resolution):
+    """Start of the minute / hour / day bucket containing moment."""
+    moment = moment.replace(second=0, microsecond=0)
+    if resolution == 'MINUTE':
+        return moment
+    moment = moment.replace(minute=0)
+    if resolution == 'HOUR':
+        return moment
+    return moment.replace(hour=0)
+
+
+def resolution_for_span(span):
+    for limit, resolution in RESOLUTION_SPANS:
+        if span <= limit:
+            return resolution
+    return 'DAY'
+
+
+def _login(pamm):
+    try:
+        return int(pamm.mt5_account_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_mt5_equities(pamms, mt5_manager=None):
+    """{pamm_id: Decimal equity} for the given PAMMs from one batched MT5 request."""
+    by_login = {}
+    for pamm in pamms:
+        login = _login(pamm)
+        if login is not None:
+            by_login[login] = pamm.id
+    if not by_login:
+        return {}
+
+    if mt5_manager is None:
+        from adminPanel.mt5.services import MT5ManagerActions
+        mt5_manager = MT5ManagerActions()
+    accounts = mt5_manager.get_accounts_data(list(by_login), use_cache=False)
+
+    missing = len(by_login) - len(accounts)
+    if missing:
+        logger.warning(f"PAMM equity sync: {missing} PAMM MT5 account(s) not returned by MT5")
+    return {
+        by_login[login]: Decimal(str(data['equity'])).quantize(CENT)
+        for login, data in accounts.items()
+        if login in by_login
+    }
+
+
+def record_rollups(pamms, moment=None):
+    """
+    Fold the current equity of each PAMM into its minute, hour and day buckets.
+    Call inside the transaction that wrote the equity (rows locked).
+    """
+    pamms = list(pamms)
+    if not pamms:
+        return 0
+    moment = moment or timezone.now()
+    buckets = {resolution: bucket_start(moment, resolution) for resolution in RESOLUTIONS}
+
+    bucket_filter = Q()
+    for resolution, start in buckets.items():
+        bucket_filter |= Q(resolution=resolution, bucket_start=start)
+    existing = {
+        (rollup.pamm_id, rollup.resolution): rollup
+        for rollup in PAMMEquityRollup.objects.filter(bucket_filter, pamm_id__in=[p.id for p in pamms])
+    }
+
+    created, updated = [], []
+    for pamm in pamms:
+        equity = pamm.total_equity
+        unit_price = pamm.unit_price()
+        for resolution, start in buckets.items():
+            rollup = existing.get((pamm.id, resolution))
+            if rollup is None:
+                created.append(PAMMEquityRollup(
+                    pamm=pamm,
+                    resolution=resolution,
+                    bucket_start=start,
+                    open_equity=equity,
+                    high_equity=equity,
+                    low_equity=equity,
+                    close_equity=equity,
+                    total_units=pamm.total_units,
+                    unit_price=unit_price,
+                    updated_at=moment,
+                ))
+                continue
+            rollup.high_equity = max(rollup.high_equity, equity)
+            rollup.low_equity = min(rollup.low_equity, equity)
+            rollup.close_equity = equity
+            rollup.total_units = pamm.total_units
+            rollup.unit_price = unit_price
+            rollup.updated_at = moment
+            updated.append(rollup)
+
+    if created:
+        PAMMEquityRollup.objects.bulk_create(created, batch_size=1000)
+    if updated:
+        PAMMEquityRollup.objects.bulk_update(updated, ROLLUP_FIELDS, batch_size=1000)
+    return len(created) + len(updated)
+
+
+def apply_equities(equities, moment=None):
+    """
+    Write {pamm_id: equity} in one transaction. PAMMs whose equity did not move
+    are left alone, so their rollups are not rewritten either.
+    Returns the PAMMs that changed.
+    """
+    if not equities:
+        return []
+    moment = moment or timezone.now()
+
+    with transaction.atomic():
+        pamms = list(
+            PAMMAccount.objects.select_for_update()
+            .filter(id__in=list(equities))
+            .order_by('id')
+        )
+        changed = []
+        for pamm in pamms:
+            equity = equities[pamm.id]
+            if equity == pamm.total_equity:
+                continue
+            pamm.total_equity = equity
+            pamm.last_equity_update = moment
+            pamm.updated_at = moment
+            changed.append(pamm)
+
+        if changed:
+            PAMMAccount.objects.bulk_update(changed, ['total_equity', 'last_equity_update', 'updated_at'])
+            record_rollups(changed, moment)
+    return changed
+
+
+def prune_rollups(moment=None):
+    """Delete minute and hour rollups past their retention. Returns rows deleted."""
+    moment = moment or timezone.now()
+    deleted = 0
+    for resolution, retention in RETENTION.items():
+        if retention is None:
+            continue
+        count, _ = PAMMEquityRollup.objects.filter(
+            resolution=resolution,
+            bucket_start__lt=moment - retention,
+        ).delete()
+        deleted += count
+    return deleted
+
+
+def sync_pamm_equities(mt5_manager=None):
+    """Run one sync cycle over every active PAMM with an MT5 account."""
+    pamms = list(
+        PAMMAccount.objects.filter(status='ACTIVE', mt5_account_id__isnull=False)
+        .only('id', 'mt5_account_id')
+    )
+    equities = read_mt5_equities(pamms, mt5_manager)
+    changed = apply_equities(equities)
+    return {
+        'pamms': len(pamms),
+        'read': len(equities),
+        'changed': len(changed),
+    }
+
+
+def equity_history(pamm, resolution='RAW', span=None, limit=100):
+    """
+    Chart points for a PAMM, newest first.
+    resolution: RAW (unit-event snapshots, the default), MINUTE, HOUR, DAY or AUTO
+    (picked from span). A rollup resolution with no rows yet (sync not running)
+    falls back to RAW. Returns (resolution, points).
+    """
+    resolution = (resolution or 'RAW').upper()
+    since = timezone.now() - span if span else None
+
+    if resolution == 'AUTO':
+        resolution = resolution_for_span(span) if span else 'HOUR'
+
+    if resolution != 'RAW':
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {('AUTO', 'RAW') + RESOLUTIONS}")
+        queryset = PAMMEquityRollup.objects.filter(pamm=pamm, resolution=resolution)
+        if since:
+            queryset = queryset.filter(bucket_start__gte=bucket_start(since, resolution))
+        points = list(queryset[:limit])
+        if points or PAMMEquityRollup.objects.filter(pamm=pamm, resolution=resolution).exists():
+            return resolution, points
+        resolution = 'RAW'
+
+    queryset = PAMMEquitySnapshot.objects.filter(pamm=pamm).select_related('pamm')
+    if since:
+        queryset = queryset.filter(timestamp__gte=since)
+    return resolution, queryset[:limit]
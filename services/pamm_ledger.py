@@ -0,0 +1,259 @@
+"""
+PAMM Ledger Engine
+Unit accounting for one PAMM pool held as parallel arrays.
+
+Participant units, deposited and withdrawn totals are kept as fixed-point
+integers (units in 1e-8, money in cents) in lists indexed by participant, so
+an event touching many participants (a batch of approvals, a balance
+read-out) is one pass over the arrays instead of a model round-trip per
+participant. Integer arithmetic keeps results exact; every
+division rounds half-to-even at the model field's precision, matching how
+DecimalField quantizes on save.
+
+Each event is persisted with one bulk write per table via save():
+participants (bulk_update of the rows that changed), the PAMM row,
+transactions (bulk_update) and a single equity snapshot computed from the
+arrays.
+
+Usage:
+    with transaction.atomic():
+        ledger = PAMMLedger.load(pamm_id)            # row locks on PAMM + participants
+        units = ledger.apply_deposits([(participant_id, Decimal('100.00')), ...])
+        ledger.save(transactions=[...])
+"""
+
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from adminPanel.models_pamm import PAMMAccount, PAMMEquitySnapshot, PAMMParticipant, PAMMTransaction
+
+UNIT_PLACES = 8
+MONEY_PLACES = 2
+UNIT_SCALE = 10 ** UNIT_PLACES
+MONEY_SCALE = 10 ** MONEY_PLACES
+# Units per cent at the initial unit price of 1.0
+UNITS_PER_CENT = UNIT_SCALE // MONEY_SCALE
+
+PARTICIPANT_FIELDS = ['units', 'total_deposited', 'total_withdrawn', 'last_transaction_at']
+TRANSACTION_FIELDS = [
+    'units_added', 'units_removed', 'unit_price_at_transaction', 'status',
+    'approved_by', 'approved_at', 'completed_at', 'rejection_reason',
+]
+BULK_BATCH_SIZE = 1000
+
+
+def to_fixed(value, places):
+    """Decimal-compatible value -> integer scaled by 10**places (half-even)."""
+    return int((Decimal(str(value)) * (10 ** places)).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def from_fixed(value, places):
+    return Decimal(value).scaleb(-places)
+
+
+def div_round(numerator, denominator):
+    """Integer division rounded half-to-even (denominator > 0)."""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+class PAMMLedger:
+    def __init__(self, total_equity, total_units, participant_ids, roles, units, deposited, withdrawn,
+                 high_water_mark=Decimal('0'), profit_share=Decimal('0'), pamm=None, participants=None):
+        """
+        Money/unit arguments are Decimals (or anything Decimal() accepts);
+        per-participant arguments are parallel sequences.
+        """
+        self.pamm = pamm
+        self.participants = participants or []
+        self.participant_ids = list(participant_ids)
+        self.roles = list(roles)
+        self.index = {pid: i for i, pid in enumerate(self.participant_ids)}
+        self.units = [to_fixed(u, UNIT_PLACES) for u in units]
+        self.deposited = [to_fixed(d, MONEY_PLACES) for d in deposited]
+        self.withdrawn = [to_fixed(w, MONEY_PLACES) for w in withdrawn]
+        self.total_equity = to_fixed(total_equity, MONEY_PLACES)
+        self.total_units = to_fixed(total_units, UNIT_PLACES)
+        self.high_water_mark = to_fixed(high_water_mark, MONEY_PLACES)
+        self.profit_share = Decimal(str(profit_share))
+        self.dirty = set()
+
+    @classmethod
+    def load(cls, pamm_id, lock=True):
+        """Load a PAMM and all its participants. With lock=True call inside transaction.atomic()."""
+        pamms = PAMMAccount.objects.select_for_update() if lock else PAMMAccount.objects
+        try:
+            pamm = pamms.get(id=pamm_id)
+        except PAMMAccount.DoesNotExist:
+            raise ValidationError("PAMM account not found")
+        participants = PAMMParticipant.objects.filter(pamm=pamm).order_by('id')
+        if lock:
+            participants = participants.select_for_update()
+        participants = list(participants)
+        return cls(
+            total_equity=pamm.total_equity,
+            total_units=pamm.total_units,
+            participant_ids=[p.id for p in participants],
+            roles=[p.role for p in participants],
+            units=[p.units for p in participants],
+            deposited=[p.total_deposited for p in participants],
+            withdrawn=[p.total_withdrawn for p in participants],
+            high_water_mark=pamm.high_water_mark,
+            profit_share=pamm.profit_share,
+            pamm=pamm,
+            participants=participants,
+        )
+
+    # --- read-outs --------------------------------------------------------
+
+    def unit_price(self):
+        """Current unit price (1.0 while no units exist), rounded to 8 places."""
+        if self.total_units == 0:
+            return Decimal('1').quantize(Decimal(1).scaleb(-UNIT_PLACES))
+        # equity cents -> price in 1e-8: equity * 1e8 / units, units already scaled by 1e8
+        return from_fixed(div_round(self.total_equity * UNIT_SCALE * UNIT_SCALE // MONEY_SCALE, self.total_units), UNIT_PLACES)
+
+    def balances(self):
+        """Current value of every participant's units (Decimal cents), in participant order."""
+        if self.total_units == 0:
+            return [Decimal('0.00')] * len(self.units)
+        equity, total = self.total_equity, self.total_units
+        return [from_fixed(div_round(u * equity, total), MONEY_PLACES) for u in self.units]
+
+    def profit_losses(self):
+        balances = self.balances()
+        return [
+            balance - from_fixed(d - w, MONEY_PLACES)
+            for balance, d, w in zip(balances, self.deposited, self.withdrawn)
+        ]
+
+    def snapshot_values(self):
+        manager_units = sum(u for u, role in zip(self.units, self.roles) if role == 'MANAGER')
+        investor_units = sum(u for u, role in zip(self.units, self.roles) if role == 'INVESTOR')
+        investor_count = sum(1 for u, role in zip(self.units, self.roles) if role == 'INVESTOR' and u > 0)
+        return {
+            'equity': from_fixed(self.total_equity, MONEY_PLACES),
+            'total_units': from_fixed(self.total_units, UNIT_PLACES),
+            'unit_price': self.unit_price(),
+            'manager_units': from_fixed(manager_units, UNIT_PLACES),
+            'investor_units': from_fixed(investor_units, UNIT_PLACES),
+            'investor_count': investor_count,
+        }
+
+    # --- events -----------------------------------------------------------
+
+    def _units_for_cents(self, cents):
+        if self.total_units == 0:
+            return cents * UNITS_PER_CENT
+        if self.total_equity <= 0:
+            raise ValidationError("PAMM equity is zero; unit price is undefined")
+        return div_round(cents * self.total_units, self.total_equity)
+
+    def _position(self, participant_id):
+        try:
+            return self.index[participant_id]
+        except KeyError:
+            raise ValidationError(f"Participant {participant_id} does not belong to this PAMM")
+
+    def apply_deposits(self, entries):
+        """
+        entries: [(participant_id, amount)]. All deposits of the batch are priced
+        at the current unit price (a deposit at that price does not move it).
+        Returns the units added per entry as Decimals.
+        """
+        positions = [self._position(pid) for pid, _ in entries]
+        cents = [to_fixed(amount, MONEY_PLACES) for _, amount in entries]
+        if any(c <= 0 for c in cents):
+            raise ValidationError("Deposit amount must be positive")
+        added = [self._units_for_cents(c) for c in cents]
+
+        for i, c, u in zip(positions, cents, added):
+            self.units[i] += u
+            self.deposited[i] += c
+        self.dirty.update(positions)
+        self.total_units += sum(added)
+        self.total_equity += sum(cents)
+        return [from_fixed(u, UNIT_PLACES) for u in added]
+
+    def plan_withdrawals(self, entries):
+        """
+        Units each withdrawal would remove at the current price, or None where
+        the participant (counting earlier entries of the batch) lacks the units.
+        Does not change the ledger.
+        """
+        remaining = {}
+        planned = []
+        for pid, amount in entries:
+            i = self._position(pid)
+            cents = to_fixed(amount, MONEY_PLACES)
+            if cents <= 0:
+                raise ValidationError("Withdrawal amount must be positive")
+            units = self._units_for_cents(cents)
+            available = remaining.get(i, self.units[i])
+            if units > available:
+                planned.append(None)
+                continue
+            remaining[i] = available - units
+            planned.append(units)
+        return planned
+
+    def apply_withdrawals(self, entries, planned=None):
+        """
+        entries: [(participant_id, amount)] that passed plan_withdrawals().
+        Returns the units removed per entry as Decimals.
+        """
+        planned = planned if planned is not None else self.plan_withdrawals(entries)
+        if any(units is None for units in planned):
+            raise ValidationError("Insufficient units")
+        positions = [self._position(pid) for pid, _ in entries]
+        cents = [to_fixed(amount, MONEY_PLACES) for _, amount in entries]
+
+        for i, c, u in zip(positions, cents, planned):
+            self.units[i] -= u
+            self.withdrawn[i] += c
+        self.dirty.update(positions)
+        self.total_units -= sum(planned)
+        self.total_equity -= sum(cents)
+        return [from_fixed(u, UNIT_PLACES) for u in planned]
+
+    # --- persistence ------------------------------------------------------
+
+    def save(self, transactions=(), snapshot=True, touched_at=None):
+        """
+        Write the event: one bulk_update of changed participants, one PAMM update,
+        one bulk_update of the given transactions and one equity snapshot.
+        """
+        if self.pamm is None:
+            raise ValueError("Ledger was not loaded from the database")
+        touched_at = touched_at or timezone.now()
+
+        changed = []
+        for i in sorted(self.dirty):
+            participant = self.participants[i]
+            participant.units = from_fixed(self.units[i], UNIT_PLACES)
+            participant.total_deposited = from_fixed(self.deposited[i], MONEY_PLACES)
+            participant.total_withdrawn = from_fixed(self.withdrawn[i], MONEY_PLACES)
+            participant.last_transaction_at = touched_at
+            changed.append(participant)
+        if changed:
+            PAMMParticipant.objects.bulk_update(changed, PARTICIPANT_FIELDS, batch_size=BULK_BATCH_SIZE)
+        self.dirty.clear()
+
+        pamm = self.pamm
+        pamm.total_equity = from_fixed(self.total_equity, MONEY_PLACES)
+        pamm.total_units = from_fixed(self.total_units, UNIT_PLACES)
+        pamm.high_water_mark = from_fixed(self.high_water_mark, MONEY_PLACES)
+        pamm.save(update_fields=['total_equity', 'total_units', 'high_water_mark', 'updated_at'])
+
+        transactions = list(transactions)
+        if transactions:
+            PAMMTransaction.objects.bulk_update(transactions, TRANSACTION_FIELDS, batch_size=BULK_BATCH_SIZE)
+
+        if snapshot:
+            PAMMEquitySnapshot.objects.create(pamm=pamm, **self.snapshot_values())
+        return pamm
@@ -12,6 +12,7 @@ from adminPanel.models_pamm import (
 )
 from django.core.exceptions import ValidationError
 from adminPanel.mt5.services import MT5ManagerActions
+from adminPanel.services.pamm_equity_sync import record_rollups
 import logging
 
 logger = logging.getLogger(__name__)
@@ -755,8 +756,8 @@ class PAMMService:
         pamm.last_equity_update = timezone.now()
         pamm.save()
         
-        # Create snapshot
-        PAMMService._create_equity_snapshot(pamm)
+        # Equity-only moves go to the downsampled history, not a raw snapshot per call
+        record_rollups([pamm], pamm.last_equity_update)
         
         logger.info(f"Updated PAMM {pamm.name} equity: ${old_equity} -> ${new_equity}")
         
@@ -834,26 +835,182 @@ class PAMMService:
         }
     
     @staticmethod
-    def _create_equity_snapshot(pamm):
-        """Create an equity snapshot for historical tracking"""
-        manager_units = pamm.participants.filter(role='MANAGER').aggregate(
-            total=models.Sum('units')
-        )['total'] or Decimal('0.00000000')
+    def approve_transactions_bulk(transaction_ids, approved_by):
+        """
+        Approve many pending deposit/withdrawal transactions.
+        
+        Transactions are grouped by PAMM. For each PAMM the participants are
+        loaded once into a PAMMLedger, all deposits and withdrawals of the batch
+        are applied as single array operations at the current unit price, and
+        the result is written with one bulk update per table plus one equity
+        snapshot.
         
-        investor_units = pamm.participants.filter(role='INVESTOR').aggregate(
-            total=models.Sum('units')
-        )['total'] or Decimal('0.00000000')
+        MT5 balance operations run first, per transaction (one shared manager
+        connection), and each success is recorded at once in mt5_applied_at,
+        outside the ledger transaction. If the ledger step then fails and rolls
+        back, a retry skips the MT5 move of every transaction already recorded,
+        so no balance is moved twice. A transaction whose MT5 call fails is left
+        pending.
         
-        investor_count = pamm.participants.filter(role='INVESTOR', units__gt=0).count()
+        Returns:
+            (results, errors) lists of dicts keyed by transaction_id
+        """
+        from adminPanel.services.pamm_ledger import PAMMLedger
+        
+        results = []
+        errors = []
+        pending = PAMMTransaction.objects.filter(
+            id__in=transaction_ids,
+            status='PENDING',
+            transaction_type__in=['MANAGER_DEPOSIT', 'INVESTOR_DEPOSIT', 'MANAGER_WITHDRAW', 'INVESTOR_WITHDRAW'],
+        ).values_list('id', 'pamm_id')
+        found = dict(pending)
+        for txn_id in transaction_ids:
+            if txn_id not in found:
+                errors.append({"transaction_id": txn_id, "error": "Transaction not found or already processed"})
+        
+        by_pamm = {}
+        for txn_id, pamm_id in found.items():
+            by_pamm.setdefault(pamm_id, []).append(txn_id)
+        
+        mt5_manager = None
+        for pamm_id, ids in by_pamm.items():
+            try:
+                # 1. MT5 moves, planned on an unlocked copy of the ledger (deposits first,
+                #    as below) so withdrawals that will be rejected never touch MT5
+                preview = PAMMLedger.load(pamm_id, lock=False)
+                pamm = preview.pamm
+                txns = list(
+                    PAMMTransaction.objects.filter(id__in=ids, status='PENDING')
+                    .select_related('participant__user')
+                    .order_by('created_at', 'id')
+                )
+                deposits = [t for t in txns if t.transaction_type.endswith('DEPOSIT')]
+                withdrawals = [t for t in txns if t.transaction_type.endswith('WITHDRAW')]
+                preview.apply_deposits([(t.participant_id, t.amount) for t in deposits])
+                planned = preview.plan_withdrawals([(t.participant_id, t.amount) for t in withdrawals])
+                insufficient = {t.id for t, units in zip(withdrawals, planned) if units is None and not t.mt5_applied_at}
+                
+                if pamm.mt5_account_id and mt5_manager is None:
+                    mt5_manager = MT5ManagerActions()
+                
+                def mt5_move(txn, deposit):
+                    if txn.mt5_applied_at or not pamm.mt5_account_id:
+                        return True
+                    kind = 'Deposit' if deposit else 'Withdrawal'
+                    role = 'Manager' if txn.transaction_type.startswith('MANAGER') else 'Investor'
+                    comment = f"PAMM {role} {kind} | {txn.participant.user.email} | {pamm.name} | ${txn.amount}"
+                    try:
+                        if deposit:
+                            ok = mt5_manager.deposit_funds(login_id=int(pamm.mt5_account_id), amount=float(txn.amount), comment=comment)
+                        else:
+                            ok = mt5_manager.withdraw_funds(login_id=int(pamm.mt5_account_id), amount=float(txn.amount), comment=comment)
+                    except Exception as e:
+                        logger.error(f"❌ MT5 {kind.lower()} failed for PAMM {pamm.name}: {e}")
+                        ok = False
+                    if not ok:
+                        errors.append({"transaction_id": txn.id, "error": f"MT5 {kind.lower()} failed"})
+                        return False
+                    # Autocommit: survives a rollback of the ledger step below
+                    PAMMTransaction.objects.filter(id=txn.id).update(mt5_applied_at=timezone.now())
+                    return True
+                
+                moved = {t.id for t in deposits if mt5_move(t, True)}
+                moved |= {t.id for t in withdrawals if t.id not in insufficient and mt5_move(t, False)}
+                
+                # 2. Ledger: only transactions whose MT5 move is recorded
+                with transaction.atomic():
+                    ledger = PAMMLedger.load(pamm_id)
+                    pamm = ledger.pamm
+                    txns = list(
+                        PAMMTransaction.objects.select_for_update()
+                        .filter(id__in=ids, status='PENDING')
+                        .order_by('created_at', 'id')
+                    )
+                    now = timezone.now()
+                    unit_price = ledger.unit_price()
+                    completed = []
+                    # Reported only once the ledger step has committed
+                    approved = []
+                    rejected = []
+                    
+                    deposits = [t for t in txns if t.transaction_type.endswith('DEPOSIT') and t.id in moved]
+                    if deposits:
+                        added = ledger.apply_deposits([(t.participant_id, t.amount) for t in deposits])
+                        for txn, units in zip(deposits, added):
+                            txn.units_added = units
+                            completed.append(txn)
+                    
+                    for txn in txns:
+                        if txn.id in insufficient:
+                            txn.status = 'REJECTED'
+                            txn.rejection_reason = 'Insufficient units at approval time'
+                            txn.approved_by = approved_by
+                            txn.approved_at = now
+                            completed.append(txn)
+                            rejected.append({"transaction_id": txn.id, "error": "Insufficient units at approval time"})
+                    
+                    withdrawals = [t for t in txns if t.transaction_type.endswith('WITHDRAW') and t.id in moved]
+                    planned = ledger.plan_withdrawals([(t.participant_id, t.amount) for t in withdrawals])
+                    approved_withdrawals = []
+                    approved_plan = []
+                    for txn, units in zip(withdrawals, planned):
+                        if units is None:
+                            # Units changed between the plan and the lock; the MT5 withdrawal is
+                            # recorded, so the transaction stays pending for review
+                            logger.error(f"PAMM {pamm.name}: MT5 withdrawal of transaction {txn.id} applied but units are now insufficient")
+                            errors.append({"transaction_id": txn.id, "error": "MT5 withdrawal applied but units are now insufficient; needs review"})
+                            continue
+                        approved_withdrawals.append(txn)
+                        approved_plan.append(units)
+                    if approved_withdrawals:
+                        removed = ledger.apply_withdrawals(
+                            [(t.participant_id, t.amount) for t in approved_withdrawals], approved_plan
+                        )
+                        for txn, units in zip(approved_withdrawals, removed):
+                            txn.units_removed = units
+                            completed.append(txn)
+                    
+                    for txn in completed:
+                        if txn.status == 'REJECTED':
+                            continue
+                        txn.unit_price_at_transaction = unit_price
+                        txn.status = 'COMPLETED'
+                        txn.approved_by = approved_by
+                        txn.approved_at = now
+                        txn.completed_at = now
+                        approved.append({"transaction_id": txn.id, "status": "approved"})
+                    
+                    if completed:
+                        ledger.save(transactions=completed, touched_at=now)
+                
+                results.extend(approved)
+                errors.extend(rejected)
+                logger.info(f"✅ Bulk approved {len(completed)} transactions for PAMM {pamm.name}")
+            except Exception as e:
+                logger.error(f"Bulk approval failed for PAMM {pamm_id}: {e}")
+                for txn_id in ids:
+                    errors.append({"transaction_id": txn_id, "error": str(e)})
+        
+        return results, errors
+    
+    @staticmethod
+    def _create_equity_snapshot(pamm):
+        """Create an equity snapshot for historical tracking"""
+        totals = pamm.participants.aggregate(
+            manager_units=models.Sum('units', filter=models.Q(role='MANAGER')),
+            investor_units=models.Sum('units', filter=models.Q(role='INVESTOR')),
+            investor_count=models.Count('id', filter=models.Q(role='INVESTOR', units__gt=0)),
+        )
         
         PAMMEquitySnapshot.objects.create(
             pamm=pamm,
             equity=pamm.total_equity,
             total_units=pamm.total_units,
             unit_price=pamm.unit_price(),
-            manager_units=manager_units,
-            investor_units=investor_units,
-            investor_count=investor_count
+            manager_units=totals['manager_units'] or Decimal('0.00000000'),
+            investor_units=totals['investor_units'] or Decimal('0.00000000'),
+            investor_count=totals['investor_count'] or 0
         )
 
 
@@ -0,0 +1,186 @@
+"""
+Open Positions Book
+In-memory open positions per MT5 login (real server), kept current by the
+Manager API position pump so views stop issuing a PositionGet per request:
+
+    positions_book.get_positions(login)           list of position dicts
+    positions_book.get_positions_many(logins)     {login: list of position dicts}
+
+Position dicts have the get_open_positions format.
+
+Maintenance:
+    - a login enters the book on its first read, loaded with one
+      PositionGetByLogins call for all missing logins of that read;
+    - a PositionSink subscribed on the manager connection applies position
+      add/update/delete events to the logins already in the book;
+    - entries are re-fetched after BOOK_TTL seconds as a bound on missed events,
+      or after UNSUBSCRIBED_TTL when the Manager API build has no position sink;
+    - logins not read for IDLE_EVICT seconds are dropped.
+"""
+
+import threading
+import time
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds a login is trusted while the position pump is feeding the book
+BOOK_TTL = getattr(settings, 'POSITIONS_BOOK_TTL', 300)
+# Seconds a login is trusted without position events (plain read-through cache)
+UNSUBSCRIBED_TTL = getattr(settings, 'POSITIONS_BOOK_UNSUBSCRIBED_TTL', 5)
+# Drop logins nobody has read for this long
+IDLE_EVICT = 1800
+
+
+class _Entry:
+    __slots__ = ('positions', 'loaded_at', 'read_at')
+
+    def __init__(self, positions, now):
+        self.positions = positions
+        self.loaded_at = now
+        self.read_at = now
+
+
+class PositionsBookSink:
+    """
+    MT5 position sink: the Manager API calls these from its pump thread when
+    positions change on the server.
+    """
+
+    def __init__(self, book):
+        self.book = book
+
+    def OnPositionAdd(self, position):
+        self.book.apply(position)
+
+    def OnPositionUpdate(self, position):
+        self.book.apply(position)
+
+    def OnPositionDelete(self, position):
+        self.book.apply(position, deleted=True)
+
+    def OnPositionClean(self, login):
+        self.book.invalidate(login)
+
+    def OnPositionSync(self, *args):
+        # Pump resynchronised with the server: events may have been missed
+        self.book.invalidate()
+
+
+class PositionsBook:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._sink = None  # (raw manager, sink) of the current subscription
+        self._last_evict = time.monotonic()
+
+    # --- pump ---------------------------------------------------------------
+
+    def _subscribe(self, actions):
+        """Register the position sink once per manager connection."""
+        manager = getattr(actions, 'manager', None)
+        if manager is None or (self._sink is not None and self._sink[0] is manager):
+            return
+        sink = PositionsBookSink(self)
+        try:
+            subscribed = manager.PositionSubscribe(sink) is not False
+        except Exception as e:
+            logger.debug(f"Positions book: PositionSubscribe unavailable: {e}")
+            subscribed = False
+        with self._lock:
+            # A new connection invalidates everything loaded through the old one
+            self._entries.clear()
+            self._sink = (manager, sink if subscribed else None)
+        if subscribed:
+            logger.info("Positions book: subscribed to MT5 position events")
+
+    @property
+    def subscribed(self):
+        return self._sink is not None and self._sink[1] is not None
+
+    def apply(self, position, deleted=False):
+        """Apply one position event to the book (ignored for logins not in the book)."""
+        from adminPanel.mt5.services import format_position
+        try:
+            login = int(position.Login)
+            position_id = position.Position
+        except (AttributeError, TypeError, ValueError):
+            return
+        with self._lock:
+            entry = self._entries.get(login)
+            if entry is None:
+                return
+            positions = [p for p in entry.positions if p['id'] != position_id]
+            if not deleted:
+                positions.append(format_position(position))
+            # Readers hold the previous list; replace rather than mutate
+            entry.positions = positions
+
+    def invalidate(self, login=None):
+        with self._lock:
+            if login is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(login), None)
+
+    def reset(self):
+        """Forget the subscription and all positions (e.g. after a server credential change)."""
+        with self._lock:
+            self._entries.clear()
+            self._sink = None
+
+    # --- reads ----------------------------------------------------------------
+
+    def _fresh(self, entry, now):
+        ttl = BOOK_TTL if self.subscribed else UNSUBSCRIBED_TTL
+        return entry is not None and now - entry.loaded_at < ttl
+
+    def _evict_idle(self, now):
+        if now - self._last_evict < 60:
+            return
+        self._last_evict = now
+        with self._lock:
+            for login in [l for l, e in self._entries.items() if now - e.read_at > IDLE_EVICT]:
+                del self._entries[login]
+
+    def get_positions_many(self, logins):
+        """
+        {login: [position dicts]} for every requested login (empty list when it
+        has no open positions). Logins missing from the book or past their TTL
+        are loaded together with one batched MT5 request.
+        """
+        logins = {int(login) for login in logins}
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        result, missing = {}, []
+        with self._lock:
+            for login in logins:
+                entry = self._entries.get(login)
+                if self._fresh(entry, now):
+                    entry.read_at = now
+                    result[login] = entry.positions
+                else:
+                    missing.append(login)
+
+        if missing:
+            from adminPanel.mt5.services import MT5ManagerActions
+            actions = MT5ManagerActions()
+            # (Re)subscribe when this is a new manager connection
+            self._subscribe(actions)
+            fetched = actions.get_open_positions_by_logins(missing)
+            loaded_at = time.monotonic()
+            with self._lock:
+                for login in missing:
+                    positions = fetched.get(login, [])
+                    self._entries[login] = _Entry(positions, loaded_at)
+                    result[login] = positions
+        return result
+
+    def get_positions(self, login):
+        return self.get_positions_many([login])[int(login)]
+
+
+positions_book = PositionsBook()
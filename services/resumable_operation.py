@@ -0,0 +1,164 @@
+"""
+Resumable operations
+Shared runner for operations that apply one MT5 change to many logins and
+keep their progress in the row itself (MAMCopyOperation, AccountBulkOperation):
+
+    class Runner(ResumableOperationRunner):
+        label = 'mam-copy'
+
+        def apply_chunk(self, operation, logins, mt5_manager):
+            return mt5_manager.set_agents(...)      # {login: {'ok': ..., 'error': ...}}
+
+- operation.results is {login: None | {'ok', 'error'}}; logins that have not
+  succeeded yet are processed in chunks of chunk_size and progress (results,
+  succeeded, failed) is saved after every chunk;
+- a process runs an operation at most once at a time; one left 'pending' or
+  'running' without an update for stale_after (process restart) is resumable,
+  as are 'partial' and 'failed' ones.
+"""
+
+from datetime import timedelta
+import logging
+import threading
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class ResumableOperationRunner:
+    """
+    Subclasses set `label` and implement apply_chunk(). Optional hooks:
+        skip(operation)                          True to leave the operation untouched (dry runs)
+        after_chunk(operation, succeeded)        mirror the logins MT5 accepted into the database
+        describe(operation)                      subject of the completion log line
+    """
+
+    label = 'operation'
+    chunk_size = 200
+    # A running operation not updated for this long is treated as interrupted
+    stale_after = timedelta(minutes=5)
+
+    def __init__(self):
+        self._running = set()
+        self._running_lock = threading.Lock()
+
+    # --- hooks ------------------------------------------------------------
+
+    def apply_chunk(self, operation, logins, mt5_manager):
+        raise NotImplementedError
+
+    def skip(self, operation):
+        return False
+
+    def after_chunk(self, operation, succeeded):
+        pass
+
+    def describe(self, operation):
+        return f"{self.label} {operation.id}"
+
+    # --- driver -----------------------------------------------------------
+
+    def save_progress(self, operation, **extra):
+        results = operation.results.values()
+        operation.succeeded = sum(1 for result in results if result and result.get('ok'))
+        operation.failed = sum(1 for result in results if result and not result.get('ok'))
+        for field, value in extra.items():
+            setattr(operation, field, value)
+        operation.save(update_fields=['results', 'succeeded', 'failed', 'updated_at'] + list(extra))
+
+    def run(self, operation, mt5_manager=None):
+        """Apply the operation to every login that has not succeeded yet. Returns the operation."""
+        if self.skip(operation):
+            return operation
+        with self._running_lock:
+            if operation.id in self._running:
+                return operation
+            self._running.add(operation.id)
+        try:
+            if mt5_manager is None:
+                from adminPanel.mt5.services import MT5ManagerActions
+                mt5_manager = MT5ManagerActions()
+            self.save_progress(operation, status='running', error='')
+
+            todo = sorted(
+                int(login) for login, result in operation.results.items()
+                if not (result and result.get('ok'))
+            )
+            for i in range(0, len(todo), self.chunk_size):
+                chunk = todo[i:i + self.chunk_size]
+                chunk_results = self.apply_chunk(operation, chunk, mt5_manager)
+                for login in chunk:
+                    operation.results[str(login)] = chunk_results.get(login, {'ok': False, 'error': 'No result from MT5'})
+
+                succeeded = [str(login) for login in chunk if operation.results[str(login)]['ok']]
+                if succeeded:
+                    self.after_chunk(operation, succeeded)
+                self.save_progress(operation)
+
+            self.save_progress(
+                operation,
+                status='completed' if operation.failed == 0 else 'partial',
+                finished_at=timezone.now(),
+            )
+            logger.info(
+                f"{self.describe(operation)}: "
+                f"{operation.succeeded}/{operation.total} succeeded, {operation.failed} failed"
+            )
+        except Exception as e:
+            logger.error(f"{self.label} operation {operation.id} failed: {e}")
+            self.save_progress(operation, status='failed', error=str(e), finished_at=timezone.now())
+        finally:
+            with self._running_lock:
+                self._running.discard(operation.id)
+        return operation
+
+    def is_resumable(self, operation):
+        if self.skip(operation):
+            return False
+        if operation.status in ('partial', 'failed'):
+            return True
+        if operation.status in ('pending', 'running'):
+            with self._running_lock:
+                if operation.id in self._running:
+                    return False
+            return operation.updated_at < timezone.now() - self.stale_after
+        return False
+
+    def resume(self, operation, background=True):
+        if not self.is_resumable(operation):
+            return False
+        if background:
+            self.run_in_background(operation)
+        else:
+            self.run(operation)
+        return True
+
+    def run_in_background(self, operation):
+        def run():
+            try:
+                close_old_connections()
+                self.run(operation)
+            finally:
+                close_old_connections()
+
+        threading.Thread(target=run, name=f"{self.label}-{operation.id}", daemon=True).start()
+
+    def summary(self, operation, fields=None, include_results=False):
+        """Progress of the operation, with the caller's own `fields` after its id."""
+        data = {
+            'operation_id': operation.id,
+            **(fields or {}),
+            'status': operation.status,
+            'total': operation.total,
+            'succeeded': operation.succeeded,
+            'failed': operation.failed,
+            'pending': operation.total - operation.succeeded - operation.failed,
+            'error': operation.error,
+            'created_at': operation.created_at.isoformat() if operation.created_at else None,
+            'finished_at': operation.finished_at.isoformat() if operation.finished_at else None,
+        }
+        if include_results:
+            data['results'] = operation.results
+        return data
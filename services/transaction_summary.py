@@ -0,0 +1,210 @@
+"""
+Transaction Daily Summary
+Count and amount of transactions per (day, type, status, manager) in
+TransactionDailySummary, so dashboard totals read a few hundred summary rows
+instead of aggregating the whole Transaction table.
+
+Maintenance:
+    - a saved or deleted transaction marks its day; after the commit the day's
+      rows are recomputed with one grouped query over that day (created_at
+      index), once per day however many transactions the commit touched;
+    - bulk queryset updates bypass signals, so the transaction_summary job
+      (enable it in SCHEDULER_JOBS) recomputes the last REFRESH_DAYS days
+      every night;
+    - bulk writes of older days (import_transactions_from_csv) call
+      rebuild(start, end) for the days they touched; the build_transaction_summary
+      command recomputes any range by hand.
+Rebuilds of the same day are serialized by _lock().
+
+Reads:
+    transaction_totals(['deposit_trading'], 'approved', since=now - 30 days)
+combine summary rows for the whole days inside the window with a raw query for
+the partial days at its edges (the window start and today), so totals are exact.
+"""
+
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from adminPanel.models import Transaction, TransactionDailySummary
+
+logger = logging.getLogger(__name__)
+
+REFRESH_DAYS = 7
+# First key of the per-day advisory locks taken while a rebuild replaces a day's rows
+LOCK_NAMESPACE = 0x7453756D
+# Days recomputed per grouped query when rebuilding a long range
+REBUILD_CHUNK_DAYS = 31
+ZERO = Decimal('0')
+
+_pending = threading.local()
+
+
+def _aware_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def _grouped_rows(start, end):
+    """Summary rows for the days start..end (inclusive) computed from Transaction."""
+    rows = (
+        Transaction.objects.filter(
+            created_at__gte=_aware_midnight(start),
+            created_at__lt=_aware_midnight(end + timedelta(days=1)),
+        )
+        .order_by()
+        .annotate(day=TruncDate('created_at'), manager_id=F('user__created_by'))
+        .values('day', 'transaction_type', 'status', 'manager_id')
+        .annotate(count=Count('id'), total=Sum('amount'))
+    )
+    return [
+        TransactionDailySummary(
+            date=row['day'],
+            transaction_type=row['transaction_type'],
+            status=row['status'],
+            manager_id=row['manager_id'],
+            count=row['count'],
+            total_amount=row['total'] or ZERO,
+        )
+        for row in rows
+    ]
+
+
+def _lock(start, end):
+    """
+    Serialize rebuilds of the same days. Two concurrent delete + insert passes
+    over one day would collide on unique_together, or, for rows without a
+    manager (NULLs never collide), count the day twice. Rebuilds of other days
+    do not wait. PostgreSQL: one transaction-scoped advisory lock per day, taken
+    in date order; elsewhere the days' existing summary rows are locked. Call
+    inside transaction.atomic().
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            day = start
+            while day <= end:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [LOCK_NAMESPACE, day.toordinal()])
+                day += timedelta(days=1)
+        return
+    list(
+        TransactionDailySummary.objects.select_for_update()
+        .filter(date__gte=start, date__lte=end).order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def rebuild(start, end):
+    """Recompute the summary for the days start..end (inclusive). Returns the number of rows written."""
+    written = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + timedelta(days=REBUILD_CHUNK_DAYS - 1))
+        with transaction.atomic():
+            _lock(chunk_start, chunk_end)
+            # Computed under the lock so the last rebuild to run sees every commit before it
+            rows = _grouped_rows(chunk_start, chunk_end)
+            TransactionDailySummary.objects.filter(date__gte=chunk_start, date__lte=chunk_end).delete()
+            TransactionDailySummary.objects.bulk_create(rows, batch_size=1000)
+        written += len(rows)
+        chunk_start = chunk_end + timedelta(days=1)
+    return written
+
+
+def rebuild_all():
+    """Recompute the summary from the first transaction through today."""
+    first = Transaction.objects.order_by().aggregate(first=Min('created_at'))['first']
+    if first is None:
+        TransactionDailySummary.objects.all().delete()
+        return 0
+    return rebuild(timezone.localtime(first).date(), timezone.localdate())
+
+
+def refresh_recent(days=REFRESH_DAYS):
+    today = timezone.localdate()
+    written = rebuild(today - timedelta(days=days), today)
+    logger.info(f"Transaction summary: refreshed the last {days} days ({written} rows)")
+    return written
+
+
+# --- signal-driven refresh ------------------------------------------------------
+
+def _flush_pending_days():
+    days = getattr(_pending, 'days', None)
+    if not days:
+        return
+    _pending.days = set()
+    for day in sorted(days):
+        try:
+            rebuild(day, day)
+        except Exception as e:
+            logger.error(f"Transaction summary: failed to refresh {day}: {e}")
+
+
+def mark_transaction_day(sender, instance, **kwargs):
+    """
+    Signal receiver: recompute the transaction's day after the surrounding commit.
+    Every mark registers a flush; the first one to run refreshes all marked days
+    and the rest find nothing left (days of a rolled back block go with the next commit).
+    """
+    if instance.created_at is None:
+        return
+    days = getattr(_pending, 'days', None)
+    if days is None:
+        days = _pending.days = set()
+    days.add(timezone.localtime(instance.created_at).date())
+    transaction.on_commit(_flush_pending_days)
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    post_save.connect(mark_transaction_day, sender=Transaction, dispatch_uid='transaction_summary_save')
+    post_delete.connect(mark_transaction_day, sender=Transaction, dispatch_uid='transaction_summary_delete')
+
+
+# --- reads ------------------------------------------------------------------------
+
+def transaction_totals(transaction_types, status, since=None, manager=None):
+    """
+    (count, total amount) of transactions of the given types (any type when None)
+    and status created at or after `since` (all time when None), optionally only
+    of `manager`'s clients.
+    """
+    if isinstance(transaction_types, str):
+        transaction_types = [transaction_types]
+    today = timezone.localdate()
+
+    summary = TransactionDailySummary.objects.filter(status=status, date__lt=today)
+    raw = Transaction.objects.filter(status=status)
+    if transaction_types is not None:
+        summary = summary.filter(transaction_type__in=transaction_types)
+        raw = raw.filter(transaction_type__in=transaction_types)
+    if manager is not None:
+        summary = summary.filter(manager=manager)
+        raw = raw.filter(user__created_by=manager)
+
+    raw_ranges = [(_aware_midnight(today), None)]
+    if since is not None:
+        first_whole_day = timezone.localtime(since).date() + timedelta(days=1)
+        if first_whole_day <= today:
+            summary = summary.filter(date__gte=first_whole_day)
+            raw_ranges.append((since, _aware_midnight(first_whole_day)))
+        else:
+            # The window starts today: nothing comes from the summary
+            summary = summary.none()
+            raw_ranges = [(since, None)]
+
+    totals = summary.aggregate(count=Sum('count'), total=Sum('total_amount'))
+    count, amount = totals['count'] or 0, totals['total'] or ZERO
+    for start, end in raw_ranges:
+        window = raw.filter(created_at__gte=start)
+        if end is not None:
+            window = window.filter(created_at__lt=end)
+        partial = window.order_by().aggregate(count=Count('id'), total=Sum('amount'))
+        count += partial['count'] or 0
+        amount += partial['total'] or ZERO
+    return count, amount
@@ -1,75 +1,450 @@
 from datetime import datetime, timedelta, date, time
 from django.utils import timezone
 import logging
-from django.db import transaction
+import queue
+import threading
+import concurrent.futures
+import multiprocessing
+from time import monotonic, sleep
+from django.db import connection, transaction
+from django.db.models import F
 from adminPanel.models import TradingAccount, DailyTradingReport
-from adminPanel.tasks.monthly_reports import MonthlyReportGenerator
+from adminPanel.tasks.monthly_reports import MonthlyReportGenerator, html_to_pdf_bytes
 import tempfile
 import os
 from django.conf import settings
 
-def daily_trading_report_runner(report_date_str=None, dry_run=False):
-    """Scheduler entry: find eligible accounts and run per-account processing.
-    This replaces the previous Celery-based implementation and runs in-process.
+MONTH_NAMES = ['', 'January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
 
-    NOTE: We do NOT pre-filter eligibility via MT5 here. Doing 1700+ MT5 calls
-    per account at 02:00 fails silently and results in zero reports created.
-    process_account_for_daily_report() already skips accounts with no activity,
-    so all active accounts are passed through and it handles skipping internally.
+_template_lock = threading.Lock()
+_compiled_template = None  # (path, mtime, Template)
+
+
+def get_report_template():
+    """report_template.html compiled once; recompiled only when the file changes on disk."""
+    global _compiled_template
+    from django.template import Template as DjangoTemplate
+
+    path = os.path.join(settings.BASE_DIR, 'report_template.html')
+    mtime = os.path.getmtime(path)
+    with _template_lock:
+        if _compiled_template is None or _compiled_template[:2] != (path, mtime):
+            with open(path, 'r', encoding='utf-8') as f:
+                _compiled_template = (path, mtime, DjangoTemplate(f.read()))
+        return _compiled_template[2]
+
+
+def _day_range(report_date):
+    # Build day range as NAIVE datetimes — MT5 DealRequest does not accept
+    # timezone-aware objects on Windows and silently returns empty results if given one.
+    start = datetime.combine(report_date, time.min)   # 00:00:00 naive UTC
+    return start, start + timedelta(days=1)            # 00:00:00 next day naive UTC
+
+
+def _deals_to_trades(account_id, raw_deals, logger):
+    """Convert raw MT5 deal objects to trade dicts"""
+    trades = []
+    for deal in raw_deals:
+        try:
+            time_val = getattr(deal, 'Time', 0)
+            open_time = datetime.fromtimestamp(time_val).strftime('%Y-%m-%d %H:%M:%S') if isinstance(time_val, (int, float)) and time_val > 0 else str(time_val)
+            time_close_val = getattr(deal, 'TimeClose', time_val)
+            close_time = datetime.fromtimestamp(time_close_val).strftime('%Y-%m-%d %H:%M:%S') if isinstance(time_close_val, (int, float)) and time_close_val > 0 else open_time
+            action = getattr(deal, 'Action', None)
+            trades.append({
+                'open_time': open_time,
+                'close_time': close_time,
+                'symbol': getattr(deal, 'Symbol', 'N/A'),
+                'type': 'Buy' if action == 0 else 'Sell' if action == 1 else 'Unknown',
+                'volume': round(getattr(deal, 'Volume', 0) / 10000, 2),
+                'profit': float(getattr(deal, 'Profit', 0)),
+                'commission': float(getattr(deal, 'Commission', 0)),
+                'swap': float(getattr(deal, 'Storage', 0)),
+                'status': 'Closed',
+                'account_id': str(account_id),
+            })
+        except Exception as e:
+            logger.warning('Error converting deal for account %s: %s', account_id, e)
+    return trades
+
+
+def _positions_to_trades(account_id, open_positions):
+    """Open positions in the trade dict format the template renders in the trade history section"""
+    open_trades = []
+    for pos in open_positions:
+        # Normalize keys and convert timestamp if necessary
+        open_time_val = pos.get('date') or pos.get('open_time') or pos.get('time')
+        try:
+            if isinstance(open_time_val, (int, float)):
+                open_time_str = datetime.fromtimestamp(open_time_val).strftime('%Y-%m-%d %H:%M')
+            else:
+                open_time_str = str(open_time_val)
+        except Exception:
+            open_time_str = str(open_time_val)
+
+        open_trades.append({
+            'open_time': open_time_str,
+            'close_time': '-',
+            'symbol': pos.get('symbol') or pos.get('symbol_name') or 'N/A',
+            'type': pos.get('type') or pos.get('position_type') or 'N/A',
+            'volume': float(pos.get('volume', 0)),
+            'profit': float(pos.get('profit', 0)),
+            'status': 'Open',
+            'account_id': str(account_id)
+        })
+    return open_trades
+
+
+def _report_context(acc, report_date, trades, balances=None):
+    """Template context (reuses report_template.html expectations)"""
+    user = acc.user
+    starting_balance, ending_balance = balances or (acc.balance, acc.balance)
+    return {
+        'company_name': 'VTIndex',
+        'client_name': user.get_full_name(),
+        'account_id': acc.account_id,
+        'address': f"{user.address}, {user.city}, {user.state}, {user.country}".strip(', '),
+        'phone': user.phone_number or 'N/A',
+        'report_date': timezone.now().strftime('%B %d, %Y'),
+        'report_month': f"{MONTH_NAMES[report_date.month]} {report_date.year}",
+        'account_type': acc.get_account_type_display(),
+        'starting_balance': starting_balance,
+        'ending_balance': ending_balance,
+        'total_pnl': sum([t.get('profit', 0) for t in trades]) if trades else 0,
+        'trades': trades,
+        'total_commission': 0,
+        'total_volume': sum([t.get('volume', 0) for t in trades]) if trades else 0,
+        'logo_path': '',
+        'is_summary': False,
+    }
+
+
+def _render_html(context):
+    from django.template import Context
+    return get_report_template().render(Context(context))
+
+
+def _email_subject_and_context(acc, report_date, context):
+    email_subject = f"Daily Trading Report - {report_date.strftime('%d %B %Y')} - Account {acc.account_id}"
+    email_context = {
+        'user_name': acc.user.get_full_name(),
+        'report_month': f"{report_date.strftime('%d %B %Y')}",
+        'report_date_label': f"Daily Report - {report_date.strftime('%d %B %Y')}",
+        'company_name': 'VTIndex',
+        'total_trades': len(context['trades']),
+        'total_volume': context['total_volume'],
+        'generated_date': timezone.now().strftime('%B %d, %Y'),
+        'password_hint': 'This PDF is not password protected.',
+        'password_format': '',
+        'support_email': 'support@vtindex.com',
+        'login_url': 'https://client.vtindex.com'
+    }
+    return email_subject, email_context
+
+
+def _write_pdf(pdf_bytes):
+    tmp_dir = getattr(settings, 'MEDIA_ROOT', None) or tempfile.gettempdir()
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix='.pdf', dir=tmp_dir)
+    os.close(tmp_fd)
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf_bytes)
+    return tmp_path
+
+
+def prefetch_daily_activity(accounts, report_date, mt5_manager=None):
+    """
+    Closed deals and open positions for all accounts of the run with batched MT5 requests.
+    Returns {trading account id: (raw_deals, open_positions)}.
     """
     logger = logging.getLogger('daily_reports')
+    if mt5_manager is None:
+        from adminPanel.mt5.services import MT5ManagerActions
+        mt5_manager = MT5ManagerActions()
+
+    logins = {}
+    for acc in accounts:
+        try:
+            logins[int(acc.account_id)] = acc.id
+        except (TypeError, ValueError):
+            logger.warning('Skipping non-numeric account ID: %s', acc.account_id)
+
+    start, end = _day_range(report_date)
+    # A failed deal request propagates: marking every account idle would hide the outage
+    deals = mt5_manager.get_closed_trades_by_logins(list(logins), start, end)
+    positions = {}
+    try:
+        positions = mt5_manager.get_open_positions_by_logins(list(logins))
+    except Exception as e:
+        logger.warning('Bulk position request failed: %s', e)
+
+    return {
+        account_id: (deals.get(login, []), positions.get(login, []))
+        for login, account_id in logins.items()
+    }
+
+
+def timeline_balances(accounts, report_date, mt5_manager=None):
+    """
+    {trading account id: (opening, closing)} balance of the report day from the
+    balance timeline; accounts without a timeline are left out (template falls back).
+    """
+    from adminPanel.services.balance_timeline import BalanceTimeline
+
+    logger = logging.getLogger('daily_reports')
+    try:
+        timeline = BalanceTimeline(mt5_manager)
+        closing = timeline.balances_at(accounts, report_date)
+        opening = timeline.balances_at(accounts, report_date - timedelta(days=1), build=False)
+    except Exception as e:
+        logger.warning('Balance timeline unavailable for %s: %s', report_date, e)
+        return {}
+    return {
+        acc.id: (opening[acc.id], closing[acc.id])
+        for acc in accounts
+        if closing.get(acc.id) is not None
+    }
+
+
+class RateLimitedMailQueue:
+    """
+    Report emails go through a queue drained by sender threads, spaced so that
+    at most per_minute messages leave per minute across all senders.
+    Results are collected as (item, sent) pairs; read them after close().
+    """
+
+    def __init__(self, send, per_minute=60, senders=1):
+        self.send = send
+        self.interval = 60.0 / per_minute if per_minute and per_minute > 0 else 0
+        self.queue = queue.Queue()
+        self.results = []
+        self._slot_lock = threading.Lock()
+        self._next_slot = monotonic()
+        self.threads = [
+            threading.Thread(target=self._drain, name=f"report-mail-{i}", daemon=True)
+            for i in range(max(1, senders))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _wait_for_slot(self):
+        if not self.interval:
+            return
+        with self._slot_lock:
+            now = monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            sleep(slot - now)
+
+    def _drain(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                # send() may have used the ORM on this thread
+                connection.close()
+                return
+            self._wait_for_slot()
+            try:
+                sent = self.send(item)
+            except Exception as e:
+                logging.getLogger('daily_reports').error('Report email failed: %s', e)
+                sent = False
+            self.results.append((item, sent))
+            self.queue.task_done()
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def close(self):
+        """Wait until every queued email has been attempted."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        return self.results
+
+
+def _render_executor(concurrency):
+    """
+    Threads for PDF rendering by default. DAILY_REPORTS_RENDER_PROCESSES = True uses
+    spawned worker processes instead: the runner usually starts from the scheduler
+    thread of a web worker, and forking a threaded process that holds DB and MT5
+    connections is unsafe.
+    """
+    if getattr(settings, 'DAILY_REPORTS_RENDER_PROCESSES', False):
+        try:
+            import django
+            context = multiprocessing.get_context('spawn')
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=concurrency, mp_context=context, initializer=django.setup,
+            )
+        except (ValueError, OSError) as e:
+            logging.getLogger('daily_reports').warning('Process pool unavailable, rendering in threads: %s', e)
+    return concurrent.futures.ThreadPoolExecutor(max_workers=concurrency)
+
+
+def _record_attempt(report_id, **fields):
+    DailyTradingReport.objects.filter(id=report_id).update(attempts=F('attempts') + 1, **fields)
+
+
+def daily_trading_report_runner(report_date_str=None, dry_run=False, concurrency=None):
+    """Scheduler entry: prefetch the day's activity for all accounts, then render and send reports.
+
+    1. one query for accounts, one for rows already sent;
+    2. closed deals and open positions for every account via batched MT5 requests;
+    3. idle accounts are marked skipped in bulk before any rendering;
+    4. report HTML comes from the template compiled once; PDFs render on
+       `concurrency` worker threads (see _render_executor);
+    5. emails go through a rate-limited queue (DAILY_REPORTS_EMAILS_PER_MINUTE);
+    6. each report row is updated as soon as its email has been attempted, so a
+       run cut short (crash, timeout, lost lease) never resends a sent report.
+    """
+    logger = logging.getLogger('daily_reports')
+    started = monotonic()
+    phases = {}
 
     if report_date_str:
         report_date = date.fromisoformat(report_date_str)
     else:
         report_date = (timezone.now() - timedelta(days=1)).date()
+    if concurrency is None:
+        concurrency = getattr(settings, 'DAILY_REPORTS_CONCURRENCY', None) or min(os.cpu_count() or 2, 8)
 
-    logger.info('daily_trading_report_runner STARTED for report_date=%s dry_run=%s', report_date, dry_run)
+    logger.info('daily_trading_report_runner STARTED for report_date=%s dry_run=%s concurrency=%s', report_date, dry_run, concurrency)
 
-    # Process ALL active trading accounts. Each per-account function checks MT5
-    # individually and marks the report 'skipped' if there is no activity.
-    qs = TradingAccount.objects.select_related('user').filter(user__isnull=False)
-    ids = list(qs.values_list('id', flat=True))
+    accounts = list(TradingAccount.objects.select_related('user').filter(user__isnull=False))
+    logger.info('daily_trading_report_runner: found %d accounts to process', len(accounts))
 
-    logger.info('daily_trading_report_runner: found %d accounts to process', len(ids))
+    if dry_run:
+        DailyTradingReport.objects.bulk_create(
+            [DailyTradingReport(trading_account_id=acc.id, report_date=report_date) for acc in accounts],
+            ignore_conflicts=True,
+        )
+        summary = {'report_date': str(report_date), 'checked_accounts': len(accounts), 'dry_created': len(accounts)}
+        logger.info('daily_trading_report_runner DRY RUN: %s', summary)
+        return summary
+
+    already_sent = set(
+        DailyTradingReport.objects.filter(report_date=report_date, status='sent')
+        .values_list('trading_account_id', flat=True)
+    )
+    pending = [acc for acc in accounts if acc.id not in already_sent]
+
+    # --- prefetch -----------------------------------------------------------
+    phase = monotonic()
+    try:
+        from adminPanel.mt5.services import MT5ManagerActions
+        mt5_manager = MT5ManagerActions()
+        activity = prefetch_daily_activity(pending, report_date, mt5_manager)
+    except Exception as exc:
+        logger.exception('daily_trading_report_runner: prefetching MT5 activity failed for %s', report_date)
+        return {'report_date': str(report_date), 'checked_accounts': len(accounts), 'error': str(exc)}
+
+    active, idle_ids = [], []
+    for acc in pending:
+        raw_deals, open_positions = activity.get(acc.id, ([], []))
+        if raw_deals or open_positions:
+            active.append((acc, raw_deals, open_positions))
+        else:
+            idle_ids.append(acc.id)
+
+    # Rows for every pending account; idle ones are closed out without rendering
+    DailyTradingReport.objects.bulk_create(
+        [DailyTradingReport(trading_account_id=acc.id, report_date=report_date, status='pending') for acc in pending],
+        ignore_conflicts=True,
+    )
+    if idle_ids:
+        DailyTradingReport.objects.filter(report_date=report_date, trading_account_id__in=idle_ids).exclude(status='sent').update(
+            status='skipped', attempts=F('attempts') + 1, last_error='no closed trades and no open positions'
+        )
+    reports = {
+        report.trading_account_id: report
+        for report in DailyTradingReport.objects.filter(
+            report_date=report_date, trading_account_id__in=[acc.id for acc, _, _ in active]
+        )
+    }
+
+    # Opening/closing balances are indexed lookups on the balance timeline
+    balances = timeline_balances([acc for acc, _, _ in active], report_date, mt5_manager)
+    phases['prefetch_s'] = round(monotonic() - phase, 2)
+
+    # --- render + send ----------------------------------------------------------
+    generator = MonthlyReportGenerator()
+
+    now = timezone.now()
 
-    batch_size = 50  # smaller batches to avoid overloading MT5 connections
-    results = []
-    for i in range(0, len(ids), batch_size):
-        batch = ids[i:i+batch_size]
-        for account_id in batch:
-            if dry_run:
-                DailyTradingReport.objects.get_or_create(trading_account_id=account_id, report_date=report_date)
-                results.append({'account_id': account_id, 'action': 'dry_created'})
+    def send(item):
+        acc, path, subject, email_context = item
+        try:
+            sent = generator._send_report_email_with_attachment(acc.user.email, subject, email_context, path)
+        except Exception as e:
+            logger.error('Report email failed for account %s: %s', acc.account_id, e)
+            sent = False
+        report = reports.get(acc.id)
+        if report:
+            if sent:
+                _record_attempt(report.id, status='sent', sent_at=now, file_url=path, last_error=None)
             else:
-                # Run synchronously in-process (no Celery)
-                try:
-                    res = process_account_for_daily_report(account_id, report_date.isoformat())
-                    results.append({'account_id': account_id, 'result': res})
-                except Exception as exc:
-                    logger.exception('Failed processing account %s', account_id)
-                    results.append({'account_id': account_id, 'error': str(exc)})
-
-    logger.info('Daily trading report runner completed for %s; eligible=%d, processed=%d', report_date, len(ids), len(results))
-    # Return a concise summary useful in management shells
+                _record_attempt(report.id, status='failed', file_url=path, last_error='Email send failed')
+        return sent
+
+    render_failed = 0
+    phase = monotonic()
+    with _render_executor(concurrency) as executor:
+        futures = {}
+        for acc, raw_deals, open_positions in active:
+            trades = _deals_to_trades(acc.account_id, raw_deals, logger) + _positions_to_trades(acc.account_id, open_positions)
+            context = _report_context(acc, report_date, trades, balances.get(acc.id))
+            futures[executor.submit(html_to_pdf_bytes, _render_html(context))] = (acc, context)
+
+        mail_queue = RateLimitedMailQueue(
+            send,
+            per_minute=getattr(settings, 'DAILY_REPORTS_EMAILS_PER_MINUTE', 60),
+            senders=getattr(settings, 'DAILY_REPORTS_MAIL_SENDERS', 2),
+        )
+        for future in concurrent.futures.as_completed(futures):
+            acc, context = futures[future]
+            report = reports.get(acc.id)
+            try:
+                path = _write_pdf(future.result())
+            except Exception as exc:
+                logger.error('Rendering daily report failed for account %s: %s', acc.account_id, exc)
+                render_failed += 1
+                if report:
+                    _record_attempt(report.id, status='failed', last_error=str(exc))
+                continue
+            subject, email_context = _email_subject_and_context(acc, report_date, context)
+            mail_queue.put((acc, path, subject, email_context))
+    phases['render_s'] = round(monotonic() - phase, 2)
+
+    phase = monotonic()
+    sent_count = sum(1 for _, sent in mail_queue.close() if sent)
+    phases['mail_drain_s'] = round(monotonic() - phase, 2)
+
+    elapsed = monotonic() - started
     summary = {
         'report_date': str(report_date),
-        'checked_accounts': qs.count(),
-        'eligible_accounts': len(ids),
-        'processed_count': len(results),
-        'sample_results': results[:10]
+        'checked_accounts': len(accounts),
+        'already_sent': len(already_sent),
+        'idle_skipped': len(idle_ids),
+        'rendered': len(active) - render_failed,
+        'render_failed': render_failed,
+        'sent': sent_count,
+        'send_failed': len(active) - render_failed - sent_count,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 2),
+        'reports_per_min': round(len(active) / elapsed * 60, 1) if elapsed and active else 0,
+        **phases,
     }
-    # Also print to stdout for management shell immediate feedback
-    try:
-        print(summary)
-    except Exception:
-        pass
+    logger.info('Daily trading report runner completed: %s', summary)
     return summary
 
 
 def process_account_for_daily_report(account_id, report_date_str):
     """Generate and send per-account daily report. Implements idempotency via DailyTradingReport.
-    Runs synchronously (no Celery)."""
+    Runs synchronously (single-account path; the runner batches all accounts)."""
     report_date = date.fromisoformat(report_date_str)
     report = None
     # Acquire or create DailyTradingReport row
@@ -87,11 +462,7 @@ def process_account_for_daily_report(account_id, report_date_str):
     try:
         acc = TradingAccount.objects.select_related('user').get(id=account_id)
         user = acc.user
-
-        # Build day range as NAIVE datetimes — MT5 DealRequest does not accept
-        # timezone-aware objects on Windows and silently returns empty results if given one.
-        start = datetime.combine(report_date, time.min)   # 00:00:00 naive UTC
-        end = start + timedelta(days=1)                    # 00:00:00 next day naive UTC
+        start, end = _day_range(report_date)
 
         # Fetch closed trades directly for THIS account only (not via monthly-report
         # generator which loops ALL user accounts and may silently return empty).
@@ -103,30 +474,7 @@ def process_account_for_daily_report(account_id, report_date_str):
             raw_deals = mt5_manager.get_closed_trades(int(acc.account_id), start, end) or []
         except Exception as e:
             logger.warning('get_closed_trades failed for account %s: %s', acc.account_id, e)
-
-        # Convert raw MT5 deal objects to trade dicts
-        trades = []
-        for deal in raw_deals:
-            try:
-                time_val = getattr(deal, 'Time', 0)
-                open_time = datetime.fromtimestamp(time_val).strftime('%Y-%m-%d %H:%M:%S') if isinstance(time_val, (int, float)) and time_val > 0 else str(time_val)
-                time_close_val = getattr(deal, 'TimeClose', time_val)
-                close_time = datetime.fromtimestamp(time_close_val).strftime('%Y-%m-%d %H:%M:%S') if isinstance(time_close_val, (int, float)) and time_close_val > 0 else open_time
-                action = getattr(deal, 'Action', None)
-                trades.append({
-                    'open_time': open_time,
-                    'close_time': close_time,
-                    'symbol': getattr(deal, 'Symbol', 'N/A'),
-                    'type': 'Buy' if action == 0 else 'Sell' if action == 1 else 'Unknown',
-                    'volume': round(getattr(deal, 'Volume', 0) / 10000, 2),
-                    'profit': float(getattr(deal, 'Profit', 0)),
-                    'commission': float(getattr(deal, 'Commission', 0)),
-                    'swap': float(getattr(deal, 'Storage', 0)),
-                    'status': 'Closed',
-                    'account_id': str(acc.account_id),
-                })
-            except Exception as e:
-                logger.warning('Error converting deal for account %s: %s', acc.account_id, e)
+        trades = _deals_to_trades(acc.account_id, raw_deals, logger)
 
         # Fetch open positions for this account
         open_positions = []
@@ -146,95 +494,16 @@ def process_account_for_daily_report(account_id, report_date_str):
                 report.save()
             return {'status': 'skipped', 'reason': 'no_activity'}
 
-        # If there are open positions, convert them to the same trade dict format
-        # used by the template so they render in the trade history section.
-        if open_positions:
-            open_trades = []
-            for pos in open_positions:
-                # Normalize keys and convert timestamp if necessary
-                open_time_val = pos.get('date') or pos.get('open_time') or pos.get('time')
-                try:
-                    if isinstance(open_time_val, (int, float)):
-                        open_time_str = datetime.fromtimestamp(open_time_val).strftime('%Y-%m-%d %H:%M')
-                    else:
-                        open_time_str = str(open_time_val)
-                except Exception:
-                    open_time_str = str(open_time_val)
-
-                open_trades.append({
-                    'open_time': open_time_str,
-                    'close_time': '-',
-                    'symbol': pos.get('symbol') or pos.get('symbol_name') or 'N/A',
-                    'type': pos.get('type') or pos.get('position_type') or 'N/A',
-                    'volume': float(pos.get('volume', 0)),
-                    'profit': float(pos.get('profit', 0)),
-                    'status': 'Open',
-                    'account_id': str(acc.account_id)
-                })
-
-            # Merge open positions into the trades list so template shows them
-            trades = trades + open_trades
-
-        # Prepare template context (reuse report_template.html expectations)
-        month_names = [ '', 'January','February','March','April','May','June','July','August','September','October','November','December']
-        report_month = f"{month_names[report_date.month]} {report_date.year}"
-
-        context = {
-            'company_name': 'VTIndex',
-            'client_name': user.get_full_name(),
-            'account_id': acc.account_id,
-            'address': f"{user.address}, {user.city}, {user.state}, {user.country}".strip(', '),
-            'phone': user.phone_number or 'N/A',
-            'report_date': timezone.now().strftime('%B %d, %Y'),
-            'report_month': report_month,
-            'account_type': acc.get_account_type_display(),
-            'starting_balance': acc.balance,
-            'ending_balance': acc.balance,
-            'total_pnl': sum([t.get('profit', 0) for t in trades]) if trades else 0,
-            'trades': trades,
-            'total_commission': 0,
-            'total_volume': sum([t.get('volume', 0) for t in trades]) if trades else 0,
-            'logo_path': ''
-        }
-
-        # Render template to HTML
-        html_template_path = os.path.join(settings.BASE_DIR, 'report_template.html')
-        with open(html_template_path, 'r', encoding='utf-8') as f:
-            html_template = f.read()
-
-        from django.template import Template as DjangoTemplate, Context
-        template = DjangoTemplate(html_template)
-        acc_context = context.copy()
-        acc_context['is_summary'] = False
-        acc_html = template.render(Context(acc_context))
+        trades = trades + _positions_to_trades(acc.account_id, open_positions)
+        balances = timeline_balances([acc], report_date, mt5_manager)
+        acc_context = _report_context(acc, report_date, trades, balances.get(acc.id))
 
         # Convert to PDF bytes
         generator = MonthlyReportGenerator()
-        pdf_bytes = generator._convert_html_to_pdf(acc_html, user, report_date.year, report_date.month)
-
-        # Save to temp file
-        tmp_dir = getattr(settings, 'MEDIA_ROOT', None) or tempfile.gettempdir()
-        tmp_fd, tmp_path = tempfile.mkstemp(suffix='.pdf', dir=tmp_dir)
-        os.close(tmp_fd)
-        with open(tmp_path, 'wb') as f:
-            f.write(pdf_bytes)
-
-        # Prepare email
-        email_subject = f"Daily Trading Report - {report_date.strftime('%d %B %Y')} - Account {acc.account_id}"
-        email_context = {
-            'user_name': user.get_full_name(),
-            'report_month': f"{report_date.strftime('%d %B %Y')}",
-            'report_date_label': f"Daily Report - {report_date.strftime('%d %B %Y')}",
-            'company_name': 'VTIndex',
-            'total_trades': len(trades),
-            'total_volume': acc_context['total_volume'],
-            'generated_date': timezone.now().strftime('%B %d, %Y'),
-            'password_hint': 'This PDF is not password protected.',
-            'password_format': '',
-            'support_email': 'support@vtindex.com',
-            'login_url': 'https://client.vtindex.com'
-        }
+        pdf_bytes = generator._convert_html_to_pdf(_render_html(acc_context), user, report_date.year, report_date.month)
+        tmp_path = _write_pdf(pdf_bytes)
 
+        email_subject, email_context = _email_subject_and_context(acc, report_date, acc_context)
         sent = generator._send_report_email_with_attachment(user.email, email_subject, email_context, tmp_path)
 
         # Update report record
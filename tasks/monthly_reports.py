@@ -8,15 +8,6 @@ from django.template.loader import render_to_string
 from django.core.files.base import ContentFile
 from django.utils import timezone
 from django.db.models import Sum, Count, Q
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.utils import ImageReader
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.linecharts import HorizontalLineChart
-from reportlab.graphics.charts.barcharts import VerticalBarChart  
 from django.template import Template as DjangoTemplate, Context
 import tempfile
 import zipfile
@@ -31,6 +22,46 @@ from adminPanel.EmailSender import EmailSender
 
 logger = logging.getLogger(__name__)
 
+def html_to_pdf_bytes(html_content):
+    """
+    Render report HTML to PDF bytes: WeasyPrint first (best CSS support), then xhtml2pdf.
+    Touches neither the ORM nor settings, so it can run in a worker process.
+    """
+    try:
+        import weasyprint
+        return weasyprint.HTML(string=html_content).write_pdf()
+    except ImportError as ie:
+        logger.warning(f"WeasyPrint not available: {ie}")
+    except Exception as we:
+        logger.warning(f"WeasyPrint failed (system libs?): {we}")
+
+    # Sanitize HTML for XHTML-compatible renderers
+    try:
+        sanitized = html_content.replace('<br>', '<br/>')
+    except Exception:
+        sanitized = html_content
+
+    # Next try xhtml2pdf (pisa) in XHTML mode
+    try:
+        from xhtml2pdf import pisa
+
+        result = BytesIO()
+        # Use xhtml=True so parser treats input as XHTML-compatible HTML
+        pdf = pisa.CreatePDF(BytesIO(sanitized.encode('utf-8')), dest=result, xhtml=True)
+
+        out_bytes = result.getvalue()
+        # Accept output if it appears to be a valid PDF even when pisa reports non-zero errors
+        if out_bytes and out_bytes.startswith(b'%PDF'):
+            return out_bytes
+        logger.error(f"xhtml2pdf failed to produce valid PDF; parser err={getattr(pdf, 'err', None)}")
+    except ImportError:
+        logger.warning("xhtml2pdf not available on this system")
+    except Exception as xe:
+        logger.error(f"xhtml2pdf failed: {xe}")
+
+    raise RuntimeError('HTML to PDF conversion failed: WeasyPrint/xhtml2pdf unavailable or errored')
+
+
 class MonthlyReportGenerator:
     """
     Enhanced service class for generating automated monthly trading reports.
@@ -516,59 +547,22 @@ class MonthlyReportGenerator:
     def _convert_html_to_pdf(self, html_content, user, year, month):
         """Convert HTML content to PDF"""
         try:
-            # Prefer HTML-based rendering. Try WeasyPrint first (best CSS support)
-            try:
-                import weasyprint
-                pdf_bytes = weasyprint.HTML(string=html_content).write_pdf()
-                logger.info(f"Successfully generated PDF using WeasyPrint for {user.email}")
-                return pdf_bytes
-            except ImportError as ie:
-                logger.warning(f"WeasyPrint not available: {ie}")
-            except Exception as we:
-                logger.warning(f"WeasyPrint failed (system libs?): {we}")
-
-            # Sanitize HTML for XHTML-compatible renderers
-            try:
-                sanitized = html_content.replace('<br>', '<br/>')
-            except Exception:
-                sanitized = html_content
-
-            # Next try xhtml2pdf (pisa) in XHTML mode
-            try:
-                from xhtml2pdf import pisa
-                from io import BytesIO
-
-                result = BytesIO()
-                # Use xhtml=True so parser treats input as XHTML-compatible HTML
-                pdf = pisa.CreatePDF(BytesIO(sanitized.encode('utf-8')), dest=result, xhtml=True)
-
-                out_bytes = result.getvalue()
-                # Accept output if it appears to be a valid PDF even when pisa reports non-zero errors
-                if out_bytes and out_bytes.startswith(b'%PDF'):
-                    logger.info(f"xhtml2pdf produced PDF bytes for {user.email} (accepting despite parser warnings)")
-                    return out_bytes
-                else:
-                    logger.error(f"xhtml2pdf failed to produce valid PDF for {user.email}; parser err={getattr(pdf,'err',None)}")
-            except ImportError:
-                logger.warning("xhtml2pdf not available on this system")
-            except Exception as xe:
-                logger.error(f"xhtml2pdf failed for {user.email}: {xe}")
-
-            # If both HTML-based converters fail, write sanitized HTML to a debug file
+            pdf_bytes = html_to_pdf_bytes(html_content)
+            logger.info(f"Successfully generated PDF for {user.email}")
+            return pdf_bytes
+        except Exception as e:
+            # Both HTML-based converters failed: write sanitized HTML to a debug file
             try:
                 import os
                 debug_dir = os.path.join(getattr(settings, 'BASE_DIR', '.'), 'report_debug')
                 os.makedirs(debug_dir, exist_ok=True)
                 debug_path = os.path.join(debug_dir, f'report_debug_{getattr(user, "id", "unknown")}_{year}_{month:02d}.html')
                 with open(debug_path, 'w', encoding='utf-8') as f:
-                    f.write(sanitized)
+                    f.write(html_content.replace('<br>', '<br/>'))
                 logger.error(f'HTML to PDF conversion failed; sanitized HTML written to {debug_path}')
             except Exception as de:
                 logger.error(f'Failed to write debug HTML file: {de}')
 
-            raise RuntimeError('HTML to PDF conversion failed: WeasyPrint/xhtml2pdf unavailable or errored')
-
-        except Exception as e:
             logger.error(f"Failed to convert HTML to PDF for user {user.email}: {e}")
             raise
     
@@ -576,6 +570,12 @@ class MonthlyReportGenerator:
     
     def _generate_simple_pdf_report(self, user, year, month):
         """Generate a simple PDF report using reportlab as fallback"""
+        # reportlab is only needed by this fallback; import it on use
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
         try:
             # Create a temporary file
             buffer = BytesIO()
@@ -658,8 +658,11 @@ class MonthlyReportGenerator:
             logger.error(f"Failed to generate simple PDF report: {e}")
             raise
     
-    def create_monthly_report(self, user, year, month, force_regenerate=False):
-        """Create or update a monthly report for a user"""
+    def create_monthly_report(self, user, year, month, force_regenerate=False, data_loader=None):
+        """
+        Create or update a monthly report for a user.
+        data_loader: optional MonthlyReportDataLoader shared by a whole report run.
+        """
         try:
             # Check if report already exists
             report, created = MonthlyTradeReport.objects.get_or_create(
@@ -681,7 +684,7 @@ class MonthlyReportGenerator:
             try:
                 from adminPanel.services.monthly_report_generator import MonthlyTradeReportGenerator
 
-                gen = MonthlyTradeReportGenerator(user, datetime(year, month, 1))
+                gen = MonthlyTradeReportGenerator(user, datetime(year, month, 1), data_loader=data_loader)
                 pdf_path = gen.generate_html_pdf_report()
 
                 # Read PDF bytes and save to report_file
@@ -1006,6 +1009,16 @@ class MonthlyReportGenerator:
         skipped_reports = 0
         
         logger.info(f"Found {total_users} eligible users for monthly reports")
+
+        # Load transactions, commissions and opening balances for every eligible
+        # user once; each report then only formats its slice of the data
+        from adminPanel.services.monthly_report_data import MonthlyReportDataLoader
+        data_loader = MonthlyReportDataLoader(year, month, users=users)
+        try:
+            data_loader.load()
+        except Exception as e:
+            logger.error(f"Bulk report data load failed, falling back to per-user queries: {e}")
+            data_loader = None
         
         for user in users:
             try:
@@ -1018,7 +1031,7 @@ class MonthlyReportGenerator:
                     continue
                 
                 # Generate report
-                report = self.create_monthly_report(user, year, month, force_regenerate)
+                report = self.create_monthly_report(user, year, month, force_regenerate, data_loader=data_loader)
                 
                 if report:
                     # Send email
@@ -3,6 +3,14 @@ from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from adminPanel.utils.query_profiler import QueryBudgetExceeded, QueryBudgetMixin, fingerprint
+import os
+import shutil
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from adminPanel.utils.file_serving import parse_range
+from adminPanel.models import AccountBulkOperation, MAMCopyOperation, TradingAccount
 
 
 class RefreshRotationTests(TestCase):
@@ -33,3 +41,227 @@ class RefreshRotationTests(TestCase):
 		self.assertIn(res2.status_code, (400, 401))
 
 
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+	def setUp(self):
+		User = get_user_model()
+		for i in range(3):
+			User.objects.create_user(username=f'budget{i}', email=f'budget{i}@example.com', password='testpass')
+
+	def test_per_row_queries_are_reported_as_repeated(self):
+		User = get_user_model()
+		with self.assertRaises(QueryBudgetExceeded) as ctx:
+			with self.assertQueryBudget(max_duplicates=0):
+				for user in User.objects.all():
+					User.objects.filter(pk=user.pk).exists()
+		self.assertIn('repeated queries', str(ctx.exception))
+
+	def test_within_budget(self):
+		User = get_user_model()
+		with self.assertQueryBudget(max_queries=1, max_duplicates=0) as prof:
+			list(User.objects.all())
+		self.assertEqual(prof.queries, 1)
+
+	def test_fingerprint_collapses_literals(self):
+		self.assertEqual(
+			fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'x' AND k IN (1, 2, 3)"),
+			fingerprint("SELECT * FROM t WHERE id = 17 AND name = 'y' AND k IN (4)"),
+		)
+
+
+class BlobStorageTests(TestCase):
+	def setUp(self):
+		self.media_root = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+		override = override_settings(MEDIA_ROOT=self.media_root)
+		override.enable()
+		self.addCleanup(override.disable)
+
+	def test_identical_uploads_share_one_blob(self):
+		from adminPanel.services import blob_storage
+
+		first = blob_storage.store_upload(SimpleUploadedFile('a.pdf', b'%PDF same bytes', 'application/pdf'))
+		second = blob_storage.store_upload(SimpleUploadedFile('b.pdf', b'%PDF same bytes', 'application/pdf'))
+		self.assertEqual(first.pk, second.pk)
+		second.refresh_from_db()
+		self.assertEqual(second.ref_count, 2)
+		self.assertTrue(blob_storage.get_storage().exists(second.name))
+
+		self.assertTrue(blob_storage.release(second.name))
+		second.refresh_from_db()
+		self.assertEqual(second.ref_count, 1)
+		self.assertFalse(blob_storage.release('messages/not-a-blob.pdf'))
+
+	def test_managers_only_read_their_own_clients_files(self):
+		from adminPanel.services import blob_storage
+
+		User = get_user_model()
+		manager = User.objects.create_user(username='blob-m1', email='blob-m1@example.com', password='testpass',
+			manager_admin_status='Manager Level 1')
+		other_manager = User.objects.create_user(username='blob-m2', email='blob-m2@example.com', password='testpass',
+			manager_admin_status='Manager Level 1')
+		client = User.objects.create_user(username='blob-c', email='blob-c@example.com', password='testpass',
+			created_by=other_manager)
+		blob = blob_storage.store_upload(SimpleUploadedFile('id.pdf', b'%PDF client id', 'application/pdf'))
+		User.objects.filter(pk=client.pk).update(id_proof=blob.name)
+
+		api = APIClient()
+		api.force_authenticate(manager)
+		self.assertEqual(api.get(f'/api/files/{blob.sha256}/').status_code, 404)
+		api.force_authenticate(other_manager)
+		self.assertEqual(api.get(f'/api/files/{blob.sha256}/').status_code, 200)
+
+	def test_parse_range(self):
+		self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+		self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+		self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+		self.assertEqual(parse_range('bytes=500-5000', 1000), (500, 999))
+		self.assertIs(parse_range('bytes=1000-', 1000), False)
+		self.assertIsNone(parse_range('bytes=0-1,5-9', 1000))
+		self.assertIsNone(parse_range(None, 1000))
+
+
+class ManagerScopeTests(TestCase):
+	"""Managers (manager_admin_status 'Manager Level N') only reach their own clients' accounts."""
+
+	def setUp(self):
+		User = get_user_model()
+		self.manager = User.objects.create_user(username='scope-m1', email='scope-m1@example.com', password='testpass',
+			manager_admin_status='Manager Level 1')
+		self.other_manager = User.objects.create_user(username='scope-m2', email='scope-m2@example.com', password='testpass',
+			manager_admin_status='Manager Level 1')
+		client = User.objects.create_user(username='scope-c', email='scope-c@example.com', password='testpass',
+			created_by=self.other_manager)
+		self.master = TradingAccount.objects.create(user=client, account_id='555001', account_type='mam',
+			account_name='Scope MAM')
+		self.api = APIClient()
+
+	def test_manager_cannot_control_other_managers_mam_copy(self):
+		self.api.force_authenticate(self.manager)
+		res = self.api.post('/api/mam-copy-operations/', {'account_id': '555001', 'action': 'pause'}, format='json')
+		self.assertEqual(res.status_code, 403)
+		self.assertFalse(MAMCopyOperation.objects.exists())
+
+		operation = MAMCopyOperation.objects.create(master_account=self.master, action='pause', created_by=self.other_manager)
+		self.assertEqual(self.api.get(f'/api/mam-copy-operations/{operation.id}/').status_code, 403)
+		self.assertEqual(self.api.post(f'/api/mam-copy-operations/{operation.id}/').status_code, 403)
+
+		self.api.force_authenticate(self.other_manager)
+		self.assertEqual(self.api.get(f'/api/mam-copy-operations/{operation.id}/').status_code, 200)
+
+	def test_manager_bulk_operations_are_limited_to_their_clients(self):
+		self.api.force_authenticate(self.manager)
+		res = self.api.post('/api/account-bulk-operations/', {
+			'operation': 'change_leverage', 'params': {'leverage': 100},
+			'filters': {'account_type': 'mam', 'manager_id': self.other_manager.id}, 'dry_run': True,
+		}, format='json')
+		self.assertEqual(res.status_code, 200)
+		operation = AccountBulkOperation.objects.get()
+		self.assertEqual(operation.filters['manager_id'], self.manager.id)
+		self.assertEqual(operation.total, 0)
+
+		other = AccountBulkOperation.objects.create(operation='disable_account', params={}, filters={},
+			created_by=self.other_manager)
+		self.assertEqual(self.api.get(f'/api/account-bulk-operations/{other.id}/').status_code, 403)
+		self.assertEqual(self.api.post(f'/api/account-bulk-operations/{other.id}/').status_code, 403)
+
+
+class UserImportSideEffectTests(TestCase):
+	"""The bulk user import applies the CustomUser.save() side effects it bypasses."""
+
+	HEADER = ('user_id,email,first_name,last_name,dob,phone_number,address,city,zip_code,state,country,profile_pic,'
+		'address_proof_verified,id_proof_verified,IB_status,MAM_manager_status,manager_admin_status,date_joined,'
+		'is_active,is_staff,commissioning_profile_name,parent_ib_user_id\n')
+
+	def test_new_ib_gets_clients_who_used_their_code(self):
+		from adminPanel.management.commands.import_users_from_csv import UserImporter
+		from adminPanel.models import CommissioningProfile
+
+		User = get_user_model()
+		CommissioningProfile.objects.create(name='Default')
+		ib = User.objects.create_user(username='import-ib', email='import-ib@example.com', password='testpass',
+			user_id=7000100, referral_code='REFTEST1')
+		client = User.objects.create_user(username='import-c', email='import-c@example.com', password='testpass',
+			referral_code_used='REFTEST1')
+
+		directory = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+		path = f'{directory}/users.csv'
+		with open(path, 'w', encoding='utf-8') as f:
+			f.write(self.HEADER)
+			f.write('7000100,import-ib@example.com,Import,IB,,,,,,,,,False,False,True,False,,,True,False,Default,\n')
+		UserImporter(path).run()
+
+		client.refresh_from_db()
+		self.assertEqual(client.parent_ib_id, ib.pk)
+
+
+class ExportCleanupTests(TestCase):
+	def setUp(self):
+		self.export_root = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.export_root, ignore_errors=True)
+		override = override_settings(EXPORT_ROOT=self.export_root)
+		override.enable()
+		self.addCleanup(override.disable)
+
+	def test_expired_export_files_are_deleted(self):
+		from datetime import timedelta
+		from django.utils import timezone
+		from adminPanel.models import ExportJob
+		from adminPanel.services.export_service import cleanup_expired_exports
+
+		path = f'{self.export_root}/users_export_old.csv.gz'
+		with open(path, 'wb') as f:
+			f.write(b'pii')
+		job = ExportJob.objects.create(job_id='old', export='users', status='completed', path=path,
+			filename='users_export.csv.gz', expires_at=timezone.now() - timedelta(minutes=1))
+
+		self.assertEqual(cleanup_expired_exports(), 1)
+		job.refresh_from_db()
+		self.assertEqual(job.status, 'expired')
+		self.assertEqual(job.path, '')
+		self.assertFalse(os.path.exists(path))
+
+
+class ClientIpTests(TestCase):
+	def _request(self, forwarded):
+		from django.test import RequestFactory
+		return RequestFactory().get('/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR=forwarded)
+
+	def test_forwarded_for_is_ignored_without_trusted_proxies(self):
+		from adminPanel.utils.rate_limit import client_ip
+		self.assertEqual(client_ip(self._request('1.2.3.4')), '10.0.0.2')
+
+	@override_settings(RATE_LIMIT_TRUSTED_PROXIES=1)
+	def test_hop_appended_by_trusted_proxy_is_used(self):
+		from adminPanel.utils.rate_limit import client_ip
+		# The client forged the first entry; the proxy appended the real address
+		self.assertEqual(client_ip(self._request('6.6.6.6, 203.0.113.9')), '203.0.113.9')
+
+
+class TransactionSummaryTests(TestCase):
+	def test_deleting_a_manager_keeps_totals(self):
+		from datetime import datetime, time, timedelta
+		from decimal import Decimal
+		from django.utils import timezone
+		from adminPanel.models import Transaction
+		from adminPanel.services.transaction_summary import rebuild, transaction_totals
+
+		User = get_user_model()
+		manager = User.objects.create_user(username='sum-m', email='sum-m@example.com', password='testpass',
+			manager_admin_status='Manager Level 1')
+		client = User.objects.create_user(username='sum-c', email='sum-c@example.com', password='testpass',
+			created_by=manager)
+		tx = Transaction.objects.create(user=client, transaction_type='deposit_trading', amount=Decimal('150.00'),
+			status='approved')
+		day = timezone.localdate() - timedelta(days=30)
+		# created_at is auto_now_add; move the deposit to a day only the summary covers
+		Transaction.objects.filter(pk=tx.pk).update(
+			created_at=timezone.make_aware(datetime.combine(day, time(12))))
+		rebuild(day, day)
+
+		before = transaction_totals(['deposit_trading'], 'approved')
+		self.assertEqual(before, (1, Decimal('150.00')))
+		manager.delete()
+		self.assertEqual(transaction_totals(['deposit_trading'], 'approved'), before)
@@ -0,0 +1,255 @@
+"""
+Bulk CSV import framework shared by the import_*_from_csv management commands.
+
+Rows are read in chunks, validated against lookup maps that are preloaded once
+(instead of several .filter().first() queries per row), and written with one
+bulk_create / bulk_update per chunk. Links that can point at rows from the
+same file (parent IB, MAM master) are resolved in a second in-memory pass.
+"""
+
+import csv
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class RowSkipped(Exception):
+    """Raised from build_row() to skip a CSV row with a reason that is reported."""
+
+
+class RowDeferred(Exception):
+    """Raised from build_row() to retry a row in finalize() once the other rows are written."""
+
+
+def parse_bool(value, default=False):
+    if not value:
+        return default
+    return str(value).strip().lower() == 'true'
+
+
+def parse_int(value):
+    return int(value) if value else None
+
+
+def parse_decimal(value, default=None):
+    if not value:
+        return default
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise RowSkipped(f"invalid decimal value '{value}'")
+
+
+def parse_csv_datetime(raw):
+    """
+    Parse an ISO datetime (with offset) or a date-only string from CSV.
+    Date-only values become midnight in the project timezone. Returns None
+    for empty/'none'/unparseable values.
+    """
+    if not raw or str(raw).lower() == 'none':
+        return None
+    value = parse_datetime(raw)
+    if value:
+        return value
+    parsed_date = parse_date(raw)
+    if not parsed_date:
+        return None
+    value = datetime.combine(parsed_date, datetime.min.time())
+    try:
+        value = timezone.make_aware(value)
+    except Exception:
+        pass
+    return value
+
+
+def iter_chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportStats:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.linked = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (
+            f"{self.rows} rows in {self.elapsed:.1f}s ({self.rows_per_second:.0f} rows/s): "
+            f"{self.created} created, {self.updated} updated, {self.skipped} skipped"
+            + (f", {self.linked} links resolved" if self.linked else "")
+        )
+
+
+class BulkCSVImporter:
+    """
+    Base class for chunked CSV imports.
+
+    Subclasses set `model` and `update_fields` and implement:
+        preload()               build lookup maps once before reading rows
+        build_row(row)          return (key, field_values) or raise RowSkipped / RowDeferred
+        fetch_existing(keys)    return {key: instance} for keys already in the DB
+    Optional hooks:
+        validate(instance)      raise ValidationError/RowSkipped to reject a row
+        after_chunk(pairs)      receives [(instance, created)] once the chunk is written
+        finalize()              second pass after all chunks (link resolution)
+
+    `created_timestamp_fields` are re-applied with bulk_update after bulk_create
+    because auto_now_add fields ignore the value supplied on insert.
+    """
+
+    model = None
+    update_fields = ()
+    created_timestamp_fields = ()
+    label = 'rows'
+
+    def __init__(self, path, stdout=None, style=None, chunk_size=DEFAULT_CHUNK_SIZE, verbose=False):
+        self.path = path
+        self.stdout = stdout
+        self.style = style
+        self.chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        self.verbose = verbose
+        self.stats = ImportStats()
+        self.deferred_rows = []
+
+    # --- output -----------------------------------------------------------
+
+    def write(self, message, level=None):
+        if not self.stdout:
+            return
+        if self.style and level:
+            message = getattr(self.style, level)(message)
+        self.stdout.write(message)
+
+    def skip(self, reason):
+        self.stats.skipped += 1
+        if self.verbose:
+            self.write(f"Skipping row {self.stats.rows}: {reason}", 'WARNING')
+
+    # --- hooks ------------------------------------------------------------
+
+    def preload(self):
+        pass
+
+    def build_row(self, row):
+        raise NotImplementedError
+
+    def fetch_existing(self, keys):
+        raise NotImplementedError
+
+    def validate(self, instance):
+        pass
+
+    def after_chunk(self, pairs):
+        pass
+
+    def finalize(self):
+        pass
+
+    # --- driver -----------------------------------------------------------
+
+    def run(self):
+        with transaction.atomic():
+            self.preload()
+            with open(self.path, newline='', encoding='utf-8') as csvfile:
+                reader = csv.DictReader(csvfile)
+                for chunk in iter_chunks(reader, self.chunk_size):
+                    self.process_chunk(chunk)
+                    self.write(f"Processed {self.stats.rows} {self.label} ({self.stats.rows_per_second:.0f} rows/s)")
+            self.finalize()
+        self.write(f"Imported {self.label}: {self.stats.summary()}", 'SUCCESS')
+        return self.stats
+
+    def process_chunk(self, rows):
+        prepared = []
+        for row in rows:
+            self.stats.rows += 1
+            try:
+                key, values = self.build_row(row)
+            except RowDeferred:
+                self.stats.rows -= 1
+                self.deferred_rows.append(row)
+                continue
+            except RowSkipped as e:
+                self.skip(str(e))
+                continue
+            prepared.append((key, values))
+
+        if not prepared:
+            return []
+
+        existing = self.fetch_existing({key for key, _ in prepared})
+        pending = {}
+        for key, values in prepared:
+            # Duplicate keys within a chunk update the instance already queued
+            instance = pending.get(key) or existing.get(key)
+            if instance is None:
+                instance = self.model(**values)
+                instance._import_created = True
+            else:
+                for field, value in values.items():
+                    setattr(instance, field, value)
+                if not hasattr(instance, '_import_created'):
+                    instance._import_created = False
+            try:
+                self.validate(instance)
+            except (ValidationError, RowSkipped) as e:
+                self.skip('; '.join(getattr(e, 'messages', [str(e)])))
+                continue
+            pending[key] = instance
+
+        return self.write_instances(list(pending.values()))
+
+    def write_instances(self, instances):
+        to_create = [obj for obj in instances if obj._import_created]
+        to_update = [obj for obj in instances if not obj._import_created]
+
+        if to_create:
+            timestamps = [
+                {field: getattr(obj, field) for field in self.created_timestamp_fields}
+                for obj in to_create
+            ]
+            created = self.model.objects.bulk_create(to_create, batch_size=self.chunk_size)
+            self.stats.created += len(created)
+            if self.created_timestamp_fields:
+                restore = []
+                for obj, values in zip(created, timestamps):
+                    if obj.pk and all(values.values()):
+                        for field, value in values.items():
+                            setattr(obj, field, value)
+                        restore.append(obj)
+                if restore:
+                    self.model.objects.bulk_update(
+                        restore, list(self.created_timestamp_fields), batch_size=self.chunk_size
+                    )
+        if to_update:
+            self.model.objects.bulk_update(to_update, list(self.update_fields), batch_size=self.chunk_size)
+            self.stats.updated += len(to_update)
+
+        pairs = [(obj, obj._import_created) for obj in instances]
+        self.after_chunk(pairs)
+        return pairs
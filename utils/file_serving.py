@@ -0,0 +1,118 @@
+"""
+File serving
+Serve stored files without tying up a Django worker for the whole download:
+
+    return serve_file(request, blob.name, content_type=blob.content_type, etag=blob.sha256)
+
+    - settings.FILE_SERVE_ACCEL_REDIRECT_PREFIX (e.g. '/protected-media/'):
+      answer with an empty response and X-Accel-Redirect: <prefix><name>; nginx
+      serves the bytes (ranges included) from an `internal` location aliased to
+      MEDIA_ROOT;
+    - settings.FILE_SERVE_SENDFILE = True: X-Sendfile with the absolute path
+      (Apache mod_xsendfile, lighttpd);
+    - otherwise Django streams the file itself: a single `Range: bytes=` range
+      gets a 206 with only that slice, anything else the whole file through
+      FileResponse (wsgi.file_wrapper, so servers that support it use sendfile).
+
+An `etag` (content digest) enables If-None-Match (304) and If-Range.
+"""
+
+from urllib.parse import quote
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+CHUNK_SIZE = 256 * 2 ** 10
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single-range header, None to serve everything, False if unsatisfiable."""
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        # Missing, malformed or multi-range: the whole file is a valid answer
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        file.close()
+
+
+def _headers(response, content_type, filename, as_attachment, etag, max_age):
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    response['Accept-Ranges'] = 'bytes'
+    if filename or as_attachment:
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    if etag:
+        response['ETag'] = f'"{etag}"'
+        # Content-addressed: the bytes behind this ETag never change
+        response['Cache-Control'] = f'private, max-age={max_age}, immutable'
+    return response
+
+
+def serve_file(request, name, storage=None, content_type=None, filename=None, as_attachment=False, etag=None,
+               max_age=86400):
+    storage = storage or default_storage
+    if etag and request.headers.get('If-None-Match', '').strip('"') == etag:
+        return _headers(HttpResponse(status=304), content_type, None, False, etag, max_age)
+
+    accel_prefix = getattr(settings, 'FILE_SERVE_ACCEL_REDIRECT_PREFIX', None)
+    if accel_prefix:
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = quote(accel_prefix.rstrip('/') + '/' + str(name).lstrip('/'))
+        response = _headers(response, content_type, filename, as_attachment, etag, max_age)
+        # Let nginx pick the type from its own mime map only when we have none
+        if not content_type:
+            del response['Content-Type']
+        return response
+
+    if getattr(settings, 'FILE_SERVE_SENDFILE', False):
+        response = HttpResponse()
+        response['X-Sendfile'] = storage.path(name)
+        return _headers(response, content_type, filename, as_attachment, etag, max_age)
+
+    size = storage.size(name)
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if not if_range or (etag and if_range.strip('"') == etag):
+        byte_range = parse_range(request.headers.get('Range'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(storage.open(name, 'rb'))
+        response['Content-Length'] = str(size)
+        return _headers(response, content_type, filename, as_attachment, etag, max_age)
+
+    start, end = byte_range
+    response = StreamingHttpResponse(_read_range(storage.open(name, 'rb'), start, end - start + 1), status=206)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return _headers(response, content_type, filename, as_attachment, etag, max_age)
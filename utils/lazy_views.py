@@ -0,0 +1,74 @@
+"""
+Lazy views
+URL patterns that name their view by dotted path, so building the URL conf does
+not import every views module (and the models, serializers, MT5 and PDF code
+they pull in) in each worker:
+
+    path('api/admin/deposit/', lazy_view('adminPanel.views.views7.DepositView'), name=...)
+
+The view module is imported on the first request routed to the pattern; class
+based views are turned into views with as_view(**initkwargs). Attributes
+middleware reads from the view (csrf_exempt, cls, ...) resolve it as well.
+
+ADMINPANEL_EAGER_VIEWS=1 in the environment (or settings.LAZY_VIEWS = False)
+resolves every view while the URL conf is built, as before; the
+benchmark_startup command uses it to compare both modes.
+"""
+
+from importlib import import_module
+import inspect
+import os
+import threading
+
+from django.conf import settings
+
+# Names the URL resolver inspects while it indexes patterns; answering them must not import the view
+_UNRESOLVED_ATTRIBUTES = frozenset({'view_class'})
+
+
+def eager_views():
+    return os.environ.get('ADMINPANEL_EAGER_VIEWS') == '1' or not getattr(settings, 'LAZY_VIEWS', True)
+
+
+class LazyView:
+    def __init__(self, dotted_path, initkwargs):
+        module_path, _, name = dotted_path.rpartition('.')
+        self.__module__ = module_path
+        self.__name__ = name
+        self.__qualname__ = name
+        self._initkwargs = initkwargs
+        self._view = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        view = self._view
+        if view is None:
+            with self._lock:
+                if self._view is None:
+                    target = getattr(import_module(self.__module__), self.__name__)
+                    if inspect.isclass(target) and hasattr(target, 'as_view'):
+                        target = target.as_view(**self._initkwargs)
+                    self._view = target
+                view = self._view
+        return view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        # Private and dunder lookups (coroutine markers, _non_atomic_requests, ...)
+        # get the default behaviour of a plain sync view
+        if name.startswith('_') or name in _UNRESOLVED_ATTRIBUTES:
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        return f"<LazyView {self.__module__}.{self.__name__}>"
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """The view at `dotted_path`, imported on first use (as_view(**initkwargs) for classes)."""
+    view = LazyView(dotted_path, initkwargs)
+    if eager_views():
+        return view.resolve()
+    return view
@@ -3,7 +3,7 @@ Notification Utility Functions
 Helper functions to create notifications for various system events
 """
 
-from adminPanel.models_notification import Notification
+from adminPanel.models_notification import Notification, BroadcastNotification
 import logging
 
 logger = logging.getLogger(__name__)
@@ -315,3 +315,34 @@ def create_custom_notification(user, notification_type, status, title, message,
     except Exception as e:
         logger.error(f"Error creating custom notification: {e}")
         return None
+
+
+def create_broadcast_notification(notification_type, status, title, message, audience='all',
+                                  action_url=None, metadata=None, created_by=None):
+    """
+    Create one notification shown to a whole audience
+    
+    Args:
+        notification_type: Type of notification (IB, BANK, CRYPTO, PROFILE, DOCUMENT, ACCOUNT)
+        status: Status (pending, approved, rejected, created, completed)
+        title: Notification title
+        message: Notification message
+        audience: 'all', 'client', 'manager' or 'admin'
+        action_url: Optional URL for action
+        metadata: Optional metadata dict
+        created_by: Admin who sent the broadcast
+    """
+    try:
+        return BroadcastNotification.create_broadcast(
+            notification_type=notification_type,
+            status=status,
+            title=title,
+            message=message,
+            audience=audience,
+            action_url=action_url,
+            metadata=metadata or {},
+            created_by=created_by
+        )
+    except Exception as e:
+        logger.error(f"Error creating broadcast notification: {e}")
+        return None
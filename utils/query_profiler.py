@@ -0,0 +1,309 @@
+"""
+Query profiler
+Per-request counts of SQL queries, SQL time, repeated query shapes (the N+1
+signature) and MT5 Manager API calls, aggregated per URL name.
+
+    with profile() as prof:                  # record everything run in this context
+        ...
+    prof.queries, prof.sql_ms, prof.duplicates(), prof.mt5_calls, prof.mt5_ms
+
+    profiler_stats.summary()                 # per-endpoint percentiles (this process)
+
+Collection:
+    - SQL: a connection execute_wrapper installed for the duration of the profile;
+    - MT5: MT5ManagerActions wraps its manager in ProfiledManager once
+      instrumentation is enabled (the profiler middleware or a query budget
+      enables it), which times every Manager API call made inside a profile;
+    - query shapes: SQL with literals and IN lists normalised, so the same
+      query issued once per row collapses to one fingerprint.
+
+Profiles nest: a query is recorded by every active profile, so a query budget
+in a test still sees queries while the middleware profiles the same request.
+
+QueryProfilerMiddleware (middleware/query_profiler.py) feeds profiler_stats
+when settings.QUERY_PROFILER_ENABLED is set; assert_query_budget /
+QueryBudgetMixin check budgets in tests.
+"""
+
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+import contextvars
+import math
+import re
+import threading
+import time
+
+from django.db import connections
+
+# Samples kept per endpoint for percentiles
+SAMPLE_SIZE = 500
+# Fingerprints kept per endpoint (the most repeated ones)
+TOP_DUPLICATES = 5
+FINGERPRINT_LENGTH = 500
+
+_active = contextvars.ContextVar('query_profiles', default=())
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:[^()]*)\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Shape of a SQL statement: literals replaced and IN lists collapsed."""
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    return _SPACE_RE.sub(' ', shape).strip()[:FINGERPRINT_LENGTH]
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.shapes = Counter()
+        self.mt5_calls = 0
+        self.mt5_seconds = 0.0
+        self.mt5_methods = Counter()
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    @property
+    def sql_ms(self):
+        return round(self.sql_seconds * 1000, 2)
+
+    @property
+    def mt5_ms(self):
+        return round(self.mt5_seconds * 1000, 2)
+
+    @property
+    def duration_ms(self):
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self.started
+        return round(seconds * 1000, 2)
+
+    def duplicates(self):
+        """[(fingerprint, count)] of query shapes run more than once, most repeated first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > 1]
+
+    def duplicate_queries(self):
+        """Queries beyond the first of each shape."""
+        return sum(count - 1 for count in self.shapes.values())
+
+
+def _record_query(execute, sql, params, many, context):
+    profiles = _active.get()
+    if not profiles:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        shape = fingerprint(sql)
+        for prof in profiles:
+            prof.queries += 1
+            prof.sql_seconds += elapsed
+            prof.shapes[shape] += 1
+
+
+def record_mt5_call(method, seconds):
+    for prof in _active.get():
+        prof.mt5_calls += 1
+        prof.mt5_seconds += seconds
+        prof.mt5_methods[method] += 1
+
+
+@contextmanager
+def profile():
+    """Record SQL and MT5 activity of the current context into a new RequestProfile."""
+    prof = RequestProfile()
+    outer = _active.get()
+    token = _active.set(outer + (prof,))
+    try:
+        with ExitStack() as stack:
+            # The outermost profile installs the wrapper; it records into every active profile
+            if not outer:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_record_query))
+            yield prof
+    finally:
+        prof.seconds = time.perf_counter() - prof.started
+        _active.reset(token)
+
+
+# --- MT5 instrumentation ----------------------------------------------------
+
+_instrumented = False
+_proxies = {}
+_proxies_lock = threading.Lock()
+
+
+class ProfiledManager:
+    """Manager API proxy that times calls made while a profile is active."""
+
+    __slots__ = ('_wrapped',)
+
+    def __init__(self, wrapped):
+        object.__setattr__(self, '_wrapped', wrapped)
+
+    def __getattr__(self, name):
+        attr = getattr(self._wrapped, name)
+        if not callable(attr) or not _active.get():
+            return attr
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                record_mt5_call(name, time.perf_counter() - started)
+        return timed
+
+    def __setattr__(self, name, value):
+        setattr(self._wrapped, name, value)
+
+    def __bool__(self):
+        return bool(self._wrapped)
+
+
+def enable_mt5_instrumentation():
+    global _instrumented
+    _instrumented = True
+
+
+def instrument_manager(manager):
+    """The manager itself, or its (stable) ProfiledManager once instrumentation is enabled."""
+    if not _instrumented or manager is None or isinstance(manager, ProfiledManager):
+        return manager
+    with _proxies_lock:
+        cached = _proxies.get(id(manager))
+        if cached is None or cached[0] is not manager:
+            # Managers are replaced on reconnect; keep only the current ones
+            if len(_proxies) >= 4:
+                _proxies.clear()
+            cached = (manager, ProfiledManager(manager))
+            _proxies[id(manager)] = cached
+        return cached[1]
+
+
+# --- aggregation --------------------------------------------------------------
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0
+    # Nearest rank
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+_METRICS = ('queries', 'sql_ms', 'duplicate_queries', 'mt5_calls', 'mt5_ms', 'duration_ms')
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.worst_duplicates = {}
+
+    def add(self, prof):
+        self.requests += 1
+        self.samples.append((
+            prof.queries, prof.sql_ms, prof.duplicate_queries(), prof.mt5_calls, prof.mt5_ms, prof.duration_ms,
+        ))
+        for shape, count in prof.duplicates()[:TOP_DUPLICATES]:
+            if count > self.worst_duplicates.get(shape, 0):
+                self.worst_duplicates[shape] = count
+        if len(self.worst_duplicates) > TOP_DUPLICATES * 4:
+            kept = sorted(self.worst_duplicates.items(), key=lambda item: item[1], reverse=True)[:TOP_DUPLICATES]
+            self.worst_duplicates = dict(kept)
+
+    def summary(self):
+        result = {'requests': self.requests, 'samples': len(self.samples)}
+        for position, metric in enumerate(_METRICS):
+            ordered = sorted(sample[position] for sample in self.samples)
+            result[metric] = {
+                'p50': _percentile(ordered, 0.50),
+                'p95': _percentile(ordered, 0.95),
+                'p99': _percentile(ordered, 0.99),
+                'max': ordered[-1] if ordered else 0,
+            }
+        result['top_duplicates'] = [
+            {'fingerprint': shape, 'max_per_request': count}
+            for shape, count in sorted(self.worst_duplicates.items(), key=lambda item: item[1], reverse=True)[:TOP_DUPLICATES]
+        ]
+        return result
+
+
+class ProfilerStats:
+    """Per-endpoint profiles of this process."""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self.since = time.time()
+
+    def record(self, name, prof):
+        with self._lock:
+            stats = self._endpoints.get(name)
+            if stats is None:
+                stats = self._endpoints[name] = EndpointStats()
+            stats.add(prof)
+
+    def summary(self, endpoint=None, sort='queries'):
+        with self._lock:
+            items = [
+                dict(endpoint=name, **stats.summary())
+                for name, stats in self._endpoints.items()
+                if endpoint is None or name == endpoint
+            ]
+        if sort in _METRICS:
+            items.sort(key=lambda item: item[sort]['p95'], reverse=True)
+        return items
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self.since = time.time()
+
+
+profiler_stats = ProfilerStats()
+
+
+# --- test helpers -------------------------------------------------------------
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_query_budget(max_queries=None, max_duplicates=None, max_mt5_calls=None):
+    """
+    Fail when the block runs more SQL queries, more repeated query shapes
+    (queries beyond the first of each shape) or more MT5 calls than allowed.
+
+        with assert_query_budget(max_queries=8, max_duplicates=0):
+            self.client.get(url)
+    """
+    enable_mt5_instrumentation()
+    with profile() as prof:
+        yield prof
+
+    failures = []
+    if max_queries is not None and prof.queries > max_queries:
+        failures.append(f"{prof.queries} queries (budget {max_queries})")
+    if max_duplicates is not None and prof.duplicate_queries() > max_duplicates:
+        failures.append(f"{prof.duplicate_queries()} repeated queries (budget {max_duplicates})")
+    if max_mt5_calls is not None and prof.mt5_calls > max_mt5_calls:
+        failures.append(f"{prof.mt5_calls} MT5 calls (budget {max_mt5_calls}): {dict(prof.mt5_methods)}")
+    if failures:
+        details = '\n'.join(f"  {count}x {shape}" for shape, count in prof.duplicates()[:TOP_DUPLICATES])
+        message = "Query budget exceeded: " + ", ".join(failures)
+        if details:
+            message += "\nMost repeated queries:\n" + details
+        raise QueryBudgetExceeded(message)
+
+
+class QueryBudgetMixin:
+    """TestCase mixin: `with self.assertQueryBudget(max_queries=5): ...`"""
+
+    def assertQueryBudget(self, max_queries=None, max_duplicates=None, max_mt5_calls=None):
+        return assert_query_budget(max_queries, max_duplicates, max_mt5_calls)
@@ -0,0 +1,252 @@
+"""
+Rate limiting
+Atomic sliding-window counters shared by every worker process, with per-route
+policies declared on the view:
+
+    @api_view(['POST'])
+    @rate_limit('login', limit=5, window=60, key='ip')
+    def login_view(request): ...
+
+    class ChangeLeverageView(APIView):
+        @mt5_budget(cost=2)
+        def post(self, request, account_id): ...
+
+    allowed, retry_after = hit('rl:otp:send:email:a@b.c', limit=5, window=3600)
+
+Sliding window counter: the estimate is the previous fixed window's count
+weighted by how much of it still overlaps the sliding window, plus the current
+window's count. A hit of `cost` units is allowed when estimate + cost <= limit
+and is then added to the current window in the same atomic step:
+    - Redis (settings.RATE_LIMIT_REDIS_URL and the redis package): one Lua script;
+    - otherwise the database: a conditional UPDATE ... SET count = count + cost
+      WHERE count <= allowance on RateLimitCounter, so concurrent workers cannot
+      both take the last unit.
+
+settings.RATE_LIMITS = {'login': (10, 60)} overrides a policy's (limit, window).
+Per-IP keys use REMOTE_ADDR; behind reverse proxies set
+settings.RATE_LIMIT_TRUSTED_PROXIES to their count (see client_ip()).
+
+mt5_budget() charges MT5-heavy endpoints against a per-user budget and a global
+one (MT5_BUDGET_PER_USER / MT5_BUDGET_GLOBAL units per MT5_BUDGET_WINDOW) so a
+burst of interactive requests leaves the manager connection to the commission
+sync and other background jobs, which are not charged.
+
+Backend errors fail open: a broken limiter must not lock everyone out.
+"""
+
+from datetime import timedelta
+from functools import wraps
+import hashlib
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 200
+
+_SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local weight = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * weight + current + cost > limit then
+    return 0
+end
+redis.call('INCRBY', KEYS[1], cost)
+redis.call('EXPIRE', KEYS[1], ttl)
+return 1
+"""
+
+
+def _storage_key(key):
+    if len(key) <= MAX_KEY_LENGTH:
+        return key
+    return key[:MAX_KEY_LENGTH - 41] + ':' + hashlib.sha1(key.encode()).hexdigest()
+
+
+class RedisBackend:
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(_SLIDING_WINDOW_LUA)
+
+    def hit(self, key, limit, window, cost, index, weight):
+        keys = [f"{key}:{index}", f"{key}:{index - 1}"]
+        return bool(self.script(keys=keys, args=[limit, cost, weight, window * 2]))
+
+
+class DatabaseBackend:
+    def hit(self, key, limit, window, cost, index, weight):
+        from adminPanel.models import RateLimitCounter
+
+        previous = RateLimitCounter.objects.filter(key=key, window=index - 1).values_list('count', flat=True).first() or 0
+        # Largest current-window count that still leaves room for this hit
+        allowance = math.floor(limit - cost - previous * weight)
+        if allowance < 0:
+            return False
+
+        current = RateLimitCounter.objects.filter(key=key, window=index)
+        if current.filter(count__lte=allowance).update(count=F('count') + cost):
+            return True
+        if current.exists():
+            return False
+        try:
+            with transaction.atomic():
+                RateLimitCounter.objects.create(
+                    key=key,
+                    window=index,
+                    count=cost,
+                    expires_at=timezone.now() + timedelta(seconds=window * 2),
+                )
+            return True
+        except IntegrityError:
+            # Another worker created the row first
+            return bool(current.filter(count__lte=allowance).update(count=F('count') + cost))
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        url = getattr(settings, 'RATE_LIMIT_REDIS_URL', None)
+        if url and redis is not None:
+            try:
+                _backend = RedisBackend(url)
+            except Exception as e:
+                logger.warning(f"Rate limit: Redis unavailable ({e}), using the database")
+        if _backend is None:
+            _backend = DatabaseBackend()
+    return _backend
+
+
+def hit(key, limit, window, cost=1):
+    """
+    Charge `cost` units to `key` if that keeps it within `limit` per sliding
+    `window` seconds. Returns (allowed, retry_after_seconds).
+    """
+    now = time.time()
+    index = int(now // window)
+    elapsed = now - index * window
+    weight = 1 - elapsed / window
+    try:
+        allowed = get_backend().hit(_storage_key(key), limit, window, cost, index, weight)
+    except Exception as e:
+        logger.warning(f"Rate limit check failed for {key}: {e}")
+        return True, 0
+    return allowed, 0 if allowed else max(1, math.ceil(window - elapsed))
+
+
+def is_rate_limited(key, limit, window):
+    """True if `key` is over `limit` hits per `window` seconds (counts this hit when it is not)."""
+    return not hit(key, limit, window)[0]
+
+
+def cleanup_expired():
+    """Delete database counters whose window has passed. Returns the number deleted."""
+    from adminPanel.models import RateLimitCounter
+    deleted, _ = RateLimitCounter.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
+
+
+# --- per-route policies -----------------------------------------------------
+
+def client_ip(request):
+    """
+    REMOTE_ADDR, unless settings.RATE_LIMIT_TRUSTED_PROXIES = N: then the
+    address the outermost of the N trusted proxies saw, the N-th
+    X-Forwarded-For entry from the right. Entries left of it are client-supplied
+    and never used, so a forged header cannot pick a fresh bucket per request.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    proxies = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
+    if not proxies:
+        return remote_addr
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    if len(hops) < proxies:
+        return remote_addr
+    return hops[-proxies]
+
+
+def _identity(request, key):
+    if callable(key):
+        return key(request)
+    user = getattr(request, 'user', None)
+    authenticated = user is not None and user.is_authenticated
+    if key == 'user':
+        return f"user:{user.pk}" if authenticated else None
+    if key == 'ip':
+        return f"ip:{client_ip(request)}"
+    return f"user:{user.pk}" if authenticated else f"ip:{client_ip(request)}"
+
+
+def _find_request(args):
+    # Function views get the request first, APIView methods second
+    for arg in args[:2]:
+        if hasattr(arg, 'META'):
+            return arg
+    return None
+
+
+def _limited_response(message, retry_after):
+    response = Response({'error': message, 'retry_after': retry_after}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(name, limit, window, key='user_or_ip', cost=1, methods=None, message=None):
+    """
+    Limit a view to `limit` units per sliding `window` seconds per identity.
+    key: 'user', 'ip', 'user_or_ip' or a callable(request) returning the identity
+    (None skips the check). methods limits only those HTTP methods.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            request = _find_request(args)
+            if request is not None and (methods is None or request.method in methods):
+                identity = _identity(request, key)
+                if identity is not None:
+                    policy_limit, policy_window = getattr(settings, 'RATE_LIMITS', {}).get(name, (limit, window))
+                    allowed, retry_after = hit(f"rl:{name}:{identity}", policy_limit, policy_window, cost)
+                    if not allowed:
+                        logger.info(f"Rate limit {name} exceeded by {identity}")
+                        return _limited_response(message or 'Too many requests. Try again later.', retry_after)
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def mt5_budget(cost=1):
+    """Charge `cost` MT5 units per request against the caller's and the global MT5 budget."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            request = _find_request(args)
+            if request is not None:
+                window = getattr(settings, 'MT5_BUDGET_WINDOW', 60)
+                identity = _identity(request, 'user_or_ip')
+                allowed, retry_after = hit(f"rl:mt5:{identity}", getattr(settings, 'MT5_BUDGET_PER_USER', 60), window, cost)
+                if allowed:
+                    allowed, retry_after = hit('rl:mt5:global', getattr(settings, 'MT5_BUDGET_GLOBAL', 600), window, cost)
+                if not allowed:
+                    logger.info(f"MT5 budget exceeded by {identity}")
+                    return _limited_response('Trading server is busy. Try again shortly.', retry_after)
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
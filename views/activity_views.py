@@ -28,9 +28,9 @@ from rest_framework.permissions import AllowAny
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 import os
-from django.core.cache import cache
 from rest_framework.permissions import IsAuthenticated
 from adminPanel.permissions import IsAdminOrManager
+from adminPanel.utils.rate_limit import is_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -86,24 +86,8 @@ def verify_password(stored_hash, provided_password):
         return False
 
 def _check_rate_limit(key, limit, period_seconds):
-    """Return True if the key is currently rate-limited.
-
-    Uses Django cache to store a counter with TTL `period_seconds`.
-    """
-    try:
-        val = cache.get(key)
-        if val is None:
-            cache.set(key, 1, timeout=period_seconds)
-            return False
-        if val >= limit:
-            return True
-        try:
-            cache.incr(key)
-        except Exception:
-            cache.set(key, val + 1, timeout=period_seconds)
-        return False
-    except Exception:
-        return False
+    """Return True if the key is currently rate-limited (sliding window, see utils/rate_limit.py)."""
+    return is_rate_limited(key, limit, period_seconds)
 
 
 @api_view(['POST', 'OPTIONS'])
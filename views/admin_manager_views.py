@@ -12,6 +12,7 @@ from django.db.models import Q
 from adminPanel.models import CustomUser, TradeGroup, TradingAccount
 from adminPanel.serializers import UserSerializer, TradingAccountSerializer
 from adminPanel.permissions import IsAdmin, IsManager, IsAdminOrManager, IsSuperuser
+from adminPanel.services.group_catalog import group_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -297,88 +298,45 @@ def get_available_groups(request):
     try:
         logger.info("Fetching trading groups from database and MT5")
         
-        # Get database groups
-        db_groups = TradeGroup.objects.all()
-        logger.info(f"Found {db_groups.count()} trading groups in database")
+        # Database groups (TradeGroup rows), held by the group catalog until a row changes
+        db_groups = {name: settings for name, settings in group_catalog.db_settings().items() if 'type' in settings}
+        logger.info(f"Found {len(db_groups)} trading groups in database")
         
         group_data = []
         
         # Process database groups
-        for group in db_groups:
-            try:
-                group_data.append({
-                    'id': group.name,  # Use name as ID for consistency with frontend
-                    'name': group.name,
-                    'description': group.description,
-                    'alias': group.alias,  # Include the alias field
-                    'type': group.type,  # 'real' or 'demo'
-                    'is_active': group.is_active,
-                    'enabled': group.is_active,
-                    'is_default': group.is_default,
-                    'is_demo_default': group.is_demo_default,
-                    'source': 'database',
-                    'group_type': 'Database'
-                })
-            except Exception as group_error:
-                logger.error(f"Error processing database group {group.id}: {str(group_error)}")
-                continue
+        for name, group in db_groups.items():
+            group_data.append({
+                'id': name,  # Use name as ID for consistency with frontend
+                'name': name,
+                'description': group['description'],
+                'alias': group['alias'] or None,  # Include the alias field
+                'type': group['type'],  # 'real' or 'demo'
+                'is_active': group['is_active'],
+                'enabled': group['is_active'],
+                'is_default': group['is_default'],
+                'is_demo_default': group['is_demo_default'],
+                'source': 'database',
+                'group_type': 'Database'
+            })
         
         # Get real MT5 groups if requested
         include_mt5 = request.query_params.get('include_mt5', 'true').lower() == 'true'
         
         if include_mt5:
             try:
-                # Get MT5 manager instance
-                mt5_manager_instance = get_manager_instance() if get_manager_instance else None
-                if mt5_manager_instance and hasattr(mt5_manager_instance, 'manager') and mt5_manager_instance.manager:
-                    logger.info("MT5 manager instance obtained, fetching groups...")
-                    
-                    # Get total number of groups
-                    total_groups = mt5_manager_instance.manager.GroupTotal()
-                    logger.info(f"MT5 reports {total_groups} total groups")
-                    
-                    mt5_groups = []
-                    if total_groups > 0:
-                        logger.debug(f"Starting to iterate through {total_groups} groups...")
-                        for i in range(total_groups):  # Get all groups
-                            try:
-                                group = mt5_manager_instance.manager.GroupNext(i)  # Use GroupNext to get group by index
-                                
-                                if group is not None:
-                                    # Try to get the group name from common attributes
-                                    group_name = None
-                                    
-                                    # Common attributes that might contain the group name
-                                    name_attrs = ['Group', 'Name', 'GroupName', 'group', 'name']
-                                    
-                                    for attr in name_attrs:
-                                        try:
-                                            if hasattr(group, attr):
-                                                value = getattr(group, attr)
-                                                if isinstance(value, str) and value:
-                                                    group_name = value
-                                                    break
-                                        except Exception:
-                                            continue
-                                    
-                                    # If we found a group name, add it
-                                    if group_name:
-                                        mt5_groups.append(group_name)
-                                        logger.debug(f"Retrieved MT5 group: {group_name}")
-                                        
-                            except Exception as e:
-                                logger.error(f"Error getting group at index {i}: {str(e)}")
-                                continue
-                    else:
-                        logger.warning("Total groups is 0 or negative")
-                    
+                # Group names come from the in-memory catalog snapshot (no per-request enumeration)
+                mt5_groups = list(group_catalog.group_names('real'))
+                if mt5_groups:
+                    logger.info(f"Group catalog reports {len(mt5_groups)} MT5 groups")
+
                     # Add real MT5 groups to the response
                     # For groups that exist in both database and MT5, prefer the database version
                     # but add additional MT5-specific information
-                    existing_names = {g['name'] for g in group_data}
+                    existing_by_name = {g['name']: g for g in group_data}
                     
                     for i, group_name in enumerate(mt5_groups):
-                        if group_name not in existing_names:
+                        if group_name not in existing_by_name:
                             # This is a pure MT5 group not in database
                             group_data.append({
                                 'id': group_name,  # Use actual group name as ID instead of virtual mt5_X
@@ -394,17 +352,15 @@ def get_available_groups(request):
                             })
                         else:
                             # Mark existing database groups as MT5-synced
-                            for existing_group in group_data:
-                                if existing_group['name'] == group_name:
-                                    existing_group['group_type'] = 'MT5-Synced'
-                                    existing_group['source'] = 'database_mt5_synced'
-                                    break
+                            existing_group = existing_by_name[group_name]
+                            existing_group['group_type'] = 'MT5-Synced'
+                            existing_group['source'] = 'database_mt5_synced'
                     
                     pure_mt5_count = len([g for g in group_data if g['source'] == 'mt5'])
                     synced_count = len([g for g in group_data if g.get('group_type') == 'MT5-Synced'])
                     logger.info(f"Added {pure_mt5_count} pure MT5 groups, marked {synced_count} as MT5-synced")
                 else:
-                    logger.warning("MT5 manager instance not available or doesn't have manager attribute")
+                    logger.warning("No MT5 groups available from the group catalog")
             except Exception as mt5_error:
                 logger.error(f"Error fetching MT5 groups: {str(mt5_error)}")
                 # Continue without MT5 groups if there's an error
@@ -821,85 +777,42 @@ def test_available_groups(request):
     try:
         logger.info("TEST: Fetching trading groups from database and MT5")
         
-        # Get database groups
-        db_groups = TradeGroup.objects.all()
-        logger.info(f"Found {db_groups.count()} trading groups in database")
+        # Database groups (TradeGroup rows), held by the group catalog until a row changes
+        db_groups = {name: settings for name, settings in group_catalog.db_settings().items() if 'type' in settings}
+        logger.info(f"Found {len(db_groups)} trading groups in database")
         
         group_data = []
         
         # Process database groups
-        for group in db_groups:
-            try:
-                group_data.append({
-                    'id': group.id,
-                    'name': group.name,
-                    'description': group.description,
-                    'type': group.type,  # 'real' or 'demo'
-                    'is_active': group.is_active,
-                    'enabled': group.is_active,
-                    'source': 'database',
-                    'group_type': 'Database'
-                })
-            except Exception as group_error:
-                logger.error(f"Error processing database group {group.id}: {str(group_error)}")
-                continue
+        for name, group in db_groups.items():
+            group_data.append({
+                'id': group['id'],
+                'name': name,
+                'description': group['description'],
+                'type': group['type'],  # 'real' or 'demo'
+                'is_active': group['is_active'],
+                'enabled': group['is_active'],
+                'source': 'database',
+                'group_type': 'Database'
+            })
         
         # Get real MT5 groups
         include_mt5 = request.query_params.get('include_mt5', 'true').lower() == 'true'
         
         if include_mt5:
             try:
-                # Get MT5 manager instance
-                mt5_manager_instance = get_manager_instance() if get_manager_instance else None
-                if mt5_manager_instance and hasattr(mt5_manager_instance, 'manager') and mt5_manager_instance.manager:
-                    logger.info("MT5 manager instance obtained, fetching groups...")
-                    
-                    # Get total number of groups
-                    total_groups = mt5_manager_instance.manager.GroupTotal()
-                    logger.info(f"MT5 reports {total_groups} total groups")
-                    
-                    mt5_groups = []
-                    if total_groups > 0:
-                        logger.debug(f"Starting to iterate through {total_groups} groups...")
-                        for i in range(total_groups):  # Get all groups
-                            try:
-                                group = mt5_manager_instance.manager.GroupNext(i)  # Use GroupNext to get group by index
-                                
-                                if group is not None:
-                                    # Try to get the group name from common attributes
-                                    group_name = None
-                                    
-                                    # Common attributes that might contain the group name
-                                    name_attrs = ['Group', 'Name', 'GroupName', 'group', 'name']
-                                    
-                                    for attr in name_attrs:
-                                        try:
-                                            if hasattr(group, attr):
-                                                value = getattr(group, attr)
-                                                if isinstance(value, str) and value:
-                                                    group_name = value
-                                                    break
-                                        except Exception:
-                                            continue
-                                    
-                                    # If we found a group name, add it
-                                    if group_name:
-                                        mt5_groups.append(group_name)
-                                        logger.debug(f"Retrieved MT5 group: {group_name}")
-                                        
-                            except Exception as e:
-                                logger.error(f"Error getting group at index {i}: {str(e)}")
-                                continue
-                    else:
-                        logger.warning("Total groups is 0 or negative")
-                    
+                # Group names come from the in-memory catalog snapshot (no per-request enumeration)
+                mt5_groups = list(group_catalog.group_names('real'))
+                if mt5_groups:
+                    logger.info(f"Group catalog reports {len(mt5_groups)} MT5 groups")
+
                     # Add real MT5 groups to the response
                     # For groups that exist in both database and MT5, prefer the database version
                     # but add additional MT5-specific information
-                    existing_names = {g['name'] for g in group_data}
+                    existing_by_name = {g['name']: g for g in group_data}
                     
                     for i, group_name in enumerate(mt5_groups):
-                        if group_name not in existing_names:
+                        if group_name not in existing_by_name:
                             # This is a pure MT5 group not in database
                             group_data.append({
                                 'id': f'mt5_{i}',  # Virtual ID for MT5 groups
@@ -913,17 +826,15 @@ def test_available_groups(request):
                             })
                         else:
                             # Update existing database group to show it's also an MT5 group
-                            for db_group in group_data:
-                                if db_group['name'] == group_name:
-                                    db_group['group_type'] = 'MT5-Synced'
-                                    db_group['mt5_index'] = i
-                                    break
+                            db_group = existing_by_name[group_name]
+                            db_group['group_type'] = 'MT5-Synced'
+                            db_group['mt5_index'] = i
                     
                     pure_mt5_count = len([g for g in group_data if g['source'] == 'mt5'])
                     synced_count = len([g for g in group_data if g.get('group_type') == 'MT5-Synced'])
                     logger.info(f"Added {pure_mt5_count} pure MT5 groups, marked {synced_count} as MT5-synced")
                 else:
-                    logger.warning("MT5 manager instance not available or doesn't have manager attribute")
+                    logger.warning("No MT5 groups available from the group catalog")
             except Exception as mt5_error:
                 logger.error(f"Error fetching MT5 groups: {str(mt5_error)}")
                 # Continue without MT5 groups if there's an error
@@ -30,6 +30,7 @@ from rest_framework.response import Response
 import os
 from rest_framework.permissions import IsAuthenticated
 from adminPanel.permissions import IsAdminOrManager
+from adminPanel.utils.rate_limit import client_ip, is_rate_limited, rate_limit
 from clientPanel.views.auth_views import get_client_ip
 
 logger = logging.getLogger(__name__)
@@ -78,6 +79,8 @@ def verify_password(stored_hash, provided_password):
 @api_view(['POST', 'OPTIONS'])
 @permission_classes([AllowAny])
 @csrf_exempt
+@rate_limit('login', limit=20, window=60, key='ip', methods=['POST'],
+            message='Too many login attempts from your IP. Try again later.')
 def login_view(request):
     # Handle CORS preflight
     if request.method == 'OPTIONS':
@@ -254,6 +257,15 @@ def login_view(request):
 
     if last_ip and current_ip and last_ip != current_ip:
         try:
+            # Before generating/sending OTP, enforce per-IP and per-email send limits
+            otp_send_limit = getattr(settings, 'OTP_SEND_RATE_LIMIT_PER_HOUR', 5)
+            otp_ip_limit = getattr(settings, 'OTP_SEND_RATE_LIMIT_PER_HOUR_PER_IP', 5)
+            # Keyed like the login limits: X-Forwarded-For is only trusted as far as our own proxies
+            if is_rate_limited(f"rl:otp:send:ip:{client_ip(request)}", otp_ip_limit, 3600):
+                return JsonResponse({'error': 'Too many OTP send attempts from your IP. Try again later.'}, status=429)
+            if is_rate_limited(f"rl:otp:send:email:{user.email.strip().lower()}", otp_send_limit, 3600):
+                return JsonResponse({'error': 'Too many OTP send attempts for this account. Try again later.'}, status=429)
+
             # Generate login-specific OTP and attach to user
             otp = f"{random.randint(100000, 999999)}"
             # Hash OTP before storing
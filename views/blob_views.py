@@ -0,0 +1,55 @@
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from adminPanel.models import CustomUser, Message, StoredBlob
+from adminPanel.permissions import IsAdmin, IsManager, OrPermission
+
+
+def _manager_may_read(user, name):
+    """Whether `name` is a file of the manager's own clients (or themselves): KYC documents, profile fields or ticket messages."""
+    from clientPanel.models import UserDocument
+
+    own_users = Q(created_by=user) | Q(pk=user.pk)
+    if CustomUser.objects.filter(own_users).filter(
+        Q(id_proof=name) | Q(address_proof=name) | Q(profile_pic=name)
+    ).exists():
+        return True
+    if UserDocument.objects.filter(document=name).filter(Q(user__created_by=user) | Q(user=user)).exists():
+        return True
+    return Message.objects.filter(file=name).filter(
+        Q(ticket__created_by=user) | Q(ticket__created_by__created_by=user)
+    ).exists()
+
+
+class StoredFileView(APIView):
+    """
+    Download an uploaded file (KYC document, ticket attachment) by its SHA-256,
+    or its thumbnail with ?thumbnail=1. Supports Range requests; with
+    FILE_SERVE_ACCEL_REDIRECT_PREFIX set the bytes are sent by nginx.
+    Admins can read any file; managers only the files of their own clients.
+    """
+    permission_classes = [OrPermission(IsAdmin, IsManager)]
+
+    def get(self, request, digest):
+        from adminPanel.services.blob_storage import get_storage
+        from adminPanel.utils.file_serving import serve_file
+
+        blob = StoredBlob.objects.filter(sha256=digest.lower(), ref_count__gt=0).first()
+        # Same answer as a missing file, so digests of other clients' files cannot be probed
+        if blob is None or not (IsAdmin().has_permission(request, self) or _manager_may_read(request.user, blob.name)):
+            return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.query_params.get('thumbnail') in ('1', 'true'):
+            if blob.thumbnail_status != 'ready':
+                return Response({'error': 'Thumbnail not available', 'status': blob.thumbnail_status},
+                                status=status.HTTP_404_NOT_FOUND)
+            return serve_file(request, blob.thumbnail, storage=get_storage(), content_type='image/jpeg',
+                              etag=f"{blob.sha256}-thumbnail")
+
+        extension = blob.name.rsplit('.', 1)[-1] if '.' in blob.name.rsplit('/', 1)[-1] else ''
+        filename = f"{blob.sha256[:12]}.{extension}" if extension else blob.sha256[:12]
+        return serve_file(request, blob.name, storage=get_storage(), content_type=blob.content_type,
+                          filename=filename, as_attachment=request.query_params.get('download') in ('1', 'true'),
+                          etag=blob.sha256)
@@ -18,6 +18,7 @@ import logging
 import time
 
 from adminPanel.models import CustomUser, TradingAccount, Transaction, Ticket, IBRequest
+from adminPanel.services.transaction_summary import transaction_totals
 from adminPanel.decorators import role_required
 from adminPanel.roles import UserRole
 from rest_framework.permissions import IsAuthenticated
@@ -289,21 +290,12 @@ def generate_dashboard_data():
         role='client'
     ).exclude(manager_admin_status='None').count()
     
-    # Get deposits from last 30 days
+    # Get deposits from last 30 days (transaction totals come from the daily summary)
     thirty_days_ago = timezone.now() - timedelta(days=30)
     
-    total_deposits = Transaction.objects.filter(
-        transaction_type='deposit_trading',
-        status='approved',
-        created_at__gte=thirty_days_ago
-    ).aggregate(
-        total=Sum('amount')
-    )['total'] or 0
+    total_deposits = transaction_totals('deposit_trading', 'approved', since=thirty_days_ago)[1]
     # Also compute overall (all-time) deposits
-    total_deposits_alltime = Transaction.objects.filter(
-        transaction_type='deposit_trading',
-        status='approved'
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    total_deposits_alltime = transaction_totals('deposit_trading', 'approved')[1]
     
     # Get MAM funds
     mam_accounts = TradingAccount.objects.filter(account_type='mam')
@@ -312,26 +304,14 @@ def generate_dashboard_data():
     )['total'] or 0
     
     # Get IB earnings
-    ib_earnings = Transaction.objects.filter(
-        transaction_type='commission',
-        status='completed'
-    ).aggregate(
-        total=Sum('amount')
-    )['total'] or 0
+    ib_earnings = transaction_totals('commission', 'completed')[1]
     
     # Get withdrawable commission
-    withdrawable_commission = Transaction.objects.filter(
-        transaction_type='commission',
-        status='completed',
-        # Add your withdrawal logic here
-    ).aggregate(
-        total=Sum('amount')
-    )['total'] or 0
+    # Add your withdrawal logic here
+    withdrawable_commission = ib_earnings
     
     # Get pending counts
-    pending_transactions = Transaction.objects.filter(
-        status='pending'
-    ).count()
+    pending_transactions = transaction_totals(None, 'pending')[0]
     
     # Get pending tickets from Ticket model
     pending_tickets = Ticket.objects.filter(
@@ -343,10 +323,7 @@ def generate_dashboard_data():
 
     # Calculate total withdrawn globally (approved withdraw types)
     withdraw_types = ['withdraw_trading', 'credit_out']
-    total_withdrawn = Transaction.objects.filter(
-        transaction_type__in=withdraw_types,
-        status='approved'
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    total_withdrawn = transaction_totals(withdraw_types, 'approved')[1]
     
     return {
         'live_accounts': live_count,
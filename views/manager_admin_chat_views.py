@@ -6,8 +6,11 @@ Manages real-time messaging between managers and admins.
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q
-from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from django.db.models import Q, Max
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes, throttle_classes, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
@@ -15,16 +18,147 @@ from adminPanel.permissions import IsAdminOrManager, IsManager
 from adminPanel.models import ChatMessage, CustomUser
 from adminPanel.serializers import ChatMessageSerializer
 from django.contrib.auth import get_user_model
+from adminPanel.services import chat_pubsub
+from adminPanel.utils.rate_limit import rate_limit
 import json
+import time
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _manager_messages_queryset(user):
+    """
+    Unified conversation between a manager and all admins:
+    messages sent by the manager plus admin replies addressed to them.
+    """
+    return ChatMessage.objects.filter(
+        Q(sender=user, sender_type='manager') |  # Messages from this manager
+        Q(recipient=user, sender_type='admin')  # Messages to this manager from admins
+    )
+
+
+def _admin_messages_queryset(user):
+    """Messages sent by this admin plus manager messages broadcast to all admins (recipient=None)."""
+    return ChatMessage.objects.filter(
+        Q(sender=user, sender_type='admin') |  # Messages from this admin
+        Q(sender_type='manager', recipient__isnull=True)  # Broadcast messages from managers to all admins
+    )
+
+
+def _manager_channels(user):
+    """{channel: messages published on it}; the querysets seed the channel cursors."""
+    return {chat_pubsub.manager_channel(user.id): _manager_messages_queryset(user)}
+
+
+def _admin_channels(user):
+    return {
+        chat_pubsub.ADMINS_CHANNEL: ChatMessage.objects.filter(sender_type='manager', recipient__isnull=True),
+        chat_pubsub.admin_channel(user.id): ChatMessage.objects.filter(sender=user, sender_type='admin'),
+    }
+
+
+def _fetch_messages(base_queryset, last_id, limit):
+    """
+    Single query for the next page of messages after last_id.
+    Returns (serializer, last_id) where last_id is the newest id in the page,
+    so clients continue from there instead of skipping past the limit.
+    """
+    messages = list(
+        base_queryset.filter(id__gt=last_id)
+        .select_related('sender', 'recipient')
+        .order_by('id')[:limit]
+    )
+    last_message_id = messages[-1].id if messages else last_id
+    return ChatMessageSerializer(messages, many=True), last_message_id
+
+
+def _seed_channels(channels):
+    """
+    On a cache miss, store the newest id of the messages published on that channel,
+    so the cursor lines up with later publishes and idle polls skip the DB.
+    """
+    for channel, queryset in channels.items():
+        if chat_pubsub.channel_last_id(channel) is None:
+            chat_pubsub.seed_channel(channel, queryset.aggregate(newest=Max('id'))['newest'] or 0)
+
+
+def _poll_params(request):
+    last_id = int(request.GET.get('last_id', 0))
+    limit = int(request.GET.get('limit', 50))
+    timeout = min(float(request.GET.get('timeout', chat_pubsub.LONG_POLL_TIMEOUT)), chat_pubsub.LONG_POLL_TIMEOUT)
+    return last_id, limit, timeout
+
+
+def _next_page(base_queryset, channels, last_id, cursor, limit, timeout):
+    """
+    Wait until a page of messages after last_id is available or the timeout ends.
+    `cursor` is the channel id already known to hold nothing new for this user
+    (e.g. a deleted message); an empty fetch moves it forward and goes back to
+    waiting. Returns (serializer or None, last_id, cursor).
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        _seed_channels(channels)
+        if not chat_pubsub.wait_for_updates(list(channels), cursor, max(0, deadline - time.monotonic())):
+            return None, last_id, cursor
+        serializer, last_message_id = _fetch_messages(base_queryset, last_id, limit)
+        if serializer.instance:
+            return serializer, last_message_id, max(cursor, last_message_id)
+        cursor = max([cursor] + [chat_pubsub.channel_last_id(channel) or 0 for channel in channels])
+        if time.monotonic() >= deadline:
+            return None, last_id, cursor
+
+
+def _long_poll(base_queryset, channels, last_id, limit, timeout, unread):
+    serializer, last_message_id, _ = _next_page(base_queryset, channels, last_id, last_id, limit, timeout)
+    if serializer is None:
+        return Response({
+            'status': 'success',
+            'messages': [],
+            'last_id': last_id,
+            'count': 0,
+            'unread_count': unread(),
+            'timeout': True
+        })
+    return Response({
+        'status': 'success',
+        'messages': serializer.data,
+        'last_id': last_message_id,
+        'count': len(serializer.data),
+        'unread_count': unread()
+    })
+
+
+def _sse_stream(base_queryset, channels, last_id, limit, unread, duration):
+    """
+    Server-Sent Events generator. Emits a 'messages' event whenever the channels
+    move past last_id and a keep-alive comment while idle, until `duration` ends.
+    """
+    deadline = time.monotonic() + duration
+    cursor = last_id
+    yield "retry: 3000\n\n"
+    while time.monotonic() < deadline:
+        remaining = deadline - time.monotonic()
+        serializer, last_id, cursor = _next_page(
+            base_queryset, channels, last_id, cursor, limit, min(chat_pubsub.LONG_POLL_TIMEOUT, remaining)
+        )
+        if serializer is not None:
+            payload = json.dumps({
+                'messages': serializer.data,
+                'last_id': last_id,
+                'unread_count': unread()
+            }, cls=DjangoJSONEncoder)
+            yield f"id: {last_id}\nevent: messages\ndata: {payload}\n\n"
+        else:
+            yield ": keep-alive\n\n"
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 @throttle_classes([])
+@rate_limit('chat', limit=240, window=60, key='user')
 def get_manager_messages(request):
     """
     Retrieve all messages between manager and admins.
@@ -36,35 +170,16 @@ def get_manager_messages(request):
         last_id = int(request.GET.get('last_id', 0))
         limit = int(request.GET.get('limit', 50))
         
-        logger.info(f"[Manager Chat API] Getting messages for user {user.id} (email: {user.email})")
-        logger.info(f"[Manager Chat API] User manager_admin_status: {getattr(user, 'manager_admin_status', 'NOT SET')}")
-        
-        # Get all messages where:
-        # 1. Manager is the sender (to any admin)
-        # 2. Any admin is the sender and manager is the recipient
-        # This creates a unified conversation between manager and all admins
-        messages_queryset = ChatMessage.objects.filter(
-            Q(sender=user, sender_type='manager') |  # Messages from this manager
-            Q(recipient=user, sender_type='admin')  # Messages to this manager from admins
-        ).filter(id__gt=last_id).order_by('created_at')
+        logger.debug(f"[Manager Chat API] Getting messages for user {user.id}")
         
-        logger.info(f"[Manager Chat API] Found {messages_queryset.count()} messages for user {user.id}")
-        
-        # Get the last ID before slicing
-        last_message_id = messages_queryset.values_list('id', flat=True).last() if messages_queryset.exists() else last_id
-        
-        # Now slice to get the limit
-        messages = messages_queryset[:limit]
-        
-        serializer = ChatMessageSerializer(messages, many=True)
-        
-        logger.info(f"[Manager Chat API] Returning {len(serializer.data)} messages")
+        serializer, last_message_id = _fetch_messages(_manager_messages_queryset(user), last_id, limit)
         
         return Response({
             'status': 'success',
             'messages': serializer.data,
             'last_id': last_message_id,
-            'count': len(serializer.data)
+            'count': len(serializer.data),
+            'unread_count': chat_pubsub.get_manager_unread(user)
         })
         
     except Exception as e:
@@ -78,6 +193,7 @@ def get_manager_messages(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 @throttle_classes([])
+@rate_limit('chat', limit=240, window=60, key='user')
 def mark_manager_messages_as_read(request):
     """
     Mark all unread admin messages to this manager as read.
@@ -93,6 +209,7 @@ def mark_manager_messages_as_read(request):
             sender_type='admin',
             is_read=False
         ).update(is_read=True)
+        chat_pubsub.reset_unread(user.id)
         
         logger.info(f"[Manager Chat API] Marked {updated_count} messages as read for manager {user.id}")
         
@@ -111,6 +228,7 @@ def mark_manager_messages_as_read(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminOrManager])
 @throttle_classes([])
+@rate_limit('chat', limit=240, window=60, key='user')
 def get_admin_manager_messages(request):
     """
     Admin endpoint to retrieve all messages between admin and managers.
@@ -128,17 +246,7 @@ def get_admin_manager_messages(request):
         limit = int(request.GET.get('limit', 50))
         manager_id = request.GET.get('manager_id')
         
-        logger.info(f"[Admin Chat API] Getting manager messages for admin {user.id} (email: {user.email})")
-        
-        # Get all messages where:
-        # 1. Admin is the sender (to any manager)
-        # 2. Manager is the sender (broadcast to all admins - recipient=None)
-        messages_queryset = ChatMessage.objects.filter(
-            Q(sender=user, sender_type='admin') |  # Messages from this admin
-            Q(sender_type='manager', recipient__isnull=True)  # Broadcast messages from managers to all admins
-        ).filter(id__gt=last_id).order_by('created_at')
-        
-        logger.info(f"[Admin Chat API] Found {messages_queryset.count()} manager messages for admin {user.id}")
+        logger.debug(f"[Admin Chat API] Getting manager messages for admin {user.id}")
         
         # Mark messages from specific manager as read if manager_id is provided
         if manager_id:
@@ -152,25 +260,19 @@ def get_admin_manager_messages(request):
                 ).update(is_read=True)
                 
                 if updated_count > 0:
+                    chat_pubsub.invalidate_admins_unread()
                     logger.info(f"[Admin Chat API] Marked {updated_count} messages from manager {manager_id} as read")
             except (ValueError, TypeError):
                 logger.warning(f"[Admin Chat API] Invalid manager_id provided: {manager_id}")
         
-        # Get the last ID before slicing
-        last_message_id = messages_queryset.values_list('id', flat=True).last() if messages_queryset.exists() else last_id
-        
-        # Now slice to get the limit
-        messages = messages_queryset[:limit]
-        
-        serializer = ChatMessageSerializer(messages, many=True)
-        
-        logger.info(f"[Admin Chat API] Returning {len(serializer.data)} manager messages")
+        serializer, last_message_id = _fetch_messages(_admin_messages_queryset(user), last_id, limit)
         
         return Response({
             'status': 'success',
             'messages': serializer.data,
             'last_id': last_message_id,
-            'count': len(serializer.data)
+            'count': len(serializer.data),
+            'unread_count': chat_pubsub.get_admins_unread()
         })
         
     except Exception as e:
@@ -236,6 +338,13 @@ def send_manager_message(request):
         
         logger.info(f"[Manager Chat API] Message created with ID {chat_message.id}")
         
+        # Wake admins waiting on the broadcast channel and the manager's other tabs
+        chat_pubsub.publish(
+            [chat_pubsub.ADMINS_CHANNEL, chat_pubsub.manager_channel(request.user.id)],
+            chat_message.id
+        )
+        chat_pubsub.increment_admins_unread()
+        
         serializer = ChatMessageSerializer(chat_message)
         
         return Response({
@@ -325,6 +434,12 @@ def send_admin_reply_to_manager(request):
         
         logger.info(f"[Admin Reply API] Reply message created with ID {chat_message.id}")
         
+        chat_pubsub.publish(
+            [chat_pubsub.manager_channel(manager.id), chat_pubsub.admin_channel(request.user.id)],
+            chat_message.id
+        )
+        chat_pubsub.increment_unread(manager.id)
+        
         serializer = ChatMessageSerializer(chat_message)
         
         return Response({
@@ -391,6 +506,7 @@ def mark_manager_messages_as_read(request):
             recipient=request.user,
             is_read=False
         ).update(is_read=True)
+        chat_pubsub.reset_unread(request.user.id)
         
         return Response({
             'status': 'success',
@@ -427,6 +543,7 @@ def mark_admin_manager_messages_as_read(request):
             sender_type='manager',
             is_read=False
         ).update(is_read=True)
+        chat_pubsub.invalidate_admins_unread()
         
         logger.info(f"[Manager Chat API] Admin {request.user.id} marked {updated_count} messages to manager {manager_id} as read")
         
@@ -441,3 +558,111 @@ def mark_admin_manager_messages_as_read(request):
             {'status': 'error', 'message': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([])
+@rate_limit('chat', limit=240, window=60, key='user')
+def poll_manager_messages(request):
+    """
+    Long-poll variant of get_manager_messages.
+    Waits up to `timeout` seconds (max 25) for a message newer than `last_id`.
+    While nothing changes the wait is served from the cache without DB queries.
+    """
+    try:
+        last_id, limit, timeout = _poll_params(request)
+        user = request.user
+        return _long_poll(
+            _manager_messages_queryset(user), _manager_channels(user), last_id, limit, timeout,
+            lambda: chat_pubsub.get_manager_unread(user)
+        )
+    except Exception as e:
+        logger.error(f'Error polling manager messages: {e}')
+        return Response(
+            {'status': 'error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrManager])
+@throttle_classes([])
+@rate_limit('chat', limit=240, window=60, key='user')
+def poll_admin_manager_messages(request):
+    """Long-poll variant of get_admin_manager_messages (does not mark messages as read)."""
+    try:
+        last_id, limit, timeout = _poll_params(request)
+        user = request.user
+        return _long_poll(
+            _admin_messages_queryset(user), _admin_channels(user), last_id, limit, timeout,
+            chat_pubsub.get_admins_unread
+        )
+    except Exception as e:
+        logger.error(f'[Admin Chat API] Error polling manager messages: {e}')
+        return Response(
+            {'status': 'error', 'message': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+# Maximum lifetime of one SSE connection; EventSource reconnects with Last-Event-ID
+SSE_STREAM_DURATION = 300
+# Largest page of messages sent in one SSE event
+SSE_MAX_LIMIT = 200
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF content negotiation accept EventSource's `Accept: text/event-stream`."""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+def _sse_response(request, base_queryset, channels, unread):
+    try:
+        last_id = int(request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('last_id', 0))
+        limit = min(max(int(request.GET.get('limit', 50)), 1), SSE_MAX_LIMIT)
+    except (TypeError, ValueError):
+        # JsonResponse, not Response: EventSource negotiates the event-stream renderer
+        return JsonResponse(
+            {'status': 'error', 'message': 'last_id and limit must be integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    response = StreamingHttpResponse(
+        _sse_stream(base_queryset, channels, last_id, limit, unread, SSE_STREAM_DURATION),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Disable proxy buffering (nginx) so events are flushed immediately
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([])
+@rate_limit('chat', limit=240, window=60, key='user')
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def stream_manager_messages(request):
+    """Server-Sent Events stream of new manager-admin messages for the current manager."""
+    user = request.user
+    return _sse_response(
+        request, _manager_messages_queryset(user), _manager_channels(user),
+        lambda: chat_pubsub.get_manager_unread(user)
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrManager])
+@throttle_classes([])
+@rate_limit('chat', limit=240, window=60, key='user')
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def stream_admin_manager_messages(request):
+    """Server-Sent Events stream of new manager messages for the current admin."""
+    user = request.user
+    return _sse_response(
+        request, _admin_messages_queryset(user), _admin_channels(user), chat_pubsub.get_admins_unread
+    )
@@ -396,38 +396,38 @@ def report_statistics(request):
         last_month = current_month - relativedelta(months=1)
         last_year = current_month - relativedelta(years=1)
         
+        # Report counts in one pass (MonthlyTradeReport stores year / month, not a date)
+        counts = MonthlyTradeReport.objects.order_by().aggregate(
+            total_reports=Count('id'),
+            reports_this_month=Count('id', filter=Q(year=current_month.year, month=current_month.month)),
+            reports_last_month=Count('id', filter=Q(year=last_month.year, month=last_month.month)),
+            reports_this_year=Count('id', filter=Q(year=today.year)),
+            pending_reports=Count('id', filter=Q(status='pending')),
+            failed_reports=Count('id', filter=Q(status='email_failed')),
+        )
         stats = {
-            'total_reports': MonthlyTradeReport.objects.count(),
-            'reports_this_month': MonthlyTradeReport.objects.filter(
-                report_month=current_month
-            ).count(),
-            'reports_last_month': MonthlyTradeReport.objects.filter(
-                report_month=last_month
-            ).count(),
-            'reports_this_year': MonthlyTradeReport.objects.filter(
-                report_month__year=today.year
-            ).count(),
-            'pending_reports': MonthlyTradeReport.objects.filter(
-                status='generating'
-            ).count(),
-            'failed_reports': MonthlyTradeReport.objects.filter(
-                status='failed'
-            ).count(),
+            **counts,
             'users_with_schedules': ReportGenerationSchedule.objects.filter(
                 is_enabled=True
             ).count(),
             'total_users': CustomUser.objects.filter(role='client', is_active=True).count()
         }
         
-        # Monthly breakdown for the last 12 months
+        # Monthly breakdown for the last 12 months (one grouped query)
+        first_month = current_month - relativedelta(months=11)
+        counts_by_month = {
+            (row['year'], row['month']): row['count']
+            for row in MonthlyTradeReport.objects.filter(
+                Q(year__gt=first_month.year) | Q(year=first_month.year, month__gte=first_month.month)
+            ).order_by().values('year', 'month').annotate(count=Count('id'))
+        }
         monthly_stats = []
         for i in range(12):
             month = current_month - relativedelta(months=i)
-            count = MonthlyTradeReport.objects.filter(report_month=month).count()
             monthly_stats.append({
                 'month': month.strftime('%Y-%m'),
                 'month_name': month.strftime('%B %Y'),
-                'count': count
+                'count': counts_by_month.get((month.year, month.month), 0)
             })
         
         stats['monthly_breakdown'] = monthly_stats
@@ -7,9 +7,55 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.utils import timezone
-from adminPanel.models_notification import Notification
+from adminPanel.models_notification import Notification, BroadcastNotification
 from rest_framework.permissions import IsAuthenticated
 from adminPanel.permissions import IsAdminOrManager
+from adminPanel.decorators import role_required
+from adminPanel.roles import UserRole
+
+# Maximum notifications returned by one delta fetch
+DELTA_LIMIT = 100
+
+
+def _serialize_notification(notif):
+    return {
+        'id': notif.id,
+        'notification_type': notif.notification_type,
+        'status': notif.status,
+        'title': notif.title,
+        'message': notif.message,
+        'action_url': notif.action_url,
+        'is_read': notif.is_read,
+        'read_at': notif.read_at.isoformat() if notif.read_at else None,
+        'created_at': notif.created_at.isoformat(),
+        'metadata': notif.metadata,
+        'is_broadcast': False,
+    }
+
+
+def _serialize_broadcast(broadcast):
+    return {
+        'id': broadcast.id,
+        'notification_type': broadcast.notification_type,
+        'status': broadcast.status,
+        'title': broadcast.title,
+        'message': broadcast.message,
+        'action_url': broadcast.action_url,
+        'is_read': bool(getattr(broadcast, 'is_read', False)),
+        'read_at': None,
+        'created_at': broadcast.created_at.isoformat(),
+        'metadata': broadcast.metadata,
+        'is_broadcast': True,
+    }
+
+
+def _parse_cursor(cursor):
+    """Cursor format is '<last notification id>:<last broadcast id>'"""
+    try:
+        personal, broadcast = (cursor or '0:0').split(':', 1)
+        return int(personal), int(broadcast)
+    except (TypeError, ValueError):
+        return 0, 0
 
 
 @api_view(['GET'])
@@ -46,24 +92,21 @@ def get_notifications(request):
     if unread_only:
         queryset = queryset.filter(is_read=False)
     
-    # Limit results
-    notifications = queryset[:limit]
+    # Broadcasts are stored once and merged in with the user's read state
+    broadcasts = BroadcastNotification.visible_to(user)
+    if notification_type and notification_type != 'all':
+        broadcasts = broadcasts.filter(notification_type=notification_type)
+    if notification_status and notification_status != 'all':
+        broadcasts = broadcasts.filter(status=notification_status)
+    if unread_only:
+        broadcasts = broadcasts.exclude(reads__user=user)
+    broadcasts = BroadcastNotification.with_read_state(user, broadcasts)
     
     # Serialize data
-    notification_data = []
-    for notif in notifications:
-        notification_data.append({
-            'id': notif.id,
-            'notification_type': notif.notification_type,
-            'status': notif.status,
-            'title': notif.title,
-            'message': notif.message,
-            'action_url': notif.action_url,
-            'is_read': notif.is_read,
-            'read_at': notif.read_at.isoformat() if notif.read_at else None,
-            'created_at': notif.created_at.isoformat(),
-            'metadata': notif.metadata,
-        })
+    notification_data = [_serialize_notification(n) for n in queryset[:limit]]
+    notification_data += [_serialize_broadcast(b) for b in broadcasts[:limit]]
+    notification_data.sort(key=lambda n: n['created_at'], reverse=True)
+    notification_data = notification_data[:limit]
     
     # Get unread count
     unread_count = Notification.get_unread_count(user)
@@ -72,7 +115,7 @@ def get_notifications(request):
         'success': True,
         'notifications': notification_data,
         'unread_count': unread_count,
-        'total_count': queryset.count()
+        'total_count': queryset.count() + broadcasts.count()
     })
 
 
@@ -244,3 +287,110 @@ def create_notification(request):
         'message': 'Notification created successfully',
         'notification_id': notification.id
     }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_notifications_delta(request):
+    """
+    Return only notifications newer than the client's cursor.
+    
+    Query params:
+        cursor: value returned by the previous call ('0:0' or omitted for the first call)
+    The response carries the next cursor and the cached unread count, so a
+    client polling with nothing new costs two indexed id lookups and no COUNT.
+    """
+    user = request.user
+    last_personal_id, last_broadcast_id = _parse_cursor(request.GET.get('cursor'))
+    
+    notifications = list(
+        Notification.objects.filter(user=user, id__gt=last_personal_id).order_by('id')[:DELTA_LIMIT]
+    )
+    broadcasts = list(
+        BroadcastNotification.with_read_state(
+            user, BroadcastNotification.visible_to(user).filter(id__gt=last_broadcast_id)
+        ).order_by('id')[:DELTA_LIMIT]
+    )
+    
+    if notifications:
+        last_personal_id = notifications[-1].id
+    if broadcasts:
+        last_broadcast_id = broadcasts[-1].id
+    
+    data = [_serialize_notification(n) for n in notifications] + [_serialize_broadcast(b) for b in broadcasts]
+    data.sort(key=lambda n: n['created_at'], reverse=True)
+    
+    return Response({
+        'success': True,
+        'notifications': data,
+        'cursor': f"{last_personal_id}:{last_broadcast_id}",
+        'has_more': len(notifications) == DELTA_LIMIT or len(broadcasts) == DELTA_LIMIT,
+        'unread_count': Notification.get_unread_count(user)
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_broadcast_notification_read(request, broadcast_id):
+    """
+    Mark a broadcast notification as read for the authenticated user.
+    Pass {"dismiss": true} to also hide it from the user's list.
+    """
+    user = request.user
+    if not BroadcastNotification.visible_to(user).filter(id=broadcast_id).exists():
+        return Response({
+            'success': False,
+            'error': 'Notification not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    dismiss = str(request.data.get('dismiss', 'false')).lower() == 'true'
+    BroadcastNotification.mark_read(user, [broadcast_id], dismiss=dismiss)
+    
+    return Response({
+        'success': True,
+        'message': 'Notification dismissed' if dismiss else 'Notification marked as read',
+        'unread_count': Notification.get_unread_count(user)
+    })
+
+
+@api_view(['POST'])
+@role_required([UserRole.ADMIN.value])
+@permission_classes([IsAuthenticated, IsAdminOrManager])
+def create_broadcast_notification(request):
+    """
+    Admin broadcast: stores a single notification visible to an audience
+    ('all', 'client', 'manager' or 'admin') instead of one row per user.
+    """
+    notification_type = request.data.get('notification_type')
+    title = request.data.get('title')
+    message = request.data.get('message')
+    audience = request.data.get('audience', 'all')
+    
+    if not all([notification_type, title, message]):
+        return Response({
+            'success': False,
+            'error': 'Missing required fields: notification_type, title, message'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if audience not in dict(BroadcastNotification.AUDIENCE_CHOICES):
+        return Response({
+            'success': False,
+            'error': f'Invalid audience: {audience}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    broadcast = BroadcastNotification.create_broadcast(
+        notification_type=notification_type,
+        status=request.data.get('status', 'created'),
+        title=title,
+        message=message,
+        audience=audience,
+        action_url=request.data.get('action_url', None),
+        metadata=request.data.get('metadata', {}),
+        created_by=request.user
+    )
+    
+    return Response({
+        'success': True,
+        'message': 'Broadcast notification created successfully',
+        'broadcast_id': broadcast.id
+    }, status=status.HTTP_201_CREATED)
@@ -7,20 +7,36 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Sum, Count
+from django.db.models import Q, Count
 from django.db import transaction
+from datetime import timedelta
 from decimal import Decimal
 from django.core.exceptions import ValidationError as DjangoValidationError
 
-from adminPanel.models_pamm import PAMMAccount, PAMMParticipant, PAMMTransaction, PAMMEquitySnapshot
+from adminPanel.models_pamm import PAMMAccount, PAMMParticipant, PAMMTransaction
 from adminPanel.serializers_pamm import (
     PAMMAccountSerializer,
     PAMMParticipantSerializer,
     PAMMTransactionSerializer,
     PAMMDetailSerializer,
-    PAMMEquitySnapshotSerializer
+    PAMMEquitySnapshotSerializer,
+    PAMMEquityRollupSerializer
 )
 from adminPanel.services.pamm_service import PAMMService
+from adminPanel.services.pamm_equity_sync import equity_history
+from adminPanel.services.pamm_analytics import (
+    INVESTOR_SORT_FIELDS,
+    PAMM_SORT_FIELDS,
+    apply_sort,
+    investor_table_queryset,
+    paginate,
+    pamm_statistics,
+    pamm_table_queryset,
+    parse_pagination,
+    serialize_investor_row,
+    serialize_pamm_row,
+    with_participants,
+)
 from adminPanel.permissions import IsAdminOrManager
 
 import logging
@@ -287,26 +303,57 @@ class AdminPAMMParticipantsView(APIView):
 
 
 class AdminPAMMEquityHistoryView(APIView):
-    """Get PAMM equity history for charting (Admin only)"""
+    """
+    Get PAMM equity history for charting (Admin only)
+    
+    Query params:
+        resolution: raw (default: the equity snapshots, newest first), or
+            minute, hour, day or auto for rollups; rollups fall back to raw
+            snapshots while none have been recorded
+        hours / days: chart span; auto picks the resolution from it
+        limit: max points (default 100, max 1000)
+    """
     permission_classes = [IsAuthenticated, IsAdminOrManager]
     
     def get(self, request, pamm_id):
         try:
             pamm = PAMMAccount.objects.get(id=pamm_id)
-            
-            # Get last N snapshots
-            limit = int(request.query_params.get('limit', 100))
-            snapshots = PAMMEquitySnapshot.objects.filter(pamm=pamm)[:limit]
-            
-            serializer = PAMMEquitySnapshotSerializer(snapshots, many=True)
-            
-            return Response(serializer.data, status=status.HTTP_200_OK)
-            
         except PAMMAccount.DoesNotExist:
             return Response(
                 {"error": "PAMM account not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), 1000)
+            hours = request.query_params.get('hours')
+            days = request.query_params.get('days')
+            span = None
+            if hours:
+                span = timedelta(hours=float(hours))
+            elif days:
+                span = timedelta(days=float(days))
+            
+            resolution, points = equity_history(
+                pamm,
+                resolution=request.query_params.get('resolution', 'raw'),
+                span=span,
+                limit=limit
+            )
+        except ValueError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if resolution == 'RAW':
+            serializer = PAMMEquitySnapshotSerializer(points, many=True)
+        else:
+            serializer = PAMMEquityRollupSerializer(points, many=True)
+        
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        response['X-Equity-Resolution'] = resolution.lower()
+        return response
 
 
 class AdminPAMMStatisticsView(APIView):
@@ -315,40 +362,16 @@ class AdminPAMMStatisticsView(APIView):
     
     def get(self, request):
         # Overall statistics
-        total_pamms = PAMMAccount.objects.count()
-        active_pamms = PAMMAccount.objects.filter(status='ACTIVE').count()
-        
-        total_equity = PAMMAccount.objects.aggregate(
-            total=Sum('total_equity')
-        )['total'] or Decimal('0.00')
-        
-        total_investors = PAMMParticipant.objects.filter(
-            role='INVESTOR',
-            units__gt=0
-        ).count()
-        
-        pending_transactions = PAMMTransaction.objects.filter(
-            status='PENDING'
-        ).count()
-        
-        pending_deposits = PAMMTransaction.objects.filter(
-            status='PENDING',
-            transaction_type__in=['MANAGER_DEPOSIT', 'INVESTOR_DEPOSIT']
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        
-        pending_withdrawals = PAMMTransaction.objects.filter(
-            status='PENDING',
-            transaction_type__in=['MANAGER_WITHDRAW', 'INVESTOR_WITHDRAW']
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        stats = pamm_statistics()
         
         return Response({
-            "total_pamms": total_pamms,
-            "active_pamms": active_pamms,
-            "total_equity": str(total_equity),
-            "total_investors": total_investors,
-            "pending_transactions": pending_transactions,
-            "pending_deposits": str(pending_deposits),
-            "pending_withdrawals": str(pending_withdrawals)
+            "total_pamms": stats['total_pamms'],
+            "active_pamms": stats['active_pamms'],
+            "total_equity": str(stats['total_equity']),
+            "total_investors": stats['total_investors'],
+            "pending_transactions": stats['pending_transactions'],
+            "pending_deposits": str(stats['pending_deposits']),
+            "pending_withdrawals": str(stats['pending_withdrawals'])
         }, status=status.HTTP_200_OK)
 
 
@@ -473,27 +496,8 @@ class AdminBulkApprovePAMMTransactionsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        results = []
-        errors = []
-        
-        for txn_id in transaction_ids:
-            try:
-                transaction = PAMMTransaction.objects.get(id=txn_id, status='PENDING')
-                
-                # Route to appropriate approval method
-                if transaction.transaction_type == 'MANAGER_DEPOSIT':
-                    PAMMService.approve_manager_deposit(txn_id, request.user)
-                elif transaction.transaction_type == 'MANAGER_WITHDRAW':
-                    PAMMService.approve_manager_withdraw(txn_id, request.user)
-                elif transaction.transaction_type == 'INVESTOR_DEPOSIT':
-                    PAMMService.approve_investor_deposit(txn_id, request.user)
-                elif transaction.transaction_type == 'INVESTOR_WITHDRAW':
-                    PAMMService.approve_investor_withdraw(txn_id, request.user)
-                
-                results.append({"transaction_id": txn_id, "status": "approved"})
-                
-            except Exception as e:
-                errors.append({"transaction_id": txn_id, "error": str(e)})
+        # One ledger pass and one bulk write per PAMM instead of one approval per transaction
+        results, errors = PAMMService.approve_transactions_bulk(transaction_ids, request.user)
         
         return Response({
             "success": len(errors) == 0,
@@ -505,125 +509,29 @@ class AdminBulkApprovePAMMTransactionsView(APIView):
 
 
 class AdminPAMMAccountsTableView(APIView):
-    """PAMM Accounts table view with pagination (Admin Panel Table)"""
+    """
+    PAMM Accounts table view with pagination (Admin Panel Table)
+    
+    Query params: page, page_size, search, sort_by, sort_order (asc/desc),
+    include_participants (default true)
+    """
     permission_classes = [IsAuthenticated, IsAdminOrManager]
     
     def get(self, request):
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 10))
+        page, page_size = parse_pagination(request.query_params)
         search = request.query_params.get('search', '').strip()
+        include_participants = request.query_params.get('include_participants', 'true').lower() != 'false'
         
-        # Base queryset
-        pamms = PAMMAccount.objects.all().select_related('manager')
-        
-        # Search filter
-        if search:
-            pamms = pamms.filter(
-                Q(name__icontains=search) |
-                Q(manager__email__icontains=search) |
-                Q(mt5_account_id__icontains=search) |
-                Q(manager__first_name__icontains=search) |
-                Q(manager__last_name__icontains=search)
-            )
-        
-        # Get total count
+        # All per-PAMM figures are annotations on one queryset
+        pamms = pamm_table_queryset(search)
         total = pamms.count()
         
-        # Pagination
-        start = (page - 1) * page_size
-        end = start + page_size
-        pamms = pamms[start:end]
+        pamms = apply_sort(pamms, request.query_params, PAMM_SORT_FIELDS, 'created_at')
+        pamms = paginate(pamms, page, page_size)
+        if include_participants:
+            pamms = with_participants(pamms)
         
-        # Build response data
-        data = []
-        for pamm in pamms:
-            # Get manager participant
-            manager_participant = PAMMParticipant.objects.filter(
-                pamm=pamm, role='MANAGER'
-            ).first()
-            
-            # Get all participants for calculations
-            participants = PAMMParticipant.objects.filter(pamm=pamm)
-            investors = participants.filter(role='INVESTOR', units__gt=0)
-            
-            # Calculate totals
-            total_deposited = sum(p.total_deposited for p in participants)
-            total_withdrawn = sum(p.total_withdrawn for p in participants)
-            net_invested = total_deposited - total_withdrawn
-            total_profit = float(pamm.total_equity - net_invested)
-            
-            # Get transaction counts
-            transaction_stats = PAMMTransaction.objects.filter(pamm=pamm).aggregate(
-                total_transactions=Count('id'),
-                deposits=Count('id', filter=Q(transaction_type__in=['MANAGER_DEPOSIT', 'INVESTOR_DEPOSIT'])),
-                withdrawals=Count('id', filter=Q(transaction_type__in=['MANAGER_WITHDRAW', 'INVESTOR_WITHDRAW'])),
-            )
-            
-            # Calculate performance metrics
-            profit_percentage = (total_profit / float(net_invested) * 100) if net_invested > 0 else 0
-            unit_price = float(pamm.unit_price())
-            unit_price_change = ((unit_price - 1.0) / 1.0 * 100) if unit_price > 0 else 0
-            
-            # Build participant details
-            participant_details = []
-            for p in participants:
-                participant_details.append({
-                    'user_id': p.user.id,
-                    'email': p.user.email,
-                    'name': f"{p.user.first_name} {p.user.last_name}".strip() or p.user.email,
-                    'role': p.role,
-                    'units': float(p.units),
-                    'current_balance': float(p.current_balance()),
-                    'total_deposited': float(p.total_deposited),
-                    'total_withdrawn': float(p.total_withdrawn),
-                    'net_invested': float(p.total_deposited - p.total_withdrawn),
-                    'profit_loss': float(p.profit_loss()),
-                    'share_percentage': float(p.share_percentage()),
-                    'joined_at': p.joined_at.isoformat() if p.joined_at else None,
-                })
-            
-            data.append({
-                'id': pamm.id,
-                'name': pamm.name,
-                'manager_name': f"{pamm.manager.first_name} {pamm.manager.last_name}".strip() or pamm.manager.email,
-                'manager_email': pamm.manager.email,
-                'manager_id': pamm.manager.id,
-                'mt5_login': pamm.mt5_account_id,
-                'pool_balance': float(pamm.total_equity),
-                'manager_capital': float(manager_participant.current_balance()) if manager_participant else 0,
-                'total_profit': total_profit,
-                'profit_percentage': round(profit_percentage, 2),
-                'profit_share': float(pamm.profit_share),
-                'leverage': pamm.leverage,
-                'risk_level': 'Medium',  # Placeholder
-                'payout_frequency': 'Monthly',  # Placeholder
-                'account_id': pamm.mt5_account_id,
-                'is_enabled': pamm.is_accepting_investors,
-                'status': pamm.status,
-                'investor_count': investors.count(),
-                'created_at': pamm.created_at.isoformat() if pamm.created_at else None,
-                'last_equity_update': pamm.last_equity_update.isoformat() if pamm.last_equity_update else None,
-                
-                # Unit-based metrics
-                'total_units': float(pamm.total_units),
-                'unit_price': unit_price,
-                'unit_price_change_pct': round(unit_price_change, 2),
-                'high_water_mark': float(pamm.high_water_mark),
-                
-                # Financial summary
-                'total_deposited': float(total_deposited),
-                'total_withdrawn': float(total_withdrawn),
-                'net_invested': float(net_invested),
-                
-                # Transaction stats
-                'total_transactions': transaction_stats['total_transactions'] or 0,
-                'total_deposits': transaction_stats['deposits'] or 0,
-                'total_withdrawals': transaction_stats['withdrawals'] or 0,
-                
-                # Participant details (optional, can be verbose)
-                'participants': participant_details,
-                'participant_count': len(participant_details),
-            })
+        data = [serialize_pamm_row(pamm, include_participants) for pamm in pamms]
         
         return Response({
             'data': data,
@@ -634,97 +542,25 @@ class AdminPAMMAccountsTableView(APIView):
 
 
 class AdminPAMMInvestorsTableView(APIView):
-    """PAMM Investors table view with pagination (Admin Panel Table)"""
+    """
+    PAMM Investors table view with pagination (Admin Panel Table)
+    
+    Query params: page, page_size, search, sort_by, sort_order (asc/desc)
+    """
     permission_classes = [IsAuthenticated, IsAdminOrManager]
     
     def get(self, request):
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 10))
+        page, page_size = parse_pagination(request.query_params)
         search = request.query_params.get('search', '').strip()
         
-        # Base queryset - only investors
-        participants = PAMMParticipant.objects.filter(
-            role='INVESTOR'
-        ).select_related('user', 'pamm', 'pamm__manager')
-        
-        # Search filter
-        if search:
-            participants = participants.filter(
-                Q(user__email__icontains=search) |
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(pamm__name__icontains=search) |
-                Q(pamm__manager__email__icontains=search)
-            )
-        
-        # Get total count
+        # Investors with value, P/L and transaction counts annotated
+        participants = investor_table_queryset(search)
         total = participants.count()
         
-        # Pagination
-        start = (page - 1) * page_size
-        end = start + page_size
-        participants = participants[start:end]
+        participants = apply_sort(participants, request.query_params, INVESTOR_SORT_FIELDS, 'joined_at')
+        participants = paginate(participants, page, page_size)
         
-        # Build response data
-        data = []
-        for participant in participants:
-            net_invested = participant.total_deposited - participant.total_withdrawn
-            current_value = participant.current_balance()
-            profit_loss = participant.profit_loss()
-            # ROI based on original investment (total_deposited) rather than net_invested
-            # This gives consistent ROI even when withdrawals exceed deposits
-            roi_percentage = (float(profit_loss) / float(participant.total_deposited) * 100) if participant.total_deposited > 0 else 0
-            
-            # Get participant's transaction counts
-            txn_stats = PAMMTransaction.objects.filter(participant=participant).aggregate(
-                total_txns=Count('id'),
-                deposits=Count('id', filter=Q(transaction_type='INVESTOR_DEPOSIT')),
-                withdrawals=Count('id', filter=Q(transaction_type='INVESTOR_WITHDRAW')),
-            )
-            
-            data.append({
-                'id': participant.id,
-                'user_id': participant.user.id,
-                'investor_name': f"{participant.user.first_name} {participant.user.last_name}".strip() or participant.user.email,
-                'investor_email': participant.user.email,
-                'investorEmail': participant.user.email,  # Legacy field
-                
-                # PAMM details
-                'pamm_id': participant.pamm.id,
-                'pamm_name': participant.pamm.name,
-                'manager_name': f"{participant.pamm.manager.first_name} {participant.pamm.manager.last_name}".strip() or participant.pamm.manager.email,
-                'manager_email': participant.pamm.manager.email,
-                'pamm_mt5_login': participant.pamm.mt5_account_id,
-                'tradingAccountId': participant.pamm.mt5_account_id,
-                
-                # Financial details
-                'amount': float(participant.total_deposited),
-                'amountInvested': float(participant.total_deposited),  # Legacy
-                'amount_invested': float(participant.total_deposited),
-                'total_withdrawn': float(participant.total_withdrawn),
-                'net_invested': float(net_invested),
-                'current_value': float(current_value),
-                'net_profit_loss': float(profit_loss),
-                'profit': float(profit_loss),  # Legacy
-                'roi_percentage': round(roi_percentage, 2),
-                
-                # Unit-based data
-                'units': float(participant.units),
-                'share_percentage': float(participant.share_percentage()),
-                'unit_price': float(participant.pamm.unit_price()),
-                
-                # Transaction stats
-                'total_transactions': txn_stats['total_txns'] or 0,
-                'total_deposits': txn_stats['deposits'] or 0,
-                'total_withdrawals': txn_stats['withdrawals'] or 0,
-                
-                # Metadata
-                'joined_at': participant.joined_at.isoformat() if participant.joined_at else None,
-                'last_transaction_at': participant.last_transaction_at.isoformat() if participant.last_transaction_at else None,
-                'is_enabled': True,  # Investors don't have individual enable/disable
-                'pam_account': participant.pamm.id,
-                'investor': participant.user.id,
-            })
+        data = [serialize_investor_row(participant) for participant in participants]
         
         return Response({
             'data': data,
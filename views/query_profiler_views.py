@@ -0,0 +1,35 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from django.conf import settings
+import os
+
+from adminPanel.permissions import IsAdmin
+from adminPanel.utils.query_profiler import profiler_stats
+
+
+class AdminQueryProfileView(APIView):
+    """
+    Per-endpoint query profile of this worker process (QueryProfilerMiddleware).
+    GET: ?endpoint=<url name> for one endpoint, ?sort=queries|sql_ms|duplicate_queries|mt5_calls|mt5_ms|duration_ms
+         (by p95, default queries)
+    DELETE: reset the collected samples
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        endpoint = request.query_params.get('endpoint')
+        sort = request.query_params.get('sort', 'queries')
+        endpoints = profiler_stats.summary(endpoint=endpoint, sort=sort)
+        if endpoint and not endpoints:
+            return Response({'error': f'No samples for endpoint {endpoint}'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'enabled': getattr(settings, 'QUERY_PROFILER_ENABLED', False),
+            'pid': os.getpid(),
+            'since': profiler_stats.since,
+            'endpoints': endpoints,
+        })
+
+    def delete(self, request):
+        profiler_stats.reset()
+        return Response({'message': 'Query profile reset'})
@@ -8,6 +8,7 @@ from ..permissions import IsAdmin, IsManager, OrPermission
 from .views import get_client_ip
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from ..services.blob_storage import hashing_uploads, store_upload
 
 class TicketView(APIView):
     permission_classes = [OrPermission(IsAdmin, IsManager)]
@@ -83,6 +84,7 @@ class TicketView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @hashing_uploads
     def post(self, request):
         # Extract only subject and description, ignore extra fields like 'documents'
         data = {
@@ -118,7 +120,8 @@ class TicketView(APIView):
                     pass
 
             for f in files:
-                Message.objects.create(ticket=ticket, sender=request.user, file=f)
+                # Attachments already stored (same content) are referenced, not written again
+                Message.objects.create(ticket=ticket, sender=request.user, file=store_upload(f).name)
             
             # Create activity log
             ActivityLog.objects.create(
@@ -4,6 +4,8 @@ from django.conf import settings
 from adminPanel.models import ActivityLog
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.core.files.move import file_move_safe
+from adminPanel.services.blob_storage import hashing_uploads
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +28,23 @@ def _ensure_unique_filename(dest_dir, filename):
     return candidate
 
 
+def _save_upload(f, dest_path):
+    # Streamed to a temporary file while the request was parsed: move it into place
+    if hasattr(f, 'temporary_file_path'):
+        file_move_safe(f.temporary_file_path(), dest_path)
+        os.chmod(dest_path, getattr(settings, 'FILE_UPLOAD_PERMISSIONS', None) or 0o644)
+        try:
+            f.close()
+        except FileNotFoundError:
+            pass
+        return
+    with open(dest_path, 'wb+') as out:
+        for chunk in f.chunks():
+            out.write(chunk)
+
+
 @csrf_exempt
+@hashing_uploads
 def upload_admin_files(request):
     """Accept multipart POST with files in field 'files' and save them
     to the configured `ADMIN_UPLOAD_DIR` (defaults to <project>/admin_uploads).
@@ -98,9 +116,7 @@ def upload_admin_files(request):
             safe_name = _ensure_unique_filename(admin_dir, target_name)
             dest_path = os.path.join(admin_dir, safe_name)
 
-            with open(dest_path, 'wb+') as out:
-                for chunk in f.chunks():
-                    out.write(chunk)
+            _save_upload(f, dest_path)
 
             saved.append({'original_name': f.name, 'saved_name': safe_name, 'size': f.size, 'path': dest_path})
             uploaded_names.append(safe_name)
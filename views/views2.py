@@ -21,10 +21,13 @@ from clientPanel.serializers import BankDetailsSerializer, CryptoDetailsSerializ
 from clientPanel.models import UserDocument  # Add import for UserDocument model
 from rest_framework.parsers import MultiPartParser
 from rest_framework.decorators import parser_classes
+from adminPanel.services.blob_storage import discard_uncommitted, hashing_uploads, is_blob_name, release, store_upload
 
 def try_delete_file(file_field):
-    """Safely delete a file field."""
+    """Safely delete a file field. Shared (deduplicated) uploads only lose a reference."""
     try:
+        if file_field and is_blob_name(file_field.name):
+            return release(file_field.name)
         if file_field and hasattr(file_field, 'path') and os.path.isfile(file_field.path):
             os.remove(file_field.path)
             return True
@@ -367,6 +370,7 @@ def get_user_documents(request, user_id):
 @api_view(['POST'])
 @permission_classes([IsAuthenticatedUser])
 @parser_classes((MultiPartParser,))
+@hashing_uploads
 def upload_document(request):
     """Upload a document for a user."""
     # Debug logging
@@ -427,27 +431,40 @@ def upload_document(request):
             defaults={'status': 'pending'}
         )
 
-        # Update document and reset status to pending
-        if not created and user_document.document:
-            # Delete old document file
-            try_delete_file(user_document.document)
-        
-        user_document.document = file
-        user_document.status = 'pending'
-        user_document.save()
-
-        # For backward compatibility, also update CustomUser fields
-        if doc_type == 'identity':
-            if user.id_proof:
-                try_delete_file(user.id_proof)
-            user.id_proof = file
-            user.id_proof_verified = False
-        else:
-            if user.address_proof:
-                try_delete_file(user.address_proof)
-            user.address_proof = file
-            user.address_proof_verified = False
-        user.save()
+        # Stored once by content and shared by the document and the user field (two references);
+        # re-uploading a file that is already stored writes nothing. The references and the
+        # fields pointing at the blob commit together, so a failure leaves no stray reference.
+        blob = None
+        try:
+            with transaction.atomic():
+                blob = store_upload(file, references=2)
+
+                # Update document and reset status to pending; old files go once the new ones are committed
+                if not created and user_document.document:
+                    old_document = user_document.document
+                    transaction.on_commit(lambda: try_delete_file(old_document))
+
+                user_document.document = blob.name
+                user_document.status = 'pending'
+                user_document.save()
+
+                # For backward compatibility, also update CustomUser fields
+                if doc_type == 'identity':
+                    if user.id_proof:
+                        old_proof = user.id_proof
+                        transaction.on_commit(lambda: try_delete_file(old_proof))
+                    user.id_proof = blob.name
+                    user.id_proof_verified = False
+                else:
+                    if user.address_proof:
+                        old_proof = user.address_proof
+                        transaction.on_commit(lambda: try_delete_file(old_proof))
+                    user.address_proof = blob.name
+                    user.address_proof_verified = False
+                user.save()
+        except Exception:
+            discard_uncommitted(blob)
+            raise
 
         ActivityLog.objects.create(
             user=request.user,
@@ -466,7 +483,8 @@ def upload_document(request):
             "message": "Document uploaded successfully.",
             "status": "pending",
             "document_type": doc_type,
-            "document_url": user_document.document.url
+            "document_url": user_document.document.url,
+            "sha256": blob.sha256,
         }, status=status.HTTP_201_CREATED)
 
     except CustomUser.DoesNotExist:
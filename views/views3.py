@@ -1,4 +1,5 @@
 from adminPanel.mt5.services import MT5ManagerActions
+from adminPanel.utils.rate_limit import mt5_budget
 from django.utils.timezone import now
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ObjectDoesNotExist
@@ -305,6 +306,7 @@ class ChangeLeverageView(APIView):
         except TradingAccount.DoesNotExist:
             return Response({"error": "Account not found."}, status=status.HTTP_404_NOT_FOUND)
 
+    @mt5_budget(cost=2)
     def post(self, request):
         account_id = request.data.get('accountId')
         new_leverage = request.data.get('leverage')
@@ -1151,35 +1151,16 @@ class AvailableLeverageOptionsView(APIView):
         
         try:
             
-            # Try to get leverage options from MT5 group configurations
-            mt5_actions = MT5ManagerActions()
-            
-            # Get all group configurations to determine available leverage ranges
-            groups_config = mt5_actions.get_all_group_configurations()
+            from adminPanel.services.group_catalog import group_catalog
+
+            # Leverage ranges are precomputed per group catalog snapshot
+            summary = group_catalog.leverage_summary('real')
             
             leverage_options = []
             
-            if groups_config and len(groups_config) > 0:
-                # Collect unique leverage values from all groups
-                leverage_set = set()
-                max_leverage = 1000  # Default max
-                min_leverage = 1     # Default min
-                
-                for group in groups_config:
-                    group_max = group.get('leverage_max', 1000)
-                    group_min = group.get('leverage_min', 1)
-                    max_leverage = max(max_leverage, group_max)
-                    min_leverage = min(min_leverage, group_min)
-                    
-                    
-                    # Add common leverage ratios up to the group's max
-                    common_ratios = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
-                    for ratio in common_ratios:
-                        if group_min <= ratio <= group_max:
-                            leverage_set.add(ratio)
-                
+            if summary['groups_analyzed'] > 0:
                 # Convert to formatted options
-                for ratio in sorted(leverage_set):
+                for ratio in summary['ratios']:
                     leverage_options.append({
                         "value": f"1:{ratio}",
                         "label": f"1:{ratio}",
@@ -1191,9 +1172,9 @@ class AvailableLeverageOptionsView(APIView):
                     "leverage_options": leverage_options,
                     "source": "mt5_groups",
                     "success": True,
-                    "max_leverage": max_leverage,
-                    "min_leverage": min_leverage,
-                    "groups_analyzed": len(groups_config),
+                    "max_leverage": summary['max_leverage'],
+                    "min_leverage": summary['min_leverage'],
+                    "groups_analyzed": summary['groups_analyzed'],
                     "total_options": len(leverage_options)
                 }, status=status.HTTP_200_OK)
             
@@ -1,4 +1,6 @@
 from adminPanel.mt5.services import MT5ManagerActions
+from adminPanel.services.positions_book import positions_book
+from adminPanel.utils.rate_limit import mt5_budget
 from rest_framework.decorators import api_view, permission_classes
 from django.utils.timezone import now
 from rest_framework.pagination import PageNumberPagination
@@ -98,6 +100,7 @@ class UpdateTradingGroupView(APIView):
     """
     permission_classes = [IsAdmin]
 
+    @mt5_budget(cost=2)
     def post(self, request):
         account_id = request.data.get("account_id")
         # Support both 'group_id' and 'selected_group' for backward compatibility
@@ -199,7 +202,7 @@ class AccountDetailsView(APIView):
                 except:
                     return Response({"error": "Failed to fetch equity"}, status=equity_response.status_code)
                 try:
-                    positions_response = mt5action.get_open_positions(int(account_id)) 
+                    positions_response = positions_book.get_positions(int(account_id))
                 except:
                     return Response({"error": "Failed to fetch open positions"}, status=positions_response.status_code)
                 data = {
@@ -263,7 +266,7 @@ class TradingHistoryView(APIView):
 
             
             if account:
-                open_positions = MT5ManagerActions().get_open_positions(int(account.account_id))
+                open_positions = positions_book.get_positions(int(account.account_id))
                 trading_history = [
                     {
                         "trade_id": position.get("id"),
@@ -581,7 +584,7 @@ class OpenPositionsView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             
-            positions = MT5ManagerActions().get_open_positions(int(account_id))
+            positions = positions_book.get_positions(int(account_id))
             return Response({"positions": positions}, status=status.HTTP_200_OK)
         except Exception as e:
             print(e)
@@ -1039,30 +1042,14 @@ class DemoAvailableGroupsView(APIView):
 
     def get(self, request):
         try:
-            from adminPanel.mt5.manager import get_demo_manager_instance
+            from adminPanel.services.group_catalog import group_catalog
 
-            # Connect to demo MT5 server
-            demo_instance = get_demo_manager_instance()
-            demo_manager = demo_instance.manager
+            # Demo server groups from the in-memory catalog snapshot
+            group_names = group_catalog.group_names('demo')
 
-            # Fetch groups directly via the MT5Manager API
-            group_names = []
-            for i in range(demo_manager.GroupTotal()):
-                grp = demo_manager.GroupNext(i)
-                if grp and grp.Group:
-                    group_names.append(grp.Group)
-
-            # Load database alias/active info for the groups
+            # Database alias/active info for the groups
             try:
-                db_groups = TradeGroup.objects.all()
-                db_settings = {}
-                for db_group in db_groups:
-                    db_settings[db_group.name] = {
-                        'is_active': getattr(db_group, 'is_active', False),
-                        'alias': getattr(db_group, 'alias', '') or '',
-                        'is_default': getattr(db_group, 'is_default', False),
-                        'is_demo_default': getattr(db_group, 'is_demo_default', False),
-                    }
+                db_settings = group_catalog.db_settings()
             except Exception:
                 db_settings = {}
 
@@ -759,3 +759,178 @@ class MAMInvestmentDetailsView(APIView):
             )
 
 
+
+def _is_admin(user):
+    # Same test as IsAdmin; everyone else let in by IsManager is limited to their own clients
+    if user.is_superuser:
+        return True
+    return 'admin' in (getattr(user, 'manager_admin_status', None) or '').lower()
+
+
+class MAMCopyOperationView(APIView):
+    """
+    Bulk MAM copy control for all investors of a MAM master account.
+    POST body:
+    - account_id: MAM master account
+    - action: pause | start | reassign
+    - target_account_id: new MAM master (reassign only)
+    The operation runs in the background; GET returns its progress.
+    """
+    permission_classes = [OrPermission(IsAdmin, IsManager)]
+
+    def _master(self, request, account_id):
+        master = TradingAccount.objects.select_related('user').get(account_id=account_id, account_type='mam')
+        if not _is_admin(request.user) and master.user.created_by_id != request.user.id:
+            return None
+        return master
+
+    def post(self, request):
+        from adminPanel.services.mam_copy import create_operation, operation_summary, run_in_background
+
+        action = request.data.get('action')
+        if action not in ('pause', 'start', 'reassign'):
+            return Response({"error": "action must be pause, start or reassign"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            master = self._master(request, request.data.get('account_id'))
+            target = None
+            if action == 'reassign':
+                target = self._master(request, request.data.get('target_account_id'))
+                if target is not None and target.id == getattr(master, 'id', None):
+                    return Response({"error": "Target master must differ from the current master"}, status=status.HTTP_400_BAD_REQUEST)
+        except TradingAccount.DoesNotExist:
+            return Response({"error": "MAM account not found"}, status=status.HTTP_404_NOT_FOUND)
+        if master is None or (action == 'reassign' and target is None):
+            return Response({"error": "You don't have permission to manage this MAM account"}, status=status.HTTP_403_FORBIDDEN)
+
+        operation = create_operation(master, action, target_master=target, user=request.user)
+        run_in_background(operation)
+        return Response(operation_summary(operation), status=status.HTTP_202_ACCEPTED)
+
+
+class MAMCopyOperationDetailView(APIView):
+    """
+    GET: progress of a bulk MAM copy operation (?results=true for the per-login map).
+    POST: resume an interrupted, partial or failed operation.
+    """
+    permission_classes = [OrPermission(IsAdmin, IsManager)]
+
+    def _operation(self, request, operation_id):
+        operation = MAMCopyOperation.objects.select_related('master_account__user', 'target_master').get(id=operation_id)
+        if not _is_admin(request.user) and operation.master_account.user.created_by_id != request.user.id:
+            return None
+        return operation
+
+    def get(self, request, operation_id):
+        from adminPanel.services.mam_copy import operation_summary
+
+        try:
+            operation = self._operation(request, operation_id)
+        except MAMCopyOperation.DoesNotExist:
+            return Response({"error": "Operation not found"}, status=status.HTTP_404_NOT_FOUND)
+        if operation is None:
+            return Response({"error": "You don't have permission to view this operation"}, status=status.HTTP_403_FORBIDDEN)
+        include_results = request.GET.get('results', '').lower() in ('1', 'true', 'yes')
+        return Response(operation_summary(operation, include_results=include_results), status=status.HTTP_200_OK)
+
+    def post(self, request, operation_id):
+        from adminPanel.services.mam_copy import operation_summary, resume_operation
+
+        try:
+            operation = self._operation(request, operation_id)
+        except MAMCopyOperation.DoesNotExist:
+            return Response({"error": "Operation not found"}, status=status.HTTP_404_NOT_FOUND)
+        if operation is None:
+            return Response({"error": "You don't have permission to manage this operation"}, status=status.HTTP_403_FORBIDDEN)
+        if not resume_operation(operation):
+            return Response({"error": f"Operation is {operation.status} and cannot be resumed"}, status=status.HTTP_409_CONFLICT)
+        return Response(operation_summary(operation), status=status.HTTP_202_ACCEPTED)
+
+
+class AccountBulkOperationView(APIView):
+    """
+    Bulk account operation over the trading accounts matched by a filter.
+    POST body:
+    - operation: change_group | change_leverage | enable_algo | disable_algo | enable_account | disable_account
+    - params: {"group": ...} or {"leverage": ...}
+    - filters: {"group_name", "account_type", "manager_id"} (managers are limited to their clients)
+    - dry_run: report the current and target value per account without touching MT5
+    Real operations run in the background; GET on the detail view returns progress.
+    """
+    permission_classes = [OrPermission(IsAdmin, IsManager)]
+
+    def post(self, request):
+        from adminPanel.services.account_bulk import create_operation, operation_summary, run_in_background
+
+        filters = dict(request.data.get('filters') or {})
+        if not _is_admin(request.user):
+            filters['manager_id'] = request.user.id
+        if not any(filters.get(key) for key in ('group_name', 'account_type', 'manager_id')):
+            return Response({"error": "At least one filter (group_name, account_type, manager_id) is required"}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        try:
+            operation = create_operation(
+                request.data.get('operation'),
+                request.data.get('params') or {},
+                filters,
+                dry_run=dry_run,
+                user=request.user,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        ActivityLog.objects.create(
+            user=request.user,
+            activity=f"{'Dry run of bulk' if dry_run else 'Bulk'} {operation.operation} on {operation.total} accounts ({operation.filters}).",
+            ip_address=get_client_ip(request),
+            endpoint=request.path,
+            activity_type="update",
+            activity_category="management",
+            user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            timestamp=timezone.now(),
+            related_object_id=operation.id,
+            related_object_type="AccountBulkOperation"
+        )
+        if dry_run:
+            return Response(operation_summary(operation, include_results=True), status=status.HTTP_200_OK)
+        run_in_background(operation)
+        return Response(operation_summary(operation), status=status.HTTP_202_ACCEPTED)
+
+
+class AccountBulkOperationDetailView(APIView):
+    """
+    GET: progress of a bulk account operation (?results=true for the per-login map).
+    POST: resume an interrupted, partial or failed operation.
+    """
+    permission_classes = [OrPermission(IsAdmin, IsManager)]
+
+    def _operation(self, request, operation_id):
+        operation = AccountBulkOperation.objects.get(id=operation_id)
+        if not _is_admin(request.user) and operation.created_by_id != request.user.id:
+            return None
+        return operation
+
+    def get(self, request, operation_id):
+        from adminPanel.services.account_bulk import operation_summary
+
+        try:
+            operation = self._operation(request, operation_id)
+        except AccountBulkOperation.DoesNotExist:
+            return Response({"error": "Operation not found"}, status=status.HTTP_404_NOT_FOUND)
+        if operation is None:
+            return Response({"error": "You don't have permission to view this operation"}, status=status.HTTP_403_FORBIDDEN)
+        include_results = request.GET.get('results', '').lower() in ('1', 'true', 'yes')
+        return Response(operation_summary(operation, include_results=include_results), status=status.HTTP_200_OK)
+
+    def post(self, request, operation_id):
+        from adminPanel.services.account_bulk import operation_summary, resume_operation
+
+        try:
+            operation = self._operation(request, operation_id)
+        except AccountBulkOperation.DoesNotExist:
+            return Response({"error": "Operation not found"}, status=status.HTTP_404_NOT_FOUND)
+        if operation is None:
+            return Response({"error": "You don't have permission to manage this operation"}, status=status.HTTP_403_FORBIDDEN)
+        if not resume_operation(operation):
+            return Response({"error": f"Operation is {operation.status} and cannot be resumed"}, status=status.HTTP_409_CONFLICT)
+        return Response(operation_summary(operation), status=status.HTTP_202_ACCEPTED)